@@ -0,0 +1,64 @@
+"""Pluggable classifier backends tried before the Claude API.
+
+A backend returns a result shaped like `classify_message` output, or None to
+defer to the next backend; Claude stays the final fallback in the callers.
+"""
+
+from dataclasses import dataclass, field
+from typing import Protocol
+
+import structlog
+
+from core.brief_extractor import extract_template_brief
+
+logger = structlog.get_logger()
+
+
+class ClassifierBackend(Protocol):
+    name: str
+
+    async def classify(self, text: str, has_photo: bool) -> dict | None:
+        """Return a classification, or None when this backend cannot decide."""
+
+
+class TemplateExtractorBackend:
+    """Rule-based parser for briefs in the fixed emoji template (no API call)."""
+
+    name = "template"
+
+    async def classify(self, text: str, has_photo: bool) -> dict | None:
+        return extract_template_brief(text)
+
+
+@dataclass
+class LocalBackendStats:
+    hits: dict[str, int] = field(default_factory=dict)
+    deferred: int = 0
+
+    @property
+    def total_hits(self) -> int:
+        return sum(self.hits.values())
+
+
+local_backends: list[ClassifierBackend] = [TemplateExtractorBackend()]
+local_backend_stats = LocalBackendStats()
+
+
+async def classify_locally(text: str, has_photo: bool) -> tuple[str, dict] | None:
+    """Try the registered local backends in order; (backend name, result) or None."""
+    for backend in local_backends:
+        try:
+            result = await backend.classify(text, has_photo)
+        except Exception as exc:
+            logger.warning("local_backend_failed", backend=backend.name, error=str(exc))
+            continue
+        if result is not None:
+            local_backend_stats.hits[backend.name] = local_backend_stats.hits.get(backend.name, 0) + 1
+            return backend.name, result
+    local_backend_stats.deferred += 1
+    return None
+
+
+def reset_local_backend_stats() -> None:
+    local_backend_stats.hits.clear()
+    local_backend_stats.deferred = 0
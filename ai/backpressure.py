@@ -0,0 +1,95 @@
+"""Load shedding: a pre-filter threshold that follows AI backpressure.
+
+While the AI retry queue is growing or the API answers 429, feeding borderline
+messages into classification only makes the backlog longer. The minimum
+`heuristic_score` the pre-filter asks for is therefore `MIN_HEURISTIC_SCORE`
+plus one per `AI_SHED_QUEUE_STEP` due transient-failure retries in
+`ai_retry_queue` (sender-budget deferrals do not count) and one per
+`AI_SHED_RATE_LIMIT_STEP` rate-limit responses in the last
+`AI_SHED_RATE_LIMIT_WINDOW` seconds, capped at `AI_SHED_MAX_EXTRA_SCORE`.
+It falls back as the queue drains and old 429s age out.
+
+Queue depth is refreshed by each retry scan; 429s are reported by the
+classifier. Shed messages are logged (`message_shed_under_load`) with their
+score, so they can be found and re-examined in bulk later.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
+import structlog
+
+from core.config import env
+from core.constants import (
+    AI_SHED_MAX_EXTRA_SCORE,
+    AI_SHED_QUEUE_STEP,
+    AI_SHED_RATE_LIMIT_STEP,
+    AI_SHED_RATE_LIMIT_WINDOW,
+    MIN_HEURISTIC_SCORE,
+)
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class ShedStats:
+    shed: int = 0
+    rate_limits: int = 0
+
+
+class LoadShedder:
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.reset()
+
+    def reset(self) -> None:
+        self.queue_depth = 0
+        self._rate_limited_at: deque[float] = deque()
+        self._last_min_score = MIN_HEURISTIC_SCORE
+        self.stats = ShedStats()
+
+    def set_queue_depth(self, depth: int) -> None:
+        self.queue_depth = max(0, int(depth))
+
+    def record_rate_limit(self) -> None:
+        self._rate_limited_at.append(self._clock())
+        self.stats.rate_limits += 1
+
+    def record_shed(self) -> None:
+        self.stats.shed += 1
+
+    @property
+    def recent_rate_limits(self) -> int:
+        cutoff = self._clock() - AI_SHED_RATE_LIMIT_WINDOW
+        while self._rate_limited_at and self._rate_limited_at[0] <= cutoff:
+            self._rate_limited_at.popleft()
+        return len(self._rate_limited_at)
+
+    @property
+    def extra_score(self) -> int:
+        if not env.ai_load_shedding:
+            return 0
+        pressure = (
+            self.queue_depth // AI_SHED_QUEUE_STEP
+            + self.recent_rate_limits // AI_SHED_RATE_LIMIT_STEP
+        )
+        return min(AI_SHED_MAX_EXTRA_SCORE, pressure)
+
+    def min_heuristic_score(self) -> int:
+        """Current pre-filter threshold; logs when it moves."""
+        min_score = MIN_HEURISTIC_SCORE + self.extra_score
+        if min_score != self._last_min_score:
+            logger.warning(
+                "prefilter_threshold_changed",
+                min_score=min_score,
+                previous=self._last_min_score,
+                queue_depth=self.queue_depth,
+                recent_rate_limits=self.recent_rate_limits,
+            )
+            self._last_min_score = min_score
+        return min_score
+
+
+load_shedder = LoadShedder()
@@ -0,0 +1,274 @@
+"""Message Batches API engine for bulk classification (backfill, retry backlog).
+
+Submits many classifier requests as batch jobs, polls until they end and maps
+each result back through the same parsing/normalization as `classify_message`.
+Batch ids are persisted in a JSON state file so an interrupted run resumes
+polling instead of paying for a second submission.
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+import structlog
+
+from ai import classifier
+from ai.cache import build_cache_key, classification_cache
+from ai.prompts import CLASSIFIER_PROMPT_VERSION
+from ai.usage import extract_usage, usage_meter
+from core.config import runtime
+from core.constants import AI_BATCH_MAX_REQUESTS, AI_BATCH_POLL_INTERVAL
+
+logger = structlog.get_logger()
+
+
+@dataclass(slots=True)
+class BatchItem:
+    custom_id: str
+    text: str
+    has_photo: bool = False
+
+
+@dataclass(slots=True)
+class BatchOutcome:
+    """Per-item result. `result` mirrors `classify_message` (dict or None);
+    `transient` marks errored/expired/canceled requests worth retrying later."""
+
+    custom_id: str
+    result: dict | None = None
+    transient: bool = False
+    error: str | None = None
+
+
+@dataclass
+class BatchProgress:
+    batch_ids: list[str] = field(default_factory=list)
+    total: int = 0
+    cached: int = 0
+    processing: int = 0  # requests still running in the batch being polled
+    succeeded: int = 0
+    errored: int = 0
+    expired: int = 0
+    canceled: int = 0
+
+    @property
+    def done(self) -> int:
+        return self.cached + self.succeeded + self.errored + self.expired + self.canceled
+
+    def render(self) -> str:
+        failed = self.errored + self.expired + self.canceled
+        return (
+            f"[batch] {self.done}/{self.total} done "
+            f"(cached={self.cached} processing={self.processing} "
+            f"succeeded={self.succeeded} failed={failed})"
+        )
+
+
+def _load_state(state_path: Path | None) -> dict[str, Any]:
+    if state_path is None or not state_path.exists():
+        return {}
+    try:
+        return json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        logger.warning("ai_batch_state_unreadable", path=str(state_path), error=str(exc))
+        return {}
+
+
+def _save_state(state_path: Path | None, state: dict[str, Any]) -> None:
+    if state_path is None:
+        return
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = state_path.with_suffix(state_path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp_path.replace(state_path)
+
+
+def _chunks(items: list[BatchItem], size: int) -> list[list[BatchItem]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def _wait_for_batch(
+    client: Any,
+    batch_id: str,
+    *,
+    poll_interval: float,
+    progress: BatchProgress,
+    on_progress: Callable[[BatchProgress], None] | None,
+) -> None:
+    while True:
+        batch = await client.messages.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        logger.info(
+            "ai_batch_progress",
+            batch_id=batch_id,
+            status=batch.processing_status,
+            processing=counts.processing,
+            succeeded=counts.succeeded,
+            errored=counts.errored,
+            expired=counts.expired,
+            canceled=counts.canceled,
+        )
+        if on_progress is not None:
+            snapshot = BatchProgress(
+                batch_ids=list(progress.batch_ids),
+                total=progress.total,
+                cached=progress.cached,
+                processing=counts.processing,
+                succeeded=progress.succeeded + counts.succeeded,
+                errored=progress.errored + counts.errored,
+                expired=progress.expired + counts.expired,
+                canceled=progress.canceled + counts.canceled,
+            )
+            on_progress(snapshot)
+        if batch.processing_status == "ended":
+            return
+        await asyncio.sleep(poll_interval)
+
+
+async def _collect_results(
+    client: Any,
+    batch_id: str,
+    items_by_id: dict[str, BatchItem],
+    ai_model: str,
+) -> dict[str, BatchOutcome]:
+    outcomes: dict[str, BatchOutcome] = {}
+    async for entry in await client.messages.batches.results(batch_id):
+        custom_id = entry.custom_id
+        result_type = entry.result.type
+        if result_type != "succeeded":
+            error = getattr(entry.result, "error", None)
+            outcomes[custom_id] = BatchOutcome(
+                custom_id=custom_id,
+                transient=True,
+                error=f"{result_type}: {error}" if error else result_type,
+            )
+            continue
+
+        message = entry.result.message
+        result = classifier._parse_response_content(message.content)
+        outcomes[custom_id] = BatchOutcome(custom_id=custom_id, result=result)
+
+        item = items_by_id.get(custom_id)
+        usage = extract_usage(getattr(message, "usage", None))
+        usage_meter.record(usage, malformed=result is None, model=ai_model)
+        if result is not None and item is not None:
+            await classification_cache.put(
+                build_cache_key(item.text, item.has_photo, ai_model, CLASSIFIER_PROMPT_VERSION),
+                result,
+                ai_model=ai_model,
+                prompt_version=CLASSIFIER_PROMPT_VERSION,
+                input_tokens=usage.prompt_tokens,
+                output_tokens=usage.output_tokens,
+            )
+    return outcomes
+
+
+async def classify_batch(
+    items: list[BatchItem],
+    *,
+    state_path: Path | None = None,
+    poll_interval: float | None = None,
+    max_requests: int = AI_BATCH_MAX_REQUESTS,
+    on_progress: Callable[[BatchProgress], None] | None = None,
+    client: Any = None,
+) -> dict[str, BatchOutcome]:
+    """Classify many messages through the Message Batches API.
+
+    Items already in the classification cache are resolved without a request.
+    When `state_path` holds the state of an interrupted run over the same
+    items, its batches are polled again instead of being resubmitted.
+    The state file is removed once all results are collected.
+    """
+    client = client or classifier.client
+    if poll_interval is None:
+        poll_interval = AI_BATCH_POLL_INTERVAL
+    ai_model = runtime.ai_model
+    items_by_id = {item.custom_id: item for item in items}
+    progress = BatchProgress(total=len(items))
+    outcomes: dict[str, BatchOutcome] = {}
+
+    state = _load_state(state_path)
+    if state and (
+        state.get("ai_model") != ai_model
+        or state.get("prompt_version") != CLASSIFIER_PROMPT_VERSION
+        or set(state.get("custom_ids", [])) != set(items_by_id)
+    ):
+        logger.warning("ai_batch_state_mismatch_ignored", path=str(state_path))
+        state = {}
+
+    if not state:
+        state = {
+            "ai_model": ai_model,
+            "prompt_version": CLASSIFIER_PROMPT_VERSION,
+            "custom_ids": list(items_by_id),
+            "batches": [],
+        }
+    else:
+        logger.info("ai_batch_resumed", batch_ids=[b["batch_id"] for b in state["batches"]])
+    batches: list[dict[str, Any]] = state["batches"]
+    submitted = {cid for batch in batches for cid in batch["custom_ids"]}
+
+    pending: list[BatchItem] = []
+    for item in items:
+        if item.custom_id in submitted:
+            continue
+        cached = await classification_cache.get(
+            build_cache_key(item.text, item.has_photo, ai_model, CLASSIFIER_PROMPT_VERSION)
+        )
+        if cached is not None:
+            outcomes[item.custom_id] = BatchOutcome(custom_id=item.custom_id, result=cached)
+        else:
+            pending.append(item)
+
+    for chunk in _chunks(pending, max_requests):
+        batch = await client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": item.custom_id,
+                    "params": classifier._build_request_params(
+                        item.text, item.has_photo, ai_model
+                    ),
+                }
+                for item in chunk
+            ]
+        )
+        batches.append({"batch_id": batch.id, "custom_ids": [item.custom_id for item in chunk]})
+        _save_state(state_path, state)
+        logger.info("ai_batch_submitted", batch_id=batch.id, requests=len(chunk))
+
+    progress.cached = len(outcomes)
+    progress.batch_ids = [batch["batch_id"] for batch in batches]
+
+    for batch in batches:
+        batch_id = batch["batch_id"]
+        await _wait_for_batch(
+            client,
+            batch_id,
+            poll_interval=poll_interval,
+            progress=progress,
+            on_progress=on_progress,
+        )
+        collected = await _collect_results(client, batch_id, items_by_id, ai_model)
+        for custom_id in batch["custom_ids"]:
+            outcome = collected.get(custom_id) or BatchOutcome(
+                custom_id=custom_id, transient=True, error="missing_result"
+            )
+            outcomes[custom_id] = outcome
+            if outcome.transient:
+                progress.errored += 1
+            else:
+                progress.succeeded += 1
+
+    if state_path is not None and state_path.exists():
+        state_path.unlink()
+
+    logger.info(
+        "ai_batch_completed",
+        total=progress.total,
+        cached=progress.cached,
+        succeeded=progress.succeeded,
+        failed=progress.errored,
+    )
+    return outcomes
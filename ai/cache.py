@@ -0,0 +1,234 @@
+"""Content-addressed cache for classifier results.
+
+Two tiers: a small in-process LRU (hot) and the `ai_classification_cache`
+SQLite table (persistent). Only successful, schema-valid results are stored.
+
+Hot hits do not touch SQLite one by one: their keys are collected and their
+`last_accessed_at` refreshed in one statement at most every
+`AI_CACHE_TOUCH_INTERVAL`, so the persistent LRU prune keeps the hottest keys.
+The prune itself runs every `AI_CACHE_PRUNE_EVERY` writes, not on each one.
+"""
+
+import copy
+import hashlib
+import json
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.constants import (
+    AI_CACHE_HOT_SIZE,
+    AI_CACHE_MAX_ROWS,
+    AI_CACHE_PRUNE_EVERY,
+    AI_CACHE_TOUCH_INTERVAL,
+    AI_CACHE_TTL,
+)
+from db.repo import ai_cache_repo
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class CacheStats:
+    hot_hits: int = 0
+    persistent_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    errors: int = 0
+    saved_seconds: float = 0.0
+    saved_input_tokens: int = 0
+    saved_output_tokens: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.hot_hits + self.persistent_hits
+
+
+@dataclass
+class _HotEntry:
+    result: dict
+    expires_at: float  # time.time()
+    latency_ms: int
+    input_tokens: int
+    output_tokens: int
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for hashing: NFC, LF line endings, no trailing spaces."""
+    normalized = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    lines = [line.rstrip() for line in normalized.split("\n")]
+    return "\n".join(lines).strip()
+
+
+def build_cache_key(text: str, has_photo: bool, ai_model: str, prompt_version: str) -> str:
+    payload = "\x1f".join(
+        (normalize_text(text), "1" if has_photo else "0", ai_model, prompt_version)
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ClassificationCache:
+    def __init__(
+        self,
+        *,
+        hot_size: int = AI_CACHE_HOT_SIZE,
+        ttl: timedelta = AI_CACHE_TTL,
+        max_rows: int = AI_CACHE_MAX_ROWS,
+        prune_every: int = AI_CACHE_PRUNE_EVERY,
+        touch_interval: timedelta = AI_CACHE_TOUCH_INTERVAL,
+    ):
+        self.hot_size = hot_size
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.prune_every = prune_every
+        self.touch_interval = touch_interval
+        self.stats = CacheStats()
+        self._hot: OrderedDict[str, _HotEntry] = OrderedDict()
+        self._session_maker: async_sessionmaker[AsyncSession] | None = None
+        self._touched: set[str] = set()  # hot hits not yet written to SQLite
+        self._touched_at = time.monotonic()
+        self._writes_since_prune = 0
+
+    def bind(self, session_maker: async_sessionmaker[AsyncSession] | None) -> None:
+        """Enable (or disable with None) the persistent SQLite tier."""
+        self._session_maker = session_maker
+
+    def reset(self) -> None:
+        self._hot.clear()
+        self.stats = CacheStats()
+        self._session_maker = None
+        self._touched.clear()
+        self._touched_at = time.monotonic()
+        self._writes_since_prune = 0
+
+    def _remember_hot(self, key: str, entry: _HotEntry) -> None:
+        self._hot[key] = entry
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.hot_size:
+            self._hot.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _count_hit(self, entry: _HotEntry) -> dict:
+        self.stats.saved_seconds += entry.latency_ms / 1000
+        self.stats.saved_input_tokens += entry.input_tokens
+        self.stats.saved_output_tokens += entry.output_tokens
+        return copy.deepcopy(entry.result)
+
+    async def _write_touched(self, session: AsyncSession) -> None:
+        keys, self._touched = sorted(self._touched), set()
+        self._touched_at = time.monotonic()
+        await ai_cache_repo.touch_cached_classifications(session, keys)
+
+    async def _touch(self, key: str) -> None:
+        """Queue a hot hit's LRU refresh; write the queue once the interval has passed."""
+        if self._session_maker is None:
+            return
+        self._touched.add(key)
+        if time.monotonic() - self._touched_at < self.touch_interval.total_seconds():
+            return
+        try:
+            async with self._session_maker() as session:
+                await self._write_touched(session)
+                await session.commit()
+        except Exception as exc:
+            self.stats.errors += 1
+            logger.warning("ai_cache_touch_failed", error=str(exc))
+
+    async def get(self, key: str) -> dict | None:
+        entry = self._hot.get(key)
+        if entry is not None:
+            if entry.expires_at > time.time():
+                self._hot.move_to_end(key)
+                self.stats.hot_hits += 1
+                await self._touch(key)
+                return self._count_hit(entry)
+            del self._hot[key]
+            entry = None
+
+        if self._session_maker is not None:
+            try:
+                async with self._session_maker() as session:
+                    row = await ai_cache_repo.get_cached_classification(session, key)
+                    if row:
+                        entry = _HotEntry(
+                            result=json.loads(row.result_json),
+                            expires_at=datetime.fromisoformat(row.expires_at).timestamp(),
+                            latency_ms=int(row.latency_ms or 0),
+                            input_tokens=int(row.input_tokens or 0),
+                            output_tokens=int(row.output_tokens or 0),
+                        )
+                    await session.commit()
+            except Exception as exc:
+                self.stats.errors += 1
+                logger.warning("ai_cache_read_failed", error=str(exc))
+                entry = None
+            if entry is not None:
+                self._remember_hot(key, entry)
+                self.stats.persistent_hits += 1
+                return self._count_hit(entry)
+
+        self.stats.misses += 1
+        return None
+
+    async def put(
+        self,
+        key: str,
+        result: dict,
+        *,
+        ai_model: str,
+        prompt_version: str,
+        latency_s: float = 0.0,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+    ) -> None:
+        expires_at = datetime.now(timezone.utc) + self.ttl
+        entry = _HotEntry(
+            result=copy.deepcopy(result),
+            expires_at=expires_at.timestamp(),
+            latency_ms=int(latency_s * 1000),
+            input_tokens=int(input_tokens or 0),
+            output_tokens=int(output_tokens or 0),
+        )
+        self._remember_hot(key, entry)
+        self.stats.stores += 1
+
+        if self._session_maker is None:
+            return
+        self._touched.discard(key)  # the upsert refreshes it
+        self._writes_since_prune += 1
+        pruned = 0
+        try:
+            async with self._session_maker() as session:
+                await ai_cache_repo.upsert_cached_classification(
+                    session,
+                    cache_key=key,
+                    ai_model=ai_model,
+                    prompt_version=prompt_version,
+                    result_json=json.dumps(result, ensure_ascii=False),
+                    expires_at=expires_at.isoformat(),
+                    latency_ms=entry.latency_ms,
+                    input_tokens=entry.input_tokens,
+                    output_tokens=entry.output_tokens,
+                )
+                if self._writes_since_prune >= self.prune_every:
+                    # Pending hot hits first, so the prune sees their real LRU order.
+                    await self._write_touched(session)
+                    pruned = await ai_cache_repo.prune_cached_classifications(
+                        session, max_rows=self.max_rows
+                    )
+                    self._writes_since_prune = 0
+                await session.commit()
+            self.stats.evictions += pruned
+        except Exception as exc:
+            self.stats.errors += 1
+            logger.warning("ai_cache_write_failed", error=str(exc))
+
+
+# Module-level singleton; the persistent tier is bound at startup (bot.py).
+classification_cache = ClassificationCache()
@@ -0,0 +1,78 @@
+"""Fast-model-first classification cascade.
+
+With `AI_CASCADE_MODEL` set, `classify_message` asks that (small, fast) model
+first. Its answer is kept when the confidence is clearly on one side of
+`runtime.ai_confidence_threshold` — at least `AI_CASCADE_CONFIDENCE_MARGIN`
+away — so obvious non-briefs and obvious briefs never reach the main model.
+The ambiguous middle band, malformed answers and fast-tier failures escalate
+to `runtime.ai_model`.
+
+Per-tier latency, tokens and cost come from `usage_meter.by_model`; this module
+only counts the cascade decisions.
+"""
+
+from dataclasses import dataclass
+
+from core.config import env, runtime
+from core.constants import AI_CASCADE_CONFIDENCE_MARGIN
+
+ESCALATE_AMBIGUOUS = "ambiguous"
+ESCALATE_MALFORMED = "malformed"
+ESCALATE_FAILED = "failed"
+
+
+@dataclass
+class CascadeStats:
+    fast_calls: int = 0
+    accepted: int = 0
+    escalated_ambiguous: int = 0
+    escalated_malformed: int = 0
+    escalated_failed: int = 0
+
+    @property
+    def escalated(self) -> int:
+        return self.escalated_ambiguous + self.escalated_malformed + self.escalated_failed
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of fast-tier attempts whose answer was kept."""
+        return self.accepted / self.fast_calls if self.fast_calls else 0.0
+
+
+class CascadeTracker:
+    def __init__(self):
+        self.stats = CascadeStats()
+
+    def reset(self) -> None:
+        self.stats = CascadeStats()
+
+    def record_accepted(self) -> None:
+        self.stats.fast_calls += 1
+        self.stats.accepted += 1
+
+    def record_escalated(self, reason: str) -> None:
+        self.stats.fast_calls += 1
+        if reason == ESCALATE_AMBIGUOUS:
+            self.stats.escalated_ambiguous += 1
+        elif reason == ESCALATE_MALFORMED:
+            self.stats.escalated_malformed += 1
+        else:
+            self.stats.escalated_failed += 1
+
+
+def cascade_model() -> str | None:
+    """The fast-tier model, or None when the cascade is off."""
+    model = env.ai_cascade_model.strip()
+    if not model or model == runtime.ai_model:
+        return None
+    return model
+
+
+def is_decisive(result: dict, threshold: float | None = None) -> bool:
+    """True when the confidence is clearly above or clearly below the threshold."""
+    if threshold is None:
+        threshold = runtime.ai_confidence_threshold
+    return round(abs(float(result["confidence"]) - threshold), 6) >= AI_CASCADE_CONFIDENCE_MARGIN
+
+
+cascade_stats = CascadeTracker()
@@ -0,0 +1,101 @@
+"""Circuit breaker for the Anthropic API.
+
+After `failure_threshold` consecutive transient failures the circuit opens:
+`classify_message` stops calling the API and callers fall back to the retry
+queue immediately. Once `reset_timeout` has passed, a single probe call is let
+through (half-open); its outcome closes or re-opens the circuit.
+"""
+
+import time
+from typing import Callable
+
+import structlog
+
+from core.constants import AI_CIRCUIT_FAILURE_THRESHOLD, AI_CIRCUIT_RESET_TIMEOUT
+
+logger = structlog.get_logger()
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        *,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.reset()
+
+    def reset(self) -> None:
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self._probe_started_at: float | None = None
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are refused outright (no probe is due yet)."""
+        if self.state == STATE_CLOSED:
+            return False
+        now = self._clock()
+        if self.state == STATE_OPEN:
+            return self.opened_at is not None and now - self.opened_at < self.reset_timeout
+        # Half-open: refused while the probe is running, unless it was abandoned.
+        return (
+            self._probe_started_at is not None
+            and now - self._probe_started_at < self.reset_timeout
+        )
+
+    def allow_request(self) -> bool:
+        """Decide whether one API call may go out; counts refusals."""
+        if self.state == STATE_CLOSED:
+            return True
+        if self.is_open:
+            self.rejected += 1
+            return False
+        self.state = STATE_HALF_OPEN
+        self._probe_started_at = self._clock()
+        logger.info("ai_circuit_half_open_probe")
+        return True
+
+    @property
+    def probing(self) -> bool:
+        return self.state == STATE_HALF_OPEN
+
+    def record_success(self) -> None:
+        if self.state != STATE_CLOSED:
+            logger.info("ai_circuit_closed", was=self.state)
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_started_at = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == STATE_HALF_OPEN or (
+            self.state == STATE_CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = STATE_OPEN
+            self.opened_at = self._clock()
+            self._probe_started_at = None
+            self.trips += 1
+            logger.warning(
+                "ai_circuit_opened",
+                consecutive_failures=self.consecutive_failures,
+                reset_timeout_s=self.reset_timeout,
+            )
+
+
+circuit_breaker = CircuitBreaker(
+    failure_threshold=AI_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=AI_CIRCUIT_RESET_TIMEOUT,
+)
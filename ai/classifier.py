@@ -1,17 +1,46 @@
 """Claude API integration for brief classification."""
 
 import asyncio
-import json
+import copy
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 import anthropic
 import structlog
 
-from ai.prompts import CLASSIFIER_SYSTEM_PROMPT
+from ai.backpressure import load_shedder
+from ai.cache import build_cache_key, classification_cache
+from ai.cascade import (
+    ESCALATE_AMBIGUOUS,
+    ESCALATE_FAILED,
+    ESCALATE_MALFORMED,
+    cascade_model,
+    cascade_stats,
+    is_decisive,
+)
+from ai.circuit_breaker import STATE_CLOSED, circuit_breaker
+from ai.compact import expand_compact
+from ai.gateway import GatewayTicket, ai_gateway
+from ai.latency import CallKind, latency_tracker
+from ai.prompts import (
+    CLASSIFIER_PROMPT_VERSION,
+    CLASSIFIER_SYSTEM_PROMPT,
+    CLASSIFIER_TOOL,
+    CLASSIFIER_TOOL_NAME,
+    GATE_SYSTEM_PROMPT,
+    GATE_TOOL,
+    GATE_TOOL_NAME,
+    TWO_STAGE_PROMPT_VERSION,
+)
+from ai.recorder import classification_recorder
+from ai.stream_parser import IncrementalObjectScanner
+from ai.usage import CallUsage, extract_usage, usage_meter
 from core.config import env, runtime
 from core.constants import (
-    AI_API_TIMEOUT,
+    AI_GATE_MAX_TOKENS,
+    AI_GATEWAY_BASE_TOKEN_ESTIMATE,
     AI_MAX_INLINE_RETRIES,
     AI_RETRY_BASE_DELAY,
     AMOUNT_FIELDS,
@@ -19,12 +48,20 @@ from core.constants import (
     VALID_PLATFORMS,
     VALID_PRIORITIES,
 )
-from core.exceptions import AIPermanentError, AITransientError
+from core.exceptions import AICircuitOpenError, AIPermanentError, AITransientError
 
 logger = structlog.get_logger()
 
 client = anthropic.AsyncAnthropic(api_key=env.anthropic_api_key)
 
+# Receives the members parsed so far while a classification streams in.
+PartialCallback = Callable[[dict], Awaitable[None]]
+
+# `stage` of the `ai_classification` event
+STAGE_SINGLE = "single"
+STAGE_GATE = "gate"  # two-stage mode, verdict only
+STAGE_EXTRACT = "extract"  # two-stage mode, full extraction after a "brief" verdict
+
 
 def _as_optional_text(value: Any) -> str | None:
     if value is None:
@@ -62,7 +99,8 @@ def _as_optional_iso_date(value: Any) -> str | None:
     return date_str
 
 
-def _normalize_classifier_result(payload: Any) -> dict | None:
+def _normalize_verdict(payload: Any) -> dict | None:
+    """The `is_task`/`confidence` (and non-brief `reason`) part of a tool input."""
     if not isinstance(payload, dict):
         logger.error("ai_schema_invalid", reason="payload_not_object")
         return None
@@ -88,6 +126,13 @@ def _normalize_classifier_result(payload: Any) -> dict | None:
             "confidence": confidence_val,
             "reason": reason,
         }
+    return {"is_task": True, "confidence": confidence_val}
+
+
+def _normalize_classifier_result(payload: Any) -> dict | None:
+    verdict = _normalize_verdict(payload)
+    if verdict is None or not verdict["is_task"]:
+        return verdict
 
     data = payload.get("data")
     if not isinstance(data, dict):
@@ -115,96 +160,429 @@ def _normalize_classifier_result(payload: Any) -> dict | None:
 
     return {
         "is_task": True,
-        "confidence": confidence_val,
+        "confidence": verdict["confidence"],
         "data": normalized_data,
     }
 
 
-async def classify_message(text: str, has_photo: bool = False) -> dict | None:
+def _user_message(text: str, has_photo: bool) -> str:
+    if has_photo:
+        return "[Фото/референс прикреплено к сообщению]\n\n" + text
+    return text
+
+
+def _build_gate_params(text: str, has_photo: bool, ai_model: str) -> dict[str, Any]:
+    """Stage one of two-stage mode: a verdict-only call with a tiny output budget."""
+    return {
+        "model": ai_model,
+        "max_tokens": AI_GATE_MAX_TOKENS,
+        "system": [
+            {
+                "type": "text",
+                "text": GATE_SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"},
+            }
+        ],
+        "tools": [GATE_TOOL],
+        "tool_choice": {"type": "tool", "name": GATE_TOOL_NAME},
+        "messages": [{"role": "user", "content": _user_message(text, has_photo)}],
+    }
+
+
+def _build_request_params(text: str, has_photo: bool, ai_model: str) -> dict[str, Any]:
+    """Messages API parameters for one classification (shared with batch mode)."""
+    user_message = _user_message(text, has_photo)
+    return {
+        "model": ai_model,
+        "max_tokens": 1024,
+        # The system prompt is identical on every call: mark it for prompt caching
+        # so repeat calls read it from cache instead of paying full input price.
+        "system": [
+            {
+                "type": "text",
+                "text": CLASSIFIER_SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"},
+            }
+        ],
+        # Forced tool call: the answer arrives as the tool's already-parsed input,
+        # never as free text that could be fenced or truncated mid-JSON.
+        "tools": [CLASSIFIER_TOOL],
+        "tool_choice": {"type": "tool", "name": CLASSIFIER_TOOL_NAME},
+        "messages": [{"role": "user", "content": user_message}],
+    }
+
+
+def _parse_response_content(content: Any, tool_name: str = CLASSIFIER_TOOL_NAME) -> dict | None:
+    """Turn Messages API content blocks into a normalized result, None if malformed.
+
+    For the stage-one `record_verdict` tool the result is the verdict only.
+    """
+    if not content:
+        logger.error("ai_empty_response")
+        return None
+
+    for block in content:
+        if getattr(block, "type", None) != "tool_use":
+            continue
+        if getattr(block, "name", None) != tool_name:
+            continue
+        payload = getattr(block, "input", None)
+        if tool_name == GATE_TOOL_NAME:
+            return _normalize_verdict(payload)
+        return _normalize_classifier_result(expand_compact(payload))
+
+    logger.error(
+        "ai_tool_use_missing",
+        block_types=[getattr(block, "type", None) for block in content],
+    )
+    return None
+
+
+async def _stream_response(
+    params: dict[str, Any],
+    on_partial: PartialCallback,
+) -> tuple[Any, Any, dict | None]:
+    """Stream one classification; returns (content, usage, early_result).
+
+    `early_result` is set (and content is None) when the stream was cut short
+    because the message is not a brief.
+    """
+    scanner = IncrementalObjectScanner()
+    async with client.messages.stream(**params) as stream:
+        async for event in stream:
+            delta = getattr(event, "delta", None)
+            if event.type != "content_block_delta" or getattr(delta, "type", None) != "input_json_delta":
+                continue
+            if not scanner.feed(delta.partial_json):
+                continue
+            members = expand_compact(scanner.members)
+            if "confidence" not in members:
+                continue
+            if members.get("is_task") is False:
+                early_result = _normalize_classifier_result(
+                    {
+                        "is_task": False,
+                        "confidence": members["confidence"],
+                        "reason": members.get("reason"),
+                    }
+                )
+                if early_result is not None:
+                    snapshot = getattr(stream, "current_message_snapshot", None)
+                    return None, getattr(snapshot, "usage", None), early_result
+            elif members.get("is_task") is True:
+                try:
+                    await on_partial(copy.deepcopy(members))
+                except Exception as e:
+                    logger.warning("ai_stream_partial_callback_failed", error=str(e))
+        final = await stream.get_final_message()
+    return final.content, getattr(final, "usage", None), None
+
+
+async def classify_message(
+    text: str,
+    has_photo: bool = False,
+    *,
+    on_partial: PartialCallback | None = None,
+) -> dict | None:
     """
     Send a message to Claude for classification.
 
+    Results are served from the classification cache when the same normalized
+    text was already classified with the current model and prompt version.
+
     Returns:
       - parsed JSON dict on success
-      - None on permanent failure (malformed AI response)
+      - None on permanent failure (no valid `record_classification` tool call)
     Raises:
       - AITransientError on retryable failure (rate-limit, connection)
+      - AICircuitOpenError (an AITransientError) without calling the API while
+        the circuit breaker is open
       - AIPermanentError on non-retryable API error
+
+    A half-open circuit lets exactly one probe attempt through (no inline
+    retries). Each attempt waits for a slot from the shared AI gateway in the
+    caller's lane (see `ai.gateway.use_lane`); backoff sleeps do not hold a slot.
+    The per-attempt timeout follows the observed p99 latency, and with
+    `AI_HEDGE_REQUESTS` a slow call gets one duplicate (see `ai.latency`).
+
+    With `AI_CASCADE_MODEL` set, the fast model answers first and only
+    ambiguous, malformed or failed answers reach `runtime.ai_model` (see
+    `ai.cascade`).
+
+    With `AI_TWO_STAGE` on, a verdict-only `record_verdict` call (output capped
+    at `AI_GATE_MAX_TOKENS`) runs first; a non-brief verdict is returned as the
+    result and goes through the callers' usual confidence-threshold checks,
+    and only a "brief" verdict triggers the full extraction call.
+
+    With `on_partial` the response is streamed and the tool input is parsed as
+    its JSON deltas arrive. Once `is_task: true` and `confidence` are known,
+    `on_partial` is called with the members parsed so far each time another
+    member completes. Once `is_task: false` and `confidence` are known, the
+    stream is cut and that verdict is the result.
     """
-    user_message = text
-    if has_photo:
-        user_message = "[Фото/референс прикреплено к сообщению]\n\n" + text
+    fast_model = cascade_model()
+    if fast_model is None:
+        return await _classify_with_model(text, has_photo, runtime.ai_model, on_partial)
 
-    last_error = None
-    raw_response = ""
-    for attempt in range(1 + AI_MAX_INLINE_RETRIES):
-        try:
-            response = await asyncio.wait_for(
-                client.messages.create(
-                    model=runtime.ai_model,
-                    max_tokens=1024,
-                    system=CLASSIFIER_SYSTEM_PROMPT,
-                    messages=[{"role": "user", "content": user_message}],
-                ),
-                timeout=AI_API_TIMEOUT,
+    try:
+        # The fast tier never streams: a kept answer arrives quickly anyway and
+        # an escalated one must not leave a skeleton card behind.
+        fast_result = await _classify_with_model(text, has_photo, fast_model, None)
+    except AICircuitOpenError:
+        raise
+    except AITransientError as e:
+        fast_result, reason = None, ESCALATE_FAILED
+        logger.warning("ai_cascade_fast_tier_failed", model=fast_model, error=str(e))
+    else:
+        if fast_result is None:
+            reason = ESCALATE_MALFORMED
+        elif is_decisive(fast_result):
+            cascade_stats.record_accepted()
+            logger.info(
+                "ai_cascade_accepted",
+                model=fast_model,
+                is_task=fast_result.get("is_task"),
+                confidence=fast_result.get("confidence"),
             )
+            return fast_result
+        else:
+            reason = ESCALATE_AMBIGUOUS
+
+    cascade_stats.record_escalated(reason)
+    logger.info(
+        "ai_cascade_escalated",
+        model=fast_model,
+        reason=reason,
+        confidence=fast_result.get("confidence") if fast_result else None,
+    )
+    return await _classify_with_model(text, has_photo, runtime.ai_model, on_partial)
+
+
+async def _first_success(tasks: list[asyncio.Future]) -> asyncio.Future:
+    """The first task to finish without an error, else the first task."""
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None:
+                return task
+    return tasks[0]
+
+
+async def _create_with_hedge(params: dict[str, Any], kind: CallKind, ticket: GatewayTicket) -> Any:
+    """`client.messages.create`, duplicated once when it runs past the observed p95."""
+    hedge_delay = latency_tracker.hedge_delay(kind)
+    if hedge_delay is None:
+        return await client.messages.create(**params)
+
+    first = asyncio.ensure_future(client.messages.create(**params))
+    tasks = [first]
+    try:
+        done, _pending = await asyncio.wait(tasks, timeout=hedge_delay)
+        if not done and latency_tracker.allow_hedge():
+            # The duplicate needs its own free gateway slot; it never queues.
+            if ai_gateway.try_acquire(ticket.lane, ticket.estimated_tokens):
+                hedge = asyncio.ensure_future(client.messages.create(**params))
+                hedge.add_done_callback(lambda _task: ai_gateway.release(ticket.estimated_tokens, None))
+                tasks.append(hedge)
+                logger.info("ai_request_hedged", lane=ticket.lane, after_ms=int(hedge_delay * 1000))
+            else:
+                latency_tracker.record_hedge_capped()
+        winner = await _first_success(tasks)
+        latency_tracker.record_call(hedged=len(tasks) > 1, hedge_won=winner is not first)
+        return winner.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+@dataclass(frozen=True, slots=True)
+class _Answer:
+    result: dict
+    latency_s: float
+    usage: CallUsage
+
+
+def _check_circuit() -> None:
+    if not circuit_breaker.allow_request():
+        logger.warning("ai_circuit_open_skipped", consecutive_failures=circuit_breaker.consecutive_failures)
+        raise AICircuitOpenError("AI circuit breaker is open")
+
+
+async def _classify_with_model(
+    text: str,
+    has_photo: bool,
+    ai_model: str,
+    on_partial: PartialCallback | None,
+) -> dict | None:
+    two_stage = env.ai_two_stage
+    prompt_version = TWO_STAGE_PROMPT_VERSION if two_stage else CLASSIFIER_PROMPT_VERSION
+    cache_key = build_cache_key(text, has_photo, ai_model, prompt_version)
+    cached = await classification_cache.get(cache_key)
+    if cached is not None:
+        logger.info(
+            "ai_classification_cache_hit",
+            is_task=cached.get("is_task"),
+            confidence=cached.get("confidence"),
+        )
+        return cached
+
+    _check_circuit()
+    answers: list[_Answer] = []
+    if two_stage:
+        verdict = await _request(
+            _build_gate_params(text, has_photo, ai_model),
+            text=text,
+            has_photo=has_photo,
+            on_partial=None,
+            stage=STAGE_GATE,
+        )
+        if verdict is None:
+            return None
+        answers.append(verdict)
+
+    if answers and not answers[0].result["is_task"]:
+        logger.info("ai_two_stage_extraction_skipped", confidence=answers[0].result["confidence"])
+    else:
+        if answers:
+            _check_circuit()
+        answer = await _request(
+            _build_request_params(text, has_photo, ai_model),
+            text=text,
+            has_photo=has_photo,
+            on_partial=on_partial,
+            stage=STAGE_EXTRACT if two_stage else STAGE_SINGLE,
+        )
+        if answer is None:
+            return None
+        answers.append(answer)
+
+    result = answers[-1].result
+    await classification_cache.put(
+        cache_key,
+        result,
+        ai_model=ai_model,
+        prompt_version=prompt_version,
+        latency_s=sum(answer.latency_s for answer in answers),
+        input_tokens=sum(answer.usage.prompt_tokens for answer in answers),
+        output_tokens=sum(answer.usage.output_tokens for answer in answers),
+    )
+    return result
+
+
+async def _request(
+    params: dict[str, Any],
+    *,
+    text: str,
+    has_photo: bool,
+    on_partial: PartialCallback | None,
+    stage: str,
+) -> _Answer | None:
+    """One API call with inline retries; None on a permanent failure."""
+    ai_model = params["model"]
+    tool_name = params["tool_choice"]["name"]
+    kind = (ai_model, tool_name, on_partial is not None)
+    estimated_tokens = AI_GATEWAY_BASE_TOKEN_ESTIMATE + len(text) // 3
+    max_attempts = 1 if circuit_breaker.probing else 1 + AI_MAX_INLINE_RETRIES
 
-            if not response.content:
-                logger.error("ai_empty_response")
-                return None
-
-            raw_response = getattr(response.content[0], "text", "")
-            if not isinstance(raw_response, str):
-                logger.error("ai_invalid_response_block")
-                return None
-            raw_response = raw_response.strip()
-            if not raw_response:
-                logger.error("ai_empty_response_text")
-                return None
-
-            # Strip markdown code blocks if present
-            if raw_response.startswith("```"):
-                lines = raw_response.splitlines()
-                lines = [line for line in lines if not line.strip().startswith("```")]
-                raw_response = "\n".join(lines).strip()
-
-            parsed = json.loads(raw_response)
-            result = _normalize_classifier_result(parsed)
+    last_error = None
+    for attempt in range(max_attempts):
+        if attempt and circuit_breaker.state != STATE_CLOSED:
+            break  # tripped meanwhile: stop retrying inline, let the queue handle it
+        timeout = latency_tracker.timeout(kind)
+        try:
+            async with ai_gateway.slot(estimated_tokens) as ticket:
+                started = time.monotonic()
+                early_result = None
+                if on_partial is None:
+                    response = await asyncio.wait_for(
+                        _create_with_hedge(params, kind, ticket),
+                        timeout=timeout,
+                    )
+                    content, raw_usage = response.content, getattr(response, "usage", None)
+                else:
+                    content, raw_usage, early_result = await asyncio.wait_for(
+                        _stream_response(params, on_partial),
+                        timeout=timeout,
+                    )
+                latency_s = time.monotonic() - started
+                latency_tracker.record(kind, latency_s)
+                circuit_breaker.record_success()
+                usage = extract_usage(raw_usage)
+                # Cache reads do not count against the input-tokens rate limit.
+                ticket.actual_tokens = (
+                    usage.input_tokens + usage.cache_creation_input_tokens + usage.output_tokens
+                )
+
+            if content is not None:
+                await classification_recorder.record(
+                    params=params,
+                    text=text,
+                    has_photo=has_photo,
+                    content=content,
+                    usage=usage,
+                    latency_s=latency_s,
+                )
+            result = early_result or _parse_response_content(content, tool_name)
+            usage_meter.record(usage, latency_s, malformed=result is None, model=ai_model)
             if result is None:
+                logger.error(
+                    "ai_malformed_response",
+                    lane=ticket.lane,
+                    malformed_total=usage_meter.stats.malformed_responses,
+                )
                 return None
 
             logger.info(
                 "ai_classification",
+                model=ai_model,
+                stage=stage,
                 is_task=result.get("is_task"),
                 confidence=result.get("confidence"),
+                lane=ticket.lane,
+                streamed=on_partial is not None,
+                stopped_early=early_result is not None,
+                latency_ms=int(latency_s * 1000),
+                queue_wait_ms=int(ticket.waited_seconds * 1000),
+                input_tokens=usage.input_tokens,
+                cache_read_input_tokens=usage.cache_read_input_tokens,
+                cache_creation_input_tokens=usage.cache_creation_input_tokens,
+                output_tokens=usage.output_tokens,
             )
+            return _Answer(result, latency_s, usage)
 
-            return result
-
-        except json.JSONDecodeError as e:
-            logger.error("ai_json_parse_error", error=str(e), raw=raw_response[:200])
-            return None  # Permanent: AI returned garbage
         except (anthropic.RateLimitError, anthropic.APIConnectionError, asyncio.TimeoutError) as e:
             last_error = e
+            circuit_breaker.record_failure()
+            if isinstance(e, anthropic.RateLimitError):
+                load_shedder.record_rate_limit()
+            if isinstance(e, asyncio.TimeoutError):
+                latency_tracker.record(kind, timeout)
             delay = AI_RETRY_BASE_DELAY * (2 ** attempt)
             logger.warning(
                 "ai_transient_error",
-                error=str(e),
+                error=str(e) or type(e).__name__,
                 attempt=attempt + 1,
                 retry_in=delay,
+                timeout=round(timeout, 1),
             )
-            if attempt < AI_MAX_INLINE_RETRIES:
+            if attempt < max_attempts - 1 and circuit_breaker.state == STATE_CLOSED:
                 await asyncio.sleep(delay)
             continue
         except anthropic.APIStatusError as e:
             status = int(getattr(e, "status_code", 0) or 0)
             if status >= 500 or status in {408, 409, 429}:
                 last_error = e
+                circuit_breaker.record_failure()
+                if status == 429:
+                    load_shedder.record_rate_limit()
                 delay = AI_RETRY_BASE_DELAY * (2 ** attempt)
                 logger.warning("ai_server_error", status=status, attempt=attempt + 1, retry_in=delay)
-                if attempt < AI_MAX_INLINE_RETRIES:
+                if attempt < max_attempts - 1 and circuit_breaker.state == STATE_CLOSED:
                     await asyncio.sleep(delay)
                 continue
+            circuit_breaker.record_success()  # the API answered; the request itself was bad
             logger.error("ai_api_error_non_retryable", status=status, error=str(e))
             return None
         except Exception as e:
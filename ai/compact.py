@@ -0,0 +1,91 @@
+"""Compact wire schema for the `record_classification` tool input.
+
+Output tokens dominate classifier latency, so the tool input uses one- and
+two-letter keys, a flat layout, single-letter enums and omits null fields:
+
+    {"t": true, "c": 0.95, "td": "2026-02-13", "fl": "https://…", "pl": "f",
+     "at": 80, "ap": 80, "ar": 0, "du": "5 minutes", "de": "…", "pr": "l"}
+
+`expand_compact` turns it back into the long-key shape that
+`ai.classifier._normalize_classifier_result` validates, so nothing downstream
+sees the wire format. Long keys and full enum values pass through unchanged,
+which keeps recordings made before the switch replayable. The schema is
+versioned with the prompt (`CLASSIFIER_PROMPT_VERSION`).
+"""
+
+from typing import Any
+
+TOP_LEVEL_KEYS = {
+    "t": "is_task",
+    "c": "confidence",
+    "r": "reason",
+}
+
+DATA_KEYS = {
+    "td": "task_date",
+    "dl": "deadline",
+    "pl": "platform",
+    "pr": "priority",
+    "fl": "fan_link",
+    "fn": "fan_name",
+    "pn": "payment_note",
+    "du": "duration",
+    "de": "description",
+    "ou": "outfit",
+    "no": "notes",
+    "at": "amount_total",
+    "ap": "amount_paid",
+    "ar": "amount_remaining",
+}
+
+ENUM_VALUES = {
+    "platform": {"f": "fansly", "o": "onlyfans"},
+    "priority": {"l": "low", "m": "medium", "h": "high"},
+}
+
+_SHORT_DATA_KEYS = {long: short for short, long in DATA_KEYS.items()}
+_SHORT_ENUM_VALUES = {
+    field: {long: short for short, long in values.items()} for field, values in ENUM_VALUES.items()
+}
+
+
+def expand_compact(payload: Any) -> Any:
+    """Long-key classifier payload from a compact one; works on partial objects too."""
+    if not isinstance(payload, dict):
+        return payload
+
+    expanded: dict[str, Any] = {}
+    data: dict[str, Any] = {}
+    for key, value in payload.items():
+        if key in TOP_LEVEL_KEYS:
+            expanded[TOP_LEVEL_KEYS[key]] = value
+        elif key in DATA_KEYS:
+            field = DATA_KEYS[key]
+            data[field] = ENUM_VALUES.get(field, {}).get(value, value) if isinstance(value, str) else value
+        else:
+            expanded[key] = value
+
+    if data:
+        legacy = expanded.get("data")
+        expanded["data"] = {**legacy, **data} if isinstance(legacy, dict) else data
+    if "t" in payload and expanded.get("is_task") is True and "data" not in expanded:
+        expanded["data"] = {}  # a brief with every field omitted
+    return expanded
+
+
+def to_compact(result: dict) -> dict:
+    """Compact wire form of a normalized classifier result (nulls omitted)."""
+    compact: dict[str, Any] = {"t": result["is_task"], "c": result["confidence"]}
+    if not result["is_task"]:
+        if result.get("reason"):
+            compact["r"] = result["reason"]
+        return compact
+    for field, value in (result.get("data") or {}).items():
+        if value is None or field not in _SHORT_DATA_KEYS:
+            continue
+        if field == "priority" and value == "medium":
+            continue  # the normalizer's default
+        if field in _SHORT_ENUM_VALUES:
+            value = _SHORT_ENUM_VALUES[field].get(value, value)
+        compact[_SHORT_DATA_KEYS[field]] = value
+    return compact
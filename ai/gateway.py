@@ -0,0 +1,273 @@
+"""Process-wide admission control for Anthropic API calls.
+
+Every classifier request takes a slot from one gateway: at most
+`env.ai_max_in_flight` concurrent calls, a requests-per-minute and a
+tokens-per-minute bucket, and strict priority between lanes
+(live topic messages > edits > retries > backfill).
+
+The lane is carried in a context variable so callers only need to wrap their
+work in `use_lane(...)`; anything not wrapped runs in the live lane.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Iterator
+
+import structlog
+
+from core.config import env
+
+logger = structlog.get_logger()
+
+LANE_LIVE = "live"
+LANE_EDIT = "edit"
+LANE_RETRY = "retry"
+LANE_BACKFILL = "backfill"
+
+LANE_PRIORITIES = {
+    LANE_LIVE: 0,
+    LANE_EDIT: 1,
+    LANE_RETRY: 2,
+    LANE_BACKFILL: 3,
+}
+
+_current_lane: ContextVar[str] = ContextVar("ai_lane", default=LANE_LIVE)
+
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+
+@contextmanager
+def use_lane(lane: str) -> Iterator[None]:
+    """Run the enclosed AI calls in `lane` (see LANE_PRIORITIES)."""
+    if lane not in LANE_PRIORITIES:
+        raise ValueError(f"Unknown AI lane: {lane}")
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+class _TokenBucket:
+    """Continuous-refill bucket; a per-minute rate of 0 means unlimited."""
+
+    def __init__(self, per_minute: int, clock: Callable[[], float]):
+        self.capacity = float(max(per_minute, 0))
+        self.level = self.capacity
+        self._rate = self.capacity / 60.0
+        self._clock = clock
+        self._updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def seconds_until(self, amount: float) -> float:
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self._rate)
+
+    def take(self, amount: float) -> None:
+        if self.unlimited:
+            return
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Return (positive) or charge (negative) tokens after the fact."""
+        if self.unlimited:
+            return
+        self._refill()
+        self.level = min(self.capacity, self.level + delta)
+
+
+@dataclass
+class LaneStats:
+    acquired: int = 0
+    waiting: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    @property
+    def avg_wait_seconds(self) -> float:
+        return self.wait_seconds / self.acquired if self.acquired else 0.0
+
+
+@dataclass
+class GatewayTicket:
+    lane: str
+    estimated_tokens: int
+    waited_seconds: float = 0.0
+    actual_tokens: int | None = None
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class AIGateway:
+    def __init__(
+        self,
+        *,
+        max_in_flight: int,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        self.configure(
+            max_in_flight=max_in_flight,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+        )
+
+    def configure(self, *, max_in_flight: int, requests_per_minute: int, tokens_per_minute: int) -> None:
+        """(Re)initialize limits, buckets and per-lane stats."""
+        self.max_in_flight = max(1, int(max_in_flight))
+        self._requests = _TokenBucket(requests_per_minute, self._clock)
+        self._tokens = _TokenBucket(tokens_per_minute, self._clock)
+        self._in_flight = 0
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self.lanes: dict[str, LaneStats] = {lane: LaneStats() for lane in LANE_PRIORITIES}
+
+    def reset(self) -> None:
+        """Reload limits from env and drop all state (tests, reloads)."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self.configure(
+            max_in_flight=env.ai_max_in_flight,
+            requests_per_minute=env.ai_requests_per_minute,
+            tokens_per_minute=env.ai_tokens_per_minute,
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.future.done())
+
+    def _can_start_now(self, tokens: int) -> float:
+        return max(self._requests.seconds_until(1), self._tokens.seconds_until(tokens))
+
+    def _grant(self, tokens: int) -> None:
+        self._requests.take(1)
+        self._tokens.take(tokens)
+        self._in_flight += 1
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        while self._waiters and self._in_flight < self.max_in_flight:
+            head = self._waiters[0]
+            if head.future.done():  # cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._can_start_now(head.tokens)
+            if delay > 0:
+                loop = asyncio.get_running_loop()
+                self._timer = loop.call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self._grant(head.tokens)
+            head.future.set_result(None)
+
+    async def acquire(self, lane: str, estimated_tokens: int) -> float:
+        """Wait for a slot in `lane`; returns the seconds spent waiting."""
+        stats = self.lanes[lane]
+        started = self._clock()
+        if not self._waiters and self._in_flight < self.max_in_flight:
+            if self._can_start_now(estimated_tokens) <= 0:
+                self._grant(estimated_tokens)
+                stats.acquired += 1
+                return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters,
+            _Waiter(LANE_PRIORITIES[lane], next(self._seq), estimated_tokens, future),
+        )
+        stats.waiting += 1
+        try:
+            if self._timer is None:
+                self._dispatch()
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(estimated_tokens, None)
+            raise
+        finally:
+            stats.waiting -= 1
+
+        waited = self._clock() - started
+        stats.acquired += 1
+        stats.wait_seconds += waited
+        stats.max_wait_seconds = max(stats.max_wait_seconds, waited)
+        return waited
+
+    def try_acquire(self, lane: str, estimated_tokens: int) -> bool:
+        """Take a slot only if one is free right now and nobody is waiting (hedges)."""
+        if self._waiters or self._in_flight >= self.max_in_flight:
+            return False
+        if self._can_start_now(estimated_tokens) > 0:
+            return False
+        self._grant(estimated_tokens)
+        self.lanes[lane].acquired += 1
+        return True
+
+    def release(self, estimated_tokens: int, actual_tokens: int | None) -> None:
+        self._in_flight = max(0, self._in_flight - 1)
+        if actual_tokens is not None:
+            self._tokens.adjust(estimated_tokens - actual_tokens)
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int, lane: str | None = None) -> AsyncIterator[GatewayTicket]:
+        """Hold one API slot for the enclosed call.
+
+        Set `ticket.actual_tokens` from the response usage so the token bucket
+        is corrected for the real cost of the call.
+        """
+        ticket = GatewayTicket(lane=lane or current_lane(), estimated_tokens=estimated_tokens)
+        ticket.waited_seconds = await self.acquire(ticket.lane, estimated_tokens)
+        if ticket.waited_seconds >= 1:
+            logger.info(
+                "ai_gateway_waited",
+                lane=ticket.lane,
+                waited_ms=int(ticket.waited_seconds * 1000),
+                in_flight=self._in_flight,
+                queued=self.queued,
+            )
+        try:
+            yield ticket
+        finally:
+            self.release(estimated_tokens, ticket.actual_tokens)
+
+
+ai_gateway = AIGateway(
+    max_in_flight=env.ai_max_in_flight,
+    requests_per_minute=env.ai_requests_per_minute,
+    tokens_per_minute=env.ai_tokens_per_minute,
+)
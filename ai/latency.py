@@ -0,0 +1,113 @@
+"""Rolling latency histograms for adaptive AI timeouts and request hedging.
+
+Latencies of recent calls are kept per call kind — `(model, tool, streamed)`,
+since a verdict-only call, a full extraction and a stream behave differently.
+Once a kind has `AI_LATENCY_MIN_SAMPLES` samples:
+
+- its timeout is `AI_TIMEOUT_P99_FACTOR` × observed p99, clamped to
+  `[AI_MIN_API_TIMEOUT, AI_API_TIMEOUT]` (before that, `AI_API_TIMEOUT`);
+- with `AI_HEDGE_REQUESTS` on, a non-streamed call still running after the
+  observed p95 gets one duplicate request, and whichever answers first wins.
+  At most `AI_HEDGE_MAX_RATE` of the last `AI_HEDGE_RATE_WINDOW` calls hedge.
+
+A timed-out call is recorded at its timeout, so repeated timeouts push the
+next timeout up instead of cutting every slow call short.
+"""
+
+import math
+from collections import deque
+from dataclasses import dataclass
+
+from core.config import env
+from core.constants import (
+    AI_API_TIMEOUT,
+    AI_HEDGE_MAX_RATE,
+    AI_HEDGE_RATE_WINDOW,
+    AI_LATENCY_MIN_SAMPLES,
+    AI_LATENCY_WINDOW,
+    AI_MIN_API_TIMEOUT,
+    AI_TIMEOUT_P99_FACTOR,
+)
+
+CallKind = tuple[str, str, bool]  # (model, tool, streamed)
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@dataclass
+class HedgeStats:
+    calls: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0  # the duplicate answered first
+    capped: int = 0  # past p95 but over the hedge-rate cap or without a free gateway slot
+
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedged / self.calls if self.calls else 0.0
+
+
+class LatencyTracker:
+    def __init__(self, window: int = AI_LATENCY_WINDOW, min_samples: int = AI_LATENCY_MIN_SAMPLES):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: dict[CallKind, deque[float]] = {}
+        self._recent_hedges: deque[bool] = deque(maxlen=AI_HEDGE_RATE_WINDOW)
+        self.hedges = HedgeStats()
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self._recent_hedges.clear()
+        self.hedges = HedgeStats()
+
+    @property
+    def kinds(self) -> list[CallKind]:
+        return list(self._samples)
+
+    def record(self, kind: CallKind, latency_s: float) -> None:
+        samples = self._samples.get(kind)
+        if samples is None:
+            samples = self._samples[kind] = deque(maxlen=self.window)
+        samples.append(latency_s)
+
+    def percentile(self, kind: CallKind, pct: float) -> float | None:
+        """Observed latency percentile, None until there are enough samples."""
+        samples = self._samples.get(kind)
+        if samples is None or len(samples) < self.min_samples:
+            return None
+        return _percentile(sorted(samples), pct)
+
+    def timeout(self, kind: CallKind) -> float:
+        p99 = self.percentile(kind, 99)
+        if p99 is None:
+            return AI_API_TIMEOUT
+        return min(AI_API_TIMEOUT, max(AI_MIN_API_TIMEOUT, p99 * AI_TIMEOUT_P99_FACTOR))
+
+    def hedge_delay(self, kind: CallKind) -> float | None:
+        """Seconds after which a call of this kind may be hedged; None disables it."""
+        if not env.ai_hedge_requests or kind[2]:
+            return None
+        return self.percentile(kind, 95)
+
+    def allow_hedge(self) -> bool:
+        if sum(self._recent_hedges) + 1 > AI_HEDGE_MAX_RATE * AI_HEDGE_RATE_WINDOW:
+            self.record_hedge_capped()
+            return False
+        return True
+
+    def record_hedge_capped(self) -> None:
+        """A hedge was due but not sent (rate cap or no free gateway slot)."""
+        self.hedges.capped += 1
+
+    def record_call(self, *, hedged: bool, hedge_won: bool = False) -> None:
+        self._recent_hedges.append(hedged)
+        self.hedges.calls += 1
+        if hedged:
+            self.hedges.hedged += 1
+        if hedge_won:
+            self.hedges.hedge_wins += 1
+
+
+latency_tracker = LatencyTracker()
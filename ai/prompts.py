@@ -1,6 +1,19 @@
-CLASSIFIER_SYSTEM_PROMPT = """You are a message classifier in a work chat. Your task: determine whether a message is a custom content brief, and if so — extract structured data from it.
+from ai.compact import DATA_KEYS, ENUM_VALUES
+from core.constants import AMOUNT_FIELDS, TEXT_FIELDS
 
-## What is a Custom Brief
+# Bump whenever CLASSIFIER_SYSTEM_PROMPT, CLASSIFIER_TOOL or the expected response
+# shape (including the compact wire keys in ai/compact.py) changes: cached
+# classifications are keyed on this value.
+CLASSIFIER_PROMPT_VERSION = "3"
+
+# Two-stage mode (AI_TWO_STAGE) caches under its own version; bump the suffix
+# whenever GATE_SYSTEM_PROMPT or GATE_TOOL changes.
+TWO_STAGE_PROMPT_VERSION = f"{CLASSIFIER_PROMPT_VERSION}+gate1"
+
+CLASSIFIER_TOOL_NAME = "record_classification"
+GATE_TOOL_NAME = "record_verdict"
+
+_BRIEF_DEFINITION = """## What is a Custom Brief
 
 A brief is a message describing an order to create personalized video or photo for a specific buyer. A typical brief contains:
 - Order description (📦)
@@ -23,81 +36,125 @@ The format may vary, but the essence is an order to create content for a specifi
 - Shooting reports ("8:24 in mask")
 - Questions and clarifications
 - Photos/videos without an order description
-- Prioritization of existing tasks ("this custom is first")
+- Prioritization of existing tasks ("this custom is first")"""
+
+CLASSIFIER_SYSTEM_PROMPT = (
+    "You are a message classifier in a work chat. Your task: determine whether a message "
+    "is a custom content brief, and if so — extract structured data from it.\n\n"
+    + _BRIEF_DEFINITION
+    + """
 
 ## Your Response
 
-Respond STRICTLY in JSON format, without markdown wrapping:
+Always answer by calling the `record_classification` tool. Its input uses short keys and omits every field that is null or unknown:
+
+- `t`: is it a brief (true/false)
+- `c`: confidence, 0 to 1
+- `r`: only when NOT a brief — why, in Russian
+- brief fields (only when it IS a brief): `td` task date, `dl` deadline, `pl` platform, `pr` priority, `fl` buyer link, `fn` fan name, `pn` payment note, `du` duration, `de` description, `ou` outfit, `no` notes, `at` amount total, `ap` amount paid, `ar` amount remaining
 
 If it IS a brief:
-{
-  "is_task": true,
-  "confidence": 0.95,
-  "data": {
-    "task_date": "2026-02-13",
-    "fan_link": "https://fansly.com/tyson0892/posts",
-    "fan_name": null,
-    "platform": "fansly",
-    "amount_total": 80,
-    "amount_paid": 80,
-    "amount_remaining": 0,
-    "payment_note": null,
-    "duration": "5 minutes",
-    "description": "Brief task description (1-2 sentences)",
-    "outfit": "Skirt, top",
-    "notes": "Focus on teasing with skirt",
-    "priority": "low",
-    "deadline": "2026-02-20"
-  }
-}
+{"t": true, "c": 0.95, "td": "2026-02-13", "fl": "https://fansly.com/tyson0892/posts", "pl": "f", "at": 80, "ap": 80, "ar": 0, "du": "5 minutes", "de": "Brief task description (1-2 sentences)", "ou": "Skirt, top", "no": "Focus on teasing with skirt", "pr": "l", "dl": "2026-02-20"}
 
 If it is NOT a brief:
-{
-  "is_task": false,
-  "confidence": 0.95,
-  "reason": "Brief explanation of why this is not a brief"
-}
+{"t": false, "c": 0.95, "r": "Brief explanation of why this is not a brief"}
 
 ## Parsing Rules
 
 ### Dates
 - "До 20.02.2026" or "By 20.02.2026" → "2026-02-20"
 - "До 20.02" or "By 20.02" → add current year
-- If deadline not specified → deadline = null
-- task_date: the date mentioned in the order description, not today's date
+- If deadline not specified → omit `dl`
+- `td`: the date mentioned in the order description, not today's date
 
 ### Amounts
-- "80$" or "$80" → amount_total: 80, amount_paid: 80, amount_remaining: 0
-- "$100 advance + $100 on completion" → amount_total: 200, amount_paid: 100, amount_remaining: 100, payment_note: "advance + on completion"
-- "advanced sub + 200 + 20 after completion" → amount_total: 220, amount_paid: 0, amount_remaining: 220, payment_note: "advanced sub + 200 + 20 after completion"
-- "300$ already sent" → amount_total: 300, amount_paid: 300, amount_remaining: 0
-- "$55, $55 after" → amount_total: 110, amount_paid: 55, amount_remaining: 55, payment_note: "$55 paid, $55 after"
+- "80$" or "$80" → at: 80, ap: 80, ar: 0
+- "$100 advance + $100 on completion" → at: 200, ap: 100, ar: 100, pn: "advance + on completion"
+- "advanced sub + 200 + 20 after completion" → at: 220, ap: 0, ar: 220, pn: "advanced sub + 200 + 20 after completion"
+- "300$ already sent" → at: 300, ap: 300, ar: 0
+- "$55, $55 after" → at: 110, ap: 55, ar: 55, pn: "$55 paid, $55 after"
 
 ### Platform
-- Link contains fansly.com → "fansly"
-- Link contains onlyfans.com → "onlyfans"
-- No link → null
+- Link contains fansly.com → "f"
+- Link contains onlyfans.com → "o"
+- No link → omit `pl`
 
 ### Priority
-- "Low" / "Низкая" → "low"
-- "Medium" / "Средняя" → "medium"
-- "High" / "Высокая" → "high"
-- "Medium/High" → "high"
-- Not specified → "medium"
+- "Low" / "Низкая" → "l"
+- "Medium" / "Средняя" → omit `pr` (medium is the default)
+- "High" / "Высокая" → "h"
+- "Medium/High" → "h"
+- Not specified → omit `pr`
 
 ### Output Language
-- Always write `description`, `outfit`, and `notes` in Russian.
-- Always write `reason` in Russian when `is_task` is false.
+- Always write `de`, `ou`, and `no` in Russian.
+- Always write `r` in Russian when `t` is false.
 - If the source brief is in another language, translate these fields to Russian.
 
 ### Description
 - Condensed task description in 1-2 sentences. Don't copy the entire text, create a brief summary.
 
 ### Fan Name
-- Look in notes: "Name - Arian", "Fan name: Josh", "Имя - Ариан" → fan_name: "Arian" / "Josh"
-- If not specified → null
+- Look in notes: "Name - Arian", "Fan name: Josh", "Имя - Ариан" → fn: "Arian" / "Josh"
+- If not specified → omit `fn`
 
 ### Duration
 - "5 минут" / "5 minutes" / "5 min" → "5 minutes"
 - "6 кадров" / "6 frames" → "6 frames"
-- If not specified → null"""
+- If not specified → omit `du`"""
+)
+
+GATE_SYSTEM_PROMPT = (
+    "You are a message classifier in a work chat. Your task: determine whether a message "
+    "is a custom content brief. Do not extract any fields from it.\n\n"
+    + _BRIEF_DEFINITION
+    + """
+
+## Your Response
+
+Always answer by calling the `record_verdict` tool with `is_task` (true for a brief), `confidence` (0 to 1) and, only when it is NOT a brief, a short `reason` in Russian (a few words)."""
+)
+
+
+# Compact wire schema (see `ai/compact.py`): short keys, single-letter enums and
+# no null fields; `ai.classifier` expands it before normalizing.
+CLASSIFIER_TOOL = {
+    "name": CLASSIFIER_TOOL_NAME,
+    "description": "Record whether the message is a custom brief and, if it is, the extracted fields.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "t": {"type": "boolean", "description": "is_task"},
+            "c": {"type": "number", "minimum": 0, "maximum": 1, "description": "confidence"},
+            "r": {"type": "string", "description": "Why this is not a brief (Russian); only when t is false."},
+            "td": {"type": "string", "description": "task_date, YYYY-MM-DD"},
+            "dl": {"type": "string", "description": "deadline, YYYY-MM-DD"},
+            "pl": {"enum": sorted(ENUM_VALUES["platform"]), "description": "platform: f=fansly, o=onlyfans"},
+            "pr": {"enum": sorted(ENUM_VALUES["priority"]), "description": "priority: l/m/h, omit for medium"},
+            **{
+                short: {"type": "number" if long in AMOUNT_FIELDS else "string", "description": long}
+                for short, long in DATA_KEYS.items()
+                if long in TEXT_FIELDS or long in AMOUNT_FIELDS
+            },
+        },
+        "required": ["t", "c"],
+    },
+}
+
+# Stage one of the two-stage protocol: the verdict only, no extracted fields.
+GATE_TOOL = {
+    "name": GATE_TOOL_NAME,
+    "description": "Record whether the message is a custom brief.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "is_task": {"type": "boolean"},
+            "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+            "reason": {
+                "type": "string",
+                "description": "Why this is not a brief (Russian, a few words); only when is_task is false.",
+            },
+        },
+        "required": ["is_task", "confidence"],
+    },
+}
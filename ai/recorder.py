@@ -0,0 +1,87 @@
+"""Append-only recorder of real classifier calls for offline replay.
+
+With `AI_RECORD_PATH` set, every answered `classify_message` call appends one
+JSON line: the request input, the raw response content blocks, usage and
+latency. `scripts/fake_messages_api.py` replays these lines as a local
+Messages API and `scripts/bench_classifier.py` benchmarks against it. The
+file is written from a worker thread, so recording never blocks the event loop.
+"""
+
+import asyncio
+import json
+import threading
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from ai.usage import CallUsage
+from core.config import env
+
+logger = structlog.get_logger()
+
+
+def to_jsonable(value: Any) -> Any:
+    """SDK models, namespaces and containers as plain JSON-compatible values."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, dict):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if hasattr(value, "__dict__"):
+        return {key: to_jsonable(item) for key, item in vars(value).items()}
+    return value
+
+
+class ClassificationRecorder:
+    def __init__(self, path: str | None = None):
+        self._path = path
+        # Appends of concurrent calls run in different threads; keep lines whole.
+        self._write_lock = threading.Lock()
+
+    @property
+    def path(self) -> Path | None:
+        raw = env.ai_record_path if self._path is None else self._path
+        return Path(raw) if raw else None
+
+    async def record(
+        self,
+        *,
+        params: dict[str, Any],
+        text: str,
+        has_photo: bool,
+        content: Any,
+        usage: CallUsage,
+        latency_s: float,
+    ) -> None:
+        path = self.path
+        if path is None:
+            return
+        entry = {
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "model": params.get("model"),
+            "tool": (params.get("tool_choice") or {}).get("name"),
+            "text": text,
+            "has_photo": has_photo,
+            "user_content": params["messages"][0]["content"],
+            "latency_ms": int(latency_s * 1000),
+            "usage": asdict(usage),
+            "content": to_jsonable(content),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        try:
+            await asyncio.to_thread(self._append, path, line)
+        except OSError as e:
+            logger.warning("ai_recording_failed", path=str(path), error=str(e))
+
+    def _append(self, path: Path, line: str) -> None:
+        with self._write_lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as handle:
+                handle.write(line)
+
+
+classification_recorder = ClassificationRecorder()
@@ -0,0 +1,70 @@
+"""In-process single-flight registry for classifier calls.
+
+The same Telegram message can reach the classifier from several paths at
+once (new message, edit, reply fallback, retry queue). Callers wrap the call
+in `classification_flights.do(message_flight_key(...), call)`: the first
+caller runs it, everyone arriving while it is in flight awaits that same call
+and gets a copy of its result (or its exception).
+"""
+
+import asyncio
+import copy
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+import structlog
+
+from ai.cache import normalize_text
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class FlightStats:
+    started: int = 0
+    joined: int = 0
+
+
+def message_flight_key(chat_id: int, message_id: int, text: str, has_photo: bool) -> tuple:
+    """Message identity plus a hash of the normalized text being classified."""
+    payload = ("1" if has_photo else "0") + normalize_text(text)
+    return (chat_id, message_id, hashlib.sha256(payload.encode("utf-8")).hexdigest())
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self.stats = FlightStats()
+
+    def reset(self) -> None:
+        self._inflight.clear()
+        self.stats = FlightStats()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def _forget(self, key: tuple, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every caller went away
+
+    async def do(self, key: tuple, call: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats.joined += 1
+            logger.info("ai_single_flight_joined", chat_id=key[0], message_id=key[1])
+            return copy.deepcopy(await asyncio.shield(task))
+
+        # Run as its own task so one caller being cancelled does not cancel
+        # the classification the others are waiting for.
+        task = asyncio.ensure_future(call())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        self.stats.started += 1
+        return await asyncio.shield(task)
+
+
+classification_flights = SingleFlight()
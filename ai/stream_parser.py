@@ -0,0 +1,110 @@
+"""Incremental scanner for the classifier's tool-input JSON while it streams.
+
+Only completed members are reported: a value counts as complete once the
+character after it (`,` or `}`) has arrived, so a number such as `0.9` is not
+reported while it may still grow into `0.95`. Top-level members and members of
+one nested object level (the `data` block) are reported individually.
+"""
+
+import json
+from typing import Any
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalObjectScanner:
+    def __init__(self, max_depth: int = 2):
+        self.max_depth = max_depth
+        self.members: dict[str, Any] = {}
+        self.done = False
+        self.failed = False
+        self._buf = ""
+        self._pos = 0
+        self._stack: list[dict[str, Any]] = []
+        self._path: list[str] = []  # keys of the nested objects currently open
+        self._expect = "start"
+        self._key: str | None = None
+
+    def _skip_whitespace(self) -> None:
+        while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+            self._pos += 1
+
+    def _close_object(self) -> None:
+        self._stack.pop()
+        self._pos += 1
+        if self._path:
+            self._path.pop()
+        if self._stack:
+            self._expect = "comma_or_end"
+        else:
+            self.done = True
+
+    def feed(self, chunk: str) -> list[tuple[tuple[str, ...], Any]]:
+        """Add streamed text; returns (path, value) for members completed by it."""
+        self._buf += chunk
+        events: list[tuple[tuple[str, ...], Any]] = []
+        while not (self.done or self.failed):
+            self._skip_whitespace()
+            if self._pos >= len(self._buf):
+                break
+            char = self._buf[self._pos]
+
+            if self._expect == "start":
+                # Tolerate a markdown fence or prose before the object.
+                start = self._buf.find("{", self._pos)
+                if start < 0:
+                    self._pos = len(self._buf)
+                    break
+                self._pos = start + 1
+                self._stack.append(self.members)
+                self._expect = "key_or_end"
+            elif self._expect == "key_or_end":
+                if char == "}":
+                    self._close_object()
+                    continue
+                if char != '"':
+                    self.failed = True
+                    break
+                try:
+                    self._key, self._pos = _DECODER.raw_decode(self._buf, self._pos)
+                except json.JSONDecodeError:
+                    break  # key still streaming
+                self._expect = "colon"
+            elif self._expect == "colon":
+                if char != ":":
+                    self.failed = True
+                    break
+                self._pos += 1
+                self._expect = "value"
+            elif self._expect == "value":
+                if char == "{" and len(self._stack) < self.max_depth:
+                    nested: dict[str, Any] = {}
+                    self._stack[-1][self._key] = nested
+                    self._stack.append(nested)
+                    self._path.append(self._key)
+                    self._pos += 1
+                    self._expect = "key_or_end"
+                    continue
+                try:
+                    value, end = _DECODER.raw_decode(self._buf, self._pos)
+                except json.JSONDecodeError:
+                    break  # value still streaming
+                delimiter = end
+                while delimiter < len(self._buf) and self._buf[delimiter] in _WHITESPACE:
+                    delimiter += 1
+                if delimiter >= len(self._buf) or self._buf[delimiter] not in ",}":
+                    break  # wait for the delimiter to be sure the value is complete
+                self._stack[-1][self._key] = value
+                events.append(((*self._path, self._key), value))
+                self._pos = end
+                self._expect = "comma_or_end"
+            elif self._expect == "comma_or_end":
+                if char == ",":
+                    self._pos += 1
+                    self._expect = "key_or_end"
+                elif char == "}":
+                    self._close_object()
+                else:
+                    self.failed = True
+        return events
@@ -0,0 +1,154 @@
+"""Token usage accounting for classifier calls (prompt-cache aware)."""
+
+from dataclasses import dataclass
+from typing import Any
+
+from core.constants import (
+    AI_MODEL_PRICES_PER_MTOK,
+    AI_PROMPT_CACHE_READ_PRICE_FACTOR,
+    AI_PROMPT_CACHE_WRITE_PRICE_FACTOR,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CallUsage:
+    input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def prompt_tokens(self) -> int:
+        """All input tokens, whether billed fresh, read from or written to the cache."""
+        return self.input_tokens + self.cache_read_input_tokens + self.cache_creation_input_tokens
+
+
+def extract_usage(usage: Any) -> CallUsage:
+    """Read the Messages API `usage` object; missing fields count as zero."""
+
+    def _field(name: str) -> int:
+        value = getattr(usage, name, 0)
+        return int(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else 0
+
+    return CallUsage(
+        input_tokens=_field("input_tokens"),
+        cache_read_input_tokens=_field("cache_read_input_tokens"),
+        cache_creation_input_tokens=_field("cache_creation_input_tokens"),
+        output_tokens=_field("output_tokens"),
+    )
+
+
+@dataclass
+class UsageStats:
+    calls: int = 0
+    cache_read_calls: int = 0
+    input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_latency_seconds: float = 0.0
+    uncached_latency_seconds: float = 0.0
+    timed_cache_read_calls: int = 0
+    timed_uncached_calls: int = 0
+    malformed_responses: int = 0  # answered, but without a valid classification
+
+    @property
+    def prompt_tokens(self) -> int:
+        return self.input_tokens + self.cache_read_input_tokens + self.cache_creation_input_tokens
+
+    @property
+    def cache_read_ratio(self) -> float:
+        return self.cache_read_input_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    @property
+    def malformed_rate(self) -> float:
+        return self.malformed_responses / self.calls if self.calls else 0.0
+
+    @property
+    def avg_cache_read_latency(self) -> float:
+        if not self.timed_cache_read_calls:
+            return 0.0
+        return self.cache_read_latency_seconds / self.timed_cache_read_calls
+
+    @property
+    def avg_uncached_latency(self) -> float:
+        if not self.timed_uncached_calls:
+            return 0.0
+        return self.uncached_latency_seconds / self.timed_uncached_calls
+
+    @property
+    def avg_latency(self) -> float:
+        timed = self.timed_cache_read_calls + self.timed_uncached_calls
+        if not timed:
+            return 0.0
+        return (self.cache_read_latency_seconds + self.uncached_latency_seconds) / timed
+
+
+def model_prices(model: str) -> tuple[float, float] | None:
+    """(input, output) USD per million tokens for a model id, None if unknown."""
+    lowered = model.lower()
+    for family, prices in AI_MODEL_PRICES_PER_MTOK.items():
+        if family in lowered:
+            return prices
+    return None
+
+
+def estimate_cost_usd(stats: UsageStats, model: str) -> float | None:
+    """Approximate spend at list prices; None for a model without a known price."""
+    prices = model_prices(model)
+    if prices is None:
+        return None
+    input_price, output_price = prices
+    return (
+        stats.input_tokens * input_price
+        + stats.cache_read_input_tokens * input_price * AI_PROMPT_CACHE_READ_PRICE_FACTOR
+        + stats.cache_creation_input_tokens * input_price * AI_PROMPT_CACHE_WRITE_PRICE_FACTOR
+        + stats.output_tokens * output_price
+    ) / 1_000_000
+
+
+class UsageMeter:
+    def __init__(self):
+        self.stats = UsageStats()
+        self.by_model: dict[str, UsageStats] = {}
+
+    def reset(self) -> None:
+        self.stats = UsageStats()
+        self.by_model = {}
+
+    def record(
+        self,
+        usage: CallUsage,
+        latency_s: float | None = None,
+        *,
+        malformed: bool = False,
+        model: str | None = None,
+    ) -> None:
+        self._add(self.stats, usage, latency_s, malformed)
+        if model:
+            self._add(self.by_model.setdefault(model, UsageStats()), usage, latency_s, malformed)
+
+    @staticmethod
+    def _add(stats: UsageStats, usage: CallUsage, latency_s: float | None, malformed: bool) -> None:
+        stats.calls += 1
+        if malformed:
+            stats.malformed_responses += 1
+        stats.input_tokens += usage.input_tokens
+        stats.cache_read_input_tokens += usage.cache_read_input_tokens
+        stats.cache_creation_input_tokens += usage.cache_creation_input_tokens
+        stats.output_tokens += usage.output_tokens
+
+        cache_read = usage.cache_read_input_tokens > 0
+        if cache_read:
+            stats.cache_read_calls += 1
+        if latency_s is None:
+            return
+        if cache_read:
+            stats.cache_read_latency_seconds += latency_s
+            stats.timed_cache_read_calls += 1
+        else:
+            stats.uncached_latency_seconds += latency_s
+            stats.timed_uncached_calls += 1
+
+
+usage_meter = UsageMeter()
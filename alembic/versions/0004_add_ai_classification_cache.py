@@ -0,0 +1,56 @@
+"""add ai classification cache
+
+Revision ID: 0004_add_ai_classification_cache
+Revises: 0003_add_original_brief_sections
+Create Date: 2026-02-24 11:20:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_add_ai_classification_cache"
+down_revision: Union[str, Sequence[str], None] = "0003_add_original_brief_sections"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ai_classification_cache",
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("ai_model", sa.String(length=128), nullable=False),
+        sa.Column("prompt_version", sa.String(length=32), nullable=False),
+        sa.Column("result_json", sa.Text(), nullable=False),
+        sa.Column("latency_ms", sa.Integer(), nullable=False),
+        sa.Column("input_tokens", sa.Integer(), nullable=False),
+        sa.Column("output_tokens", sa.Integer(), nullable=False),
+        sa.Column("hit_count", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.String(length=30), nullable=False),
+        sa.Column("last_accessed_at", sa.String(length=30), nullable=False),
+        sa.Column("created_at", sa.String(length=30), nullable=False),
+        sa.PrimaryKeyConstraint("cache_key"),
+    )
+    op.create_index(
+        "ix_ai_classification_cache_expires_at",
+        "ai_classification_cache",
+        ["expires_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_ai_classification_cache_last_accessed_at",
+        "ai_classification_cache",
+        ["last_accessed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_ai_classification_cache_last_accessed_at",
+        table_name="ai_classification_cache",
+    )
+    op.drop_index("ix_ai_classification_cache_expires_at", table_name="ai_classification_cache")
+    op.drop_table("ai_classification_cache")
@@ -0,0 +1,29 @@
+"""add ai retry priority
+
+Revision ID: 0005_add_ai_retry_priority
+Revises: 0004_add_ai_classification_cache
+Create Date: 2026-03-02 10:05:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_add_ai_retry_priority"
+down_revision: Union[str, Sequence[str], None] = "0004_add_ai_classification_cache"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("ai_retry_queue") as batch_op:
+        batch_op.add_column(
+            sa.Column("priority", sa.Integer(), nullable=False, server_default="0")
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("ai_retry_queue") as batch_op:
+        batch_op.drop_column("priority")
@@ -0,0 +1,27 @@
+"""add task text fingerprint
+
+Revision ID: 0006_add_task_text_fingerprint
+Revises: 0005_add_ai_retry_priority
+Create Date: 2026-03-09 11:20:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_add_task_text_fingerprint"
+down_revision: Union[str, Sequence[str], None] = "0005_add_ai_retry_priority"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.add_column(sa.Column("text_fingerprint", sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.drop_column("text_fingerprint")
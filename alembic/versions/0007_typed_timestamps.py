@@ -0,0 +1,118 @@
+"""store timestamps as epoch microseconds
+
+Revision ID: 0007_typed_timestamps
+Revises: 0006_add_task_text_fingerprint
+Create Date: 2026-03-12 09:40:00.000000
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_typed_timestamps"
+down_revision: Union[str, Sequence[str], None] = "0006_add_task_text_fingerprint"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> {column: nullable}
+TIMESTAMP_COLUMNS: dict[str, dict[str, bool]] = {
+    "app_settings": {"created_at": False, "updated_at": False},
+    "parse_failures": {"created_at": False},
+    "processed_messages": {"processed_at": False},
+    "role_memberships": {"created_at": False, "updated_at": False},
+    "tasks": {
+        "finished_at": True,
+        "delivered_at": True,
+        "last_reminder_at": True,
+        "created_at": False,
+        "updated_at": False,
+    },
+    "status_logs": {"created_at": False},
+    "ai_retry_queue": {
+        "first_enqueued_at": False,
+        "next_retry_at": False,
+        "created_at": False,
+        "updated_at": False,
+    },
+    "ai_classification_cache": {
+        "expires_at": False,
+        "last_accessed_at": False,
+        "created_at": False,
+    },
+}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_epoch_us(value) -> int | None:
+    if isinstance(value, int):
+        return value
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (parsed - _EPOCH) // _MICROSECOND
+
+
+def _to_iso(value) -> str | None:
+    try:
+        return (_EPOCH + timedelta(microseconds=int(value))).isoformat()
+    except (TypeError, ValueError):
+        return value
+
+
+def _rewrite(table: str, column: str, convert, fallback) -> None:
+    """Convert every value of `column` in place, addressing rows by rowid."""
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text(f"SELECT rowid, {column} FROM {table} WHERE {column} IS NOT NULL")
+    ).fetchall()
+    params = []
+    for rowid, value in rows:
+        converted = convert(value)
+        params.append({"rowid": rowid, "value": fallback if converted is None else converted})
+    if params:
+        conn.execute(sa.text(f"UPDATE {table} SET {column} = :value WHERE rowid = :rowid"), params)
+
+
+def upgrade() -> None:
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        # Rewrite first: the table copy casts each value to the new type, and
+        # CAST('2026-03-01T...' AS BIGINT) would keep only the year. Unparsable
+        # values are dropped where the column allows it, else pinned to the epoch.
+        for column, nullable in columns.items():
+            _rewrite(table, column, _to_epoch_us, None if nullable else 0)
+        with op.batch_alter_table(table) as batch_op:
+            for column, nullable in columns.items():
+                batch_op.alter_column(
+                    column,
+                    type_=sa.BigInteger(),
+                    existing_type=sa.String(length=30),
+                    existing_nullable=nullable,
+                )
+
+    op.create_index("ix_tasks_created_at", "tasks", ["created_at"], unique=False)
+    op.create_index("ix_tasks_finished_at", "tasks", ["finished_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_finished_at", table_name="tasks")
+    op.drop_index("ix_tasks_created_at", table_name="tasks")
+
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column, nullable in columns.items():
+                batch_op.alter_column(
+                    column,
+                    type_=sa.String(length=30),
+                    existing_type=sa.BigInteger(),
+                    existing_nullable=nullable,
+                )
+        for column in columns:
+            _rewrite(table, column, _to_iso, None)
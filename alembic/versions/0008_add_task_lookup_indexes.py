@@ -0,0 +1,37 @@
+"""add task lookup indexes
+
+Revision ID: 0008_add_task_lookup_indexes
+Revises: 0007_typed_timestamps
+Create Date: 2026-03-13 10:15:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_add_task_lookup_indexes"
+down_revision: Union[str, Sequence[str], None] = "0007_typed_timestamps"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_tasks_chat_bot_message", "tasks", ["chat_id", "bot_message_id"], unique=False)
+    op.create_index(
+        "ix_tasks_active_deadline",
+        "tasks",
+        ["deadline", "created_at"],
+        unique=False,
+        sqlite_where=sa.text("status NOT IN ('delivered', 'cancelled')"),
+    )
+    op.create_index("ix_tasks_updated_at", "tasks", ["updated_at"], unique=False)
+    op.create_index("ix_status_logs_task_created", "status_logs", ["task_id", "created_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_status_logs_task_created", table_name="status_logs")
+    op.drop_index("ix_tasks_updated_at", table_name="tasks")
+    op.drop_index("ix_tasks_active_deadline", table_name="tasks")
+    op.drop_index("ix_tasks_chat_bot_message", table_name="tasks")
@@ -9,6 +9,7 @@ from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 
+from ai.cache import classification_cache
 from core.config import env, runtime
 from core.exceptions import StartupConfigError
 from db.engine import async_session, init_db
@@ -30,6 +31,8 @@ from handlers.messages import router as message_router
 from handlers.middleware import UpdateLogMiddleware
 from handlers.replies import router as reply_router
 from scheduler.runner import start_scheduler
+from services.duplicate_index import brief_fingerprints
+from services.edit_debounce import edit_debouncer
 from services.role_service import load_role_cache
 from services.settings_service import load_runtime_settings
 
@@ -76,6 +79,7 @@ async def main() -> None:
         raise build_startup_config_error(startup)
 
     await init_db()
+    classification_cache.bind(async_session)
 
     async with async_session() as session:
         await settings_repo.ensure_app_settings_row(session)
@@ -94,6 +98,10 @@ async def main() -> None:
             teamlead_count=len(cache["teamlead"]["ids"]) + len(cache["teamlead"]["usernames"]),
         )
 
+    if env.duplicate_detection:
+        async with async_session() as session:
+            await brief_fingerprints.load(session)
+
     bot = Bot(
         token=env.bot_token,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
@@ -136,6 +144,7 @@ async def main() -> None:
     try:
         await dp.start_polling(bot)
     finally:
+        await edit_debouncer.flush_all()
         if web_server:
             web_server.should_exit = True
         if web_task:
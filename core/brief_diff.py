@@ -0,0 +1,95 @@
+"""Classify an edit of a brief by how much of it actually changed.
+
+`diff_brief_edit(old, new)` compares the stored `task.raw_text` with the edited
+text on tokens: words and currency signs (`$100` → `€100` is a change).
+Whitespace, punctuation and emoji never count as a change, except punctuation
+inside a word, as in `12.5` or a link. A swapped 📅/🔥 marker is trivial too:
+field lines are matched without their leading emoji, so no stored field moves:
+
+- `EDIT_TRIVIAL`    — same tokens; nothing to re-parse
+- `EDIT_SECTION`    — only one labeled template field changed (date, link,
+                      payment, duration, urgency, deadline); `field` names it
+- `EDIT_STRUCTURAL` — anything else; the classifier has to look again
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass
+
+from core.brief_extractor import collect_fields, match_field
+
+EDIT_TRIVIAL = "trivial"
+EDIT_SECTION = "section"
+EDIT_STRUCTURAL = "structural"
+
+# A word (joined across inner punctuation) or a run of other visible characters;
+# of the latter only the currency signs (Unicode category Sc) are kept.
+_TOKEN_PATTERN = re.compile(r"\w+(?:[.,:/?=&%-]+\w+)*|[^\w\s]+")
+
+
+@dataclass(frozen=True, slots=True)
+class EditDiff:
+    kind: str
+    field: str | None = None
+    value: str | None = None  # the field's new value for EDIT_SECTION
+
+
+def _currency_signs(run: str) -> str:
+    return "".join(char for char in run if unicodedata.category(char) == "Sc")
+
+
+def _tokens(text: str) -> list[str]:
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.casefold()):
+        if token[0].isalnum() or token[0] == "_":
+            tokens.append(token)
+        elif signs := _currency_signs(token):
+            tokens.append(signs)
+    return tokens
+
+
+def _body_tokens(text: str) -> list[str]:
+    """Tokens of everything except the labeled field lines (and their value lines)."""
+    lines = text.splitlines()
+    kept: list[str] = []
+    skip_value_line = False
+    for line in lines:
+        if skip_value_line:
+            skip_value_line = False
+            if line.strip() and match_field(line) is None:
+                continue
+        matched = match_field(line)
+        if matched is None:
+            kept.append(line)
+            continue
+        _field, cleaned, label = matched
+        # "Оплата:" alone on its line: the value is on the next line.
+        skip_value_line = not _tokens(cleaned[len(label):])
+    return _tokens("\n".join(kept))
+
+
+def diff_brief_edit(old_text: str | None, new_text: str) -> EditDiff:
+    old_text = old_text or ""
+    if _tokens(old_text) == _tokens(new_text):
+        return EditDiff(EDIT_TRIVIAL)
+
+    old_fields = collect_fields(old_text)
+    new_fields = collect_fields(new_text)
+    if (
+        not old_fields
+        or new_fields is None
+        or old_fields.keys() != new_fields.keys()
+        or _body_tokens(old_text) != _body_tokens(new_text)
+    ):
+        return EditDiff(EDIT_STRUCTURAL)
+
+    changed = [
+        name
+        for name in new_fields
+        if _tokens(old_fields[name] or "") != _tokens(new_fields[name] or "")
+    ]
+    if len(changed) != 1:
+        return EditDiff(EDIT_STRUCTURAL)
+    return EditDiff(EDIT_SECTION, field=changed[0], value=new_fields[changed[0]])
@@ -0,0 +1,235 @@
+"""Rule-based extraction of briefs written in the fixed emoji template.
+
+`extract_template_brief` returns a result shaped like `classify_message`
+output when every field parses unambiguously, and None otherwise — the
+caller then falls back to the AI classifier. It is deliberately strict:
+anything it is not sure about (mixed payments, free-form durations,
+non-Russian descriptions) is left to the model.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from core.brief_text_parser import clean_header_prefix, split_inline_value, parse_original_brief_sections
+from core.config import runtime
+from core.constants import DIRECT_MARKERS, LOCAL_EXTRACTOR_CONFIDENCE
+
+_FIELD_LABELS = {
+    "task_date": ("дата", "date"),
+    "fan_link": ("покупатель", "buyer", "ссылка", "link", "фан", "fan"),
+    "payment": ("оплата", "payment", "сумма", "amount"),
+    "duration": ("длительность", "duration"),
+    "priority": ("срочность", "urgency", "priority"),
+    "deadline": ("дедлайн", "deadline", "сроки"),
+}
+
+_REQUIRED_FIELDS = ("task_date", "fan_link", "payment", "duration")
+
+_LINK_PATTERN = re.compile(r"https?://(?:www\.)?(fansly\.com|onlyfans\.com)/\S*", re.IGNORECASE)
+_DATE_PATTERN = re.compile(r"(\d{1,2})\.(\d{1,2})(?:\.(\d{4}))?")
+_AMOUNT_PATTERN = re.compile(r"^(?:\$\s*(\d+(?:[.,]\d+)?)|(\d+(?:[.,]\d+)?)\s*\$)\.?$")
+_MINUTES_PATTERN = re.compile(r"^(\d+)\s*(?:минут[аы]?|мин\.?|minutes?|mins?\.?)$", re.IGNORECASE)
+_FRAMES_PATTERN = re.compile(r"^(\d+)\s*(?:кадр(?:ов|а)?|frames?)$", re.IGNORECASE)
+_DEADLINE_PREFIX = re.compile(r"^(?:до|by)\s+", re.IGNORECASE)
+_FAN_NAME_PATTERN = re.compile(r"(?:имя|name)\s*[-—:]\s*([A-Za-zА-Яа-яЁё][\w'-]*)", re.IGNORECASE)
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+_PRIORITY_VALUES = {
+    "низкая": "low",
+    "low": "low",
+    "средняя": "medium",
+    "medium": "medium",
+    "высокая": "high",
+    "high": "high",
+    "средняя/высокая": "high",
+    "medium/high": "high",
+}
+
+
+def _label_value(lines: list[str], idx: int, label_text: str, label: str) -> str | None:
+    inline = split_inline_value(label_text, label_text[: len(label)])
+    if inline:
+        return inline.strip()
+    # Value on the following line: "Оплата:\n80$"
+    if idx + 1 < len(lines):
+        following = lines[idx + 1].strip()
+        if following and match_field(following) is None:
+            return following
+    return None
+
+
+def match_field(line: str) -> tuple[str, str, str] | None:
+    """(field, cleaned line, matched label) for a labeled field line, else None."""
+    cleaned = clean_header_prefix(line)
+    if not cleaned:
+        return None
+    lowered = cleaned.casefold()
+    for field, labels in _FIELD_LABELS.items():
+        for label in labels:
+            if lowered == label or lowered.startswith((f"{label}:", f"{label} -", f"{label} —")):
+                return field, cleaned, label
+    return None
+
+
+def collect_fields(text: str) -> dict[str, str | None] | None:
+    """Labeled fields of a brief by name; None if any label appears twice."""
+    lines = text.splitlines()
+    fields: dict[str, str | None] = {}
+    for idx, line in enumerate(lines):
+        matched = match_field(line)
+        if matched is None:
+            continue
+        field, cleaned, label = matched
+        if field in fields:
+            return None
+        fields[field] = _label_value(lines, idx, cleaned, label)
+    return fields
+
+
+def _parse_date(value: str, today: date) -> str | None:
+    match = _DATE_PATTERN.fullmatch(value.strip().rstrip("."))
+    if not match:
+        return None
+    day, month, year = match.groups()
+    try:
+        return date(int(year) if year else today.year, int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+def _parse_amount(value: str) -> float | None:
+    match = _AMOUNT_PATTERN.match(value.strip())
+    if not match:
+        return None
+    return float((match.group(1) or match.group(2)).replace(",", "."))
+
+
+def _parse_duration(value: str) -> str | None:
+    value = value.strip().rstrip(".")
+    if match := _MINUTES_PATTERN.match(value):
+        return f"{int(match.group(1))} minutes"
+    if match := _FRAMES_PATTERN.match(value):
+        return f"{int(match.group(1))} frames"
+    return None
+
+
+def _is_russian(value: str) -> bool:
+    without_links = _LINK_PATTERN.sub("", value)
+    cyrillic = len(re.findall(r"[А-Яа-яЁё]", without_links))
+    latin = len(re.findall(r"[A-Za-z]", without_links))
+    return cyrillic > 0 and cyrillic >= latin
+
+
+def _compact(value: str) -> str:
+    return " ".join(value.split())
+
+
+def _summarize(description: str) -> str:
+    sentences = _SENTENCE_END.split(_compact(description))
+    return " ".join(sentences[:2])
+
+
+def parse_template_field(
+    field: str,
+    value: str | None,
+    text: str,
+    *,
+    today: date | None = None,
+) -> dict | None:
+    """Task attribute updates for one labeled template field; None if uncertain.
+
+    `text` is the whole brief: the payment and link rules depend on it the same
+    way they do in `extract_template_brief`.
+    """
+    if not value:
+        return None
+    today = today or datetime.now(ZoneInfo(runtime.timezone)).date()
+    value = value.strip()
+
+    if field == "task_date":
+        task_date = _parse_date(value, today)
+        return {"task_date": task_date} if task_date else None
+    if field == "deadline":
+        deadline = _parse_date(_DEADLINE_PREFIX.sub("", value), today)
+        return {"deadline": deadline} if deadline else None
+    if field == "priority":
+        priority = _PRIORITY_VALUES.get(value.rstrip(".").casefold().replace(" ", ""))
+        return {"priority": priority} if priority else None
+    if field == "duration":
+        duration = _parse_duration(value)
+        return {"duration": duration} if duration else None
+    if field == "payment":
+        amount = _parse_amount(value)
+        if amount is None or text.count("$") != 1:
+            return None
+        return {
+            "amount_total": amount,
+            "amount_paid": amount,
+            "amount_remaining": 0.0,
+            "payment_note": None,
+        }
+    if field == "fan_link":
+        link_match = _LINK_PATTERN.search(value)
+        if link_match is None or len(_LINK_PATTERN.findall(text)) != 1:
+            return None
+        return {
+            "fan_link": link_match.group(0).rstrip(".,;)"),
+            "platform": link_match.group(1).lower().split(".")[0],
+        }
+    return None
+
+
+def extract_template_brief(text: str | None, *, today: date | None = None) -> dict | None:
+    """Parse a template brief without AI; None unless every field is certain."""
+    if not text:
+        return None
+    if not any(marker in text.lower() for marker in DIRECT_MARKERS):
+        return None
+    today = today or datetime.now(ZoneInfo(runtime.timezone)).date()
+
+    fields = collect_fields(text)
+    if fields is None or any(not fields.get(name) for name in _REQUIRED_FIELDS):
+        return None
+
+    parsed: dict = {"priority": "medium", "deadline": None}
+    for name in (*_REQUIRED_FIELDS, "priority", "deadline"):
+        if name not in _REQUIRED_FIELDS and fields.get(name) is None:
+            continue
+        updates = parse_template_field(name, fields[name], text, today=today)
+        if updates is None:
+            return None
+        parsed.update(updates)
+
+    sections = parse_original_brief_sections(text)
+    description = sections["description_original"]
+    if not description or not _is_russian(description):
+        return None
+    outfit = sections["outfit_original"]
+    notes = sections["notes_original"]
+    if any(value and not _is_russian(value) for value in (outfit, notes)):
+        return None
+
+    fan_name_match = _FAN_NAME_PATTERN.search(notes or "")
+    return {
+        "is_task": True,
+        "confidence": LOCAL_EXTRACTOR_CONFIDENCE,
+        "data": {
+            "task_date": parsed["task_date"],
+            "deadline": parsed["deadline"],
+            "platform": parsed["platform"],
+            "priority": parsed["priority"],
+            "fan_link": parsed["fan_link"],
+            "fan_name": fan_name_match.group(1) if fan_name_match else None,
+            "payment_note": None,
+            "duration": parsed["duration"],
+            "description": _summarize(description),
+            "outfit": _compact(outfit) if outfit else None,
+            "notes": _compact(notes) if notes else None,
+            "amount_total": parsed["amount_total"],
+            "amount_paid": parsed["amount_paid"],
+            "amount_remaining": parsed["amount_remaining"],
+        },
+    }
@@ -50,13 +50,14 @@ def _normalize_spaces(value: str) -> str:
     return re.sub(r"\s+", " ", value.strip())
 
 
-def _clean_header_prefix(line: str) -> str:
-    # Drop leading emojis/symbols, keep letters and numbers.
+def clean_header_prefix(line: str) -> str:
+    """Header line without its leading emoji/symbols, spaces normalised."""
     cleaned = re.sub(r"^[^0-9A-Za-zА-Яа-яЁё]+", "", line.strip())
     return _normalize_spaces(cleaned)
 
 
-def _split_inline_value(text: str, label: str) -> str | None:
+def split_inline_value(text: str, label: str) -> str | None:
+    """Value after `label` on the same line ("Оплата: 80$" -> "80$"), if any."""
     rest = text[len(label):].lstrip()
     if rest.startswith((":", "-", "—")):
         rest = rest[1:].lstrip()
@@ -64,7 +65,7 @@ def _split_inline_value(text: str, label: str) -> str | None:
 
 
 def _line_header_label(line: str) -> tuple[str, str | None] | None:
-    cleaned = _clean_header_prefix(line)
+    cleaned = clean_header_prefix(line)
     if not cleaned:
         return None
 
@@ -74,7 +75,7 @@ def _line_header_label(line: str) -> tuple[str, str | None] | None:
             if lowered == label:
                 return section, None
             if lowered.startswith((f"{label}:", f"{label} -", f"{label} —", f"{label} ")):
-                inline = _split_inline_value(cleaned, cleaned[: len(label)])
+                inline = split_inline_value(cleaned, cleaned[: len(label)])
                 return section, inline
     return None
 
@@ -83,7 +84,7 @@ def _is_stop_header(line: str) -> bool:
     if _line_header_label(line) is not None:
         return True
 
-    cleaned = _clean_header_prefix(line)
+    cleaned = clean_header_prefix(line)
     if not cleaned:
         return False
 
@@ -14,8 +14,38 @@ class EnvConfig(BaseSettings):
     bot_token: str = ""
     anthropic_api_key: str = ""
     db_path: str = "data/customs.db"
+    # SQLite connection profile (db/engine.py SQLITE_PROFILES): "wal" or "default" (SQLite defaults)
+    db_profile: str = "wal"
+    # Pooled connections kept open to the database (plus DB_POOL_MAX_OVERFLOW on bursts)
+    db_pool_size: int = 5
     log_level: str = "INFO"
 
+    # Anthropic API admission control (see ai/gateway.py); 0 disables a limit
+    ai_max_in_flight: int = 4
+    ai_requests_per_minute: int = 50
+    ai_tokens_per_minute: int = 30000
+    # Per-sender AI budget in process_brief: burst size and refill per hour; 0 disables
+    ai_sender_burst: int = 5
+    ai_sender_per_hour: int = 30
+    # JSON coefficients of a learned pre-filter model (scripts/train_prefilter_model.py); empty uses the heuristic
+    prefilter_model_path: str = ""
+    # Raise the pre-filter score threshold while the retry queue grows or the API rate-limits
+    ai_load_shedding: bool = True
+    # Hold reposted briefs (SimHash near-duplicates of a recent task) for admin confirmation
+    duplicate_detection: bool = True
+    # Stream classifier responses and show a progressive draft card
+    ai_streaming_cards: bool = False
+    # Quiet period before an edited brief is re-parsed; 0 processes every edit
+    edit_debounce_seconds: float = 8.0
+    # Append every real classifier call to this JSONL file for offline replay (ai/recorder.py)
+    ai_record_path: str = ""
+    # Send a duplicate request when a call runs past the observed p95 (ai/latency.py)
+    ai_hedge_requests: bool = False
+    # Ask for a yes/no verdict first and extract fields only for briefs (two calls per brief)
+    ai_two_stage: bool = False
+    # Fast model tried before runtime.ai_model; empty disables the cascade (ai/cascade.py)
+    ai_cascade_model: str = ""
+
     # Web dashboard
     web_enabled: bool = False
     web_host: str = "127.0.0.1"
@@ -22,7 +22,8 @@ POSTPONE_ALLOWED_STATUSES = {"awaiting_confirmation", "processing"}
 DEFAULT_AI_MODEL = "claude-sonnet-4-5-20250929"
 AI_MAX_INLINE_RETRIES = 2
 AI_RETRY_BASE_DELAY = 2.0  # seconds
-AI_API_TIMEOUT = 30.0  # seconds
+AI_API_TIMEOUT = 30.0  # seconds; fallback and upper bound of the adaptive timeout
+AI_GATE_MAX_TOKENS = 96  # stage-one verdict call in two-stage mode (AI_TWO_STAGE)
 
 TEXT_FIELDS = (
     "fan_link", "fan_name", "payment_note",
@@ -30,12 +31,62 @@ TEXT_FIELDS = (
 )
 AMOUNT_FIELDS = ("amount_total", "amount_paid", "amount_remaining")
 
+AI_CACHE_TTL = timedelta(days=7)
+AI_CACHE_MAX_ROWS = 5000
+AI_CACHE_HOT_SIZE = 256
+AI_CACHE_TOUCH_INTERVAL = timedelta(minutes=1)  # hot hits refresh SQLite LRU order at most this often
+AI_CACHE_PRUNE_EVERY = 50  # persistent writes between expiry/size prunes
+
+AI_BATCH_MAX_REQUESTS = 10_000  # per submitted batch
+AI_BATCH_POLL_INTERVAL = 30.0  # seconds
+
+# Token-bucket charge taken before a call (uncached input + typical output);
+# corrected from the response usage once the call returns.
+AI_GATEWAY_BASE_TOKEN_ESTIMATE = 400
+
+AI_CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive transient failures (attempts)
+AI_CIRCUIT_RESET_TIMEOUT = 60.0  # seconds before a half-open probe
+
+# Adaptive timeouts and hedging (ai/latency.py)
+AI_LATENCY_WINDOW = 200  # recent calls kept per (model, tool, streamed)
+AI_LATENCY_MIN_SAMPLES = 20  # before that the fixed AI_API_TIMEOUT applies
+AI_TIMEOUT_P99_FACTOR = 2.0
+AI_MIN_API_TIMEOUT = 5.0  # seconds
+AI_HEDGE_MAX_RATE = 0.05  # share of recent calls allowed a hedged duplicate
+AI_HEDGE_RATE_WINDOW = 100  # calls
+
+# Load shedding (ai/backpressure.py): the pre-filter's minimum heuristic score
+# rises by one per AI_SHED_QUEUE_STEP due normal-priority rows in ai_retry_queue and per
+# AI_SHED_RATE_LIMIT_STEP 429 responses within AI_SHED_RATE_LIMIT_WINDOW.
+AI_SHED_QUEUE_STEP = 25
+AI_SHED_RATE_LIMIT_STEP = 3
+AI_SHED_RATE_LIMIT_WINDOW = 300.0  # seconds
+AI_SHED_MAX_EXTRA_SCORE = 2  # direct markers and teamleads are never shed
+
+# Cascade mode (AI_CASCADE_MODEL): the fast model's answer is kept when its
+# confidence is at least this far from the confidence threshold.
+AI_CASCADE_CONFIDENCE_MARGIN = 0.15
+
+# Approximate list prices, USD per million tokens (input, output), matched by
+# model family in the model id; used for the cost estimates in /health.
+AI_MODEL_PRICES_PER_MTOK = {
+    "haiku": (1.0, 5.0),
+    "sonnet": (3.0, 15.0),
+    "opus": (15.0, 75.0),
+}
+AI_PROMPT_CACHE_READ_PRICE_FACTOR = 0.1
+AI_PROMPT_CACHE_WRITE_PRICE_FACTOR = 1.25
+
+STREAMING_CARD_EDIT_INTERVAL = 1.0  # seconds between skeleton card edits
+
 # --- Scheduler ---
 
 RETRY_BACKOFF_MINUTES = [2, 5, 10, 20, 40]
 MAX_RETRY_ATTEMPTS = 5
 MAX_RETRY_WINDOW = timedelta(hours=2)
 RETRY_SCAN_INTERVAL = timedelta(minutes=1)
+RETRY_PRIORITY_NORMAL = 0
+RETRY_PRIORITY_LOW = 1  # deferred by the per-sender budget; retried in the backfill lane
 MORNING_DIGEST_HOUR = 9
 
 # --- Pre-filter ---
@@ -50,8 +101,20 @@ BRIEF_KEYWORDS = [
 
 DIRECT_MARKERS = ["📦 описание заказа", "📦 order"]
 
+PAYMENT_MARKERS = ["$", "минут"]
+
+# Confidence reported for briefs parsed by the local template extractor
+LOCAL_EXTRACTOR_CONFIDENCE = 0.95
+
 MIN_BRIEF_TEXT_LENGTH = 30
 MIN_HEURISTIC_SCORE = 2
+# With a learned pre-filter model, each point of load shedding raises its probability cut-off by this
+PREFILTER_MODEL_SHED_STEP = 0.1
+
+# --- Duplicate briefs ---
+
+DUPLICATE_WINDOW_DAYS = 14  # briefs older than this are not compared
+DUPLICATE_MAX_HAMMING = 5  # SimHash bits a repost may differ by
 
 # --- Postpone ---
 
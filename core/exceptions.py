@@ -31,6 +31,10 @@ class AITransientError(BotError):
     """Retryable AI failure (rate-limit, connection, timeout)."""
 
 
+class AICircuitOpenError(AITransientError):
+    """AI call refused without trying because the circuit breaker is open."""
+
+
 class AIPermanentError(BotError):
     """Non-retryable AI failure (malformed response, invalid JSON)."""
 
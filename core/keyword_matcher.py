@@ -0,0 +1,123 @@
+"""Single-pass matching of every topic keyword list.
+
+The pre-filter needs brief markers, emojis, keywords and payment markers;
+reply detection needs shot and delivery keywords. `KeywordMatcher` compiles
+all of them into one regex shaped as a trie ("от(?:прав(?:ила|лено)|снято)"),
+so each text position costs a single character test instead of one substring
+scan per keyword, and one pass over the lowercased text reports every
+category.
+
+A regex match consumes its span, which can hide other keywords:
+
+- shorter keywords inside the match ("готов" in "готово", the "📦" emoji in
+  "📦 описание заказа") — each keyword is compiled with every keyword it
+  contains, and a hit reports all of them;
+- keywords that start inside the match and run past it ("снято" followed by
+  "оплата" shares the "о") — after a match the scan resumes at the longest
+  suffix of the keyword that is also a keyword prefix.
+
+With both, the hits equal separate `kw in text.lower()` scans.
+"""
+
+import re
+from collections.abc import Iterable, Mapping
+
+from core.constants import (
+    BRIEF_EMOJIS,
+    BRIEF_KEYWORDS,
+    DELIVERED_KEYWORDS,
+    DIRECT_MARKERS,
+    PAYMENT_MARKERS,
+    SHOT_KEYWORDS,
+)
+
+DIRECT_MARKER = "direct_marker"
+BRIEF_EMOJI = "brief_emoji"
+BRIEF_KEYWORD = "brief_keyword"
+PAYMENT_MARKER = "payment_marker"
+SHOT_KEYWORD = "shot_keyword"
+DELIVERED_KEYWORD = "delivered_keyword"
+
+KeywordHits = dict[str, set[str]]  # category -> keywords found
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Alternation of the keywords with shared prefixes factored out, longest match first."""
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" not in node:
+            return body
+        if len(branches) == 1:
+            body = f"(?:{body})"
+        return body + "?"  # greedy: the longer keyword wins, the shorter one is the fallback
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    def __init__(self, categories: Mapping[str, Iterable[str]]):
+        owners: dict[str, set[str]] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                owners.setdefault(keyword.lower(), set()).add(category)
+
+        self.categories = tuple(categories)
+        # Every (category, keyword) a match of the keyword proves present.
+        self._implied: dict[str, tuple[tuple[str, str], ...]] = {
+            keyword: tuple(
+                (category, inner)
+                for inner, inner_categories in owners.items()
+                if inner in keyword
+                for category in inner_categories
+            )
+            for keyword in owners
+        }
+        # How far back from a match's end the next keyword may start.
+        self._overlap: dict[str, int] = {
+            keyword: max(
+                (
+                    size
+                    for other in owners
+                    for size in range(1, min(len(keyword), len(other)))
+                    if keyword[-size:] == other[:size]
+                ),
+                default=0,
+            )
+            for keyword in owners
+        }
+        self._pattern = re.compile(_trie_pattern(owners))
+
+    def scan(self, text: str) -> KeywordHits:
+        hits: KeywordHits = {category: set() for category in self.categories}
+        text_lower = text.lower()
+        search = self._pattern.search
+        seen: set[str] = set()
+        match = search(text_lower)
+        while match is not None:
+            keyword = match.group()
+            if keyword not in seen:
+                seen.add(keyword)
+                for category, inner in self._implied[keyword]:
+                    hits[category].add(inner)
+            match = search(text_lower, match.end() - self._overlap[keyword])
+        return hits
+
+
+topic_keywords = KeywordMatcher({
+    DIRECT_MARKER: DIRECT_MARKERS,
+    BRIEF_EMOJI: BRIEF_EMOJIS,
+    BRIEF_KEYWORD: BRIEF_KEYWORDS,
+    PAYMENT_MARKER: PAYMENT_MARKERS,
+    SHOT_KEYWORD: SHOT_KEYWORDS,
+    DELIVERED_KEYWORD: DELIVERED_KEYWORDS,
+})
@@ -0,0 +1,124 @@
+"""Learned pre-filter scorer: a logistic model over the pre-filter features.
+
+The additive heuristic in `pre_filter.py` weighs every signal the same. A model
+trained offline by `scripts/train_prefilter_model.py` from our own outcomes
+(created tasks and recorded AI verdicts) gives each feature its own weight and
+picks the cut-off that keeps the heuristic's recall with fewer AI calls. It is
+exported as plain JSON coefficients:
+
+    {"version": "...", "intercept": -3.1, "threshold": 0.22,
+     "weights": {"log_length": 0.4, "has_keyword": 1.9, ...}}
+
+and loaded from `PREFILTER_MODEL_PATH`. Scoring one message is a dot product
+and one `exp`, a few microseconds. Without a model file the heuristic applies.
+"""
+
+import json
+import math
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import structlog
+
+from core.config import env
+from core.keyword_matcher import BRIEF_EMOJI, BRIEF_KEYWORD, PAYMENT_MARKER, KeywordHits
+
+logger = structlog.get_logger()
+
+PLATFORM_PATTERN = re.compile(r"(fansly\.com|onlyfans\.com)", re.IGNORECASE)
+
+FEATURE_NAMES = (
+    "log_length",
+    "long_text",
+    "has_emoji",
+    "has_keyword",
+    "has_platform_link",
+    "has_payment_marker",
+    "sender_admin",
+    "sender_model",
+)
+
+
+def extract_features(
+    text: str,
+    hits: KeywordHits,
+    *,
+    sender_admin: bool = False,
+    sender_model: bool = False,
+) -> dict[str, float]:
+    """Pre-filter features of a message; `hits` is `topic_keywords.scan(text)`."""
+    return {
+        "log_length": math.log1p(len(text)),
+        "long_text": float(len(text) > 100),
+        "has_emoji": float(bool(hits[BRIEF_EMOJI])),
+        "has_keyword": float(bool(hits[BRIEF_KEYWORD])),
+        "has_platform_link": float(bool(PLATFORM_PATTERN.search(text))),
+        "has_payment_marker": float(bool(hits[PAYMENT_MARKER])),
+        "sender_admin": float(sender_admin),
+        "sender_model": float(sender_model),
+    }
+
+
+@dataclass(frozen=True)
+class PrefilterModel:
+    intercept: float
+    weights: dict[str, float]
+    threshold: float
+    version: str = ""
+    meta: dict[str, object] = field(default_factory=dict)  # training report, informational
+
+    def probability(self, features: dict[str, float]) -> float:
+        z = self.intercept + sum(weight * features.get(name, 0.0) for name, weight in self.weights.items())
+        if z < -60:
+            return 0.0
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def to_json(self) -> str:
+        payload = {
+            "version": self.version,
+            "intercept": self.intercept,
+            "threshold": self.threshold,
+            "weights": self.weights,
+            "meta": self.meta,
+        }
+        return json.dumps(payload, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "PrefilterModel":
+        payload = json.loads(raw)
+        unknown = set(payload["weights"]) - set(FEATURE_NAMES)
+        if unknown:
+            raise ValueError(f"unknown pre-filter features: {sorted(unknown)}")
+        return cls(
+            intercept=float(payload["intercept"]),
+            weights={name: float(value) for name, value in payload["weights"].items()},
+            threshold=float(payload["threshold"]),
+            version=str(payload.get("version", "")),
+            meta=dict(payload.get("meta") or {}),
+        )
+
+
+_loaded: tuple[str, PrefilterModel | None] | None = None
+
+
+def prefilter_model() -> PrefilterModel | None:
+    """The model from `PREFILTER_MODEL_PATH`, loaded once per path; None disables it."""
+    global _loaded
+    path = env.prefilter_model_path
+    if _loaded is not None and _loaded[0] == path:
+        return _loaded[1]
+    model = None
+    if path:
+        try:
+            model = PrefilterModel.from_json(Path(path).read_text(encoding="utf-8"))
+            logger.info("prefilter_model_loaded", path=path, version=model.version, threshold=model.threshold)
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("prefilter_model_load_failed", path=path, error=str(exc))
+    _loaded = (path, model)
+    return model
+
+
+def reset_prefilter_model() -> None:
+    global _loaded
+    _loaded = None
@@ -0,0 +1,73 @@
+"""64-bit SimHash fingerprints of brief texts for near-duplicate detection.
+
+Briefs share a template ("Оплата: …", "Дедлайн: …"), and the labels would
+dominate the fingerprint, so normalization drops every "label:" line prefix
+and keeps the content: lowercased words, ё folded to е. The features are
+the words and word bigrams. Each feature hash votes on the 64 bits, and a
+bit is set when most features have it set. An edited amount or a reworded
+phrase moves only a few bits, while two different briefs on the same template
+are 10+ bits apart.
+
+The votes are added for all 64 bits at once: each feature hash is spread to
+one 16-bit lane per bit of a big integer (cached per feature, since briefs
+repeat their words), so a brief costs one addition per feature.
+"""
+
+import hashlib
+import re
+from functools import lru_cache
+
+FINGERPRINT_BITS = 64
+MIN_FINGERPRINT_TOKENS = 6  # shorter content gives unstable fingerprints
+
+_LANE_BITS = 16  # votes per bit lane; a Telegram message has far fewer than 2**16 features
+_LANE_MASK = (1 << _LANE_BITS) - 1
+_LABEL_PATTERN = re.compile(r"^[^\S\n]*[^:\n/]{1,40}:(?!//)", re.MULTILINE)
+_WORD_PATTERN = re.compile(r"\w+")
+# byte -> its 8 bits, one per lane
+_BYTE_LANES = tuple(
+    sum(((byte >> bit) & 1) << (bit * _LANE_BITS) for bit in range(8)) for byte in range(256)
+)
+
+
+def fingerprint_tokens(text: str) -> list[str]:
+    """Content words of a brief, without template labels."""
+    content = _LABEL_PATTERN.sub(" ", text.lower().replace("ё", "е"))
+    return _WORD_PATTERN.findall(content)
+
+
+@lru_cache(maxsize=1 << 16)
+def _feature_lanes(feature: str) -> int:
+    digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+    lanes = 0
+    for index in range(8):
+        lanes |= _BYTE_LANES[(digest >> (8 * index)) & 0xFF] << (8 * index * _LANE_BITS)
+    return lanes
+
+
+def simhash(text: str) -> int | None:
+    """Fingerprint of `text`, or None when it has too little content to compare."""
+    tokens = fingerprint_tokens(text)
+    if len(tokens) < MIN_FINGERPRINT_TOKENS:
+        return None
+    features = tokens + [f"{left} {right}" for left, right in zip(tokens, tokens[1:])]
+    votes = sum(map(_feature_lanes, features))
+    half = len(features) / 2
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        if (votes >> (bit * _LANE_BITS)) & _LANE_MASK > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming(left: int, right: int) -> int:
+    return (left ^ right).bit_count()
+
+
+def to_hex(fingerprint: int) -> str:
+    """Stored form: 16 hex digits (SQLite integers are signed)."""
+    return f"{fingerprint:016x}"
+
+
+def from_hex(value: str) -> int:
+    return int(value, 16)
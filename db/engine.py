@@ -2,19 +2,76 @@ import os
 from pathlib import Path
 
 import structlog
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from core.config import env
 
 logger = structlog.get_logger()
 
+# PRAGMAs run on every new connection, per `DB_PROFILE`. Only journal_mode is
+# stored in the database file; the rest are per-connection settings.
+SQLITE_PROFILES: dict[str, dict[str, str | int]] = {
+    # WAL lets the web dashboard read while the bot writes; NORMAL syncs at
+    # checkpoints instead of every commit (a power loss can drop the last
+    # commits, never corrupt the file); busy_timeout waits for the writer lock
+    # instead of failing with "database is locked".
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,  # ms
+        "foreign_keys": "ON",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -16000,  # KiB
+        "temp_store": "MEMORY",
+    },
+    # SQLite defaults: rollback journal, fsync on every commit.
+    "default": {},
+}
+DEFAULT_DB_PROFILE = "wal"
+DB_POOL_MAX_OVERFLOW = 5
+DB_POOL_TIMEOUT_SECONDS = 30
+
+
+def resolve_profile(name: str) -> tuple[str, dict[str, str | int]]:
+    if name not in SQLITE_PROFILES:
+        logger.warning("db_profile_unknown", profile=name, fallback=DEFAULT_DB_PROFILE)
+        name = DEFAULT_DB_PROFILE
+    return name, SQLITE_PROFILES[name]
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: dict[str, str | int]) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def build_engine(db_path: str, *, profile: str, pool_size: int) -> AsyncEngine:
+    """Async engine whose connections get the `profile` PRAGMAs on connect."""
+    _, pragmas = resolve_profile(profile)
+    new_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}",
+        echo=False,
+        pool_size=pool_size,
+        max_overflow=DB_POOL_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+    )
+    if pragmas:
+        event.listen(
+            new_engine.sync_engine,
+            "connect",
+            lambda dbapi_connection, _record: apply_sqlite_pragmas(dbapi_connection, pragmas),
+        )
+    return new_engine
+
+
 # Ensure data directory exists
 os.makedirs(os.path.dirname(env.db_path) or ".", exist_ok=True)
 
-engine = create_async_engine(
-    f"sqlite+aiosqlite:///{env.db_path}",
-    echo=False,
-)
+engine = build_engine(env.db_path, profile=env.db_profile, pool_size=env.db_pool_size)
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -33,4 +90,9 @@ async def init_db():
         command.upgrade(alembic_cfg, "head")
 
     await asyncio.to_thread(_run_migrations)
-    logger.info("database_initialized", path=env.db_path)
+    logger.info(
+        "database_initialized",
+        path=env.db_path,
+        profile=resolve_profile(env.db_profile)[0],
+        pool_size=env.db_pool_size,
+    )
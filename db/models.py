@@ -10,9 +10,18 @@ from sqlalchemy import (
     Index,
     String,
     Text,
+    text,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
+from db.types import UtcTimestamp
+
+# Statuses that take a task off the board. The partial index
+# ix_tasks_active_deadline covers the others; SQLite only uses it when a
+# query repeats ACTIVE_TASK_CONDITION with literal values (task_repo).
+CLOSED_TASK_STATUSES = ("delivered", "cancelled")
+ACTIVE_TASK_CONDITION = "status NOT IN ('delivered', 'cancelled')"
+
 
 class Base(DeclarativeBase):
     pass
@@ -30,7 +39,9 @@ class Task(Base):
     bot_message_id: Mapped[int | None] = mapped_column(BigInteger)
     sender_username: Mapped[str | None] = mapped_column(String(100))
 
-    # Task data (from AI parsing)
+    # Task data (from AI parsing). Calendar dates (task_date, deadline) are
+    # "YYYY-MM-DD" text: every writer normalises to that form, which sorts and
+    # compares like the date, so the deadline predicates run in SQL on the index.
     task_date: Mapped[str | None] = mapped_column(String(20))
     fan_link: Mapped[str | None] = mapped_column(String(500))
     fan_name: Mapped[str | None] = mapped_column(String(200))
@@ -52,31 +63,44 @@ class Task(Base):
     # Status
     status: Mapped[str] = mapped_column(String(20), default="draft")
 
-    finished_at: Mapped[str | None] = mapped_column(String(30))
-    delivered_at: Mapped[str | None] = mapped_column(String(30))
+    finished_at: Mapped[str | None] = mapped_column(UtcTimestamp)
+    delivered_at: Mapped[str | None] = mapped_column(UtcTimestamp)
 
     # Metadata
     raw_text: Mapped[str | None] = mapped_column(Text)
+    text_fingerprint: Mapped[str | None] = mapped_column(String(16))  # SimHash of raw_text, hex
     ai_confidence: Mapped[float | None] = mapped_column(Float)
-    last_reminder_at: Mapped[str | None] = mapped_column(String(30))
+    last_reminder_at: Mapped[str | None] = mapped_column(UtcTimestamp)
     created_at: Mapped[str] = mapped_column(
-        String(30), default=lambda: datetime.now(timezone.utc).isoformat()
+        UtcTimestamp, default=lambda: datetime.now(timezone.utc).isoformat()
     )
     updated_at: Mapped[str] = mapped_column(
-        String(30),
+        UtcTimestamp,
         default=lambda: datetime.now(timezone.utc).isoformat(),
         onupdate=lambda: datetime.now(timezone.utc).isoformat(),
     )
 
     # Relationships
     status_logs: Mapped[list["StatusLog"]] = relationship(
-        back_populates="task", cascade="all, delete-orphan"
+        back_populates="task",
+        cascade="all, delete-orphan",
+        order_by="StatusLog.created_at",
     )
 
     __table_args__ = (
         Index("ix_tasks_status", "status"),
         Index("ix_tasks_deadline", "deadline"),
         Index("ix_tasks_chat_message", "chat_id", "message_id", unique=True),
+        Index("ix_tasks_chat_bot_message", "chat_id", "bot_message_id"),
+        Index(
+            "ix_tasks_active_deadline",
+            "deadline",
+            "created_at",
+            sqlite_where=text(ACTIVE_TASK_CONDITION),
+        ),
+        Index("ix_tasks_created_at", "created_at"),
+        Index("ix_tasks_finished_at", "finished_at"),
+        Index("ix_tasks_updated_at", "updated_at"),
     )
 
 
@@ -91,11 +115,13 @@ class StatusLog(Base):
     changed_by_name: Mapped[str | None] = mapped_column(String(100))
     note: Mapped[str | None] = mapped_column(Text)
     created_at: Mapped[str] = mapped_column(
-        String(30), default=lambda: datetime.now(timezone.utc).isoformat()
+        UtcTimestamp, default=lambda: datetime.now(timezone.utc).isoformat()
     )
 
     task: Mapped["Task"] = relationship(back_populates="status_logs")
 
+    __table_args__ = (Index("ix_status_logs_task_created", "task_id", "created_at"),)
+
 
 class ProcessedMessage(Base):
     __tablename__ = "processed_messages"
@@ -104,7 +130,7 @@ class ProcessedMessage(Base):
     chat_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     is_task: Mapped[bool] = mapped_column(Boolean, default=False)
     processed_at: Mapped[str] = mapped_column(
-        String(30), default=lambda: datetime.now(timezone.utc).isoformat()
+        UtcTimestamp, default=lambda: datetime.now(timezone.utc).isoformat()
     )
 
 
@@ -117,7 +143,7 @@ class ParseFailure(Base):
     error_type: Mapped[str] = mapped_column(String(50), nullable=False)
     error_detail: Mapped[str | None] = mapped_column(Text)
     created_at: Mapped[str] = mapped_column(
-        String(30), default=lambda: datetime.now(timezone.utc).isoformat()
+        UtcTimestamp, default=lambda: datetime.now(timezone.utc).isoformat()
     )
 
 
@@ -132,18 +158,21 @@ class AIRetryQueue(Base):
     has_photo: Mapped[bool] = mapped_column(Boolean, default=False)
     sender_username: Mapped[str | None] = mapped_column(String(100))
     attempt_count: Mapped[int] = mapped_column(Integer, default=0)
+    # RETRY_PRIORITY_NORMAL / RETRY_PRIORITY_LOW; lower values are retried first
+    priority: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    # Start of MAX_RETRY_WINDOW: enqueue time, or the first due time of a deferred row
     first_enqueued_at: Mapped[str] = mapped_column(
-        String(30), default=lambda: datetime.now(timezone.utc).isoformat()
+        UtcTimestamp, default=lambda: datetime.now(timezone.utc).isoformat()
     )
     next_retry_at: Mapped[str] = mapped_column(
-        String(30), default=lambda: datetime.now(timezone.utc).isoformat()
+        UtcTimestamp, default=lambda: datetime.now(timezone.utc).isoformat()
     )
     last_error: Mapped[str | None] = mapped_column(Text)
     created_at: Mapped[str] = mapped_column(
-        String(30), default=lambda: datetime.now(timezone.utc).isoformat()
+        UtcTimestamp, default=lambda: datetime.now(timezone.utc).isoformat()
     )
     updated_at: Mapped[str] = mapped_column(
-        String(30),
+        UtcTimestamp,
         default=lambda: datetime.now(timezone.utc).isoformat(),
         onupdate=lambda: datetime.now(timezone.utc).isoformat(),
     )
@@ -154,6 +183,31 @@ class AIRetryQueue(Base):
     )
 
 
+class AIClassificationCache(Base):
+    __tablename__ = "ai_classification_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    ai_model: Mapped[str] = mapped_column(String(128), nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(32), nullable=False)
+    result_json: Mapped[str] = mapped_column(Text, nullable=False)
+    latency_ms: Mapped[int] = mapped_column(Integer, default=0)
+    input_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    output_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    hit_count: Mapped[int] = mapped_column(Integer, default=0)
+    expires_at: Mapped[str] = mapped_column(UtcTimestamp, nullable=False)
+    last_accessed_at: Mapped[str] = mapped_column(
+        UtcTimestamp, default=lambda: datetime.now(timezone.utc).isoformat()
+    )
+    created_at: Mapped[str] = mapped_column(
+        UtcTimestamp, default=lambda: datetime.now(timezone.utc).isoformat()
+    )
+
+    __table_args__ = (
+        Index("ix_ai_classification_cache_expires_at", "expires_at"),
+        Index("ix_ai_classification_cache_last_accessed_at", "last_accessed_at"),
+    )
+
+
 class RoleMembership(Base):
     __tablename__ = "role_memberships"
 
@@ -162,10 +216,10 @@ class RoleMembership(Base):
     user_id: Mapped[int | None] = mapped_column(BigInteger)
     username: Mapped[str | None] = mapped_column(String(100))
     created_at: Mapped[str] = mapped_column(
-        String(30), default=lambda: datetime.now(timezone.utc).isoformat()
+        UtcTimestamp, default=lambda: datetime.now(timezone.utc).isoformat()
     )
     updated_at: Mapped[str] = mapped_column(
-        String(30),
+        UtcTimestamp,
         default=lambda: datetime.now(timezone.utc).isoformat(),
         onupdate=lambda: datetime.now(timezone.utc).isoformat(),
     )
@@ -193,10 +247,10 @@ class AppSettings(Base):
     finished_reminder_hours: Mapped[int] = mapped_column(default=24)
     timezone: Mapped[str] = mapped_column(String(64), default="Europe/Moscow")
     created_at: Mapped[str] = mapped_column(
-        String(30), default=lambda: datetime.now(timezone.utc).isoformat()
+        UtcTimestamp, default=lambda: datetime.now(timezone.utc).isoformat()
     )
     updated_at: Mapped[str] = mapped_column(
-        String(30),
+        UtcTimestamp,
         default=lambda: datetime.now(timezone.utc).isoformat(),
         onupdate=lambda: datetime.now(timezone.utc).isoformat(),
     )
@@ -0,0 +1,122 @@
+"""AI classification cache rows. Repos never commit — callers commit."""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import AIClassificationCache
+
+
+async def get_cached_classification(
+    session: AsyncSession,
+    cache_key: str,
+    *,
+    now_iso: str | None = None,
+) -> AIClassificationCache | None:
+    """Return a live cache row and bump its LRU position, or None."""
+    now = now_iso or datetime.now(timezone.utc).isoformat()
+    result = await session.execute(
+        select(AIClassificationCache).where(
+            AIClassificationCache.cache_key == cache_key,
+            AIClassificationCache.expires_at > now,
+        )
+    )
+    row = result.scalar_one_or_none()
+    if row:
+        row.hit_count = int(row.hit_count or 0) + 1
+        row.last_accessed_at = now
+        await session.flush()
+    return row
+
+
+async def touch_cached_classifications(
+    session: AsyncSession,
+    cache_keys: list[str],
+    *,
+    now_iso: str | None = None,
+) -> None:
+    """Bump the LRU position of rows whose hits were served from the hot tier."""
+    if not cache_keys:
+        return
+    now = now_iso or datetime.now(timezone.utc).isoformat()
+    await session.execute(
+        update(AIClassificationCache)
+        .where(AIClassificationCache.cache_key.in_(cache_keys))
+        .values(last_accessed_at=now)
+    )
+    await session.flush()
+
+
+async def upsert_cached_classification(
+    session: AsyncSession,
+    *,
+    cache_key: str,
+    ai_model: str,
+    prompt_version: str,
+    result_json: str,
+    expires_at: str,
+    latency_ms: int = 0,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+) -> AIClassificationCache:
+    now_iso = datetime.now(timezone.utc).isoformat()
+    row = await session.get(AIClassificationCache, cache_key)
+    if row:
+        row.ai_model = ai_model
+        row.prompt_version = prompt_version
+        row.result_json = result_json
+        row.latency_ms = latency_ms
+        row.input_tokens = input_tokens
+        row.output_tokens = output_tokens
+        row.expires_at = expires_at
+        row.last_accessed_at = now_iso
+    else:
+        row = AIClassificationCache(
+            cache_key=cache_key,
+            ai_model=ai_model,
+            prompt_version=prompt_version,
+            result_json=result_json,
+            latency_ms=latency_ms,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            hit_count=0,
+            expires_at=expires_at,
+            last_accessed_at=now_iso,
+        )
+        session.add(row)
+    await session.flush()
+    return row
+
+
+async def prune_cached_classifications(
+    session: AsyncSession,
+    *,
+    max_rows: int,
+    now_iso: str | None = None,
+) -> int:
+    """Drop expired rows, then least-recently-used rows above max_rows.
+
+    Returns the number of deleted rows.
+    """
+    now = now_iso or datetime.now(timezone.utc).isoformat()
+    expired = await session.execute(
+        delete(AIClassificationCache).where(AIClassificationCache.expires_at <= now)
+    )
+    deleted = int(expired.rowcount or 0)
+
+    total = await session.scalar(select(func.count()).select_from(AIClassificationCache))
+    overflow = int(total or 0) - max_rows
+    if overflow > 0:
+        lru_keys = (
+            select(AIClassificationCache.cache_key)
+            .order_by(AIClassificationCache.last_accessed_at.asc())
+            .limit(overflow)
+        )
+        evicted = await session.execute(
+            delete(AIClassificationCache).where(AIClassificationCache.cache_key.in_(lru_keys))
+        )
+        deleted += int(evicted.rowcount or 0)
+
+    await session.flush()
+    return deleted
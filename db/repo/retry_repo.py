@@ -2,9 +2,10 @@
 
 from datetime import datetime, timezone
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.constants import RETRY_PRIORITY_LOW, RETRY_PRIORITY_NORMAL
 from db.models import AIRetryQueue
 
 
@@ -19,9 +20,13 @@ async def enqueue_ai_retry(
     sender_username: str | None = None,
     error_detail: str | None = None,
     next_retry_at: str | None = None,
+    priority: int = RETRY_PRIORITY_NORMAL,
 ) -> AIRetryQueue:
     now_iso = datetime.now(timezone.utc).isoformat()
     due_at = next_retry_at or now_iso
+    # MAX_RETRY_WINDOW runs from `first_enqueued_at`. A row deferred by the
+    # sender budget has not been tried yet, so its window opens when it comes due.
+    window_start = due_at if priority >= RETRY_PRIORITY_LOW else now_iso
     result = await session.execute(
         select(AIRetryQueue).where(
             AIRetryQueue.chat_id == chat_id,
@@ -37,9 +42,10 @@ async def enqueue_ai_retry(
         row.sender_username = sender_username
         row.last_error = error_detail
         row.next_retry_at = due_at
+        row.priority = priority
         row.updated_at = now_iso
         if not row.first_enqueued_at:
-            row.first_enqueued_at = now_iso
+            row.first_enqueued_at = window_start
     else:
         row = AIRetryQueue(
             chat_id=chat_id,
@@ -49,7 +55,8 @@ async def enqueue_ai_retry(
             has_photo=bool(has_photo),
             sender_username=sender_username,
             attempt_count=0,
-            first_enqueued_at=now_iso,
+            priority=priority,
+            first_enqueued_at=window_start,
             next_retry_at=due_at,
             last_error=error_detail,
         )
@@ -64,6 +71,23 @@ async def get_ai_retry_by_id(session: AsyncSession, queue_id: int) -> AIRetryQue
     return result.scalar_one_or_none()
 
 
+async def count_due_ai_retries(session: AsyncSession, *, now_iso: str | None = None) -> int:
+    """Due normal-priority rows, i.e. transient-failure retries waiting for the AI.
+
+    Sender-budget deferrals (low priority) and rows not due yet are left out.
+    """
+    due = now_iso or datetime.now(timezone.utc).isoformat()
+    result = await session.execute(
+        select(func.count())
+        .select_from(AIRetryQueue)
+        .where(
+            AIRetryQueue.priority == RETRY_PRIORITY_NORMAL,
+            AIRetryQueue.next_retry_at <= due,
+        )
+    )
+    return int(result.scalar_one())
+
+
 async def get_due_ai_retries(
     session: AsyncSession,
     *,
@@ -74,7 +98,11 @@ async def get_due_ai_retries(
     result = await session.execute(
         select(AIRetryQueue)
         .where(AIRetryQueue.next_retry_at <= due)
-        .order_by(AIRetryQueue.next_retry_at.asc(), AIRetryQueue.id.asc())
+        .order_by(
+            AIRetryQueue.priority.asc(),
+            AIRetryQueue.next_retry_at.asc(),
+            AIRetryQueue.id.asc(),
+        )
         .limit(limit)
     )
     return list(result.scalars().all())
@@ -3,7 +3,7 @@
 from datetime import datetime, timedelta, timezone
 
 import structlog
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -11,10 +11,18 @@ from sqlalchemy.orm import selectinload
 from core.constants import VALID_TRANSITIONS
 from core.exceptions import InvalidTransitionError
 from core.log_utils import today_local
-from db.models import StatusLog, Task
+from core.simhash import simhash, to_hex
+from db.models import CLOSED_TASK_STATUSES, StatusLog, Task
 
 logger = structlog.get_logger()
 
+# Same filter as the ix_tasks_active_deadline partial index. The values are
+# rendered into the SQL: SQLite matches a partial index against the query
+# text and cannot see bound parameters.
+_IS_ACTIVE = Task.status.notin_(
+    bindparam("closed_statuses", list(CLOSED_TASK_STATUSES), expanding=True, literal_execute=True)
+)
+
 
 def _apply_status_timestamps(task: Task, new_status: str, now_iso: str) -> None:
     if new_status == "delivered":
@@ -37,6 +45,9 @@ async def create_task(session: AsyncSession, **kwargs) -> tuple[Task, bool]:
     Returns (task, created) where created=False means an existing task
     for the same (chat_id, message_id) was returned after a race.
     """
+    if kwargs.get("raw_text") and "text_fingerprint" not in kwargs:
+        fingerprint = simhash(kwargs["raw_text"])
+        kwargs["text_fingerprint"] = to_hex(fingerprint) if fingerprint is not None else None
     task = Task(**kwargs)
     session.add(task)
     try:
@@ -235,7 +246,7 @@ async def delete_task(session: AsyncSession, task: Task) -> None:
 async def get_active_tasks(session: AsyncSession) -> list[Task]:
     result = await session.execute(
         select(Task)
-        .where(Task.status.notin_(["delivered", "cancelled"]))
+        .where(_IS_ACTIVE)
         .order_by(Task.deadline.asc().nullslast(), Task.created_at.asc())
     )
     return list(result.scalars().all())
@@ -260,7 +271,8 @@ async def get_overdue_tasks(
         .where(
             Task.deadline.isnot(None),
             Task.deadline < today,
-            Task.status.notin_(["finished", "delivered", "cancelled"]),
+            _IS_ACTIVE,
+            Task.status != "finished",
         )
         .order_by(Task.deadline.asc())
     )
@@ -282,7 +294,8 @@ async def get_tasks_due_soon(
             Task.deadline.isnot(None),
             Task.deadline >= today_str,
             Task.deadline <= soon,
-            Task.status.notin_(["finished", "delivered", "cancelled"]),
+            _IS_ACTIVE,
+            Task.status != "finished",
         )
         .order_by(Task.deadline.asc())
     )
@@ -302,25 +315,13 @@ async def get_finished_tasks_older_than_hours(
     if hours <= 0:
         hours = 24
 
-    cutoff = datetime.now(timezone.utc).timestamp() - (hours * 3600)
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
     result = await session.execute(
         select(Task)
-        .where(Task.status == "finished", Task.finished_at.isnot(None))
+        .where(Task.status == "finished", Task.finished_at <= cutoff.isoformat())
         .order_by(Task.finished_at.asc())
     )
-    tasks = list(result.scalars().all())
-
-    overdue: list[Task] = []
-    for task in tasks:
-        if not task.finished_at:
-            continue
-        try:
-            finished_at = datetime.fromisoformat(task.finished_at).timestamp()
-        except ValueError:
-            continue
-        if finished_at <= cutoff:
-            overdue.append(task)
-    return overdue
+    return list(result.scalars().all())
 
 
 async def get_task_with_logs(
@@ -341,8 +342,24 @@ async def get_recent_tasks(
     """Get recently updated active tasks for dashboard."""
     result = await session.execute(
         select(Task)
-        .where(Task.status.notin_(["delivered", "cancelled"]))
+        .where(_IS_ACTIVE)
         .order_by(Task.updated_at.desc())
         .limit(limit)
     )
     return list(result.scalars().all())
+
+
+async def get_recent_brief_fingerprints(
+    session: AsyncSession, since: str
+) -> list[tuple[int, int, int | None, str | None, str | None, str]]:
+    """(id, chat_id, topic_id, text_fingerprint, raw_text, created_at) of
+    non-cancelled tasks created at or after `since`, oldest first."""
+    result = await session.execute(
+        select(
+            Task.id, Task.chat_id, Task.topic_id,
+            Task.text_fingerprint, Task.raw_text, Task.created_at,
+        )
+        .where(Task.created_at >= since, Task.status != "cancelled")
+        .order_by(Task.created_at.asc())
+    )
+    return [tuple(row) for row in result.all()]
@@ -0,0 +1,46 @@
+"""Custom column types."""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_us(value: str | datetime | int) -> int:
+    """Microseconds since the Unix epoch; naive values are taken as UTC."""
+    if isinstance(value, int):
+        return value
+    parsed = datetime.fromisoformat(value) if isinstance(value, str) else value
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (parsed - EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(value: int) -> str:
+    return (EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+class UtcTimestamp(TypeDecorator):
+    """A point in time stored as integer microseconds since the epoch.
+
+    Python code reads and writes ISO 8601 strings as before; values are
+    converted at the boundary, query parameters included, so
+    `Task.created_at >= "2026-03-01T00:00:00+03:00"` compares instants on an
+    index. Loaded values come back in UTC ("2026-03-01T06:30:00.250000+00:00").
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return to_epoch_us(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):  # legacy text value
+            return value
+        return from_epoch_us(int(value))
@@ -0,0 +1,209 @@
+"""In-process AI counters rendered for /health and logs."""
+
+from typing import Any
+
+from ai.backends import local_backend_stats
+from ai.backpressure import load_shedder
+from ai.cache import classification_cache
+from ai.cascade import cascade_stats
+from ai.circuit_breaker import circuit_breaker
+from ai.gateway import LANE_PRIORITIES, ai_gateway
+from ai.latency import latency_tracker
+from ai.single_flight import classification_flights
+from ai.usage import UsageStats, estimate_cost_usd, usage_meter
+from core.constants import AI_SHED_RATE_LIMIT_WINDOW, MIN_HEURISTIC_SCORE
+from services.edit_debounce import edit_debouncer
+from services.duplicate_index import brief_fingerprints
+from services.sender_budget import sender_budget
+
+
+def _model_summary(model: str, usage: UsageStats) -> dict[str, Any]:
+    cost = estimate_cost_usd(usage, model)
+    return {
+        "calls": usage.calls,
+        "avg_latency_ms": int(usage.avg_latency * 1000),
+        "cost_usd": round(cost, 4) if cost is not None else None,
+    }
+
+
+def summarize_ai_metrics_for_log() -> dict[str, Any]:
+    cache = classification_cache.stats
+    usage = usage_meter.stats
+    return {
+        "cache_hot_hits": cache.hot_hits,
+        "cache_persistent_hits": cache.persistent_hits,
+        "cache_misses": cache.misses,
+        "cache_stores": cache.stores,
+        "cache_evictions": cache.evictions,
+        "cache_errors": cache.errors,
+        "cache_saved_seconds": round(cache.saved_seconds, 1),
+        "cache_saved_input_tokens": cache.saved_input_tokens,
+        "cache_saved_output_tokens": cache.saved_output_tokens,
+        "api_calls": usage.calls,
+        "input_tokens": usage.input_tokens,
+        "cache_read_input_tokens": usage.cache_read_input_tokens,
+        "cache_creation_input_tokens": usage.cache_creation_input_tokens,
+        "output_tokens": usage.output_tokens,
+        "prompt_cache_read_ratio": round(usage.cache_read_ratio, 3),
+        "avg_latency_prompt_cached_ms": int(usage.avg_cache_read_latency * 1000),
+        "avg_latency_uncached_ms": int(usage.avg_uncached_latency * 1000),
+        "malformed_responses": usage.malformed_responses,
+        "malformed_rate": round(usage.malformed_rate, 4),
+        "cascade_fast_calls": cascade_stats.stats.fast_calls,
+        "cascade_accepted": cascade_stats.stats.accepted,
+        "cascade_escalated": cascade_stats.stats.escalated,
+        "cascade_hit_rate": round(cascade_stats.stats.hit_rate, 3),
+        "models": {
+            model: _model_summary(model, model_usage) for model, model_usage in usage_meter.by_model.items()
+        },
+        "hedged_requests": latency_tracker.hedges.hedged,
+        "hedge_wins": latency_tracker.hedges.hedge_wins,
+        "hedge_capped": latency_tracker.hedges.capped,
+        "hedge_rate": round(latency_tracker.hedges.hedge_rate, 3),
+        "timeouts_s": {
+            "/".join(str(part) for part in kind): round(latency_tracker.timeout(kind), 1)
+            for kind in latency_tracker.kinds
+        },
+        "circuit_state": circuit_breaker.state,
+        "circuit_trips": circuit_breaker.trips,
+        "circuit_rejected": circuit_breaker.rejected,
+        "local_backend_hits": local_backend_stats.total_hits,
+        "local_backend_deferred": local_backend_stats.deferred,
+        "single_flight_started": classification_flights.stats.started,
+        "single_flight_joined": classification_flights.stats.joined,
+        "sender_budget_charged": sender_budget.stats.charged,
+        "sender_budget_deferred": sender_budget.stats.deferred,
+        "sender_budget_exempt": sender_budget.stats.exempt,
+        "prefilter_min_score": MIN_HEURISTIC_SCORE + load_shedder.extra_score,
+        "prefilter_shed": load_shedder.stats.shed,
+        "retry_queue_depth": load_shedder.queue_depth,
+        "recent_rate_limits": load_shedder.recent_rate_limits,
+        "duplicate_lookups": brief_fingerprints.stats.lookups,
+        "duplicate_hits": brief_fingerprints.stats.hits,
+        "duplicate_max_lookup_us": int(brief_fingerprints.stats.max_lookup_us),
+        "duplicate_index_size": len(brief_fingerprints),
+        "edits_received": edit_debouncer.stats.received,
+        "edits_coalesced": edit_debouncer.stats.coalesced,
+        "edits_flushed": edit_debouncer.stats.flushed,
+        "gateway_in_flight": ai_gateway.in_flight,
+        "gateway_queued": ai_gateway.queued,
+        **{
+            f"gateway_{lane}_avg_wait_ms": int(ai_gateway.lanes[lane].avg_wait_seconds * 1000)
+            for lane in LANE_PRIORITIES
+        },
+        **{
+            f"gateway_{lane}_max_wait_ms": int(ai_gateway.lanes[lane].max_wait_seconds * 1000)
+            for lane in LANE_PRIORITIES
+        },
+    }
+
+
+def build_ai_metrics_lines() -> list[str]:
+    cache = classification_cache.stats
+    usage = usage_meter.stats
+    lookups = cache.hits + cache.misses
+    hit_rate = (cache.hits / lookups * 100) if lookups else 0.0
+    return [
+        "AI (с момента запуска):",
+        (
+            f"• Кэш классификации: {cache.hits} попаданий "
+            f"({cache.hot_hits} из памяти, {cache.persistent_hits} из БД), "
+            f"{cache.misses} промахов, {hit_rate:.0f}%"
+        ),
+        (
+            f"• Сэкономлено: {cache.hits} запросов к API, ~{cache.saved_seconds:.0f} с, "
+            f"{cache.saved_input_tokens + cache.saved_output_tokens} токенов"
+        ),
+        (
+            f"• Запросов к API: {usage.calls}, токены: вход {usage.input_tokens}, "
+            f"из кэша промпта {usage.cache_read_input_tokens}, "
+            f"запись в кэш {usage.cache_creation_input_tokens}, выход {usage.output_tokens}"
+        ),
+        (
+            f"• Средняя задержка: {usage.avg_cache_read_latency:.1f} с с кэшем промпта, "
+            f"{usage.avg_uncached_latency:.1f} с без"
+        ),
+        (
+            f"• Некорректных ответов модели: {usage.malformed_responses} из {usage.calls} "
+            f"({usage.malformed_rate * 100:.1f}%)"
+        ),
+        *_cascade_lines(),
+        *_latency_lines(),
+        (
+            f"• Разобрано локально без API: {local_backend_stats.total_hits}, "
+            f"передано в AI: {local_backend_stats.deferred}"
+        ),
+        (
+            f"• Параллельные классификации одного сообщения: {classification_flights.stats.joined} "
+            f"присоединились к уже идущему запросу"
+        ),
+        (
+            f"• Бюджет отправителей: списано {sender_budget.stats.charged}, "
+            f"отложено в очередь {sender_budget.stats.deferred}, без лимита {sender_budget.stats.exempt}"
+        ),
+        (
+            f"• Порог префильтра: {MIN_HEURISTIC_SCORE + load_shedder.extra_score} "
+            f"(база {MIN_HEURISTIC_SCORE}; в очереди ретраев {load_shedder.queue_depth}, "
+            f"429 за {AI_SHED_RATE_LIMIT_WINDOW / 60:.0f} мин {load_shedder.recent_rate_limits}), отсеяно под нагрузкой {load_shedder.stats.shed}"
+        ),
+        (
+            f"• Повторы брифов: найдено {brief_fingerprints.stats.hits} из {brief_fingerprints.stats.lookups} проверок, "
+            f"в индексе {len(brief_fingerprints)}, поиск до {brief_fingerprints.stats.max_lookup_us:.0f} мкс"
+        ),
+        (
+            f"• Правки брифов: получено {edit_debouncer.stats.received}, "
+            f"объединено {edit_debouncer.stats.coalesced}, обработано {edit_debouncer.stats.flushed}, "
+            f"ждут паузы {edit_debouncer.pending}"
+        ),
+        (
+            f"• Предохранитель API: {circuit_breaker.state}, срабатываний {circuit_breaker.trips}, "
+            f"сообщений сразу в очередь ретраев {circuit_breaker.rejected}"
+        ),
+        (
+            f"• Очередь к API: {ai_gateway.in_flight} в работе, {ai_gateway.queued} ждут; "
+            + ", ".join(
+                f"{lane} {stats.acquired} (ожид. ср. {stats.avg_wait_seconds:.1f} с, "
+                f"макс. {stats.max_wait_seconds:.1f} с)"
+                for lane, stats in ai_gateway.lanes.items()
+            )
+        ),
+    ]
+
+
+def _cascade_lines() -> list[str]:
+    lines = []
+    cascade = cascade_stats.stats
+    if cascade.fast_calls:
+        lines.append(
+            f"• Каскад моделей: быстрая ответила сама {cascade.accepted} из {cascade.fast_calls} "
+            f"({cascade.hit_rate * 100:.0f}%), передано основной {cascade.escalated} "
+            f"(неуверенно {cascade.escalated_ambiguous}, некорректно {cascade.escalated_malformed}, "
+            f"ошибка {cascade.escalated_failed})"
+        )
+    for model, usage in usage_meter.by_model.items():
+        cost = estimate_cost_usd(usage, model)
+        cost_text = f"~${cost:.2f}" if cost is not None else "цена неизвестна"
+        lines.append(
+            f"• {model}: запросов {usage.calls}, ср. задержка {usage.avg_latency:.1f} с, {cost_text}"
+        )
+    return lines
+
+
+def _latency_lines() -> list[str]:
+    lines = []
+    for model, tool, streamed in latency_tracker.kinds:
+        kind = (model, tool, streamed)
+        p95 = latency_tracker.percentile(kind, 95)
+        p99 = latency_tracker.percentile(kind, 99)
+        observed = f"p95 {p95:.1f} с, p99 {p99:.1f} с" if p95 is not None and p99 is not None else "мало замеров"
+        lines.append(
+            f"• Задержка {model} {tool}{' (стрим)' if streamed else ''}: {observed}, "
+            f"таймаут {latency_tracker.timeout(kind):.0f} с"
+        )
+    hedges = latency_tracker.hedges
+    if hedges.calls:
+        lines.append(
+            f"• Дублирующие запросы: {hedges.hedged} из {hedges.calls} ({hedges.hedge_rate * 100:.1f}%), "
+            f"дубль ответил первым {hedges.hedge_wins}, не отправлено из-за лимита {hedges.capped}"
+        )
+    return lines
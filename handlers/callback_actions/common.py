@@ -23,6 +23,8 @@ ADMIN_OR_TEAMLEAD_ACTIONS = {
     "not_task_cancel",
     "delivered",
     "confirm_delivered",
+    "dup_ok",
+    "dup_new",
 }
 ADMIN_OR_TEAMLEAD_OR_MODEL_ACTIONS = {
     "postpone",
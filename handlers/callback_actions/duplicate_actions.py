@@ -0,0 +1,37 @@
+"""Near-duplicate brief callback actions.
+
+The duplicate card replies to the reposted message and its buttons carry the
+id of the existing task it resembles.
+"""
+
+import structlog
+
+from services.brief_pipeline import process_brief
+
+from .common import safe_delete_message
+
+logger = structlog.get_logger()
+
+
+async def action_dup_ok(callback, task, session, user, user_name, user_display):
+    if not await safe_delete_message(callback, task.id):
+        await callback.answer("Не удалось удалить сообщение о повторе")
+        return
+    logger.info("duplicate_brief_confirmed", task_id=task.id, user_id=user.id)
+    await callback.answer(f"Ок, это повтор кастома #{task.id:03d}")
+
+
+async def action_dup_new(callback, task, session, user, user_name, user_display):
+    original = callback.message.reply_to_message if callback.message else None
+    if original is None or not (original.text or original.caption):
+        await callback.answer("Исходное сообщение недоступно — используйте /add ответом на него")
+        return
+    await safe_delete_message(callback, task.id)
+    await callback.answer("Обрабатываю как новый бриф")
+    logger.info(
+        "duplicate_brief_overridden",
+        task_id=task.id,
+        user_id=user.id,
+        message_id=original.message_id,
+    )
+    await process_brief(original, session, check_duplicates=False)
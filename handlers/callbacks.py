@@ -17,6 +17,7 @@ from handlers.callback_actions.delete_actions import (
     action_not_task_cancel,
     action_not_task_confirm,
 )
+from handlers.callback_actions.duplicate_actions import action_dup_new, action_dup_ok
 from handlers.callback_actions.postpone_actions import (
     action_cancel_postpone,
     action_postpone,
@@ -57,6 +58,8 @@ ACTION_HANDLERS = {
     "confirm_delivered": action_confirm_delivered,
     "deny_delivered": action_deny_delivered,
     "open": action_open,
+    "dup_ok": action_dup_ok,
+    "dup_new": action_dup_new,
 }
 
 
@@ -17,6 +17,7 @@ from diagnostics.readiness import (
     summarize_readiness_for_log,
 )
 from handlers.filters import WorkingTopicFilter
+from services.duplicate_index import brief_fingerprints
 from services.role_service import resolve_known_roles
 from services.task_service import build_task_kwargs, sanitize_ai_data
 from ui.cards import build_draft_card
@@ -162,6 +163,7 @@ async def cmd_add(message: Message):
             session, replied.chat.id, replied.message_id, is_task=True
         )
         await session.commit()
+        brief_fingerprints.add_task(task)
 
         if is_task:
             await message.reply(f"✅ Кастом #{task.id:03d} создан вручную")
@@ -6,6 +6,7 @@ from aiogram.types import Message
 from core.permissions import is_admin, is_model, is_teamlead
 from core.text_utils import esc
 from db.engine import async_session
+from diagnostics.ai_metrics import build_ai_metrics_lines, summarize_ai_metrics_for_log
 from diagnostics.readiness import (
     BLOCKER_AI_MODEL_MISSING,
     BLOCKER_ANTHROPIC_API_KEY_MISSING,
@@ -124,6 +125,7 @@ async def cmd_health(message: Message):
         request_from_username=message.from_user.username if message.from_user else None,
         **summarize_readiness_for_log(readiness),
     )
+    logger.info("ai_metrics_snapshot", **summarize_ai_metrics_for_log())
 
     lines = ["🩺 <b>Проверка конфигурации брифов</b>"]
     lines.append(f"Статус: {'✅ Готово' if readiness.ready else '❌ Не готово'}")
@@ -141,6 +143,9 @@ async def cmd_health(message: Message):
             lines.append(f"• {esc(WARNING_MESSAGES.get(code, code))}")
         lines.append("")
 
+    lines.extend(esc(line) for line in build_ai_metrics_lines())
+    lines.append("")
+
     lines.append("Что делать:")
     lines.append("1) Проверьте секреты в .env (BOT_TOKEN, ANTHROPIC_API_KEY).")
     lines.append("2) Если бот не привязан — выполните /setup в нужном топике.")
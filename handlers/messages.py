@@ -5,6 +5,10 @@ from aiogram import Router
 from aiogram.types import Message
 
 from ai.classifier import classify_message
+from ai.gateway import LANE_EDIT, use_lane
+from ai.single_flight import classification_flights, message_flight_key
+from core.brief_diff import EDIT_SECTION, EDIT_TRIVIAL, diff_brief_edit
+from core.brief_extractor import parse_template_field
 from core.brief_text_parser import parse_original_brief_sections
 from core.config import runtime
 from core.exceptions import AITransientError
@@ -14,6 +18,7 @@ from db.engine import async_session
 from db.repo import message_repo, task_repo
 from handlers.filters import WorkingChatFilter, WorkingTopicFilter, is_topic_root_reply
 from services.brief_pipeline import process_brief
+from services.edit_debounce import edit_debouncer
 from services.postpone_service import maybe_process_pending_postpone
 from services.task_service import sanitize_ai_data
 from ui.cards import get_card_for_status
@@ -75,94 +80,141 @@ async def handle_message_in_customs_chat_other_topics(message: Message):
     )
 
 
-@router.edited_message(WorkingTopicFilter())
-async def handle_edited_message(message: Message):
-    """Re-parse edited messages that are linked to tasks."""
-    text = message.text or message.caption
-    context = message_log_context(message, text)
-    if not text:
-        logger.info("edited_message_skipped_no_text", **context)
-        return
-
-    logger.info("edited_message_received", **context)
-
-    async with async_session() as session:
-        existing_task = await task_repo.get_task_by_message(session, message.chat.id, message.message_id)
-
-    if not existing_task:
-        logger.info("edited_message_not_linked_to_task_reprocessing", **context)
-        async with async_session() as session:
-            await process_brief(message, session)
-        return
-
-    logger.info("edited_message_reparse_started", task_id=existing_task.id, **context)
-
+def _apply_parsed_data(task, data: dict) -> None:
+    task.task_date = data.get("task_date", task.task_date)
+    task.fan_link = data.get("fan_link", task.fan_link)
+    task.fan_name = data.get("fan_name", task.fan_name)
+    task.platform = data.get("platform", task.platform)
+    task.amount_total = data.get("amount_total", task.amount_total)
+    task.amount_paid = data.get("amount_paid", task.amount_paid)
+    task.amount_remaining = data.get("amount_remaining", task.amount_remaining)
+    task.payment_note = data.get("payment_note", task.payment_note)
+    task.duration = data.get("duration", task.duration)
+    task.description = data.get("description", task.description)
+    task.outfit = data.get("outfit", task.outfit)
+    task.notes = data.get("notes", task.notes)
+    task.priority = data.get("priority", task.priority)
+    task.deadline = data.get("deadline", task.deadline)
+
+
+def _store_edited_text(task, text: str) -> None:
+    task.raw_text = text
+    original_sections = parse_original_brief_sections(text)
+    task.description_original = original_sections["description_original"]
+    task.outfit_original = original_sections["outfit_original"]
+    task.notes_original = original_sections["notes_original"]
+
+
+async def _patch_task(session, task, text: str, updates: dict) -> tuple:
+    """Store the edit on the task and commit; returns the card to refresh."""
+    _store_edited_text(task, text)
+    _apply_parsed_data(task, updates)
+    await session.commit()
+    card_text, keyboard = get_card_for_status(task) if task.bot_message_id else (None, None)
+    return task.bot_message_id, task.chat_id, card_text, keyboard
+
+
+async def _reparse_with_ai(message: Message, text: str, task_id: int, context: dict) -> dict | None:
+    """Classifier data for the edited text, or None when the task must stay as is."""
     has_photo = bool(message.photo)
-
     try:
-        result = await classify_message(text, has_photo)
+        with use_lane(LANE_EDIT):
+            result = await classification_flights.do(
+                message_flight_key(message.chat.id, message.message_id, text, has_photo),
+                lambda: classify_message(text, has_photo),
+            )
     except AITransientError:
-        logger.warning("ai_transient_failure_on_edit", task_id=existing_task.id, **context)
-        return
+        logger.warning("ai_transient_failure_on_edit", task_id=task_id, **context)
+        return None
 
     if result is None:
-        logger.warning("edited_message_ai_failed", task_id=existing_task.id, **context)
-        return
+        logger.warning("edited_message_ai_failed", task_id=task_id, **context)
+        return None
 
     if not result.get("is_task"):
         logger.info(
             "edited_message_not_a_brief",
-            task_id=existing_task.id,
+            task_id=task_id,
             confidence=result.get("confidence"),
             ai_reason=result.get("reason"),
             **context,
         )
-        return
+        return None
 
     data = result.get("data", {})
     sanitize_ai_data(data)
+    return data
+
+
+@router.edited_message(WorkingTopicFilter())
+async def debounce_edited_message(message: Message):
+    """Collapse bursts of edits: only the latest text is re-parsed after a quiet period."""
+    await edit_debouncer.submit(message, handle_edited_message)
+
+
+async def handle_edited_message(message: Message):
+    """Re-parse edited messages that are linked to tasks.
+
+    The edit is diffed against the stored text first: whitespace, punctuation
+    and emoji edits skip AI, a single changed template field is re-parsed
+    locally, and only larger edits go back to the classifier.
+    """
+    text = message.text or message.caption
+    context = message_log_context(message, text)
+    if not text:
+        logger.info("edited_message_skipped_no_text", **context)
+        return
 
-    bot_message_id: int | None = None
-    card_text: str | None = None
-    keyboard = None
-    chat_id: int | None = None
+    logger.info("edited_message_received", **context)
 
+    # Local edits are patched in one session. The AI call can take seconds, so
+    # that session is closed first and the task reloaded in a fresh one.
+    updates = None
     async with async_session() as session:
         task = await task_repo.get_task_by_message(session, message.chat.id, message.message_id)
-        if not task:
-            logger.warning("edited_message_task_not_found", task_id=existing_task.id, **context)
+        if task:
+            task_id = task.id
+            diff = diff_brief_edit(task.raw_text, text)
+            if diff.kind == EDIT_TRIVIAL:
+                logger.info("edited_message_trivial_skipped_ai", task_id=task_id, **context)
+                _store_edited_text(task, text)
+                await session.commit()
+                return
+            if diff.kind == EDIT_SECTION:
+                updates = parse_template_field(diff.field, diff.value, text)
+                if updates is None:
+                    logger.info(
+                        "edited_message_section_not_parsed_locally",
+                        task_id=task_id, field=diff.field, **context,
+                    )
+            if updates is not None:
+                logger.info(
+                    "edited_message_patched_locally",
+                    task_id=task_id, field=diff.field, updated=sorted(updates), **context,
+                )
+                bot_message_id, chat_id, card_text, keyboard = await _patch_task(session, task, text, updates)
+
+    if not task:
+        logger.info("edited_message_not_linked_to_task_reprocessing", **context)
+        with use_lane(LANE_EDIT):
+            async with async_session() as session:
+                await process_brief(message, session)
+        return
+
+    if updates is None:
+        logger.info("edited_message_reparse_started", task_id=task_id, diff=diff.kind, **context)
+        updates = await _reparse_with_ai(message, text, task_id, context)
+        if updates is None:
             return
 
-        task.raw_text = text
-        original_sections = parse_original_brief_sections(text)
-        task.task_date = data.get("task_date", task.task_date)
-        task.fan_link = data.get("fan_link", task.fan_link)
-        task.fan_name = data.get("fan_name", task.fan_name)
-        task.platform = data.get("platform", task.platform)
-        task.amount_total = data.get("amount_total", task.amount_total)
-        task.amount_paid = data.get("amount_paid", task.amount_paid)
-        task.amount_remaining = data.get("amount_remaining", task.amount_remaining)
-        task.payment_note = data.get("payment_note", task.payment_note)
-        task.duration = data.get("duration", task.duration)
-        task.description = data.get("description", task.description)
-        task.outfit = data.get("outfit", task.outfit)
-        task.notes = data.get("notes", task.notes)
-        task.description_original = original_sections["description_original"]
-        task.outfit_original = original_sections["outfit_original"]
-        task.notes_original = original_sections["notes_original"]
-        task.priority = data.get("priority", task.priority)
-        task.deadline = data.get("deadline", task.deadline)
-
-        await session.commit()
-
-        if task.bot_message_id:
-            card_text, keyboard = get_card_for_status(task)
-            bot_message_id = task.bot_message_id
-            chat_id = task.chat_id
-
-        task_id = task.id
-
-    if bot_message_id and card_text is not None and chat_id is not None:
+        async with async_session() as session:
+            task = await task_repo.get_task_by_message(session, message.chat.id, message.message_id)
+            if not task:
+                logger.warning("edited_message_task_not_found", task_id=task_id, **context)
+                return
+            bot_message_id, chat_id, card_text, keyboard = await _patch_task(session, task, text, updates)
+
+    if bot_message_id and card_text is not None:
         try:
             await message.bot.edit_message_text(
                 card_text,
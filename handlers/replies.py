@@ -6,7 +6,7 @@ import structlog
 from aiogram import F, Router
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
 
-from core.constants import DELIVERED_KEYWORDS, SHOT_KEYWORDS
+from core.keyword_matcher import DELIVERED_KEYWORD, SHOT_KEYWORD, topic_keywords
 from core.log_utils import message_log_context
 from core.permissions import is_admin_or_teamlead, is_detection_actor
 from db.engine import async_session
@@ -24,15 +24,13 @@ TIMECODE_PATTERN = re.compile(r"\d{1,3}:\d{2}")
 
 
 def looks_like_shot_report(text: str) -> bool:
-    text_lower = text.lower()
     if TIMECODE_PATTERN.search(text):
         return True
-    return any(kw in text_lower for kw in SHOT_KEYWORDS)
+    return bool(topic_keywords.scan(text)[SHOT_KEYWORD])
 
 
 def looks_like_delivery_report(text: str) -> bool:
-    text_lower = text.lower()
-    return any(kw in text_lower for kw in DELIVERED_KEYWORDS)
+    return bool(topic_keywords.scan(text)[DELIVERED_KEYWORD])
 
 
 @router.message(WorkingTopicFilter(), F.reply_to_message)
@@ -1,24 +1,43 @@
 """Quick heuristic to decide if a message might be a brief (no AI)."""
 
-import re
-
 from aiogram.types import Message
 
 from core.constants import (
-    BRIEF_EMOJIS,
-    BRIEF_KEYWORDS,
     DIRECT_MARKERS,
     MIN_BRIEF_TEXT_LENGTH,
     MIN_HEURISTIC_SCORE,
+    PREFILTER_MODEL_SHED_STEP,
 )
-from core.permissions import is_teamlead
+from core.keyword_matcher import DIRECT_MARKER, topic_keywords
+from core.permissions import is_admin, is_model, is_teamlead
+from core.prefilter_model import extract_features, prefilter_model
+
+# Reasons for messages that pass at the base threshold but not under backpressure.
+SHED_REASONS = frozenset({"heuristic_score_shed", "model_score_shed"})
+
 
-PLATFORM_PATTERN = re.compile(r"(fansly\.com|onlyfans\.com)", re.IGNORECASE)
+def heuristic_score(features: dict[str, float]) -> int:
+    """The hand-tuned additive score: one point per signal."""
+    return int(
+        features["long_text"]
+        + features["has_emoji"]
+        + features["has_keyword"]
+        + features["has_platform_link"]
+        + features["has_payment_marker"]
+    )
 
 
-def evaluate_message_for_processing(message: Message) -> tuple[bool, str, dict[str, object]]:
+def evaluate_message_for_processing(
+    message: Message,
+    min_score: int = MIN_HEURISTIC_SCORE,
+) -> tuple[bool, str, dict[str, object]]:
     """
     Evaluate whether a message should be sent to AI.
+    `min_score` is the heuristic threshold; under AI backpressure it is raised
+    above MIN_HEURISTIC_SCORE (ai/backpressure.py) and messages scoring in
+    between are shed (SHED_REASONS). With a learned model loaded
+    (PREFILTER_MODEL_PATH) its probability replaces the score, and each point
+    of backpressure raises its cut-off by PREFILTER_MODEL_SHED_STEP.
     Returns: (should_process, reason, details)
     """
     text = message.text or message.caption
@@ -41,40 +60,46 @@ def evaluate_message_for_processing(message: Message) -> tuple[bool, str, dict[s
     if len(text) < MIN_BRIEF_TEXT_LENGTH:
         return False, "too_short", details
 
-    text_lower = text.lower()
-
-    direct_marker = next((m for m in DIRECT_MARKERS if m in text_lower), None)
-    has_emoji = any(emoji in text for emoji in BRIEF_EMOJIS)
-    has_keyword = any(kw in text_lower for kw in BRIEF_KEYWORDS)
-    has_platform_link = bool(PLATFORM_PATTERN.search(text))
-    has_payment_marker = "$" in text or "минут" in text_lower
-
-    score = 0
-    if len(text) > 100:
-        score += 1
-    if has_emoji:
-        score += 1
-    if has_keyword:
-        score += 1
-    if has_platform_link:
-        score += 1
-    if has_payment_marker:
-        score += 1
+    hits = topic_keywords.scan(text)
+    features = extract_features(
+        text,
+        hits,
+        sender_admin=is_admin(message.from_user),
+        sender_model=is_model(message.from_user),
+    )
+    direct_marker = next((m for m in DIRECT_MARKERS if m in hits[DIRECT_MARKER]), None)
+    score = heuristic_score(features)
 
     details.update({
         "score": score,
         "has_direct_marker": bool(direct_marker),
-        "has_emoji": has_emoji,
-        "has_keyword": has_keyword,
-        "has_platform_link": has_platform_link,
-        "has_payment_marker": has_payment_marker,
+        "has_emoji": bool(features["has_emoji"]),
+        "has_keyword": bool(features["has_keyword"]),
+        "has_platform_link": bool(features["has_platform_link"]),
+        "has_payment_marker": bool(features["has_payment_marker"]),
     })
 
     if direct_marker:
         details["direct_marker"] = direct_marker
         return True, "direct_marker", details
 
-    if score >= MIN_HEURISTIC_SCORE:
+    model = prefilter_model()
+    if model is not None:
+        probability = model.probability(features)
+        cutoff = model.threshold + max(0, min_score - MIN_HEURISTIC_SCORE) * PREFILTER_MODEL_SHED_STEP
+        details["model_probability"] = round(probability, 4)
+        if probability >= cutoff:
+            return True, "model_score", details
+        if probability >= model.threshold:
+            details["model_cutoff"] = round(cutoff, 4)
+            return False, "model_score_shed", details
+        return False, "model_score_low", details
+
+    if score >= max(min_score, MIN_HEURISTIC_SCORE):
         return True, "heuristic_score", details
 
+    if score >= MIN_HEURISTIC_SCORE:
+        details["min_score"] = min_score
+        return False, "heuristic_score_shed", details
+
     return False, "heuristic_score_low", details
@@ -1,16 +1,30 @@
 """AI retry queue processing."""
 
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
 
 import structlog
 from aiogram import Bot
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ai.backends import classify_locally
+from ai.backpressure import load_shedder
+from ai.batch import BatchItem, BatchProgress, classify_batch
+from ai.circuit_breaker import circuit_breaker
 from ai.classifier import classify_message
+from ai.gateway import LANE_BACKFILL, LANE_RETRY, use_lane
+from ai.single_flight import classification_flights, message_flight_key
 from core.config import runtime
-from core.constants import MAX_RETRY_ATTEMPTS, MAX_RETRY_WINDOW, RETRY_BACKOFF_MINUTES
-from core.exceptions import AITransientError
+from core.constants import (
+    MAX_RETRY_ATTEMPTS,
+    MAX_RETRY_WINDOW,
+    RETRY_BACKOFF_MINUTES,
+    RETRY_PRIORITY_LOW,
+)
+from core.exceptions import AICircuitOpenError, AITransientError
 from db.repo import message_repo, retry_repo, task_repo
+from services.duplicate_index import brief_fingerprints
 from services.task_service import build_task_kwargs, sanitize_ai_data
 from ui.cards import build_draft_card
 
@@ -95,17 +109,17 @@ async def _reschedule_or_fail(
     )
 
 
-async def _process_single_retry(bot: Bot, queue_id: int, session: AsyncSession) -> None:
-    now = datetime.now(timezone.utc)
+async def _load_pending_retry(session: AsyncSession, queue_id: int):
+    """Return the queue row if it still needs classification, else clean it up."""
     row = await retry_repo.get_ai_retry_by_id(session, queue_id)
     if not row:
-        return
+        return None
 
     if await message_repo.is_message_processed(session, row.chat_id, row.message_id):
         await retry_repo.delete_ai_retry(session, row)
         await session.commit()
         logger.info("ai_retry_removed_already_processed", queue_id=row.id, message_id=row.message_id)
-        return
+        return None
 
     existing_task = await task_repo.get_task_by_message(session, row.chat_id, row.message_id)
     if existing_task:
@@ -115,16 +129,15 @@ async def _process_single_retry(bot: Bot, queue_id: int, session: AsyncSession)
         await retry_repo.delete_ai_retry(session, row)
         await session.commit()
         logger.info("ai_retry_removed_existing_task", queue_id=row.id, task_id=existing_task.id)
-        return
+        return None
+
+    return row
 
-    try:
-        result = await classify_message(row.raw_text, bool(row.has_photo))
-    except AITransientError:
-        await _reschedule_or_fail(
-            session, bot, queue_id=queue_id, now=now, error_message="TRANSIENT_ERROR",
-        )
-        return
 
+async def _apply_retry_result(
+    bot: Bot, session: AsyncSession, row,
+    *, queue_id: int, now: datetime, result: dict | None,
+) -> None:
     if result is None:
         await message_repo.log_parse_failure(
             session, message_id=row.message_id, raw_text=row.raw_text,
@@ -203,19 +216,112 @@ async def _process_single_retry(bot: Bot, queue_id: int, session: AsyncSession)
     )
     await retry_repo.delete_ai_retry(session, row)
     await session.commit()
+    brief_fingerprints.add_task(task)
     logger.info(
         "ai_retry_task_created", queue_id=row.id,
         task_id=task.id, bot_message_id=sent.message_id,
     )
 
 
+async def _process_single_retry(bot: Bot, queue_id: int, session: AsyncSession) -> None:
+    now = datetime.now(timezone.utc)
+    row = await _load_pending_retry(session, queue_id)
+    if not row:
+        return
+
+    local = await classify_locally(row.raw_text, bool(row.has_photo))
+    if local is not None:
+        logger.info("ai_retry_classified_locally", queue_id=row.id, backend=local[0])
+        await _apply_retry_result(bot, session, row, queue_id=queue_id, now=now, result=local[1])
+        return
+
+    try:
+        result = await classification_flights.do(
+            message_flight_key(row.chat_id, row.message_id, row.raw_text, bool(row.has_photo)),
+            lambda: classify_message(row.raw_text, bool(row.has_photo)),
+        )
+    except AICircuitOpenError:
+        raise  # not an attempt: the row stays due and the scan stops
+    except AITransientError:
+        await _reschedule_or_fail(
+            session, bot, queue_id=queue_id, now=now, error_message="TRANSIENT_ERROR",
+        )
+        return
+
+    await _apply_retry_result(bot, session, row, queue_id=queue_id, now=now, result=result)
+
+
 async def process_ai_retry_queue(bot: Bot, session: AsyncSession) -> None:
     now_iso = datetime.now(timezone.utc).isoformat()
+    # The backlog of due transient-failure retries drives the pre-filter's
+    # load-shedding threshold; one sender's deferred flood must not raise it
+    # for every chat.
+    load_shedder.set_queue_depth(await retry_repo.count_due_ai_retries(session, now_iso=now_iso))
+
+    if circuit_breaker.is_open:
+        logger.info("ai_retry_scan_paused_circuit_open")
+        return
+
     due_rows = await retry_repo.get_due_ai_retries(session, now_iso=now_iso, limit=20)
-    queue_ids = [row.id for row in due_rows]
+    queued = [(row.id, row.priority) for row in due_rows]
 
-    for queue_id in queue_ids:
+    for queue_id, priority in queued:
+        # Low-priority rows (deferred floods) never compete with live retries.
+        lane = LANE_BACKFILL if priority >= RETRY_PRIORITY_LOW else LANE_RETRY
         try:
-            await _process_single_retry(bot, queue_id, session)
+            with use_lane(lane):
+                await _process_single_retry(bot, queue_id, session)
+        except AICircuitOpenError:
+            logger.info("ai_retry_scan_paused_circuit_open", queue_id=queue_id)
+            break
         except Exception as exc:
             logger.error("ai_retry_processing_error", queue_id=queue_id, error=str(exc))
+
+
+async def process_ai_retry_queue_batch(
+    bot: Bot,
+    session: AsyncSession,
+    *,
+    limit: int = 1000,
+    state_path: Path | None = None,
+    poll_interval: float | None = None,
+    on_progress: Callable[[BatchProgress], None] | None = None,
+) -> int:
+    """Drain a large due backlog through the Message Batches API.
+
+    Results are applied with the same logic as the per-row scan; rows handled
+    elsewhere while the batch was running are skipped. Returns the number of
+    rows submitted for classification.
+    """
+    now_iso = datetime.now(timezone.utc).isoformat()
+    due_rows = await retry_repo.get_due_ai_retries(session, now_iso=now_iso, limit=limit)
+    items = [
+        BatchItem(custom_id=f"retry-{row.id}", text=row.raw_text, has_photo=bool(row.has_photo))
+        for row in due_rows
+    ]
+    if not items:
+        return 0
+
+    outcomes = await classify_batch(
+        items, state_path=state_path, poll_interval=poll_interval, on_progress=on_progress,
+    )
+
+    now = datetime.now(timezone.utc)
+    for queue_id in [row.id for row in due_rows]:
+        outcome = outcomes.get(f"retry-{queue_id}")
+        try:
+            row = await _load_pending_retry(session, queue_id)
+            if not row or outcome is None:
+                continue
+            if outcome.transient:
+                await _reschedule_or_fail(
+                    session, bot, queue_id=queue_id, now=now,
+                    error_message=f"BATCH_TRANSIENT_ERROR: {outcome.error}",
+                )
+                continue
+            await _apply_retry_result(
+                bot, session, row, queue_id=queue_id, now=now, result=outcome.result,
+            )
+        except Exception as exc:
+            logger.error("ai_retry_batch_processing_error", queue_id=queue_id, error=str(exc))
+    return len(items)
@@ -16,12 +16,15 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from ai.batch import BatchItem, BatchProgress, classify_batch
 from ai.classifier import classify_message
+from ai.gateway import LANE_BACKFILL, use_lane
 from core.exceptions import AITransientError
 from db.engine import async_session
 from db.models import Task
 
 TEXT_FIELDS = ("description", "outfit", "notes")
+DEFAULT_BATCH_STATE_PATH = PROJECT_ROOT / "data" / "backfill_batch_state.json"
 
 
 @dataclass
@@ -67,6 +70,20 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         type=_positive_int,
         help="Maximum number of tasks to scan.",
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help=(
+            "Classify all tasks in one Message Batches API job (cheaper, slower to start). "
+            "An interrupted run resumes from --batch-state."
+        ),
+    )
+    parser.add_argument(
+        "--batch-state",
+        type=Path,
+        default=DEFAULT_BATCH_STATE_PATH,
+        help="Where batch ids are stored for resume (default: data/backfill_batch_state.json).",
+    )
     return parser.parse_args(argv)
 
 
@@ -104,32 +121,68 @@ def _append_failure(summary: BackfillSummary, task_id: int, reason: str) -> None
     summary.failures.append(BackfillFailure(task_id=task_id, reason=reason))
 
 
+def _batch_custom_id(task_id: int) -> str:
+    return f"task-{task_id}"
+
+
+def _has_raw_text(task: Task) -> bool:
+    return isinstance(task.raw_text, str) and bool(task.raw_text.strip())
+
+
+def print_batch_progress(progress: BatchProgress) -> None:
+    print(progress.render(), flush=True)
+
+
 async def run_backfill(
     *,
     apply: bool,
     task_id: int | None = None,
     limit: int | None = None,
+    batch: bool = False,
+    batch_state_path: Path | None = None,
     session_maker: async_sessionmaker[AsyncSession] = async_session,
 ) -> BackfillSummary:
     summary = BackfillSummary()
 
     async with session_maker() as session:
         tasks = await _load_tasks(session, task_id=task_id, limit=limit)
+
+        batch_outcomes = None
+        if batch:
+            batch_outcomes = await classify_batch(
+                [
+                    BatchItem(custom_id=_batch_custom_id(task.id), text=task.raw_text)
+                    for task in tasks
+                    if _has_raw_text(task)
+                ],
+                state_path=batch_state_path,
+                on_progress=print_batch_progress,
+            )
+
         for task in tasks:
             summary.scanned += 1
 
-            if not isinstance(task.raw_text, str) or not task.raw_text.strip():
+            if not _has_raw_text(task):
                 _append_failure(summary, task.id, "raw_text_missing")
                 continue
 
-            try:
-                result = await classify_message(task.raw_text, has_photo=False)
-            except AITransientError as exc:
-                _append_failure(summary, task.id, f"classify_transient: {exc}")
-                continue
-            except Exception as exc:
-                _append_failure(summary, task.id, f"classify_error: {exc}")
-                continue
+            if batch_outcomes is not None:
+                outcome = batch_outcomes.get(_batch_custom_id(task.id))
+                if outcome is None or outcome.transient:
+                    reason = outcome.error if outcome else "missing_result"
+                    _append_failure(summary, task.id, f"classify_transient: {reason}")
+                    continue
+                result = outcome.result
+            else:
+                try:
+                    with use_lane(LANE_BACKFILL):
+                        result = await classify_message(task.raw_text, has_photo=False)
+                except AITransientError as exc:
+                    _append_failure(summary, task.id, f"classify_transient: {exc}")
+                    continue
+                except Exception as exc:
+                    _append_failure(summary, task.id, f"classify_error: {exc}")
+                    continue
 
             if result is None:
                 _append_failure(summary, task.id, "classify_none")
@@ -188,6 +241,8 @@ async def _amain(argv: list[str] | None = None) -> int:
         apply=args.apply,
         task_id=args.task_id,
         limit=args.limit,
+        batch=args.batch,
+        batch_state_path=args.batch_state,
     )
     print_summary(summary, apply=args.apply)
     return 1 if summary.failures else 0
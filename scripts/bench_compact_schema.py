@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Estimate output-token and latency savings of the compact classifier schema.
+
+For every recorded `record_classification` call (`AI_RECORD_PATH`) the answer
+is rendered both in the previous long-key schema (every field, nulls included)
+and in the compact wire schema (`ai/compact.py`). Token counts are estimated
+from a least-squares fit of recorded `output_tokens` against the length of the
+recorded tool input, and latency from a fit of recorded latency against
+`output_tokens`, so the report reflects this corpus and this model. Only
+classifier-tool recordings are used; stage-one verdict calls are skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from ai import classifier
+from ai.compact import to_compact
+from ai.prompts import CLASSIFIER_TOOL_NAME
+from core.constants import AMOUNT_FIELDS, TEXT_FIELDS
+from scripts.fake_messages_api import Recording, load_recordings
+
+# Field order of the long-key schema as the previous prompt spelled it out.
+FULL_DATA_FIELDS = ("task_date", "platform", *TEXT_FIELDS, *AMOUNT_FIELDS, "priority", "deadline")
+
+
+@dataclass
+class SchemaReport:
+    recordings: int = 0
+    skipped: int = 0
+    full_chars: list[int] = field(default_factory=list)
+    compact_chars: list[int] = field(default_factory=list)
+    tokens_per_char: float = 0.0
+    token_overhead: float = 0.0  # tool-call framing tokens independent of input length
+    ms_per_output_token: float = 0.0
+    base_latency_ms: float = 0.0
+
+    def _tokens(self, chars: list[int]) -> float:
+        if not chars:
+            return 0.0
+        return sum(self.token_overhead + self.tokens_per_char * n for n in chars) / len(chars)
+
+    @property
+    def full_tokens(self) -> float:
+        return self._tokens(self.full_chars)
+
+    @property
+    def compact_tokens(self) -> float:
+        return self._tokens(self.compact_chars)
+
+    @property
+    def full_latency_ms(self) -> float:
+        return self.base_latency_ms + self.ms_per_output_token * self.full_tokens
+
+    @property
+    def compact_latency_ms(self) -> float:
+        return self.base_latency_ms + self.ms_per_output_token * self.compact_tokens
+
+
+def full_payload(result: dict) -> dict[str, Any]:
+    """The long-key tool input the previous schema asked for."""
+    if not result["is_task"]:
+        return {"is_task": False, "confidence": result["confidence"], "reason": result.get("reason")}
+    data = result.get("data") or {}
+    return {
+        "is_task": True,
+        "confidence": result["confidence"],
+        "data": {name: data.get(name) for name in FULL_DATA_FIELDS},
+    }
+
+
+def wire_length(payload: dict[str, Any]) -> int:
+    return len(json.dumps(payload, ensure_ascii=False))
+
+
+def fit_line(xs: list[float], ys: list[float]) -> tuple[float, float]:
+    """Least-squares (intercept, slope); a zero intercept when xs do not vary."""
+    if not xs:
+        return 0.0, 0.0
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if spread == 0:
+        return 0.0, (sum(ys) / sum(xs) if sum(xs) else 0.0)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+    return mean_y - slope * mean_x, slope
+
+
+def _tool_input(recording: Recording) -> dict | None:
+    for block in recording.content:
+        if block.get("type") == "tool_use" and block.get("name") == CLASSIFIER_TOOL_NAME:
+            return block.get("input")
+    return None
+
+
+def analyze(recordings: list[Recording]) -> SchemaReport:
+    report = SchemaReport()
+    recorded_chars: list[float] = []
+    recorded_tokens: list[float] = []
+    recorded_latency: list[float] = []
+    for recording in recordings:
+        if recording.tool != CLASSIFIER_TOOL_NAME:
+            continue
+        raw_input = _tool_input(recording)
+        result = classifier._parse_response_content([SimpleNamespace(**block) for block in recording.content])
+        if raw_input is None or result is None:
+            report.skipped += 1
+            continue
+        report.recordings += 1
+        report.full_chars.append(wire_length(full_payload(result)))
+        report.compact_chars.append(wire_length(to_compact(result)))
+        output_tokens = int(recording.usage.get("output_tokens") or 0)
+        if output_tokens:
+            recorded_chars.append(wire_length(raw_input))
+            recorded_tokens.append(output_tokens)
+            recorded_latency.append(recording.latency_ms)
+
+    report.token_overhead, report.tokens_per_char = fit_line(recorded_chars, recorded_tokens)
+    if report.token_overhead < 0:
+        report.token_overhead, report.tokens_per_char = 0.0, sum(recorded_tokens) / sum(recorded_chars)
+    report.base_latency_ms, report.ms_per_output_token = fit_line(recorded_tokens, recorded_latency)
+    if report.ms_per_output_token < 0:
+        report.base_latency_ms, report.ms_per_output_token = 0.0, 0.0
+    return report
+
+
+def _reduction(before: float, after: float) -> str:
+    return f"-{(before - after) / before * 100:.1f}%" if before else "n/a"
+
+
+def print_report(report: SchemaReport) -> None:
+    print(f"recordings={report.recordings} skipped={report.skipped}")
+    if not report.recordings:
+        return
+    print(
+        f"tool input chars/call: full={sum(report.full_chars) / report.recordings:.0f} "
+        f"compact={sum(report.compact_chars) / report.recordings:.0f}"
+    )
+    print(
+        f"output tokens/call (est.): full={report.full_tokens:.0f} compact={report.compact_tokens:.0f} "
+        f"({_reduction(report.full_tokens, report.compact_tokens)})"
+    )
+    if report.ms_per_output_token:
+        print(
+            f"latency/call (est., {report.ms_per_output_token:.1f} ms per output token): "
+            f"full={report.full_latency_ms:.0f}ms compact={report.compact_latency_ms:.0f}ms "
+            f"({_reduction(report.full_latency_ms, report.compact_latency_ms)})"
+        )
+    else:
+        print("latency/call: not enough latency spread in the recordings to fit")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Estimate output-token and latency savings of the compact classifier schema."
+    )
+    parser.add_argument("--recordings", type=Path, required=True, help="JSONL file written via AI_RECORD_PATH.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    print_report(analyze(load_recordings(args.recordings)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
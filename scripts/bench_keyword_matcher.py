@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Benchmark the compiled keyword matcher against per-list substring scans.
+
+The corpus is real topic text stored by the bot: task briefs (`tasks`), parse
+failures and queued retries, or the message texts of a classifier recording
+file (`AI_RECORD_PATH`). Every message is scanned both ways; the report lists
+messages whose hits differ (there should be none) and the per-message time of
+the pre-filter keyword checks and of all keyword checks together, against the
+short-circuiting `any(kw in text_lower ...)` scans the matcher replaced.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.constants import (
+    BRIEF_EMOJIS,
+    BRIEF_KEYWORDS,
+    DELIVERED_KEYWORDS,
+    DIRECT_MARKERS,
+    PAYMENT_MARKERS,
+    SHOT_KEYWORDS,
+)
+from core.keyword_matcher import (
+    BRIEF_EMOJI,
+    BRIEF_KEYWORD,
+    DELIVERED_KEYWORD,
+    DIRECT_MARKER,
+    PAYMENT_MARKER,
+    SHOT_KEYWORD,
+    KeywordHits,
+    topic_keywords,
+)
+from db.engine import async_session
+from db.models import AIRetryQueue, ParseFailure, Task
+from scripts.bench_local_extractor import SYNTHETIC_TEMPLATE, percentile
+from scripts.fake_messages_api import load_recordings
+
+KEYWORD_LISTS = {
+    DIRECT_MARKER: DIRECT_MARKERS,
+    BRIEF_EMOJI: BRIEF_EMOJIS,
+    BRIEF_KEYWORD: BRIEF_KEYWORDS,
+    PAYMENT_MARKER: PAYMENT_MARKERS,
+    SHOT_KEYWORD: SHOT_KEYWORDS,
+    DELIVERED_KEYWORD: DELIVERED_KEYWORDS,
+}
+PREFILTER_CATEGORIES = (DIRECT_MARKER, BRIEF_EMOJI, BRIEF_KEYWORD, PAYMENT_MARKER)
+
+SYNTHETIC_CHAT = (
+    "Сегодня сняла {n} видео, готово к загрузке, скинула в папку",
+    "Привет! Когда будет следующий созвон по графику?",
+    "ok, sent the files, delivered by 12:30",
+    "Напоминаю: оплата за прошлую неделю ещё не пришла, {n}$ осталось",
+)
+
+
+def scan_per_list(text: str, categories: tuple[str, ...] = tuple(KEYWORD_LISTS)) -> KeywordHits:
+    """Reference: one substring scan per keyword, as pre_filter and replies used to do."""
+    text_lower = text.lower()
+    return {
+        category: {keyword for keyword in KEYWORD_LISTS[category] if keyword in text_lower}
+        for category in categories
+    }
+
+
+def checks_per_list(text: str, categories: tuple[str, ...] = tuple(KEYWORD_LISTS)) -> dict[str, bool]:
+    """What the per-list code computed: the first hit per category, short-circuiting."""
+    text_lower = text.lower()
+    return {
+        category: any(keyword in text_lower for keyword in KEYWORD_LISTS[category])
+        for category in categories
+    }
+
+
+def scan_compiled(text: str, categories: tuple[str, ...] = tuple(KEYWORD_LISTS)) -> KeywordHits:
+    hits = topic_keywords.scan(text)
+    return {category: hits[category] for category in categories}
+
+
+@dataclass
+class MatcherReport:
+    messages: int = 0
+    mismatches: list[str] = field(default_factory=list)
+    timings_us: dict[str, list[float]] = field(default_factory=dict)
+
+    def record(self, name: str, micros: float) -> None:
+        self.timings_us.setdefault(name, []).append(micros)
+
+
+def _time_us(scan: Callable[..., dict], text: str, categories: tuple[str, ...], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        scan(text, categories)
+    return (time.perf_counter() - started) / repeat * 1_000_000
+
+
+def analyze(texts: list[str], *, repeat: int = 20) -> MatcherReport:
+    report = MatcherReport()
+    for text in texts:
+        report.messages += 1
+        if scan_compiled(text) != scan_per_list(text):
+            report.mismatches.append(text[:80])
+        for label, categories in (("prefilter", PREFILTER_CATEGORIES), ("all", tuple(KEYWORD_LISTS))):
+            report.record(f"{label}_per_list", _time_us(checks_per_list, text, categories, repeat))
+            report.record(f"{label}_compiled", _time_us(scan_compiled, text, categories, repeat))
+    return report
+
+
+def synthetic_corpus(size: int) -> list[str]:
+    texts = []
+    for n in range(size):
+        if n % 5 == 0:
+            texts.append(SYNTHETIC_TEMPLATE.format(day=n % 27 + 1, n=n, amount=50 + n % 200, minutes=n % 15 + 1))
+        else:
+            texts.append(SYNTHETIC_CHAT[n % len(SYNTHETIC_CHAT)].format(n=n))
+    return texts
+
+
+async def load_corpus(
+    *,
+    limit: int | None = None,
+    session_maker: async_sessionmaker[AsyncSession] = async_session,
+) -> list[str]:
+    texts: list[str] = []
+    async with session_maker() as session:
+        for column in (Task.raw_text, ParseFailure.raw_text, AIRetryQueue.raw_text):
+            stmt = select(column).where(column.is_not(None))
+            if limit is not None:
+                stmt = stmt.limit(limit)
+            texts.extend(value for value in (await session.execute(stmt)).scalars().all() if value)
+    return texts[:limit] if limit is not None else texts
+
+
+def print_report(report: MatcherReport) -> None:
+    print(f"messages={report.messages} mismatches={len(report.mismatches)}")
+    for sample in report.mismatches[:10]:
+        print(f"  mismatch: {sample!r}")
+    for label in ("prefilter", "all"):
+        per_list = report.timings_us.get(f"{label}_per_list", [])
+        compiled = report.timings_us.get(f"{label}_compiled", [])
+        if not per_list:
+            continue
+        print(
+            f"{label} keyword checks us/message: "
+            f"per-list p50={percentile(per_list, 50):.2f} mean={sum(per_list) / len(per_list):.2f} | "
+            f"compiled p50={percentile(compiled, 50):.2f} mean={sum(compiled) / len(compiled):.2f}"
+        )
+
+
+def _positive_int(value: str) -> int:
+    parsed = int(value)
+    if parsed <= 0:
+        raise argparse.ArgumentTypeError("value must be a positive integer")
+    return parsed
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare the compiled keyword matcher with per-list scans on stored topic messages."
+    )
+    parser.add_argument("--limit", type=_positive_int, help="Maximum number of messages to scan.")
+    parser.add_argument("--recordings", type=Path, help="Use message texts from a JSONL file written via AI_RECORD_PATH.")
+    parser.add_argument(
+        "--synthetic",
+        type=_positive_int,
+        help="Benchmark N generated briefs and chat messages instead of reading the database.",
+    )
+    parser.add_argument("--repeat", type=_positive_int, default=20, help="Timed scans per message (default 20).")
+    return parser.parse_args(argv)
+
+
+async def _amain(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    if args.synthetic:
+        texts = synthetic_corpus(args.synthetic)
+    elif args.recordings:
+        texts = [recording.text for recording in load_recordings(args.recordings)][: args.limit]
+    else:
+        texts = await load_corpus(limit=args.limit)
+    report = analyze(texts, repeat=args.repeat)
+    print_report(report)
+    return 1 if report.mismatches else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    return asyncio.run(_amain(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Benchmark the local template extractor against recorded AI classifications."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.brief_extractor import extract_template_brief
+from db.engine import async_session
+from db.models import AIClassificationCache, Task
+
+# Structured fields the extractor must agree on with the stored (AI-made) task.
+COMPARED_FIELDS = (
+    "task_date", "deadline", "platform", "priority", "fan_link",
+    "amount_total", "amount_paid", "amount_remaining", "duration",
+)
+
+SYNTHETIC_TEMPLATE = (
+    "📦 Описание заказа\n"
+    "Дата: {day:02d}.02.2026\n"
+    "Покупатель: https://fansly.com/fan{n}/posts\n"
+    "Оплата: {amount}$\n"
+    "Длительность: {minutes} минут\n"
+    "🎥 Описание задания:\n"
+    "Медленный стриптиз у зеркала, потом танец. Вариант {n}.\n"
+    "👗 Одежда: юбка, топ\n"
+    "📝 Заметки: без музыки\n"
+    "🔥 Срочность: Средняя\n"
+    "📅 Дедлайн: До 28.02.2026\n"
+)
+
+
+@dataclass
+class BenchSummary:
+    scanned: int = 0
+    extracted: int = 0
+    field_matches: int = 0
+    field_total: int = 0
+    mismatches: dict[str, int] = field(default_factory=dict)
+    local_latencies_ms: list[float] = field(default_factory=list)
+    ai_latencies_ms: list[float] = field(default_factory=list)
+
+
+def _positive_int(value: str) -> int:
+    parsed = int(value)
+    if parsed <= 0:
+        raise argparse.ArgumentTypeError("value must be a positive integer")
+    return parsed
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Run the local template extractor over stored task briefs and report coverage, "
+            "field agreement with the AI-extracted tasks and latency versus recorded AI calls."
+        )
+    )
+    parser.add_argument("--limit", type=_positive_int, help="Maximum number of tasks to scan.")
+    parser.add_argument(
+        "--synthetic",
+        type=_positive_int,
+        help="Benchmark N generated template briefs instead of reading the database.",
+    )
+    return parser.parse_args(argv)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _same(left, right) -> bool:
+    if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        return abs(float(left) - float(right)) < 0.005
+    return left == right
+
+
+def measure(summary: BenchSummary, raw_text: str, expected: dict | None) -> None:
+    summary.scanned += 1
+    started = time.perf_counter()
+    result = extract_template_brief(raw_text)
+    summary.local_latencies_ms.append((time.perf_counter() - started) * 1000)
+    if result is None:
+        return
+    summary.extracted += 1
+    if expected is None:
+        return
+    for name in COMPARED_FIELDS:
+        summary.field_total += 1
+        if _same(result["data"].get(name), expected.get(name)):
+            summary.field_matches += 1
+        else:
+            summary.mismatches[name] = summary.mismatches.get(name, 0) + 1
+
+
+async def run_bench(
+    *,
+    limit: int | None = None,
+    synthetic: int | None = None,
+    session_maker: async_sessionmaker[AsyncSession] = async_session,
+) -> BenchSummary:
+    summary = BenchSummary()
+    if synthetic:
+        for n in range(synthetic):
+            text = SYNTHETIC_TEMPLATE.format(day=n % 27 + 1, n=n, amount=50 + n % 200, minutes=n % 15 + 1)
+            measure(summary, text, None)
+        return summary
+
+    async with session_maker() as session:
+        stmt = select(Task).where(Task.raw_text.is_not(None)).order_by(Task.id.asc())
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        tasks = list((await session.execute(stmt)).scalars().all())
+        latencies = await session.execute(
+            select(AIClassificationCache.latency_ms).where(AIClassificationCache.latency_ms > 0)
+        )
+        summary.ai_latencies_ms = [float(value) for value in latencies.scalars().all()]
+
+    for task in tasks:
+        measure(summary, task.raw_text, {name: getattr(task, name) for name in COMPARED_FIELDS})
+    return summary
+
+
+def print_summary(summary: BenchSummary) -> None:
+    coverage = summary.extracted / summary.scanned * 100 if summary.scanned else 0.0
+    print(f"scanned={summary.scanned} extracted_locally={summary.extracted} coverage={coverage:.1f}%")
+    if summary.field_total:
+        agreement = summary.field_matches / summary.field_total * 100
+        print(f"field_agreement={agreement:.1f}% ({summary.field_matches}/{summary.field_total})")
+        for name, count in sorted(summary.mismatches.items()):
+            print(f"  mismatch {name}: {count}")
+    local = summary.local_latencies_ms
+    print(
+        f"local latency ms: p50={percentile(local, 50):.3f} "
+        f"p95={percentile(local, 95):.3f} p99={percentile(local, 99):.3f}"
+    )
+    ai = summary.ai_latencies_ms
+    if ai:
+        print(
+            f"recorded AI latency ms (n={len(ai)}): p50={percentile(ai, 50):.0f} "
+            f"p95={percentile(ai, 95):.0f} p99={percentile(ai, 99):.0f}"
+        )
+        if percentile(local, 50):
+            print(f"speedup at p50: x{percentile(ai, 50) / percentile(local, 50):,.0f}")
+    else:
+        print("recorded AI latency: n/a (no rows in ai_classification_cache)")
+
+
+async def _amain(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    summary = await run_bench(limit=args.limit, synthetic=args.synthetic)
+    print_summary(summary)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    return asyncio.run(_amain(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
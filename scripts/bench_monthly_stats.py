@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Benchmark monthly stats: SQL aggregates against loading every task.
+
+For each size, a fresh database is seeded with tasks spread over the past
+year (about 1/12 of them in the current month). `get_monthly_stats` then
+runs next to the previous implementation, which loaded every task of the
+month as an ORM object and counted in Python. The report has the median time
+of each and whether they returned the same stats.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.log_utils import today_local
+from db.engine import build_engine
+from db.models import Base, Task
+from db.types import to_epoch_us
+from services.stats_service import get_monthly_stats, month_bounds
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+STATUSES = ("draft", "awaiting_confirmation", "processing", "finished", "delivered", "cancelled")
+PLATFORMS = ("fansly", "onlyfans", None)
+SEED_BATCH = 50_000
+
+
+@dataclass
+class StatsTiming:
+    tasks: int
+    month_tasks: int = 0
+    orm_ms: list[float] = field(default_factory=list)
+    sql_ms: list[float] = field(default_factory=list)
+    same_result: bool = False
+
+
+async def orm_monthly_stats(session: AsyncSession, year: int, month: int) -> dict:
+    """The previous `get_monthly_stats`: every task of the month, counted in Python."""
+    start, end = month_bounds(year, month)
+    result = await session.execute(select(Task).where(Task.created_at >= start, Task.created_at < end))
+    tasks = list(result.scalars().all())
+
+    total = len(tasks)
+    completed = sum(1 for t in tasks if t.status == "delivered")
+    in_progress = sum(1 for t in tasks if t.status in ("draft", "awaiting_confirmation", "processing"))
+    cancelled = sum(1 for t in tasks if t.status == "cancelled")
+    finished = sum(1 for t in tasks if t.status == "finished")
+
+    total_amount = sum(t.amount_total or 0 for t in tasks)
+    avg_amount = total_amount / total if total > 0 else 0
+
+    overdue = 0
+    today = today_local()
+    for t in tasks:
+        if t.deadline and t.status not in ("delivered", "cancelled"):
+            if t.deadline < today:
+                overdue += 1
+
+    platforms: dict[str, dict] = {}
+    for t in tasks:
+        p = t.platform or "unknown"
+        if p not in platforms:
+            platforms[p] = {"count": 0, "amount": 0.0}
+        platforms[p]["count"] += 1
+        platforms[p]["amount"] += t.amount_total or 0
+
+    return {
+        "total": total,
+        "completed": completed,
+        "in_progress": in_progress,
+        "finished": finished,
+        "cancelled": cancelled,
+        "overdue": overdue,
+        "total_amount": total_amount,
+        "avg_amount": avg_amount,
+        "platforms": platforms,
+    }
+
+
+def same_stats(left: dict, right: dict) -> bool:
+    """Equal up to float summation order."""
+    if left.keys() != right.keys() or left["platforms"].keys() != right["platforms"].keys():
+        return False
+    for key, value in left.items():
+        if key == "platforms":
+            for name, data in value.items():
+                other = right["platforms"][name]
+                if data["count"] != other["count"] or not math.isclose(data["amount"], other["amount"]):
+                    return False
+        elif not math.isclose(value, right[key]):
+            return False
+    return True
+
+
+def _seed(db_file: Path, tasks: int, *, now: datetime, seed: int) -> None:
+    engine = create_engine(f"sqlite:///{db_file}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_file)
+    try:
+        for batch_start in range(1, tasks + 1, SEED_BATCH):
+            rows = []
+            for n in range(batch_start, min(batch_start + SEED_BATCH, tasks + 1)):
+                created = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+                deadline = (created + timedelta(days=rng.randrange(1, 14))).strftime("%Y-%m-%d")
+                rows.append(
+                    (
+                        n,
+                        -1001,
+                        777,
+                        "medium",
+                        STATUSES[n % len(STATUSES)],
+                        PLATFORMS[n % len(PLATFORMS)],
+                        float(50 + n % 200) if n % 10 else None,
+                        deadline,
+                        f"📦 Описание заказа #{n}\nОплата: {50 + n % 200}$\n" + "бриф " * 40,
+                        to_epoch_us(created),
+                        to_epoch_us(created),
+                    )
+                )
+            conn.executemany(
+                """
+                INSERT INTO tasks (
+                    message_id, chat_id, topic_id, priority, status, platform, amount_total,
+                    deadline, raw_text, created_at, updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+async def bench_size(tasks: int, *, directory: Path, repeat: int, seed: int = 7) -> StatsTiming:
+    now = datetime.now(timezone.utc)
+    db_file = directory / f"stats_{tasks}.sqlite3"
+    _seed(db_file, tasks, now=now, seed=seed)
+
+    timing = StatsTiming(tasks)
+    engine = build_engine(str(db_file), profile="wal", pool_size=1)
+    try:
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        results = {}
+        for name, implementation, samples in (
+            ("orm", orm_monthly_stats, timing.orm_ms),
+            ("sql", get_monthly_stats, timing.sql_ms),
+        ):
+            for _ in range(repeat):
+                async with session_maker() as session:
+                    started = time.perf_counter()
+                    results[name] = await implementation(session, now.year, now.month)
+                    samples.append((time.perf_counter() - started) * 1000)
+        timing.month_tasks = results["sql"]["total"]
+        timing.same_result = same_stats(results["orm"], results["sql"])
+        return timing
+    finally:
+        await engine.dispose()
+        db_file.unlink(missing_ok=True)
+
+
+def print_report(timings: list[StatsTiming]) -> None:
+    for timing in timings:
+        orm = statistics.median(timing.orm_ms)
+        sql = statistics.median(timing.sql_ms)
+        print(
+            f"tasks={timing.tasks} in month={timing.month_tasks}: "
+            f"orm={orm:.1f}ms sql={sql:.1f}ms speedup={orm / sql if sql else 0.0:.1f}x "
+            f"same={'yes' if timing.same_result else 'NO'}"
+        )
+
+
+def _positive_int(value: str) -> int:
+    parsed = int(value)
+    if parsed <= 0:
+        raise argparse.ArgumentTypeError("value must be a positive integer")
+    return parsed
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare monthly stats computed with SQL aggregates and by loading every task."
+    )
+    parser.add_argument(
+        "--tasks",
+        type=_positive_int,
+        action="append",
+        help="Database size to benchmark (repeatable; default: 10k, 100k and 1M).",
+    )
+    parser.add_argument("--repeat", type=_positive_int, default=3, help="Runs per version; the median is reported.")
+    parser.add_argument("--dir", type=Path, help="Create the benchmark databases here instead of a temp directory.")
+    return parser.parse_args(argv)
+
+
+async def _amain(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    timings = []
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for tasks in args.tasks or DEFAULT_SIZES:
+            timings.append(await bench_size(tasks, directory=Path(directory), repeat=args.repeat))
+    print_report(timings)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    return asyncio.run(_amain(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Benchmark the SQLite connection profiles under concurrent dashboard reads.
+
+For each profile in `db.engine.SQLITE_PROFILES`, a fresh database in a
+temporary directory (`--dir` to benchmark on the data disk) is seeded with
+tasks. One writer then creates tasks one commit at a time, as the bot does:
+first alone, then while web readers run the dashboard queries in a loop
+(active, overdue and due-soon tasks, monthly stats). The report has writer
+commits per second in both phases, reader latency per dashboard load, and
+"database is locked" errors on either side.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from db.engine import SQLITE_PROFILES, build_engine
+from db.models import Base, Task
+from db.repo import task_repo
+from scripts.bench_local_extractor import percentile
+from services.stats_service import get_monthly_stats
+
+STATUSES = ("draft", "awaiting_confirmation", "processing", "finished", "delivered", "cancelled")
+
+
+@dataclass
+class ProfileReport:
+    profile: str
+    solo_commits: int = 0
+    solo_seconds: float = 0.0
+    commits: int = 0
+    write_seconds: float = 0.0
+    read_ms: list[float] = field(default_factory=list)
+    write_lock_errors: int = 0
+    read_lock_errors: int = 0
+
+    @property
+    def solo_commits_per_second(self) -> float:
+        return self.solo_commits / self.solo_seconds if self.solo_seconds else 0.0
+
+    @property
+    def commits_per_second(self) -> float:
+        return self.commits / self.write_seconds if self.write_seconds else 0.0
+
+
+def _task_kwargs(n: int) -> dict:
+    return {
+        "message_id": n,
+        "chat_id": -1001,
+        "topic_id": 777,
+        "raw_text": f"📦 Описание заказа #{n}\nОплата: {50 + n % 200}$",
+        "description": f"бриф {n}",
+        "amount_total": float(50 + n % 200),
+        "platform": "fansly" if n % 2 else "onlyfans",
+        "status": STATUSES[n % len(STATUSES)],
+        "deadline": f"2026-03-{n % 28 + 1:02d}",
+        "priority": "medium",
+    }
+
+
+async def _seed(session_maker: async_sessionmaker[AsyncSession], rows: int) -> None:
+    async with session_maker() as session:
+        session.add_all(Task(**_task_kwargs(n)) for n in range(1, rows + 1))
+        await session.commit()
+
+
+async def _write(session_maker, report: ProfileReport, *, start: int, commits: int) -> tuple[int, float]:
+    """Create `commits` tasks one commit each; returns (committed, seconds)."""
+    committed = 0
+    started = time.perf_counter()
+    for n in range(start, start + commits):
+        async with session_maker() as session:
+            try:
+                await task_repo.create_task(session, **_task_kwargs(n))
+                await session.commit()
+                committed += 1
+            except OperationalError:
+                report.write_lock_errors += 1
+    return committed, time.perf_counter() - started
+
+
+async def _read(session_maker, report: ProfileReport, done: asyncio.Event) -> None:
+    now = datetime.now(timezone.utc)
+    while not done.is_set():
+        started = time.perf_counter()
+        async with session_maker() as session:
+            try:
+                await task_repo.get_active_tasks(session)
+                await task_repo.get_overdue_tasks(session)
+                await task_repo.get_tasks_due_soon(session, days=3)
+                await get_monthly_stats(session, now.year, now.month)
+                report.read_ms.append((time.perf_counter() - started) * 1000)
+            except OperationalError:
+                report.read_lock_errors += 1
+        await asyncio.sleep(0)
+
+
+async def bench_profile(
+    profile: str,
+    *,
+    directory: Path,
+    seed_rows: int,
+    commits: int,
+    readers: int,
+) -> ProfileReport:
+    engine = build_engine(str(directory / f"{profile}.sqlite3"), profile=profile, pool_size=readers + 1)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        await _seed(session_maker, seed_rows)
+
+        report = ProfileReport(profile)
+        report.solo_commits, report.solo_seconds = await _write(
+            session_maker, report, start=seed_rows + 1, commits=commits
+        )
+        done = asyncio.Event()
+        reader_tasks = [asyncio.create_task(_read(session_maker, report, done)) for _ in range(readers)]
+        try:
+            report.commits, report.write_seconds = await _write(
+                session_maker, report, start=seed_rows + commits + 1, commits=commits
+            )
+        finally:
+            done.set()
+            await asyncio.gather(*reader_tasks)
+        return report
+    finally:
+        await engine.dispose()
+
+
+def print_report(reports: list[ProfileReport]) -> None:
+    for report in reports:
+        print(
+            f"{report.profile}: commits/s alone={report.solo_commits_per_second:.0f} "
+            f"with readers={report.commits_per_second:.0f} | "
+            f"dashboard reads={len(report.read_ms)} p50={percentile(report.read_ms, 50):.1f}ms "
+            f"p95={percentile(report.read_ms, 95):.1f}ms max={max(report.read_ms, default=0.0):.1f}ms | "
+            f"locked: writes={report.write_lock_errors} reads={report.read_lock_errors}"
+        )
+
+
+def _positive_int(value: str) -> int:
+    parsed = int(value)
+    if parsed <= 0:
+        raise argparse.ArgumentTypeError("value must be a positive integer")
+    return parsed
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare SQLite connection profiles: commit rate and dashboard read latency under load."
+    )
+    parser.add_argument(
+        "--profile",
+        action="append",
+        choices=sorted(SQLITE_PROFILES),
+        help="Profile to benchmark (repeatable; default: all).",
+    )
+    parser.add_argument("--seed-rows", type=_positive_int, default=2000, help="Tasks in the database before the run.")
+    parser.add_argument("--commits", type=_positive_int, default=200, help="Single-task commits by the writer.")
+    parser.add_argument("--readers", type=_positive_int, default=2, help="Concurrent dashboard readers.")
+    parser.add_argument("--dir", type=Path, help="Create the benchmark databases here instead of a temp directory.")
+    return parser.parse_args(argv)
+
+
+async def _amain(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    reports = []
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for profile in args.profile or sorted(SQLITE_PROFILES):
+            reports.append(
+                await bench_profile(
+                    profile,
+                    directory=Path(directory),
+                    seed_rows=args.seed_rows,
+                    commits=args.commits,
+                    readers=args.readers,
+                )
+            )
+    print_report(reports)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    return asyncio.run(_amain(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
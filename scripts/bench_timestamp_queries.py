@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Benchmark time-window queries before and after the epoch timestamp migration.
+
+A fresh database is migrated to the last revision with text timestamps and
+seeded with tasks spread over the past year; a share of them carry a +03:00
+offset, as rows written from local time do. The queries that filter on time
+run against the text columns the way they used to (monthly stats by
+`created_at` prefix, stale finished tasks loaded whole and parsed in Python),
+then the database is migrated to head and the current repo queries run on
+the integer columns. The report has the median time of each query on both
+schemas, how many rows each returned, and how long the migration took.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from sqlalchemy import MetaData, String, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import registry
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from alembic import command
+from alembic.config import Config
+
+from core.config import env
+from db.engine import build_engine
+from db.models import Task
+from db.repo import task_repo
+from db.types import UtcTimestamp
+from services.stats_service import month_bounds
+
+TEXT_TIMESTAMP_REVISION = "0006_add_task_text_fingerprint"
+STATUSES = ("draft", "awaiting_confirmation", "processing", "finished", "delivered", "cancelled")
+FINISHED_OLDER_THAN_HOURS = 24
+LOCAL_OFFSET = timezone(timedelta(hours=3))
+
+
+class LegacyTask:
+    """`tasks` mapped with the text timestamp columns of the old schema."""
+
+
+_legacy_table = Task.__table__.to_metadata(MetaData())
+for _column in _legacy_table.columns:
+    if isinstance(_column.type, UtcTimestamp):
+        _column.type = String(30)
+_legacy_table.indexes.clear()
+registry().map_imperatively(LegacyTask, _legacy_table)
+
+
+@dataclass
+class QueryTiming:
+    name: str
+    before_ms: list[float] = field(default_factory=list)
+    after_ms: list[float] = field(default_factory=list)
+    before_rows: int = 0
+    after_rows: int = 0
+
+
+@dataclass
+class TimestampReport:
+    tasks: int
+    migration_seconds: float = 0.0
+    queries: list[QueryTiming] = field(default_factory=list)
+
+
+def _migrate(db_file: Path, revision: str) -> None:
+    cfg = Config(str(PROJECT_ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    env.db_path = str(db_file)
+    command.upgrade(cfg, revision)
+
+
+def _seed(db_file: Path, tasks: int, *, now: datetime, local_share: float, seed: int) -> None:
+    rng = random.Random(seed)
+    rows = []
+    for n in range(1, tasks + 1):
+        created = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        status = STATUSES[n % len(STATUSES)]
+        finished = None
+        if status in ("finished", "delivered"):
+            finished = min(created + timedelta(hours=rng.randrange(1, 96)), now)
+        tz = LOCAL_OFFSET if rng.random() < local_share else timezone.utc
+        rows.append(
+            (
+                n,
+                -1001,
+                777,
+                "medium",
+                status,
+                "fansly" if n % 2 else "onlyfans",
+                float(50 + n % 200),
+                finished.astimezone(tz).isoformat() if finished else None,
+                created.astimezone(tz).isoformat(),
+                (finished or created).astimezone(tz).isoformat(),
+            )
+        )
+    conn = sqlite3.connect(db_file)
+    try:
+        conn.executemany(
+            """
+            INSERT INTO tasks (
+                message_id, chat_id, topic_id, priority, status, platform, amount_total,
+                finished_at, created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+async def _legacy_month_rows(session: AsyncSession, year: int, month: int) -> list:
+    result = await session.execute(
+        select(LegacyTask).where(_legacy_table.c.created_at.startswith(f"{year}-{month:02d}"))
+    )
+    return list(result.scalars().all())
+
+
+async def _month_rows(session: AsyncSession, year: int, month: int) -> list[Task]:
+    start, end = month_bounds(year, month)
+    result = await session.execute(select(Task).where(Task.created_at >= start, Task.created_at < end))
+    return list(result.scalars().all())
+
+
+async def _legacy_month_count(session: AsyncSession, year: int, month: int) -> list[int]:
+    count = await session.scalar(
+        select(func.count()).where(_legacy_table.c.created_at.startswith(f"{year}-{month:02d}"))
+    )
+    return [0] * count
+
+
+async def _month_count(session: AsyncSession, year: int, month: int) -> list[int]:
+    start, end = month_bounds(year, month)
+    count = await session.scalar(select(func.count()).where(Task.created_at >= start, Task.created_at < end))
+    return [0] * count
+
+
+async def _legacy_finished_older_than_hours(session: AsyncSession, hours: int) -> list:
+    cutoff = datetime.now(timezone.utc).timestamp() - (hours * 3600)
+    result = await session.execute(
+        select(LegacyTask)
+        .where(_legacy_table.c.status == "finished", _legacy_table.c.finished_at.isnot(None))
+        .order_by(_legacy_table.c.finished_at.asc())
+    )
+    overdue = []
+    for task in result.scalars().all():
+        try:
+            if datetime.fromisoformat(task.finished_at).timestamp() <= cutoff:
+                overdue.append(task)
+        except ValueError:
+            continue
+    return overdue
+
+
+async def _time_query(
+    session_maker: async_sessionmaker[AsyncSession],
+    query: Callable[[AsyncSession], Awaitable[list]],
+    repeat: int,
+) -> tuple[list[float], int]:
+    timings: list[float] = []
+    rows = 0
+    for _ in range(repeat):
+        async with session_maker() as session:
+            started = time.perf_counter()
+            rows = len(await query(session))
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings, rows
+
+
+async def _run_queries(db_file: Path, queries: dict[str, Callable], repeat: int) -> dict[str, tuple[list[float], int]]:
+    engine = build_engine(str(db_file), profile="wal", pool_size=1)
+    try:
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        return {name: await _time_query(session_maker, query, repeat) for name, query in queries.items()}
+    finally:
+        await engine.dispose()
+
+
+async def bench_timestamps(
+    *,
+    directory: Path,
+    tasks: int,
+    repeat: int,
+    local_share: float = 0.1,
+    seed: int = 7,
+) -> TimestampReport:
+    now = datetime.now(timezone.utc)
+    year, month = now.year, now.month
+    db_file = directory / "timestamps.sqlite3"
+
+    await asyncio.to_thread(_migrate, db_file, TEXT_TIMESTAMP_REVISION)
+    _seed(db_file, tasks, now=now, local_share=local_share, seed=seed)
+
+    before = await _run_queries(
+        db_file,
+        {
+            "monthly stats window": lambda s: _legacy_month_rows(s, year, month),
+            "monthly window count": lambda s: _legacy_month_count(s, year, month),
+            f"finished > {FINISHED_OLDER_THAN_HOURS}h": lambda s: _legacy_finished_older_than_hours(
+                s, FINISHED_OLDER_THAN_HOURS
+            ),
+        },
+        repeat,
+    )
+
+    started = time.perf_counter()
+    await asyncio.to_thread(_migrate, db_file, "head")
+    migration_seconds = time.perf_counter() - started
+
+    after = await _run_queries(
+        db_file,
+        {
+            "monthly stats window": lambda s: _month_rows(s, year, month),
+            "monthly window count": lambda s: _month_count(s, year, month),
+            f"finished > {FINISHED_OLDER_THAN_HOURS}h": lambda s: task_repo.get_finished_tasks_older_than_hours(
+                s, FINISHED_OLDER_THAN_HOURS
+            ),
+        },
+        repeat,
+    )
+
+    report = TimestampReport(tasks=tasks, migration_seconds=migration_seconds)
+    for name, (before_ms, before_rows) in before.items():
+        after_ms, after_rows = after[name]
+        report.queries.append(QueryTiming(name, before_ms, after_ms, before_rows, after_rows))
+    return report
+
+
+def print_report(report: TimestampReport) -> None:
+    print(f"tasks={report.tasks} migration={report.migration_seconds:.2f}s")
+    for query in report.queries:
+        before = statistics.median(query.before_ms)
+        after = statistics.median(query.after_ms)
+        print(
+            f"{query.name}: text={before:.1f}ms ({query.before_rows} rows) "
+            f"epoch={after:.1f}ms ({query.after_rows} rows) speedup={before / after if after else 0.0:.1f}x"
+        )
+
+
+def _positive_int(value: str) -> int:
+    parsed = int(value)
+    if parsed <= 0:
+        raise argparse.ArgumentTypeError("value must be a positive integer")
+    return parsed
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare time-window queries on text timestamps and on indexed epoch integers."
+    )
+    parser.add_argument("--tasks", type=_positive_int, default=100_000, help="Tasks in the database.")
+    parser.add_argument("--repeat", type=_positive_int, default=5, help="Runs per query; the median is reported.")
+    parser.add_argument("--dir", type=Path, help="Create the benchmark database here instead of a temp directory.")
+    return parser.parse_args(argv)
+
+
+async def _amain(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        report = await bench_timestamps(directory=Path(directory), tasks=args.tasks, repeat=args.repeat)
+    print_report(report)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    return asyncio.run(_amain(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
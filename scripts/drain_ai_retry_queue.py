@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Drain a large AI retry backlog through the Message Batches API."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.enums import ParseMode
+
+from ai.batch import BatchProgress
+from core.config import env
+from db.engine import async_session
+from scheduler.jobs.retry_processor import process_ai_retry_queue_batch
+from services.settings_service import load_runtime_settings
+
+DEFAULT_STATE_PATH = PROJECT_ROOT / "data" / "retry_batch_state.json"
+
+
+def _positive_int(value: str) -> int:
+    parsed = int(value)
+    if parsed <= 0:
+        raise argparse.ArgumentTypeError("value must be a positive integer")
+    return parsed
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Classify due ai_retry_queue rows in one batch job and apply the results "
+            "(task creation, draft cards) exactly like the scheduler does."
+        )
+    )
+    parser.add_argument(
+        "--limit",
+        type=_positive_int,
+        default=1000,
+        help="Maximum number of due rows to submit (default: 1000).",
+    )
+    parser.add_argument(
+        "--state",
+        type=Path,
+        default=DEFAULT_STATE_PATH,
+        help="Where batch ids are stored for resume (default: data/retry_batch_state.json).",
+    )
+    return parser.parse_args(argv)
+
+
+def print_progress(progress: BatchProgress) -> None:
+    print(progress.render(), flush=True)
+
+
+async def _amain(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    async with async_session() as session:
+        await load_runtime_settings(session)
+
+    bot = Bot(
+        token=env.bot_token,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
+    try:
+        async with async_session() as session:
+            submitted = await process_ai_retry_queue_batch(
+                bot,
+                session,
+                limit=args.limit,
+                state_path=args.state,
+                on_progress=print_progress,
+            )
+    finally:
+        await bot.session.close()
+
+    print(f"submitted={submitted}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    return asyncio.run(_amain(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
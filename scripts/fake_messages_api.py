@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Local fake of the Anthropic Messages API that replays recorded classifications.
+
+Requests are matched to recordings (see `ai/recorder.py`) by the forced tool
+and the user message content. Recorded latency is replayed (optionally scaled), and a fault
+profile injects 429s, 5xx errors and hung requests. Point a client at it with
+`ANTHROPIC_BASE_URL=http://127.0.0.1:<port>`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from ai.cache import normalize_text
+from ai.prompts import CLASSIFIER_TOOL_NAME
+
+# Answer for requests with no recording: a confident non-brief.
+UNMATCHED_INPUT = {"is_task": False, "confidence": 0.99, "reason": "нет записи для этого сообщения"}
+
+
+@dataclass
+class Recording:
+    text: str
+    has_photo: bool
+    user_content: str
+    latency_ms: int
+    content: list[dict[str, Any]]
+    usage: dict[str, int]
+    expected: dict[str, Any] | None = None
+    tool: str = CLASSIFIER_TOOL_NAME
+
+
+@dataclass
+class FaultProfile:
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    rate_timeout: float = 0.0
+    hang_seconds: float = 120.0  # how long an injected timeout holds the request
+    latency_scale: float = 1.0
+
+
+@dataclass
+class ReplayStats:
+    requests: int = 0
+    served: int = 0
+    unmatched: int = 0
+    injected_429: int = 0
+    injected_5xx: int = 0
+    injected_timeouts: int = 0
+    by_status: dict[int, int] = field(default_factory=dict)
+
+
+def content_key(user_content: str, tool: str = CLASSIFIER_TOOL_NAME) -> str:
+    return hashlib.sha256(f"{tool}\n{normalize_text(user_content)}".encode("utf-8")).hexdigest()
+
+
+def load_recordings(path: Path) -> list[Recording]:
+    recordings = []
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            raw = json.loads(line)
+            recordings.append(
+                Recording(
+                    text=raw["text"],
+                    has_photo=bool(raw.get("has_photo")),
+                    user_content=raw.get("user_content") or raw["text"],
+                    latency_ms=int(raw.get("latency_ms") or 0),
+                    content=raw["content"],
+                    usage=raw.get("usage") or {},
+                    expected=raw.get("expected"),
+                    tool=raw.get("tool") or CLASSIFIER_TOOL_NAME,
+                )
+            )
+    return recordings
+
+
+def _error(status: int, error_type: str, message: str) -> tuple[int, dict[str, Any]]:
+    return status, {"type": "error", "error": {"type": error_type, "message": message}}
+
+
+class ReplayBackend:
+    def __init__(
+        self,
+        recordings: list[Recording],
+        faults: FaultProfile | None = None,
+        *,
+        seed: int | None = None,
+    ):
+        self._by_key = {content_key(rec.user_content, rec.tool): rec for rec in recordings}
+        self.faults = faults or FaultProfile()
+        self.stats = ReplayStats()
+        self._rng = random.Random(seed)
+
+    @property
+    def recordings(self) -> int:
+        return len(self._by_key)
+
+    def _pick_fault(self) -> str | None:
+        roll = self._rng.random()
+        for name, rate in (
+            ("429", self.faults.rate_429),
+            ("5xx", self.faults.rate_5xx),
+            ("timeout", self.faults.rate_timeout),
+        ):
+            if roll < rate:
+                return name
+            roll -= rate
+        return None
+
+    async def respond(self, body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        """(HTTP status, JSON body) for one `POST /v1/messages` request."""
+        status, payload = await self._respond(body)
+        self.stats.by_status[status] = self.stats.by_status.get(status, 0) + 1
+        return status, payload
+
+    async def _respond(self, body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        self.stats.requests += 1
+        if body.get("stream"):
+            return _error(400, "invalid_request_error", "streaming replay is not supported")
+
+        fault = self._pick_fault()
+        if fault == "429":
+            self.stats.injected_429 += 1
+            return _error(429, "rate_limit_error", "injected rate limit")
+        if fault == "5xx":
+            self.stats.injected_5xx += 1
+            return _error(529, "overloaded_error", "injected overload")
+        if fault == "timeout":
+            self.stats.injected_timeouts += 1
+            await asyncio.sleep(self.faults.hang_seconds)
+
+        messages = body.get("messages") or [{}]
+        user_content = messages[0].get("content") or ""
+        tool = (body.get("tool_choice") or {}).get("name") or CLASSIFIER_TOOL_NAME
+        recording = self._by_key.get(content_key(user_content, tool))
+        if recording is None:
+            self.stats.unmatched += 1
+            content = [
+                {
+                    "type": "tool_use",
+                    "id": "toolu_replay",
+                    "name": tool,
+                    "input": UNMATCHED_INPUT,
+                }
+            ]
+            usage = {"input_tokens": len(user_content) // 3, "output_tokens": 30}
+            latency_ms = 0
+        else:
+            content, usage, latency_ms = recording.content, recording.usage, recording.latency_ms
+
+        if latency_ms and self.faults.latency_scale > 0:
+            await asyncio.sleep(latency_ms / 1000 * self.faults.latency_scale)
+        self.stats.served += 1
+        return 200, {
+            "id": f"msg_replay_{self.stats.requests}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model"),
+            "content": content,
+            "stop_reason": "tool_use",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 0, "output_tokens": 0, **usage},
+        }
+
+
+def create_app(backend: ReplayBackend) -> web.Application:
+    async def _messages(request: web.Request) -> web.Response:
+        status, payload = await backend.respond(await request.json())
+        headers = {"retry-after": "1"} if status == 429 else None
+        return web.json_response(payload, status=status, headers=headers)
+
+    app = web.Application()
+    app.router.add_post("/v1/messages", _messages)
+    return app
+
+
+async def start_server(backend: ReplayBackend, host: str = "127.0.0.1", port: int = 0) -> tuple[web.AppRunner, str]:
+    """Serve `backend` in the running loop; returns the runner and its base URL."""
+    runner = web.AppRunner(create_app(backend))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = runner.addresses[0][1]
+    return runner, f"http://{host}:{bound_port}"
+
+
+def _rate(value: str) -> float:
+    parsed = float(value)
+    if not 0 <= parsed <= 1:
+        raise argparse.ArgumentTypeError("rate must be between 0 and 1")
+    return parsed
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--rate-429", type=_rate, default=0.0, help="Share of requests answered with 429.")
+    parser.add_argument("--rate-5xx", type=_rate, default=0.0, help="Share of requests answered with 529.")
+    parser.add_argument("--rate-timeout", type=_rate, default=0.0, help="Share of requests that hang.")
+    parser.add_argument(
+        "--hang-seconds", type=float, default=120.0, help="How long a hanging request is held (default: 120)."
+    )
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=1.0,
+        help="Multiplier for recorded latency; 0 answers immediately (default: 1).",
+    )
+    parser.add_argument("--seed", type=int, help="Random seed for fault injection.")
+
+
+def fault_profile_from_args(args: argparse.Namespace) -> FaultProfile:
+    return FaultProfile(
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        rate_timeout=args.rate_timeout,
+        hang_seconds=args.hang_seconds,
+        latency_scale=args.latency_scale,
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay recorded classifier calls as a local Messages API.")
+    parser.add_argument("--recordings", type=Path, required=True, help="JSONL file written via AI_RECORD_PATH.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    add_fault_arguments(parser)
+    return parser.parse_args(argv)
+
+
+async def _amain(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    backend = ReplayBackend(load_recordings(args.recordings), fault_profile_from_args(args), seed=args.seed)
+    runner, base_url = await start_server(backend, args.host, args.port)
+    print(f"replaying {backend.recordings} recordings at {base_url}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    try:
+        return asyncio.run(_amain(argv))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Compare the rate of unusable AI answers before and after a cutover date."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from db.engine import async_session
+from db.models import ParseFailure, ProcessedMessage
+
+# Every caller logs a classifier answer it could not use as this parse-failure type.
+FAILURE_TYPE = "api_error"
+
+
+@dataclass
+class PeriodRate:
+    label: str
+    start: str
+    end: str
+    processed: int = 0
+    failures: int = 0
+
+    @property
+    def rate(self) -> float:
+        return self.failures / self.processed if self.processed else 0.0
+
+
+def _iso_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("expected a date as YYYY-MM-DD") from exc
+
+
+def _positive_int(value: str) -> int:
+    parsed = int(value)
+    if parsed <= 0:
+        raise argparse.ArgumentTypeError("value must be a positive integer")
+    return parsed
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Report AI parse failures per processed message in equal windows before and "
+            "after a cutover date (e.g. the switch to tool-use structured output)."
+        )
+    )
+    parser.add_argument("--cutover", type=_iso_date, required=True, help="Cutover date, YYYY-MM-DD.")
+    parser.add_argument(
+        "--days",
+        type=_positive_int,
+        default=14,
+        help="Window length on each side of the cutover (default: 14).",
+    )
+    return parser.parse_args(argv)
+
+
+async def _count_period(session: AsyncSession, period: PeriodRate) -> None:
+    period.processed = await session.scalar(
+        select(func.count())
+        .select_from(ProcessedMessage)
+        .where(ProcessedMessage.processed_at >= period.start, ProcessedMessage.processed_at < period.end)
+    ) or 0
+    period.failures = await session.scalar(
+        select(func.count())
+        .select_from(ParseFailure)
+        .where(
+            ParseFailure.error_type == FAILURE_TYPE,
+            ParseFailure.created_at >= period.start,
+            ParseFailure.created_at < period.end,
+        )
+    ) or 0
+
+
+async def compare_rates(
+    cutover: date,
+    days: int,
+    *,
+    session_maker: async_sessionmaker[AsyncSession] = async_session,
+) -> tuple[PeriodRate, PeriodRate]:
+    window = timedelta(days=days)
+    before = PeriodRate("before", (cutover - window).isoformat(), cutover.isoformat())
+    after = PeriodRate("after", cutover.isoformat(), (cutover + window).isoformat())
+    async with session_maker() as session:
+        for period in (before, after):
+            await _count_period(session, period)
+    return before, after
+
+
+def print_rates(before: PeriodRate, after: PeriodRate) -> None:
+    for period in (before, after):
+        print(
+            f"{period.label:<6} [{period.start} .. {period.end}): processed={period.processed} "
+            f"failures={period.failures} rate={period.rate * 100:.2f}%"
+        )
+    if before.rate:
+        print(f"change: {(after.rate - before.rate) / before.rate * 100:+.0f}%")
+
+
+async def _amain(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    before, after = await compare_rates(args.cutover, args.days)
+    print_rates(before, after)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    return asyncio.run(_amain(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
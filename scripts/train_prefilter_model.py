@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""Train the learned pre-filter scorer and report the AI calls it would save.
+
+Labelled examples come from our own history:
+
+- every stored task (`tasks.raw_text`) is a brief;
+- every recorded classifier call (`--recordings`, written via `AI_RECORD_PATH`)
+  is labelled by its verdict — `expected.is_task` when present, otherwise the
+  recorded `is_task` at or above `runtime.ai_confidence_threshold`, which is
+  what `process_brief` acted on.
+
+Direct-marker, too-short and teamlead messages never reach the score, so they
+are left out. Sender roles come from `role_memberships`; role features are only
+trained when both classes have examples with a known sender (recordings carry
+no sender, so otherwise every brief would look admin-sent).
+
+A logistic regression is fitted by Newton's method (ridge-regularized). Its
+cut-off is the highest probability that keeps the heuristic's recall on the
+training split. On a held-out split (every `--holdout-every`-th example) the
+report compares AI calls and recall of the heuristic, of the model at that
+cut-off, and of the model at exactly the heuristic's recall — the difference
+in calls there is the number of AI calls saved at equal recall. The final model
+is refitted on all examples and written as JSON coefficients for
+`PREFILTER_MODEL_PATH`.
+
+Recordings only contain messages the heuristic already let through, so the
+report measures calls saved among those; briefs the heuristic drops are only
+represented through tasks created by hand.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import sys
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from ai import classifier
+from core.config import runtime
+from core.constants import DIRECT_MARKERS, MIN_BRIEF_TEXT_LENGTH, MIN_HEURISTIC_SCORE
+from core.keyword_matcher import DIRECT_MARKER, topic_keywords
+from core.prefilter_model import FEATURE_NAMES, PrefilterModel, extract_features
+from core.text_utils import normalize_username
+from db.engine import async_session
+from db.models import RoleMembership, Task
+from pre_filter import heuristic_score
+from scripts.fake_messages_api import load_recordings
+
+ROLE_FEATURES = ("sender_admin", "sender_model")
+
+
+@dataclass
+class Example:
+    text: str
+    is_brief: bool
+    sender_known: bool = False
+    sender_admin: bool = False
+    sender_model: bool = False
+
+
+@dataclass
+class RuleStats:
+    calls: int = 0
+    briefs_passed: int = 0
+    briefs: int = 0
+
+    @property
+    def recall(self) -> float:
+        return self.briefs_passed / self.briefs if self.briefs else 0.0
+
+
+@dataclass
+class TrainingReport:
+    examples: int = 0
+    briefs: int = 0
+    direct_markers: int = 0  # pass under both rules, so left out of the comparison
+    holdout: int = 0
+    heuristic: RuleStats | None = None
+    model: RuleStats | None = None  # cut-off chosen on the training split
+    model_equal_recall: RuleStats | None = None  # cut-off matching the heuristic's holdout recall
+    features: tuple[str, ...] = ()
+    threshold: float = 0.0
+
+    @property
+    def saved_calls(self) -> int:
+        """AI calls the learned rule avoids on the holdout at the heuristic's recall."""
+        if not self.heuristic or not self.model_equal_recall:
+            return 0
+        return self.heuristic.calls - self.model_equal_recall.calls
+
+
+def features_for(example: Example) -> dict[str, float] | None:
+    """Model features, or None when the pre-filter decides without a score."""
+    if len(example.text) < MIN_BRIEF_TEXT_LENGTH:
+        return None
+    hits = topic_keywords.scan(example.text)
+    if any(marker in hits[DIRECT_MARKER] for marker in DIRECT_MARKERS):
+        return None
+    return extract_features(
+        example.text, hits, sender_admin=example.sender_admin, sender_model=example.sender_model
+    )
+
+
+def _solve(matrix: list[list[float]], vector: list[float]) -> list[float]:
+    """Gaussian elimination with partial pivoting (the system is small and positive definite)."""
+    size = len(vector)
+    rows = [row[:] + [value] for row, value in zip(matrix, vector)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(col + 1, size):
+            factor = rows[r][col] / rows[col][col]
+            for c in range(col, size + 1):
+                rows[r][c] -= factor * rows[col][c]
+    solution = [0.0] * size
+    for r in range(size - 1, -1, -1):
+        solution[r] = (rows[r][size] - sum(rows[r][c] * solution[c] for c in range(r + 1, size))) / rows[r][r]
+    return solution
+
+
+def fit_logistic(
+    rows: list[list[float]],
+    labels: list[bool],
+    *,
+    ridge: float = 1.0,
+    iterations: int = 25,
+) -> list[float]:
+    """Coefficients [intercept, *weights] by Newton's method; the intercept is not penalized."""
+    size = len(rows[0]) + 1 if rows else 1
+    beta = [0.0] * size
+    design = [[1.0, *row] for row in rows]
+    for _ in range(iterations):
+        gradient = [-(ridge * b if i else 0.0) for i, b in enumerate(beta)]
+        hessian = [[(ridge if i == j and i else 0.0) for j in range(size)] for i in range(size)]
+        for x, label in zip(design, labels):
+            z = sum(b * v for b, v in zip(beta, x))
+            p = 1.0 / (1.0 + math.exp(-max(-60.0, min(60.0, z))))
+            weight = max(p * (1 - p), 1e-9)
+            for i in range(size):
+                gradient[i] += (float(label) - p) * x[i]
+                for j in range(i, size):
+                    hessian[i][j] += weight * x[i] * x[j]
+        for i in range(size):
+            for j in range(i):
+                hessian[i][j] = hessian[j][i]
+        step = _solve(hessian, gradient)
+        beta = [b + s for b, s in zip(beta, step)]
+        if max(abs(s) for s in step) < 1e-8:
+            break
+    return beta
+
+
+def threshold_for_recall(probabilities: list[float], labels: list[bool], target: float) -> float:
+    """Highest cut-off whose recall is at least `target`."""
+    scores = sorted((p for p, label in zip(probabilities, labels) if label), reverse=True)
+    if not scores:
+        return 0.5
+    needed = max(1, math.ceil(target * len(scores) - 1e-9))
+    return scores[min(needed, len(scores)) - 1]
+
+
+def _fit_model(scored: list[tuple[dict[str, float], bool]], feature_names: tuple[str, ...], ridge: float):
+    rows = [[features[name] for name in feature_names] for features, _ in scored]
+    labels = [label for _, label in scored]
+    beta = fit_logistic(rows, labels, ridge=ridge)
+    model = PrefilterModel(intercept=beta[0], weights=dict(zip(feature_names, beta[1:])), threshold=0.5)
+    baseline = sum(1 for features, label in scored if label and heuristic_score(features) >= MIN_HEURISTIC_SCORE)
+    briefs = sum(labels)
+    target = baseline / briefs if briefs else 1.0
+    threshold = threshold_for_recall([model.probability(features) for features, _ in scored], labels, target)
+    return PrefilterModel(intercept=model.intercept, weights=model.weights, threshold=threshold)
+
+
+def _rule_stats(scored, passes) -> RuleStats:
+    stats = RuleStats()
+    for features, label in scored:
+        passed = passes(features)
+        stats.calls += passed
+        stats.briefs += label
+        stats.briefs_passed += passed and label
+    return stats
+
+
+def train(
+    examples: list[Example],
+    *,
+    holdout_every: int = 5,
+    ridge: float = 1.0,
+) -> tuple[PrefilterModel, TrainingReport]:
+    report = TrainingReport(examples=len(examples), briefs=sum(example.is_brief for example in examples))
+    scored: list[tuple[dict[str, float], bool]] = []
+    for example in examples:
+        features = features_for(example)
+        if features is None:
+            report.direct_markers += len(example.text) >= MIN_BRIEF_TEXT_LENGTH
+            continue
+        scored.append((features, example.is_brief))
+
+    roles_known = {example.is_brief for example in examples if example.sender_known}
+    feature_names = tuple(
+        name for name in FEATURE_NAMES if name not in ROLE_FEATURES or roles_known == {True, False}
+    )
+    report.features = feature_names
+    if not scored or len({label for _, label in scored}) < 2:
+        raise ValueError("need scored examples of both briefs and non-briefs")
+
+    train_split = [row for index, row in enumerate(scored) if index % holdout_every]
+    holdout = [row for index, row in enumerate(scored) if not index % holdout_every]
+    if len({label for _, label in train_split}) == 2 and holdout:
+        candidate = _fit_model(train_split, feature_names, ridge)
+        report.holdout = len(holdout)
+        report.heuristic = _rule_stats(holdout, lambda f: heuristic_score(f) >= MIN_HEURISTIC_SCORE)
+        report.model = _rule_stats(holdout, lambda f: candidate.probability(f) >= candidate.threshold)
+        matched = threshold_for_recall(
+            [candidate.probability(features) for features, _ in holdout],
+            [label for _, label in holdout],
+            report.heuristic.recall,
+        )
+        report.model_equal_recall = _rule_stats(holdout, lambda f: candidate.probability(f) >= matched)
+
+    final = _fit_model(scored, feature_names, ridge)
+    report.threshold = final.threshold
+    meta = {
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "examples": report.examples,
+        "briefs": report.briefs,
+        "holdout": report.holdout,
+        "heuristic": asdict(report.heuristic) if report.heuristic else None,
+        "model": asdict(report.model) if report.model else None,
+        "ai_calls_saved_at_equal_recall": report.saved_calls,
+    }
+    version = datetime.now(timezone.utc).strftime("%Y%m%d%H%M")
+    return (
+        PrefilterModel(
+            intercept=final.intercept, weights=final.weights, threshold=final.threshold,
+            version=version, meta=meta,
+        ),
+        report,
+    )
+
+
+def recording_examples(path: Path) -> list[Example]:
+    examples = []
+    for recording in load_recordings(path):
+        if recording.expected and "is_task" in recording.expected:
+            is_brief = bool(recording.expected["is_task"])
+        else:
+            blocks = [SimpleNamespace(**block) for block in recording.content]
+            result = classifier._parse_response_content(blocks, recording.tool)
+            if result is None:
+                continue
+            is_brief = bool(result["is_task"]) and float(result["confidence"]) >= runtime.ai_confidence_threshold
+        examples.append(Example(text=recording.text, is_brief=is_brief))
+    return examples
+
+
+async def task_examples(
+    *,
+    session_maker: async_sessionmaker[AsyncSession] = async_session,
+) -> list[Example]:
+    async with session_maker() as session:
+        members = (await session.execute(select(RoleMembership.role, RoleMembership.username))).all()
+        rows = (await session.execute(
+            select(Task.raw_text, Task.sender_username).where(Task.raw_text.is_not(None))
+        )).all()
+    by_role: dict[str, set[str]] = {}
+    for role, username in members:
+        if username:
+            by_role.setdefault(role, set()).add(normalize_username(username))
+
+    examples = []
+    for raw_text, sender_username in rows:
+        sender = normalize_username(sender_username) if sender_username else ""
+        if sender and sender in by_role.get("teamlead", set()):
+            continue  # teamlead messages bypass the pre-filter
+        examples.append(
+            Example(
+                text=raw_text,
+                is_brief=True,
+                sender_known=bool(sender),
+                sender_admin=sender in by_role.get("admin", set()),
+                sender_model=sender in by_role.get("model", set()),
+            )
+        )
+    return examples
+
+
+def merge_examples(tasks: list[Example], recorded: list[Example]) -> list[Example]:
+    """One example per text; a stored task wins over a recorded verdict."""
+    merged = {example.text: example for example in recorded}
+    merged.update({example.text: example for example in tasks})
+    return list(merged.values())
+
+
+def _rule_line(name: str, stats: RuleStats) -> str:
+    return f"  {name}: ai_calls={stats.calls} recall={stats.recall * 100:.1f}% ({stats.briefs_passed}/{stats.briefs})"
+
+
+def print_report(report: TrainingReport, model: PrefilterModel) -> None:
+    print(
+        f"examples={report.examples} briefs={report.briefs} "
+        f"decided_without_score={report.direct_markers} features={','.join(report.features)}"
+    )
+    if report.heuristic and report.model:
+        print(f"holdout ({report.holdout} scored messages):")
+        print(_rule_line("heuristic", report.heuristic))
+        print(_rule_line("learned (training cut-off)", report.model))
+        print(_rule_line("learned (equal recall)", report.model_equal_recall))
+        saved = report.saved_calls
+        share = saved / report.heuristic.calls * 100 if report.heuristic.calls else 0.0
+        print(f"  ai_calls_saved_at_equal_recall={saved} ({share:.1f}%)")
+    else:
+        print("holdout: not enough examples of both classes to evaluate")
+    print(f"final model: threshold={model.threshold:.4f} intercept={model.intercept:.3f}")
+    for name, weight in sorted(model.weights.items(), key=lambda item: -abs(item[1])):
+        print(f"  {name}: {weight:+.3f}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Train the logistic pre-filter scorer from stored tasks and recorded AI verdicts."
+    )
+    parser.add_argument("--recordings", type=Path, help="JSONL file written via AI_RECORD_PATH.")
+    parser.add_argument("--out", type=Path, help="Write the model coefficients here (for PREFILTER_MODEL_PATH).")
+    parser.add_argument("--holdout-every", type=int, default=5, help="Hold out every N-th example (default 5).")
+    parser.add_argument("--ridge", type=float, default=1.0, help="L2 penalty on the weights (default 1.0).")
+    return parser.parse_args(argv)
+
+
+async def _amain(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    recorded = recording_examples(args.recordings) if args.recordings else []
+    examples = merge_examples(await task_examples(), recorded)
+    try:
+        model, report = train(examples, holdout_every=args.holdout_every, ridge=args.ridge)
+    except ValueError as exc:
+        print(f"cannot train: {exc}")
+        return 1
+    print_report(report, model)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(model.to_json(), encoding="utf-8")
+        print(f"written: {args.out}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    return asyncio.run(_amain(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
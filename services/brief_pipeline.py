@@ -1,21 +1,32 @@
-"""Core brief processing pipeline: pre-filter → AI classify → create task."""
+"""Core brief processing pipeline: pre-filter → duplicate check → AI classify → create task."""
+
+import time
+from datetime import datetime, timedelta, timezone
 
 import structlog
 from aiogram.types import Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ai.backends import classify_locally
+from ai.backpressure import load_shedder
 from ai.classifier import classify_message
-from core.config import roles, runtime
-from core.exceptions import AITransientError
+from ai.single_flight import classification_flights, message_flight_key
+from core.config import env, roles, runtime
+from core.constants import RETRY_PRIORITY_LOW, STREAMING_CARD_EDIT_INTERVAL
+from core.exceptions import AICircuitOpenError, AITransientError
 from core.log_utils import message_log_context
+from core.permissions import is_teamlead
+from core.simhash import simhash
 from db.repo import message_repo, retry_repo, task_repo
 from diagnostics.readiness import (
     evaluate_brief_env_readiness,
     summarize_readiness_for_log,
 )
-from pre_filter import evaluate_message_for_processing
+from pre_filter import SHED_REASONS, evaluate_message_for_processing
+from services.duplicate_index import brief_fingerprints
+from services.sender_budget import sender_budget
 from services.task_service import build_task_kwargs, sanitize_ai_data
-from ui.cards import build_draft_card
+from ui.cards import build_draft_card, build_duplicate_card, build_streaming_draft_card
 
 logger = structlog.get_logger()
 
@@ -87,8 +98,180 @@ async def _notify_admins_about_operational_issue(
     )
 
 
-async def process_brief(message: Message, session: AsyncSession) -> None:
-    """Full pipeline: pre-filter → AI → DB → card."""
+class _ProgressiveDraftCard:
+    """Skeleton draft card that follows a streaming classification.
+
+    Posted once `is_task: true` arrives with enough confidence, edited (at most
+    every STREAMING_CARD_EDIT_INTERVAL) as fields stream in, and turned into the
+    real draft card once the task is saved — or deleted if no task comes of it.
+    """
+
+    def __init__(self, message: Message):
+        self.message = message
+        self.sent = None
+        self.finalized = False
+        self._last_text: str | None = None
+        self._last_edit = 0.0
+
+    async def update(self, partial: dict) -> None:
+        if float(partial.get("confidence") or 0) < runtime.ai_confidence_threshold:
+            return
+        text = build_streaming_draft_card(partial.get("data") or {})
+        if text == self._last_text:
+            return
+        now = time.monotonic()
+        if self.sent is None:
+            self.sent = await self.message.reply(text)
+        elif now - self._last_edit >= STREAMING_CARD_EDIT_INTERVAL:
+            await self.message.bot.edit_message_text(
+                text, chat_id=self.sent.chat.id, message_id=self.sent.message_id
+            )
+        else:
+            return
+        self._last_text = text
+        self._last_edit = now
+
+    async def finalize(self, card_text: str, keyboard):
+        """Turn the skeleton into the draft card; returns the card message."""
+        await self.message.bot.edit_message_text(
+            card_text,
+            chat_id=self.sent.chat.id,
+            message_id=self.sent.message_id,
+            reply_markup=keyboard,
+        )
+        self.finalized = True
+        return self.sent
+
+    async def discard(self) -> None:
+        if self.sent is None or self.finalized:
+            return
+        try:
+            await self.message.bot.delete_message(
+                chat_id=self.sent.chat.id, message_id=self.sent.message_id
+            )
+        except Exception as e:
+            logger.warning("streaming_card_delete_failed", error=str(e))
+
+
+async def _defer_over_sender_budget(
+    message: Message,
+    session: AsyncSession,
+    *,
+    text: str,
+    has_photo: bool,
+    prefilter_reason: str,
+    context: dict,
+) -> bool:
+    """Queue the message at low priority if its sender ran out of AI budget."""
+    sender = message.from_user
+    if sender is None or not sender_budget.enabled:
+        return False
+    if prefilter_reason == "direct_marker" or is_teamlead(sender):
+        sender_budget.stats.exempt += 1
+        return False
+
+    wait_seconds = sender_budget.try_charge(sender.id)
+    if wait_seconds <= 0:
+        return False
+
+    await retry_repo.enqueue_ai_retry(
+        session,
+        chat_id=message.chat.id,
+        message_id=message.message_id,
+        topic_id=message.message_thread_id,
+        raw_text=text,
+        has_photo=has_photo,
+        sender_username=sender.username,
+        error_detail="SENDER_BUDGET",
+        next_retry_at=(datetime.now(timezone.utc) + timedelta(seconds=wait_seconds)).isoformat(),
+        priority=RETRY_PRIORITY_LOW,
+    )
+    await session.commit()
+    logger.info(
+        "ai_sender_budget_deferred",
+        sender_id=sender.id,
+        retry_in_s=int(wait_seconds),
+        **context,
+    )
+    return True
+
+
+async def _hold_near_duplicate(
+    message: Message,
+    session: AsyncSession,
+    *,
+    text: str,
+    context: dict,
+) -> bool:
+    """Link a repost of a recent brief to its task and ask admins instead of classifying it."""
+    started = time.perf_counter()
+    fingerprint = simhash(text)
+    if fingerprint is None:
+        return False
+    matches = brief_fingerprints.matches(message.chat.id, message.message_thread_id, fingerprint)
+    lookup_us = int((time.perf_counter() - started) * 1_000_000)
+
+    for match in matches:
+        existing = await task_repo.get_task_by_id(session, match.task_id)
+        if existing is None or existing.status == "cancelled":
+            brief_fingerprints.discard(match.task_id)
+            continue
+        if existing.message_id == message.message_id:
+            continue
+        if await message_repo.is_message_processed(session, message.chat.id, message.message_id):
+            # An edit of a repost that is already held (or was already settled):
+            # it keeps its card, admins are not pinged again.
+            logger.info("brief_near_duplicate_already_held", task_id=existing.id, **context)
+            return True
+
+        await message_repo.mark_message_processed(session, message.chat.id, message.message_id)
+        await session.commit()
+        brief_fingerprints.stats.hits += 1
+        logger.info(
+            "brief_near_duplicate",
+            task_id=existing.id,
+            distance=match.distance,
+            lookup_us=lookup_us,
+            **context,
+        )
+        card_text, keyboard = build_duplicate_card(existing)
+        mentions = _admin_mentions()
+        if mentions:
+            card_text += f"\n{mentions}"
+        try:
+            await message.reply(card_text, reply_markup=keyboard)
+        except Exception as e:
+            logger.error("duplicate_card_send_failed", task_id=existing.id, error=str(e), **context)
+        return True
+    return False
+
+
+async def process_brief(
+    message: Message,
+    session: AsyncSession,
+    *,
+    check_duplicates: bool = True,
+) -> None:
+    """Full pipeline: pre-filter → duplicate check → AI → DB → card.
+
+    `check_duplicates=False` classifies a message an admin declared a new
+    brief despite its resemblance to an existing task.
+    """
+    progressive = _ProgressiveDraftCard(message) if env.ai_streaming_cards else None
+    try:
+        await _run_brief_pipeline(message, session, progressive, check_duplicates=check_duplicates)
+    finally:
+        if progressive is not None:
+            await progressive.discard()
+
+
+async def _run_brief_pipeline(
+    message: Message,
+    session: AsyncSession,
+    progressive: _ProgressiveDraftCard | None,
+    *,
+    check_duplicates: bool = True,
+) -> None:
     text = message.text or message.caption
     context = message_log_context(message, text)
     if not text:
@@ -108,37 +291,72 @@ async def process_brief(message: Message, session: AsyncSession) -> None:
 
     # Pre-filter (quick, no AI)
     should_process, prefilter_reason, prefilter_details = (
-        evaluate_message_for_processing(message)
+        evaluate_message_for_processing(message, min_score=load_shedder.min_heuristic_score())
     )
     prefilter_context = {**context, **prefilter_details, "reason": prefilter_reason}
     if not should_process:
         await message_repo.mark_message_processed(session, message.chat.id, message.message_id)
         await session.commit()
+        if prefilter_reason in SHED_REASONS:
+            # Would have been classified without backpressure; logged for later bulk review.
+            load_shedder.record_shed()
+            logger.warning(
+                "message_shed_under_load",
+                queue_depth=load_shedder.queue_depth,
+                recent_rate_limits=load_shedder.recent_rate_limits,
+                **prefilter_context,
+            )
+            return
         logger.info("message_filtered_out", **prefilter_context)
         return
 
     logger.info("message_prefilter_passed", **prefilter_context)
 
-    # AI classification (slow network I/O — run outside heavy DB work)
-    has_photo = bool(message.photo)
-    logger.info("ai_classification_requested", **context)
+    if check_duplicates and env.duplicate_detection and await _hold_near_duplicate(
+        message, session, text=text, context=context
+    ):
+        return
 
-    try:
-        result = await classify_message(text, has_photo)
-    except AITransientError:
-        await retry_repo.enqueue_ai_retry(
+    # Classification: local template backends first, then AI
+    # (slow network I/O — run outside heavy DB work)
+    has_photo = bool(message.photo)
+    local = await classify_locally(text, has_photo)
+    if local is not None:
+        backend_name, result = local
+        logger.info("brief_classified_locally", backend=backend_name, **context)
+    else:
+        if await _defer_over_sender_budget(
+            message,
             session,
-            chat_id=message.chat.id,
-            message_id=message.message_id,
-            topic_id=message.message_thread_id,
-            raw_text=text,
+            text=text,
             has_photo=has_photo,
-            sender_username=message.from_user.username if message.from_user else None,
-            error_detail="TRANSIENT_ERROR",
-        )
-        await session.commit()
-        logger.warning("ai_transient_failure_enqueued", **context)
-        return
+            prefilter_reason=prefilter_reason,
+            context=context,
+        ):
+            return
+        logger.info("ai_classification_requested", streaming=progressive is not None, **context)
+        stream_kwargs = {"on_partial": progressive.update} if progressive is not None else {}
+        try:
+            result = await classification_flights.do(
+                message_flight_key(message.chat.id, message.message_id, text, has_photo),
+                lambda: classify_message(text, has_photo, **stream_kwargs),
+            )
+        except AITransientError as exc:
+            # An open circuit breaker fails fast: the message goes straight to the queue.
+            circuit_open = isinstance(exc, AICircuitOpenError)
+            await retry_repo.enqueue_ai_retry(
+                session,
+                chat_id=message.chat.id,
+                message_id=message.message_id,
+                topic_id=message.message_thread_id,
+                raw_text=text,
+                has_photo=has_photo,
+                sender_username=message.from_user.username if message.from_user else None,
+                error_detail="CIRCUIT_OPEN" if circuit_open else "TRANSIENT_ERROR",
+            )
+            await session.commit()
+            logger.warning("ai_transient_failure_enqueued", circuit_open=circuit_open, **context)
+            return
 
     if result is None:
         await message_repo.log_parse_failure(
@@ -248,10 +466,19 @@ async def process_brief(message: Message, session: AsyncSession) -> None:
         )
         return
 
+    brief_fingerprints.add_task(task)
+
     # Send confirmation card after durable persistence.
     card_text, keyboard = build_draft_card(task)
     try:
-        sent = await message.reply(card_text, reply_markup=keyboard)
+        sent = None
+        if progressive is not None and progressive.sent is not None:
+            try:
+                sent = await progressive.finalize(card_text, keyboard)
+            except Exception as e:
+                logger.warning("streaming_card_finalize_failed", task_id=task.id, error=str(e), **context)
+        if sent is None:
+            sent = await message.reply(card_text, reply_markup=keyboard)
     except Exception as e:
         logger.error("task_card_send_failed", task_id=task.id, error=str(e), **context)
         await _notify_admins_about_operational_issue(
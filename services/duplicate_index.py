@@ -0,0 +1,176 @@
+"""In-memory index of recent brief fingerprints for near-duplicate detection.
+
+Operators repost a brief, or a lightly edited copy, as a new message. Every
+task stores the SimHash of its `raw_text` (`tasks.text_fingerprint`). The
+index keeps the fingerprints of the last `DUPLICATE_WINDOW_DAYS` of tasks,
+loaded at startup and extended as tasks are created. `process_brief` looks up
+each pre-filtered message before classifying it.
+
+A lookup must find every fingerprint within `DUPLICATE_MAX_HAMMING` bits
+without comparing against all of them. The 64 bits are cut into
+DUPLICATE_MAX_HAMMING + 1 bands. Two fingerprints that differ in at most that
+many bits agree exactly on at least one band, so a lookup is one dict probe
+per band. Candidates are then checked by Hamming distance. Bands are keyed by
+chat and topic, so only briefs of the same topic are compared. The index holds
+task ids only, and the pipeline re-reads the task before linking to it.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.constants import DUPLICATE_MAX_HAMMING, DUPLICATE_WINDOW_DAYS
+from core.simhash import FINGERPRINT_BITS, from_hex, hamming, simhash
+from db.models import Task
+from db.repo import task_repo
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class DuplicateStats:
+    lookups: int = 0
+    hits: int = 0
+    max_lookup_us: float = 0.0
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    task_id: int
+    distance: int
+
+
+@dataclass
+class _Entry:
+    scope: tuple[int, int | None]  # (chat_id, topic_id)
+    fingerprint: int
+    created_at: datetime
+
+
+def _band_layout(max_distance: int) -> tuple[tuple[int, int], ...]:
+    """(shift, mask) of max_distance + 1 near-equal bit bands."""
+    count = max_distance + 1
+    layout = []
+    shift = 0
+    for index in range(count):
+        width = FINGERPRINT_BITS // count + (1 if index < FINGERPRINT_BITS % count else 0)
+        layout.append((shift, (1 << width) - 1))
+        shift += width
+    return tuple(layout)
+
+
+def _parse_created_at(value: str | datetime | None) -> datetime:
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(value) if value else datetime.now(timezone.utc)
+        except ValueError:
+            parsed = datetime.now(timezone.utc)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class BriefFingerprintIndex:
+    def __init__(
+        self,
+        *,
+        max_distance: int = DUPLICATE_MAX_HAMMING,
+        window: timedelta = timedelta(days=DUPLICATE_WINDOW_DAYS),
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.max_distance = max_distance
+        self.window = window
+        self._clock = clock
+        self._bands = _band_layout(max_distance)
+        self._tables: list[dict[tuple, set[int]]] = [{} for _ in self._bands]
+        self._entries: dict[int, _Entry] = {}
+        self.stats = DuplicateStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def reset(self) -> None:
+        self._tables = [{} for _ in self._bands]
+        self._entries.clear()
+        self.stats = DuplicateStats()
+
+    def _keys(self, scope: tuple[int, int | None], fingerprint: int):
+        for table, (shift, mask) in zip(self._tables, self._bands):
+            yield table, (*scope, (fingerprint >> shift) & mask)
+
+    def add(
+        self,
+        task_id: int,
+        chat_id: int,
+        topic_id: int | None,
+        fingerprint: int,
+        created_at: str | datetime | None = None,
+    ) -> None:
+        self.discard(task_id)
+        entry = _Entry((chat_id, topic_id), fingerprint, _parse_created_at(created_at))
+        self._entries[task_id] = entry
+        for table, key in self._keys(entry.scope, fingerprint):
+            table.setdefault(key, set()).add(task_id)
+        self._expire()
+
+    def add_task(self, task: Task) -> None:
+        if task.text_fingerprint:
+            self.add(task.id, task.chat_id, task.topic_id, from_hex(task.text_fingerprint), task.created_at)
+
+    def discard(self, task_id: int) -> None:
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return
+        for table, key in self._keys(entry.scope, entry.fingerprint):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(task_id)
+                if not bucket:
+                    del table[key]
+
+    def _expire(self) -> None:
+        """Drop entries older than the window (insertion order is creation order)."""
+        cutoff = self._clock() - self.window
+        while self._entries:
+            task_id, entry = next(iter(self._entries.items()))
+            if entry.created_at >= cutoff:
+                break
+            self.discard(task_id)
+
+    def matches(self, chat_id: int, topic_id: int | None, fingerprint: int) -> list[DuplicateMatch]:
+        """Indexed tasks of the same topic within `max_distance` bits, closest and newest first."""
+        started = time.perf_counter()
+        cutoff = self._clock() - self.window
+        candidates: set[int] = set()
+        for table, key in self._keys((chat_id, topic_id), fingerprint):
+            candidates.update(table.get(key, ()))
+        found = []
+        for task_id in candidates:
+            entry = self._entries[task_id]
+            distance = hamming(entry.fingerprint, fingerprint)
+            if distance <= self.max_distance and entry.created_at >= cutoff:
+                found.append(DuplicateMatch(task_id, distance))
+        found.sort(key=lambda match: (match.distance, -match.task_id))
+        self.stats.lookups += 1
+        self.stats.max_lookup_us = max(self.stats.max_lookup_us, (time.perf_counter() - started) * 1_000_000)
+        return found
+
+    async def load(self, session: AsyncSession) -> int:
+        """Index the recent tasks; fingerprints missing on older rows are computed."""
+        since = (self._clock() - self.window).isoformat()
+        rows = await task_repo.get_recent_brief_fingerprints(session, since)
+        for task_id, chat_id, topic_id, stored, raw_text, created_at in rows:
+            fingerprint = from_hex(stored) if stored else (simhash(raw_text) if raw_text else None)
+            if fingerprint is not None:
+                self.add(task_id, chat_id, topic_id, fingerprint, created_at)
+        logger.info("duplicate_index_loaded", tasks=len(self._entries), window_days=self.window.days)
+        return len(self._entries)
+
+
+brief_fingerprints = BriefFingerprintIndex()
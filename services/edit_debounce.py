@@ -0,0 +1,128 @@
+"""Per-message debounce buffer for edited briefs.
+
+Operators often edit a fresh brief several times within a minute. Each edit
+is parked here under `(chat_id, message_id)`; only once no newer edit arrived
+for the quiet period is the latest version processed — one re-parse and one
+card edit for the whole burst. Flushes of the same message never overlap.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import structlog
+from aiogram.types import Message
+
+from core.config import env
+
+logger = structlog.get_logger()
+
+EditProcessor = Callable[[Message], Awaitable[None]]
+
+
+@dataclass
+class DebounceStats:
+    received: int = 0
+    coalesced: int = 0  # edits superseded by a newer edit of the same message
+    flushed: int = 0
+
+
+@dataclass
+class _PendingEdit:
+    message: Message
+    process: EditProcessor
+    edits: int = 1
+    timer: asyncio.TimerHandle | None = field(default=None, repr=False)
+
+
+class EditDebouncer:
+    def __init__(self, quiet_period: float | None = None):
+        self._quiet_period = quiet_period
+        self._pending: dict[tuple[int, int], _PendingEdit] = {}
+        self._running: dict[tuple[int, int], asyncio.Task] = {}
+        self.stats = DebounceStats()
+
+    @property
+    def quiet_period(self) -> float:
+        return env.edit_debounce_seconds if self._quiet_period is None else self._quiet_period
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def reset(self) -> None:
+        for entry in self._pending.values():
+            if entry.timer is not None:
+                entry.timer.cancel()
+        self._pending.clear()
+        self._running.clear()
+        self.stats = DebounceStats()
+
+    async def submit(self, message: Message, process: EditProcessor) -> None:
+        """Park an edit; `process(latest_message)` runs after the quiet period."""
+        self.stats.received += 1
+        if self.quiet_period <= 0:
+            self.stats.flushed += 1
+            await process(message)
+            return
+
+        key = (message.chat.id, message.message_id)
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = _PendingEdit(message, process)
+            self._pending[key] = entry
+        else:
+            entry.timer.cancel()
+            entry.message = message
+            entry.process = process
+            entry.edits += 1
+            self.stats.coalesced += 1
+        entry.timer = asyncio.get_running_loop().call_later(self.quiet_period, self._flush, key)
+
+    def _flush(self, key: tuple[int, int]) -> asyncio.Task | None:
+        entry = self._pending.pop(key, None)
+        if entry is None:
+            return None
+        if entry.timer is not None:
+            entry.timer.cancel()
+        previous = self._running.get(key)
+        task = asyncio.get_running_loop().create_task(self._run(key, entry, previous))
+        self._running[key] = task
+        task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        return task
+
+    def _forget(self, key: tuple[int, int], task: asyncio.Task) -> None:
+        if self._running.get(key) is task:
+            del self._running[key]
+
+    async def _run(self, key: tuple[int, int], entry: _PendingEdit, previous: asyncio.Task | None) -> None:
+        if previous is not None:
+            await asyncio.wait({previous})
+        self.stats.flushed += 1
+        logger.info(
+            "edited_message_debounce_flushed",
+            chat_id=key[0],
+            message_id=key[1],
+            edits=entry.edits,
+            coalesced=entry.edits - 1,
+        )
+        try:
+            await entry.process(entry.message)
+        except Exception as e:
+            logger.error(
+                "edited_message_debounced_processing_failed",
+                chat_id=key[0],
+                message_id=key[1],
+                error=str(e),
+            )
+
+    async def flush_all(self) -> None:
+        """Process every parked edit now (shutdown) and wait for all flushes."""
+        for key in list(self._pending):
+            self._flush(key)
+        running = list(self._running.values())
+        if running:
+            await asyncio.wait(running)
+
+
+edit_debouncer = EditDebouncer()
@@ -0,0 +1,104 @@
+"""Per-sender AI budget for the brief pipeline.
+
+Each sender (`from_user.id`) has a token bucket of `AI_SENDER_BURST` AI
+classifications, refilled at `AI_SENDER_PER_HOUR`. A message that passed the
+pre-filter but finds the sender's bucket empty is not classified now:
+`process_brief` defers it into `ai_retry_queue` at low priority. The deferral
+reserves the next token (the level goes negative), so it is due once that
+token has refilled and a flood is spaced one refill interval apart instead of
+coming due all at once; the retry job does not charge again. Teamleads and
+messages with a direct brief marker are exempt, as are messages the local
+template backend answers.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from core.config import env
+
+_PRUNE_ABOVE = 1000  # tracked senders before full buckets are dropped
+
+
+@dataclass
+class SenderBudgetStats:
+    charged: int = 0
+    deferred: int = 0
+    exempt: int = 0
+
+
+@dataclass
+class _Bucket:
+    level: float
+    updated: float
+
+
+class SenderBudget:
+    def __init__(
+        self,
+        *,
+        burst: int | None = None,
+        per_hour: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._burst = burst
+        self._per_hour = per_hour
+        self._clock = clock
+        self._buckets: dict[int, _Bucket] = {}
+        self.stats = SenderBudgetStats()
+
+    @property
+    def burst(self) -> int:
+        return env.ai_sender_burst if self._burst is None else self._burst
+
+    @property
+    def per_hour(self) -> int:
+        return env.ai_sender_per_hour if self._per_hour is None else self._per_hour
+
+    @property
+    def enabled(self) -> bool:
+        return self.burst > 0 and self.per_hour > 0
+
+    def reset(self) -> None:
+        self._buckets.clear()
+        self.stats = SenderBudgetStats()
+
+    def _refill(self, bucket: _Bucket, now: float) -> None:
+        rate = self.per_hour / 3600.0
+        bucket.level = min(float(self.burst), bucket.level + (now - bucket.updated) * rate)
+        bucket.updated = now
+
+    def _prune(self, now: float) -> None:
+        """Forget senders whose bucket is full again (keeps memory bounded)."""
+        for sender_id, bucket in list(self._buckets.items()):
+            self._refill(bucket, now)
+            if bucket.level >= self.burst:
+                del self._buckets[sender_id]
+
+    def try_charge(self, sender_id: int) -> float:
+        """Take one classification from the sender's bucket.
+
+        Returns 0 when charged. Otherwise reserves the next token that will
+        refill and returns the seconds until it does.
+        """
+        if not self.enabled:
+            return 0.0
+        now = self._clock()
+        if len(self._buckets) > _PRUNE_ABOVE:
+            self._prune(now)
+        bucket = self._buckets.get(sender_id)
+        if bucket is None:
+            bucket = self._buckets[sender_id] = _Bucket(level=float(self.burst), updated=now)
+        else:
+            self._refill(bucket, now)
+        if bucket.level >= 1:
+            bucket.level -= 1
+            self.stats.charged += 1
+            return 0.0
+        self.stats.deferred += 1
+        wait_seconds = (1 - bucket.level) * 3600.0 / self.per_hour
+        bucket.level -= 1
+        return wait_seconds
+
+
+sender_budget = SenderBudget()
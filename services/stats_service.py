@@ -1,52 +1,77 @@
 """Monthly analytics."""
 
-from sqlalchemy import select
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.log_utils import today_local
 from db.models import Task
 
 
+def month_bounds(year: int, month: int) -> tuple[str, str]:
+    """UTC [start, end) of a calendar month as ISO timestamps."""
+    start = datetime(year, month, 1, tzinfo=timezone.utc)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+    return start.isoformat(), end.isoformat()
+
+
 async def get_monthly_stats(session: AsyncSession, year: int, month: int) -> dict:
-    month_prefix = f"{year}-{month:02d}"
-    result = await session.execute(
-        select(Task).where(Task.created_at.startswith(month_prefix))
-    )
-    tasks = list(result.scalars().all())
+    """Status and platform totals for tasks created in the month, aggregated in
+    SQL over the `created_at` index."""
+    start, end = month_bounds(year, month)
+    in_month = (Task.created_at >= start, Task.created_at < end)
+    amount = func.coalesce(func.sum(Task.amount_total), 0)
+    today = today_local()
 
-    total = len(tasks)
-    completed = sum(1 for t in tasks if t.status == "delivered")
-    in_progress = sum(
-        1 for t in tasks
-        if t.status in ("draft", "awaiting_confirmation", "processing")
-    )
-    cancelled = sum(1 for t in tasks if t.status == "cancelled")
-    finished = sum(1 for t in tasks if t.status == "finished")
+    by_status = (
+        await session.execute(
+            select(
+                Task.status,
+                func.count(),
+                amount,
+                func.count().filter(Task.deadline != "", Task.deadline < today),
+            )
+            .where(*in_month)
+            .group_by(Task.status)
+        )
+    ).all()
+    by_platform = (
+        await session.execute(
+            select(Task.platform, func.count(), amount)
+            .where(*in_month)
+            .group_by(Task.platform)
+            .order_by(func.min(Task.id))
+        )
+    ).all()
 
-    total_amount = sum(t.amount_total or 0 for t in tasks)
+    counts = {status: count for status, count, _, _ in by_status}
+    total = sum(counts.values())
+    total_amount = sum(status_amount for _, _, status_amount, _ in by_status)
     avg_amount = total_amount / total if total > 0 else 0
-
-    overdue = 0
-    today = today_local()
-    for t in tasks:
-        if t.deadline and t.status not in ("delivered", "cancelled"):
-            if t.deadline < today:
-                overdue += 1
+    overdue = sum(
+        past_deadline
+        for status, _, _, past_deadline in by_status
+        if status not in ("delivered", "cancelled")
+    )
 
     platforms: dict[str, dict] = {}
-    for t in tasks:
-        p = t.platform or "unknown"
+    for platform, count, platform_amount in by_platform:
+        p = platform or "unknown"
         if p not in platforms:
             platforms[p] = {"count": 0, "amount": 0.0}
-        platforms[p]["count"] += 1
-        platforms[p]["amount"] += t.amount_total or 0
+        platforms[p]["count"] += count
+        platforms[p]["amount"] += platform_amount
 
     return {
         "total": total,
-        "completed": completed,
-        "in_progress": in_progress,
-        "finished": finished,
-        "cancelled": cancelled,
+        "completed": counts.get("delivered", 0),
+        "in_progress": sum(
+            counts.get(status, 0)
+            for status in ("draft", "awaiting_confirmation", "processing")
+        ),
+        "finished": counts.get("finished", 0),
+        "cancelled": counts.get("cancelled", 0),
         "overdue": overdue,
         "total_amount": total_amount,
         "avg_amount": avg_amount,
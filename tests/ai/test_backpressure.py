@@ -0,0 +1,52 @@
+from ai.backpressure import LoadShedder
+from core.config import env
+from core.constants import (
+    AI_SHED_MAX_EXTRA_SCORE,
+    AI_SHED_QUEUE_STEP,
+    AI_SHED_RATE_LIMIT_STEP,
+    AI_SHED_RATE_LIMIT_WINDOW,
+    MIN_HEURISTIC_SCORE,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_threshold_rises_with_queue_depth_and_is_capped():
+    shedder = LoadShedder()
+    assert shedder.min_heuristic_score() == MIN_HEURISTIC_SCORE
+
+    shedder.set_queue_depth(AI_SHED_QUEUE_STEP - 1)
+    assert shedder.min_heuristic_score() == MIN_HEURISTIC_SCORE
+    shedder.set_queue_depth(AI_SHED_QUEUE_STEP)
+    assert shedder.min_heuristic_score() == MIN_HEURISTIC_SCORE + 1
+    shedder.set_queue_depth(AI_SHED_QUEUE_STEP * 100)
+    assert shedder.min_heuristic_score() == MIN_HEURISTIC_SCORE + AI_SHED_MAX_EXTRA_SCORE
+
+    shedder.set_queue_depth(0)
+    assert shedder.min_heuristic_score() == MIN_HEURISTIC_SCORE
+
+
+def test_recent_rate_limits_raise_threshold_until_they_age_out():
+    clock = _Clock()
+    shedder = LoadShedder(clock=clock)
+    for _ in range(AI_SHED_RATE_LIMIT_STEP):
+        shedder.record_rate_limit()
+    assert shedder.min_heuristic_score() == MIN_HEURISTIC_SCORE + 1
+
+    clock.now = AI_SHED_RATE_LIMIT_WINDOW + 1
+    assert shedder.recent_rate_limits == 0
+    assert shedder.min_heuristic_score() == MIN_HEURISTIC_SCORE
+    assert shedder.stats.rate_limits == AI_SHED_RATE_LIMIT_STEP
+
+
+def test_load_shedding_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(env, "ai_load_shedding", False)
+    shedder = LoadShedder()
+    shedder.set_queue_depth(AI_SHED_QUEUE_STEP * 10)
+    assert shedder.min_heuristic_score() == MIN_HEURISTIC_SCORE
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from ai import batch as ai_batch
+from tests.fakes import FakeBatchesAPI, make_batch_client
+
+_NOT_TASK = '{"is_task": false, "confidence": 0.9, "reason": "чат"}'
+
+
+@pytest.mark.asyncio
+async def test_classify_batch_maps_results_and_failures():
+    def _respond(custom_id, params):
+        assert params["messages"][0]["content"].startswith(("hello", "[Фото"))
+        return {"a": _NOT_TASK, "b": "{broken", "c": "!expired"}[custom_id]
+
+    batches = FakeBatchesAPI(_respond, polls_until_ended=2)
+    progress = []
+
+    outcomes = await ai_batch.classify_batch(
+        [
+            ai_batch.BatchItem("a", "hello a"),
+            ai_batch.BatchItem("b", "hello b"),
+            ai_batch.BatchItem("c", "hello c", has_photo=True),
+        ],
+        poll_interval=0,
+        on_progress=progress.append,
+        client=make_batch_client(batches),
+    )
+
+    assert outcomes["a"].result == {"is_task": False, "confidence": 0.9, "reason": "чат"}
+    assert outcomes["b"].result is None and outcomes["b"].transient is False
+    assert outcomes["c"].transient is True
+    assert len(batches.created) == 1
+    assert [p.processing for p in progress] == [3, 3, 0]
+
+
+@pytest.mark.asyncio
+async def test_classify_batch_skips_cached_items_and_chunks():
+    batches = FakeBatchesAPI(lambda _cid, _params: _NOT_TASK)
+    client = make_batch_client(batches)
+    items = [ai_batch.BatchItem(f"t-{i}", f"text {i}") for i in range(3)]
+
+    await ai_batch.classify_batch(items, poll_interval=0, max_requests=2, client=client)
+    assert [len(requests) for requests in batches.created] == [2, 1]
+
+    outcomes = await ai_batch.classify_batch(items, poll_interval=0, client=client)
+    assert len(batches.created) == 2
+    assert all(outcome.result is not None for outcome in outcomes.values())
+
+
+@pytest.mark.asyncio
+async def test_classify_batch_resumes_from_state_file(tmp_path):
+    state_path = tmp_path / "state.json"
+    batches = FakeBatchesAPI(lambda _cid, _params: _NOT_TASK)
+    client = make_batch_client(batches)
+    items = [ai_batch.BatchItem("t-1", "text 1")]
+
+    submitted = await batches.create(
+        requests=[{"custom_id": "t-1", "params": {"messages": [{"content": "text 1"}]}}]
+    )
+    state_path.write_text(
+        json.dumps(
+            {
+                "ai_model": ai_batch.runtime.ai_model,
+                "prompt_version": ai_batch.CLASSIFIER_PROMPT_VERSION,
+                "custom_ids": ["t-1"],
+                "batches": [{"batch_id": submitted.id, "custom_ids": ["t-1"]}],
+            }
+        )
+    )
+
+    outcomes = await ai_batch.classify_batch(
+        items, state_path=state_path, poll_interval=0, client=client
+    )
+
+    assert len(batches.created) == 1
+    assert outcomes["t-1"].result["is_task"] is False
+    assert not state_path.exists()
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from ai import cache as ai_cache
+from db.models import AIClassificationCache
+from db.repo import ai_cache_repo
+
+
+def test_build_cache_key_ignores_insignificant_whitespace():
+    base = ai_cache.build_cache_key("📦 Заказ\nОплата 80$", False, "m1", "1")
+
+    assert ai_cache.build_cache_key("  📦 Заказ   \r\nОплата 80$\n", False, "m1", "1") == base
+    assert ai_cache.build_cache_key("📦 Заказ\nОплата 80$", True, "m1", "1") != base
+    assert ai_cache.build_cache_key("📦 Заказ\nОплата 80$", False, "m2", "1") != base
+    assert ai_cache.build_cache_key("📦 Заказ\nОплата 80$", False, "m1", "2") != base
+
+
+@pytest.mark.asyncio
+async def test_hot_tier_hit_returns_copy_and_counts_savings():
+    cache = ai_cache.ClassificationCache(hot_size=4)
+    result = {"is_task": True, "confidence": 0.9, "data": {"priority": "low"}}
+
+    assert await cache.get("k") is None
+    await cache.put(
+        "k", result, ai_model="m", prompt_version="1",
+        latency_s=2.5, input_tokens=1200, output_tokens=300,
+    )
+
+    hit = await cache.get("k")
+    assert hit == result
+    hit["data"]["priority"] = "high"
+    assert (await cache.get("k"))["data"]["priority"] == "low"
+
+    assert cache.stats.misses == 1
+    assert cache.stats.hot_hits == 2
+    assert cache.stats.saved_seconds == pytest.approx(5.0)
+    assert cache.stats.saved_input_tokens == 2400
+    assert cache.stats.saved_output_tokens == 600
+
+
+@pytest.mark.asyncio
+async def test_hot_tier_evicts_least_recently_used():
+    cache = ai_cache.ClassificationCache(hot_size=2)
+    for key in ("a", "b"):
+        await cache.put(key, {"is_task": False}, ai_model="m", prompt_version="1")
+    await cache.get("a")
+    await cache.put("c", {"is_task": False}, ai_model="m", prompt_version="1")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") is not None
+    assert cache.stats.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_misses():
+    cache = ai_cache.ClassificationCache(ttl=timedelta(seconds=-1))
+    await cache.put("k", {"is_task": False}, ai_model="m", prompt_version="1")
+
+    assert await cache.get("k") is None
+    assert cache.stats.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_persistent_tier_survives_hot_reset_and_prunes(db_session_factory):
+    cache = ai_cache.ClassificationCache(max_rows=2, prune_every=3)
+    cache.bind(db_session_factory)
+
+    for key in ("a", "b", "c"):
+        await cache.put(
+            key, {"is_task": False, "confidence": 0.8, "reason": key},
+            ai_model="m", prompt_version="1", latency_s=1.0,
+        )
+
+    async with db_session_factory() as session:
+        count = await session.scalar(select(func.count()).select_from(AIClassificationCache))
+    assert count == 2
+
+    restarted = ai_cache.ClassificationCache()
+    restarted.bind(db_session_factory)
+    assert await restarted.get("a") is None
+    assert (await restarted.get("c"))["reason"] == "c"
+    assert restarted.stats.persistent_hits == 1
+
+    # Second lookup is served from the hot tier.
+    await restarted.get("c")
+    assert restarted.stats.hot_hits == 1
+
+    async with db_session_factory() as session:
+        row = await session.get(AIClassificationCache, "c")
+    assert row.hit_count == 1
+
+
+@pytest.mark.asyncio
+async def test_hot_hits_keep_their_rows_through_the_periodic_prune(db_session_factory, freeze_time):
+    cache = ai_cache.ClassificationCache(max_rows=2, prune_every=3)
+    cache.bind(db_session_factory)
+    start = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+    async def _row(key):
+        async with db_session_factory() as session:
+            return await session.get(AIClassificationCache, key)
+
+    freeze_time(ai_cache_repo, start)
+    for key in ("a", "b"):
+        await cache.put(key, {"is_task": False}, ai_model="m", prompt_version="1")
+
+    # A hot hit is only queued: no write per hit.
+    freeze_time(ai_cache_repo, start + timedelta(minutes=1))
+    await cache.get("a")
+    assert (await _row("a")).last_accessed_at == start.isoformat()
+
+    # The third write prunes, after writing the queued hit.
+    freeze_time(ai_cache_repo, start + timedelta(minutes=2))
+    await cache.put("c", {"is_task": False}, ai_model="m", prompt_version="1")
+
+    assert await _row("b") is None
+    assert (await _row("a")).last_accessed_at == (start + timedelta(minutes=2)).isoformat()
+    assert await _row("c") is not None
+    assert cache.stats.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_hot_hits_refresh_persistent_rows_once_the_interval_passes(db_session_factory, freeze_time):
+    cache = ai_cache.ClassificationCache(touch_interval=timedelta(0))
+    cache.bind(db_session_factory)
+    start = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+    freeze_time(ai_cache_repo, start)
+    await cache.put("a", {"is_task": False}, ai_model="m", prompt_version="1")
+
+    freeze_time(ai_cache_repo, start + timedelta(hours=1))
+    await cache.get("a")
+
+    async with db_session_factory() as session:
+        row = await session.get(AIClassificationCache, "a")
+    assert row.last_accessed_at == (start + timedelta(hours=1)).isoformat()
@@ -0,0 +1,62 @@
+from ai.circuit_breaker import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker
+
+
+def _breaker(now):
+    return CircuitBreaker(failure_threshold=3, reset_timeout=60, clock=lambda: now[0])
+
+
+def test_trips_after_consecutive_failures_and_success_resets_count():
+    now = [0.0]
+    breaker = _breaker(now)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert breaker.is_open
+    assert breaker.allow_request() is False
+    assert breaker.rejected == 1
+    assert breaker.trips == 1
+
+
+def test_half_open_lets_single_probe_through():
+    now = [0.0]
+    breaker = _breaker(now)
+    for _ in range(3):
+        breaker.record_failure()
+
+    now[0] = 60.0
+    assert not breaker.is_open
+    assert breaker.allow_request() is True
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.probing
+    assert breaker.allow_request() is False  # second caller waits for the probe
+
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow_request() is True
+
+
+def test_failed_probe_reopens_and_abandoned_probe_is_replaced():
+    now = [0.0]
+    breaker = _breaker(now)
+    for _ in range(3):
+        breaker.record_failure()
+
+    now[0] = 60.0
+    assert breaker.allow_request() is True
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert breaker.trips == 2
+
+    now[0] = 120.0
+    assert breaker.allow_request() is True
+    now[0] = 179.0
+    assert breaker.allow_request() is False
+    now[0] = 180.0  # probe never reported back
+    assert breaker.allow_request() is True
@@ -1,10 +1,20 @@
 import asyncio
 from types import SimpleNamespace
 
+import anthropic
 import pytest
 
 from ai import classifier
-from core.exceptions import AITransientError
+from ai.backpressure import load_shedder
+from ai.cascade import cascade_stats
+from ai.circuit_breaker import CircuitBreaker
+from ai.gateway import LANE_BACKFILL, LANE_LIVE, ai_gateway, use_lane
+from ai.latency import latency_tracker
+from ai.usage import usage_meter
+from core.config import env, runtime
+from core.constants import AI_GATE_MAX_TOKENS
+from core.exceptions import AICircuitOpenError, AITransientError
+from tests.fakes import FakeMessageStream, classifier_response, make_stream_client
 
 
 def test_normalize_classifier_result_valid_task_payload():
@@ -49,13 +59,16 @@ def test_normalize_classifier_result_defaults_reason_to_russian():
 
 
 @pytest.mark.asyncio
-async def test_classify_message_strips_markdown_json(monkeypatch):
+async def test_classify_message_reads_classification_tool_call(monkeypatch):
     async def _create(**_kwargs):
         return SimpleNamespace(
             content=[
+                SimpleNamespace(type="text", text="Let me classify this."),
                 SimpleNamespace(
-                    text='```json\n{"is_task": false, "confidence": 0.9, "reason": "chat"}\n```'
-                )
+                    type="tool_use",
+                    name="record_classification",
+                    input={"is_task": False, "confidence": 0.9, "reason": "chat"},
+                ),
             ]
         )
 
@@ -70,9 +83,9 @@ async def test_classify_message_strips_markdown_json(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_classify_message_returns_none_on_bad_json(monkeypatch):
+async def test_classify_message_returns_none_without_tool_call(monkeypatch):
     async def _create(**_kwargs):
-        return SimpleNamespace(content=[SimpleNamespace(text="{not-json")])
+        return classifier_response("{not-json")
 
     monkeypatch.setattr(
         classifier,
@@ -82,6 +95,8 @@ async def test_classify_message_returns_none_on_bad_json(monkeypatch):
 
     result = await classifier.classify_message("text")
     assert result is None
+    assert classifier.usage_meter.stats.calls == 1
+    assert classifier.usage_meter.stats.malformed_responses == 1
 
 
 @pytest.mark.asyncio
@@ -103,3 +118,342 @@ async def test_classify_message_raises_after_transient_retries(monkeypatch):
 
     with pytest.raises(AITransientError):
         await classifier.classify_message("text")
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_responses_are_reported_for_load_shedding(monkeypatch):
+    response = SimpleNamespace(status_code=429, headers={}, request=None)
+
+    async def _create(**_kwargs):
+        raise anthropic.RateLimitError("rate limited", response=response, body=None)
+
+    async def _sleep(_seconds):
+        return None
+
+    monkeypatch.setattr(
+        classifier,
+        "client",
+        SimpleNamespace(messages=SimpleNamespace(create=_create)),
+    )
+    monkeypatch.setattr(classifier, "AI_MAX_INLINE_RETRIES", 1)
+    monkeypatch.setattr(classifier.asyncio, "sleep", _sleep)
+
+    with pytest.raises(AITransientError):
+        await classifier.classify_message("text")
+
+    assert load_shedder.recent_rate_limits == 2
+
+
+@pytest.mark.asyncio
+async def test_classify_message_serves_repeat_text_from_cache(monkeypatch):
+    calls = {"count": 0}
+
+    async def _create(**_kwargs):
+        calls["count"] += 1
+        return classifier_response(
+            '{"is_task": false, "confidence": 0.9, "reason": "chat"}', input_tokens=1500, output_tokens=40
+        )
+
+    monkeypatch.setattr(
+        classifier,
+        "client",
+        SimpleNamespace(messages=SimpleNamespace(create=_create)),
+    )
+
+    first = await classifier.classify_message("same text")
+    second = await classifier.classify_message("same text  \n")
+
+    assert first == second
+    assert calls["count"] == 1
+    assert classifier.classification_cache.stats.hot_hits == 1
+    assert classifier.classification_cache.stats.saved_input_tokens == 1500
+
+
+@pytest.mark.asyncio
+async def test_classify_message_does_not_cache_failures(monkeypatch):
+    calls = {"count": 0}
+
+    async def _create(**_kwargs):
+        calls["count"] += 1
+        return classifier_response("{not-json")
+
+    monkeypatch.setattr(
+        classifier,
+        "client",
+        SimpleNamespace(messages=SimpleNamespace(create=_create)),
+    )
+
+    assert await classifier.classify_message("text") is None
+    assert await classifier.classify_message("text") is None
+    assert calls["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_classify_message_marks_system_prompt_cacheable_and_records_usage(monkeypatch):
+    captured = {}
+
+    async def _create(**kwargs):
+        captured.update(kwargs)
+        return classifier_response(
+            '{"is_task": false, "confidence": 0.9, "reason": "chat"}',
+            input_tokens=30,
+            cache_read_input_tokens=1400,
+            cache_creation_input_tokens=0,
+            output_tokens=25,
+        )
+
+    monkeypatch.setattr(
+        classifier,
+        "client",
+        SimpleNamespace(messages=SimpleNamespace(create=_create)),
+    )
+
+    await classifier.classify_message("usage text")
+
+    system = captured["system"]
+    assert system[0]["text"] == classifier.CLASSIFIER_SYSTEM_PROMPT
+    assert system[0]["cache_control"] == {"type": "ephemeral"}
+    assert captured["tools"] == [classifier.CLASSIFIER_TOOL]
+    assert captured["tool_choice"] == {"type": "tool", "name": "record_classification"}
+    stats = classifier.usage_meter.stats
+    assert stats.calls == 1
+    assert stats.cache_read_input_tokens == 1400
+    assert stats.output_tokens == 25
+
+
+@pytest.mark.asyncio
+async def test_classify_message_takes_gateway_slot_in_caller_lane(monkeypatch):
+    async def _create(**_kwargs):
+        assert classifier.ai_gateway.in_flight == 1
+        return classifier_response('{"is_task": false, "confidence": 0.9, "reason": "chat"}')
+
+    monkeypatch.setattr(
+        classifier,
+        "client",
+        SimpleNamespace(messages=SimpleNamespace(create=_create)),
+    )
+
+    with use_lane(LANE_BACKFILL):
+        await classifier.classify_message("lane text")
+
+    assert classifier.ai_gateway.in_flight == 0
+    assert classifier.ai_gateway.lanes[LANE_BACKFILL].acquired == 1
+    assert classifier.ai_gateway.lanes[LANE_LIVE].acquired == 0
+
+
+@pytest.mark.asyncio
+async def test_classify_message_open_circuit_fails_fast_and_probe_closes_it(monkeypatch):
+    calls = {"count": 0}
+    mode = {"fail": True}
+
+    async def _create(**_kwargs):
+        calls["count"] += 1
+        if mode["fail"]:
+            raise asyncio.TimeoutError()
+        return classifier_response('{"is_task": false, "confidence": 0.9, "reason": "chat"}')
+
+    async def _sleep(_seconds):
+        return None
+
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, clock=lambda: now[0])
+    monkeypatch.setattr(classifier, "circuit_breaker", breaker)
+    monkeypatch.setattr(classifier.asyncio, "sleep", _sleep)
+    monkeypatch.setattr(
+        classifier,
+        "client",
+        SimpleNamespace(messages=SimpleNamespace(create=_create)),
+    )
+
+    with pytest.raises(AITransientError):
+        await classifier.classify_message("first")
+    assert calls["count"] == 2  # tripped after the second attempt, no third inline retry
+
+    with pytest.raises(AICircuitOpenError):
+        await classifier.classify_message("second")
+    assert calls["count"] == 2
+
+    now[0] = 60.0
+    with pytest.raises(AITransientError):
+        await classifier.classify_message("probe fails")
+    assert calls["count"] == 3  # single probe attempt
+    assert breaker.is_open
+
+    now[0] = 120.0
+    mode["fail"] = False
+    result = await classifier.classify_message("probe succeeds")
+    assert result["is_task"] is False
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_streaming_classification_reports_partials_and_returns_full_result(monkeypatch):
+    response = (
+        '{"is_task": true, "confidence": 0.93, "data": {"amount_total": 80, '
+        '"fan_link": "https://fansly.com/a", "duration": "5 minutes", "priority": "high"}}'
+    )
+    stream = FakeMessageStream(response)
+    monkeypatch.setattr(classifier, "client", make_stream_client(stream))
+    partials = []
+
+    async def _on_partial(members):
+        partials.append(members)
+
+    result = await classifier.classify_message("stream text", on_partial=_on_partial)
+
+    assert result["is_task"] is True
+    assert result["data"]["amount_total"] == 80.0
+    assert partials[0] == {"is_task": True, "confidence": 0.93}
+    assert partials[-1]["data"]["priority"] == "high"
+    assert len(partials) == 5  # confidence + four data members
+
+
+@pytest.mark.asyncio
+async def test_streaming_stops_early_for_non_brief(monkeypatch):
+    response = '{"is_task": false, "confidence": 0.97, "reason": "' + "обычное сообщение " * 20 + '"}'
+    stream = FakeMessageStream(response)
+    monkeypatch.setattr(classifier, "client", make_stream_client(stream))
+
+    async def _on_partial(_members):
+        raise AssertionError("non-briefs must not produce partial cards")
+
+    result = await classifier.classify_message("chat text", on_partial=_on_partial)
+
+    assert result == {"is_task": False, "confidence": 0.97, "reason": "не бриф"}
+    assert stream.consumed < len(response) // 2
+    assert stream.closed
+
+
+def _cascade_client(answers_by_model, calls):
+    async def _create(**kwargs):
+        calls.append(kwargs["model"])
+        return classifier_response(answers_by_model[kwargs["model"]], input_tokens=100, output_tokens=40)
+
+    return SimpleNamespace(messages=SimpleNamespace(create=_create))
+
+
+@pytest.mark.asyncio
+async def test_cascade_keeps_a_confident_fast_tier_answer(monkeypatch):
+    calls = []
+    monkeypatch.setattr(env, "ai_cascade_model", "claude-haiku-4-5")
+    monkeypatch.setattr(runtime, "ai_confidence_threshold", 0.7)
+    monkeypatch.setattr(
+        classifier,
+        "client",
+        _cascade_client({"claude-haiku-4-5": '{"is_task": false, "confidence": 0.95, "reason": "chat"}'}, calls),
+    )
+
+    result = await classifier.classify_message("привет всем")
+
+    assert result == {"is_task": False, "confidence": 0.95, "reason": "chat"}
+    assert calls == ["claude-haiku-4-5"]
+    assert (cascade_stats.stats.accepted, cascade_stats.stats.escalated) == (1, 0)
+    assert usage_meter.by_model["claude-haiku-4-5"].calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cascade_escalates_ambiguous_answer_to_main_model(monkeypatch):
+    calls = []
+    monkeypatch.setattr(env, "ai_cascade_model", "claude-haiku-4-5")
+    monkeypatch.setattr(runtime, "ai_confidence_threshold", 0.7)
+    monkeypatch.setattr(runtime, "ai_model", "claude-sonnet-4-5-20250929")
+    monkeypatch.setattr(
+        classifier,
+        "client",
+        _cascade_client(
+            {
+                "claude-haiku-4-5": '{"is_task": false, "confidence": 0.62, "reason": "unsure"}',
+                "claude-sonnet-4-5-20250929": '{"is_task": false, "confidence": 0.9, "reason": "chat"}',
+            },
+            calls,
+        ),
+    )
+
+    result = await classifier.classify_message("может быть бриф")
+
+    assert result == {"is_task": False, "confidence": 0.9, "reason": "chat"}
+    assert calls == ["claude-haiku-4-5", "claude-sonnet-4-5-20250929"]
+    assert cascade_stats.stats.escalated_ambiguous == 1
+    assert cascade_stats.stats.hit_rate == 0.0
+
+
+def _two_stage_client(answers_by_tool, calls):
+    async def _create(**kwargs):
+        tool = kwargs["tool_choice"]["name"]
+        calls.append((tool, kwargs["max_tokens"]))
+        content = [SimpleNamespace(type="tool_use", name=tool, input=answers_by_tool[tool])]
+        return SimpleNamespace(content=content, usage=SimpleNamespace(input_tokens=80, output_tokens=20))
+
+    return SimpleNamespace(messages=SimpleNamespace(create=_create))
+
+
+@pytest.mark.asyncio
+async def test_two_stage_skips_extraction_for_non_brief_verdict(monkeypatch):
+    calls = []
+    monkeypatch.setattr(env, "ai_two_stage", True)
+    monkeypatch.setattr(
+        classifier,
+        "client",
+        _two_stage_client({"record_verdict": {"is_task": False, "confidence": 0.97, "reason": "болтовня"}}, calls),
+    )
+
+    result = await classifier.classify_message("завтра снимаю")
+
+    assert result == {"is_task": False, "confidence": 0.97, "reason": "болтовня"}
+    assert calls == [("record_verdict", AI_GATE_MAX_TOKENS)]
+
+
+@pytest.mark.asyncio
+async def test_two_stage_extracts_fields_after_brief_verdict(monkeypatch):
+    calls = []
+    monkeypatch.setattr(env, "ai_two_stage", True)
+    monkeypatch.setattr(
+        classifier,
+        "client",
+        _two_stage_client(
+            {
+                "record_verdict": {"is_task": True, "confidence": 0.9},
+                "record_classification": {
+                    "is_task": True,
+                    "confidence": 0.93,
+                    "data": {"fan_name": "Josh", "amount_total": 80},
+                },
+            },
+            calls,
+        ),
+    )
+
+    result = await classifier.classify_message("📦 кастом для Josh, 80$")
+
+    assert result["is_task"] is True
+    assert result["data"]["fan_name"] == "Josh"
+    assert result["data"]["amount_total"] == 80.0
+    assert [tool for tool, _max_tokens in calls] == ["record_verdict", "record_classification"]
+    assert usage_meter.stats.calls == 2
+    # The combined answer is cached: a repeat costs no further calls.
+    assert await classifier.classify_message("📦 кастом для Josh, 80$") == result
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_first_answer_wins(monkeypatch):
+    calls = []
+
+    async def _create(**_kwargs):
+        calls.append(len(calls))
+        if len(calls) == 1:
+            await asyncio.sleep(5)  # the original request hangs
+        return classifier_response('{"is_task": false, "confidence": 0.9, "reason": "chat"}')
+
+    monkeypatch.setattr(env, "ai_hedge_requests", True)
+    monkeypatch.setattr(classifier, "client", SimpleNamespace(messages=SimpleNamespace(create=_create)))
+    kind = (runtime.ai_model, "record_classification", False)
+    for _ in range(latency_tracker.min_samples):
+        latency_tracker.record(kind, 0.05)
+
+    result = await asyncio.wait_for(classifier.classify_message("text"), timeout=2)
+
+    assert result == {"is_task": False, "confidence": 0.9, "reason": "chat"}
+    assert len(calls) == 2
+    assert (latency_tracker.hedges.hedged, latency_tracker.hedges.hedge_wins) == (1, 1)
+    assert ai_gateway.in_flight == 0
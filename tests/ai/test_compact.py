@@ -0,0 +1,53 @@
+from ai.classifier import _normalize_classifier_result
+from ai.compact import expand_compact, to_compact
+
+
+def test_compact_brief_expands_to_normalized_result():
+    payload = {"t": True, "c": 0.95, "fl": "https://fansly.com/tyson/posts", "pl": "f", "at": 80, "pr": "h"}
+
+    result = _normalize_classifier_result(expand_compact(payload))
+
+    assert result["is_task"] is True
+    assert result["confidence"] == 0.95
+    assert result["data"]["platform"] == "fansly"
+    assert result["data"]["priority"] == "high"
+    assert result["data"]["amount_total"] == 80.0
+    assert result["data"]["deadline"] is None
+    assert result["data"]["notes"] is None
+
+
+def test_brief_with_every_field_omitted_is_valid_and_defaults_priority():
+    result = _normalize_classifier_result(expand_compact({"t": True, "c": 0.8}))
+
+    assert result["data"]["priority"] == "medium"
+    assert all(value is None for key, value in result["data"].items() if key != "priority")
+
+
+def test_long_keys_pass_through_unchanged():
+    legacy = {"is_task": False, "confidence": 0.9, "reason": "chat"}
+
+    assert expand_compact(legacy) == legacy
+    assert expand_compact({"t": False, "c": 0.9, "r": "chat"}) == legacy
+
+
+def test_partial_stream_members_expand():
+    assert expand_compact({"t": True, "c": 0.9, "td": "2026-02-13"}) == {
+        "is_task": True,
+        "confidence": 0.9,
+        "data": {"task_date": "2026-02-13"},
+    }
+
+
+def test_to_compact_round_trips_and_omits_nulls_and_default_priority():
+    result = _normalize_classifier_result(
+        {
+            "is_task": True,
+            "confidence": 0.9,
+            "data": {"platform": "onlyfans", "priority": "medium", "fan_name": "Josh", "amount_paid": 0},
+        }
+    )
+
+    compact = to_compact(result)
+
+    assert compact == {"t": True, "c": 0.9, "pl": "o", "fn": "Josh", "ap": 0.0}
+    assert _normalize_classifier_result(expand_compact(compact)) == result
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from ai import gateway as ai_gateway_module
+from ai.gateway import (
+    LANE_BACKFILL,
+    LANE_EDIT,
+    LANE_LIVE,
+    LANE_RETRY,
+    AIGateway,
+    current_lane,
+    use_lane,
+)
+
+
+def test_use_lane_sets_and_restores_context_lane():
+    assert current_lane() == LANE_LIVE
+    with use_lane(LANE_BACKFILL):
+        assert current_lane() == LANE_BACKFILL
+    assert current_lane() == LANE_LIVE
+
+    with pytest.raises(ValueError):
+        with use_lane("bulk"):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_by_lane_priority():
+    gateway = AIGateway(max_in_flight=1, requests_per_minute=0, tokens_per_minute=0)
+    order: list[str] = []
+    blocker = await gateway.acquire(LANE_LIVE, 10)
+    assert blocker == 0.0
+
+    async def _call(lane: str):
+        async with gateway.slot(10, lane=lane):
+            order.append(lane)
+
+    tasks = [
+        asyncio.create_task(_call(lane))
+        for lane in (LANE_BACKFILL, LANE_RETRY, LANE_EDIT, LANE_LIVE)
+    ]
+    await asyncio.sleep(0)
+    assert gateway.queued == 4
+
+    gateway.release(10, None)
+    await asyncio.gather(*tasks)
+
+    assert order == [LANE_LIVE, LANE_EDIT, LANE_RETRY, LANE_BACKFILL]
+    assert gateway.in_flight == 0
+    assert gateway.lanes[LANE_BACKFILL].acquired == 1
+    assert gateway.lanes[LANE_BACKFILL].max_wait_seconds >= gateway.lanes[LANE_LIVE].max_wait_seconds
+
+
+@pytest.mark.asyncio
+async def test_requests_per_minute_bucket_delays_until_refill():
+    now = [0.0]
+    gateway = AIGateway(
+        max_in_flight=10,
+        requests_per_minute=60,
+        tokens_per_minute=0,
+        clock=lambda: now[0],
+    )
+    gateway._requests.level = 1
+
+    assert await gateway.acquire(LANE_RETRY, 1) == 0.0
+    waiter = asyncio.create_task(gateway.acquire(LANE_RETRY, 1))
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+
+    now[0] = 1.0  # one request refilled
+    await asyncio.sleep(1.1)
+    assert await waiter == 1.0
+    assert gateway.lanes[LANE_RETRY].avg_wait_seconds == 0.5
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_is_corrected_with_actual_usage():
+    gateway = AIGateway(max_in_flight=2, requests_per_minute=0, tokens_per_minute=1000)
+
+    async with gateway.slot(800) as ticket:
+        ticket.actual_tokens = 100
+
+    assert gateway._tokens.level == pytest.approx(900, abs=1)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    gateway = AIGateway(max_in_flight=1, requests_per_minute=0, tokens_per_minute=0)
+    await gateway.acquire(LANE_LIVE, 1)
+
+    waiter = asyncio.create_task(gateway.acquire(LANE_BACKFILL, 1))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    gateway.release(1, None)
+    assert gateway.in_flight == 0
+    assert gateway.queued == 0
+    assert await gateway.acquire(LANE_LIVE, 1) == 0.0
+
+
+def test_shared_gateway_reloads_limits_from_env(monkeypatch):
+    monkeypatch.setattr(ai_gateway_module.env, "ai_max_in_flight", 7)
+    ai_gateway_module.ai_gateway.reset()
+
+    assert ai_gateway_module.ai_gateway.max_in_flight == 7
+
+
+@pytest.mark.asyncio
+async def test_try_acquire_only_takes_a_free_slot():
+    gateway = AIGateway(max_in_flight=2, requests_per_minute=0, tokens_per_minute=0)
+
+    assert gateway.try_acquire(LANE_LIVE, 10) is True
+    assert gateway.try_acquire(LANE_LIVE, 10) is True
+    assert gateway.try_acquire(LANE_LIVE, 10) is False
+    gateway.release(10, None)
+    assert gateway.in_flight == 1
@@ -0,0 +1,52 @@
+import pytest
+
+from ai.latency import LatencyTracker
+from core.config import env
+from core.constants import AI_API_TIMEOUT, AI_HEDGE_MAX_RATE, AI_HEDGE_RATE_WINDOW, AI_MIN_API_TIMEOUT
+
+_KIND = ("claude-sonnet-4-5-20250929", "record_classification", False)
+
+
+def test_timeout_follows_observed_p99_within_bounds():
+    tracker = LatencyTracker(min_samples=10)
+    assert tracker.timeout(_KIND) == AI_API_TIMEOUT
+
+    for latency in [1.0] * 9 + [4.0]:
+        tracker.record(_KIND, latency)
+    assert tracker.percentile(_KIND, 95) == 4.0
+    assert tracker.timeout(_KIND) == 8.0
+
+    fast = LatencyTracker(min_samples=1)
+    fast.record(_KIND, 0.2)
+    assert fast.timeout(_KIND) == AI_MIN_API_TIMEOUT
+
+    slow = LatencyTracker(min_samples=1)
+    slow.record(_KIND, 25.0)
+    assert slow.timeout(_KIND) == AI_API_TIMEOUT
+
+
+def test_hedging_needs_the_flag_samples_and_a_non_streamed_call(monkeypatch):
+    tracker = LatencyTracker(min_samples=2)
+    tracker.record(_KIND, 1.0)
+    tracker.record(_KIND, 3.0)
+    streamed = (*_KIND[:2], True)
+    tracker.record(streamed, 1.0)
+    tracker.record(streamed, 1.0)
+
+    assert tracker.hedge_delay(_KIND) is None
+    monkeypatch.setattr(env, "ai_hedge_requests", True)
+    assert tracker.hedge_delay(_KIND) == 3.0
+    assert tracker.hedge_delay(streamed) is None
+
+
+def test_hedge_rate_is_capped():
+    tracker = LatencyTracker()
+    allowed = 0
+    for _ in range(AI_HEDGE_RATE_WINDOW):
+        hedged = tracker.allow_hedge()
+        allowed += hedged
+        tracker.record_call(hedged=hedged)
+
+    assert allowed == int(AI_HEDGE_MAX_RATE * AI_HEDGE_RATE_WINDOW)
+    assert tracker.hedges.capped == AI_HEDGE_RATE_WINDOW - allowed
+    assert tracker.hedges.hedge_rate == pytest.approx(AI_HEDGE_MAX_RATE)
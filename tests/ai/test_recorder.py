@@ -0,0 +1,51 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from ai import classifier
+from ai.recorder import ClassificationRecorder
+from ai.usage import CallUsage
+from tests.fakes import classifier_response
+
+
+@pytest.mark.asyncio
+async def test_recorder_appends_one_json_line_per_call(tmp_path):
+    path = tmp_path / "calls" / "rec.jsonl"
+    recorder = ClassificationRecorder(str(path))
+    content = [SimpleNamespace(type="tool_use", name="record_classification", input={"is_task": False})]
+
+    for _ in range(2):
+        await recorder.record(
+            params={"model": "m", "messages": [{"role": "user", "content": "привет"}]},
+            text="привет",
+            has_photo=False,
+            content=content,
+            usage=CallUsage(input_tokens=10, output_tokens=5),
+            latency_s=1.25,
+        )
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 2
+    assert lines[0]["user_content"] == "привет"
+    assert lines[0]["latency_ms"] == 1250
+    assert lines[0]["usage"]["input_tokens"] == 10
+    assert lines[0]["content"] == [{"type": "tool_use", "name": "record_classification", "input": {"is_task": False}}]
+
+
+@pytest.mark.asyncio
+async def test_classify_message_records_calls_when_path_is_set(monkeypatch, tmp_path):
+    path = tmp_path / "rec.jsonl"
+    monkeypatch.setattr(classifier.env, "ai_record_path", str(path))
+
+    async def _create(**_kwargs):
+        return classifier_response('{"is_task": false, "confidence": 0.9, "reason": "chat"}', input_tokens=7)
+
+    monkeypatch.setattr(classifier, "client", SimpleNamespace(messages=SimpleNamespace(create=_create)))
+
+    await classifier.classify_message("record me", has_photo=True)
+
+    entry = json.loads(path.read_text(encoding="utf-8"))
+    assert entry["text"] == "record me" and entry["has_photo"] is True
+    assert entry["user_content"].endswith("record me")
+    assert entry["content"][0]["input"]["reason"] == "chat"
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from ai.single_flight import SingleFlight, message_flight_key
+
+
+def test_message_flight_key_tracks_identity_and_text():
+    key = message_flight_key(-100, 5, "📦 Заказ\nОплата 80$", False)
+
+    assert key[:2] == (-100, 5)
+    assert message_flight_key(-100, 5, "📦 Заказ  \r\nОплата 80$\n", False) == key
+    assert message_flight_key(-100, 5, "📦 Заказ\nОплата 90$", False) != key
+    assert message_flight_key(-100, 5, "📦 Заказ\nОплата 80$", True) != key
+    assert message_flight_key(-100, 6, "📦 Заказ\nОплата 80$", False) != key
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call_and_get_copies():
+    flights = SingleFlight()
+    release = asyncio.Event()
+    calls = {"count": 0}
+
+    async def _classify():
+        calls["count"] += 1
+        await release.wait()
+        return {"is_task": True, "data": {"fan_name": "A"}}
+
+    key = message_flight_key(1, 2, "text", False)
+    callers = [asyncio.create_task(flights.do(key, _classify)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert flights.in_flight == 1
+
+    release.set()
+    results = await asyncio.gather(*callers)
+
+    assert calls["count"] == 1
+    assert flights.stats.started == 1
+    assert flights.stats.joined == 2
+    assert flights.in_flight == 0
+    results[1]["data"]["fan_name"] = "changed"
+    assert results[0]["data"]["fan_name"] == "A"
+    assert results[2]["data"]["fan_name"] == "A"
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_all_callers_and_next_call_starts_fresh():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def _fail():
+        await release.wait()
+        raise RuntimeError("api down")
+
+    key = message_flight_key(1, 2, "text", False)
+    callers = [asyncio.create_task(flights.do(key, _fail)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    outcomes = await asyncio.gather(*callers, return_exceptions=True)
+
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+
+    async def _ok():
+        return {"is_task": False}
+
+    assert await flights.do(key, _ok) == {"is_task": False}
+    assert flights.stats.started == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_joined_callers():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def _classify():
+        await release.wait()
+        return {"is_task": False}
+
+    key = message_flight_key(1, 2, "text", False)
+    leader = asyncio.create_task(flights.do(key, _classify))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flights.do(key, _classify))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    release.set()
+
+    assert await follower == {"is_task": False}
+    with pytest.raises(asyncio.CancelledError):
+        await leader
@@ -0,0 +1,46 @@
+from ai.stream_parser import IncrementalObjectScanner
+
+RESPONSE = (
+    '{"is_task": true, "confidence": 0.95, '
+    '"data": {"fan_link": "https://fansly.com/a", "amount_total": 80, "notes": null}}'
+)
+
+
+def _feed_in_chunks(scanner: IncrementalObjectScanner, text: str, size: int) -> list:
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(scanner.feed(text[start:start + size]))
+    return events
+
+
+def test_reports_members_once_complete_in_stream_order():
+    scanner = IncrementalObjectScanner()
+
+    events = _feed_in_chunks(scanner, RESPONSE, 3)
+
+    assert events == [
+        (("is_task",), True),
+        (("confidence",), 0.95),
+        (("data", "fan_link"), "https://fansly.com/a"),
+        (("data", "amount_total"), 80),
+        (("data", "notes"), None),
+    ]
+    assert scanner.done and not scanner.failed
+    assert scanner.members["data"]["amount_total"] == 80
+
+
+def test_numbers_wait_for_delimiter():
+    scanner = IncrementalObjectScanner()
+
+    assert scanner.feed('{"is_task": false, "confidence": 0.9') == [(("is_task",), False)]
+    assert scanner.feed("5") == []
+    assert scanner.feed(', "reason"') == [(("confidence",), 0.95)]
+
+
+def test_tolerates_leading_fence_and_flags_garbage():
+    fenced = IncrementalObjectScanner()
+    assert _feed_in_chunks(fenced, "```json\n" + RESPONSE + "\n```", 5)[0] == (("is_task",), True)
+
+    broken = IncrementalObjectScanner()
+    broken.feed("{is_task: true}")
+    assert broken.failed
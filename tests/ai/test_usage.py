@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+
+from ai.usage import CallUsage, UsageMeter, estimate_cost_usd, extract_usage
+
+
+def test_extract_usage_reads_cache_fields_and_tolerates_missing():
+    usage = extract_usage(
+        SimpleNamespace(
+            input_tokens=40,
+            cache_read_input_tokens=1500,
+            cache_creation_input_tokens=None,
+            output_tokens=120,
+        )
+    )
+
+    assert usage == CallUsage(
+        input_tokens=40,
+        cache_read_input_tokens=1500,
+        cache_creation_input_tokens=0,
+        output_tokens=120,
+    )
+    assert usage.prompt_tokens == 1540
+    assert extract_usage(None) == CallUsage()
+
+
+def test_usage_meter_aggregates_and_splits_latency_by_cache_read():
+    meter = UsageMeter()
+    meter.record(CallUsage(input_tokens=50, cache_creation_input_tokens=1500, output_tokens=100), 4.0)
+    meter.record(CallUsage(input_tokens=50, cache_read_input_tokens=1500, output_tokens=100), 2.0)
+    meter.record(CallUsage(input_tokens=50, cache_read_input_tokens=1500, output_tokens=100))
+
+    stats = meter.stats
+    assert stats.calls == 3
+    assert stats.cache_read_calls == 2
+    assert stats.output_tokens == 300
+    assert stats.cache_read_ratio == 3000 / 4650
+    assert stats.avg_cache_read_latency == 2.0
+    assert stats.avg_uncached_latency == 4.0
+
+
+def test_usage_meter_splits_by_model_and_estimates_cost():
+    meter = UsageMeter()
+    meter.record(
+        CallUsage(input_tokens=1000, cache_read_input_tokens=10_000, output_tokens=200),
+        0.5,
+        model="claude-haiku-4-5",
+    )
+    meter.record(CallUsage(input_tokens=1000, output_tokens=200), 2.0, model="claude-sonnet-4-5-20250929")
+
+    assert meter.stats.calls == 2
+    haiku = meter.by_model["claude-haiku-4-5"]
+    assert (haiku.calls, haiku.avg_latency) == (1, 0.5)
+    assert estimate_cost_usd(haiku, "claude-haiku-4-5") == pytest.approx((1000 * 1 + 10_000 * 0.1 + 200 * 5) / 1e6)
+    sonnet = meter.by_model["claude-sonnet-4-5-20250929"]
+    assert estimate_cost_usd(sonnet, "claude-sonnet-4-5-20250929") == pytest.approx((1000 * 3 + 200 * 15) / 1e6)
+    assert estimate_cost_usd(sonnet, "some-other-model") is None
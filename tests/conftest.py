@@ -7,8 +7,21 @@ from pathlib import Path
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from ai.backends import reset_local_backend_stats
+from ai.backpressure import load_shedder
+from ai.cache import classification_cache
+from ai.cascade import cascade_stats
+from ai.circuit_breaker import circuit_breaker
+from ai.gateway import ai_gateway
+from ai.latency import latency_tracker
+from ai.single_flight import classification_flights
+from ai.usage import usage_meter
 from core.config import env, roles, runtime
+from core.prefilter_model import reset_prefilter_model
 from db.models import Base
+from services.duplicate_index import brief_fingerprints
+from services.edit_debounce import edit_debouncer
+from services.sender_budget import sender_budget
 
 
 @pytest.fixture(autouse=True)
@@ -18,6 +31,22 @@ def _reset_global_singletons():
         "anthropic_api_key": env.anthropic_api_key,
         "db_path": env.db_path,
         "log_level": env.log_level,
+        "ai_max_in_flight": env.ai_max_in_flight,
+        "ai_requests_per_minute": env.ai_requests_per_minute,
+        "ai_tokens_per_minute": env.ai_tokens_per_minute,
+        "ai_streaming_cards": env.ai_streaming_cards,
+        "edit_debounce_seconds": env.edit_debounce_seconds,
+        "ai_record_path": env.ai_record_path,
+        "ai_cascade_model": env.ai_cascade_model,
+        "ai_two_stage": env.ai_two_stage,
+        "ai_hedge_requests": env.ai_hedge_requests,
+        "ai_sender_burst": env.ai_sender_burst,
+        "ai_sender_per_hour": env.ai_sender_per_hour,
+        "ai_load_shedding": env.ai_load_shedding,
+        "db_profile": env.db_profile,
+        "db_pool_size": env.db_pool_size,
+        "duplicate_detection": env.duplicate_detection,
+        "prefilter_model_path": env.prefilter_model_path,
         "web_enabled": env.web_enabled,
         "web_host": env.web_host,
         "web_port": env.web_port,
@@ -37,6 +66,22 @@ def _reset_global_singletons():
     env.anthropic_api_key = env_snapshot["anthropic_api_key"]
     env.db_path = env_snapshot["db_path"]
     env.log_level = env_snapshot["log_level"]
+    env.ai_max_in_flight = env_snapshot["ai_max_in_flight"]
+    env.ai_requests_per_minute = env_snapshot["ai_requests_per_minute"]
+    env.ai_tokens_per_minute = env_snapshot["ai_tokens_per_minute"]
+    env.ai_streaming_cards = env_snapshot["ai_streaming_cards"]
+    env.edit_debounce_seconds = env_snapshot["edit_debounce_seconds"]
+    env.ai_record_path = env_snapshot["ai_record_path"]
+    env.ai_cascade_model = env_snapshot["ai_cascade_model"]
+    env.ai_two_stage = env_snapshot["ai_two_stage"]
+    env.ai_hedge_requests = env_snapshot["ai_hedge_requests"]
+    env.ai_sender_burst = env_snapshot["ai_sender_burst"]
+    env.ai_sender_per_hour = env_snapshot["ai_sender_per_hour"]
+    env.ai_load_shedding = env_snapshot["ai_load_shedding"]
+    env.db_profile = env_snapshot["db_profile"]
+    env.db_pool_size = env_snapshot["db_pool_size"]
+    env.duplicate_detection = env_snapshot["duplicate_detection"]
+    env.prefilter_model_path = env_snapshot["prefilter_model_path"]
     env.web_enabled = env_snapshot["web_enabled"]
     env.web_host = env_snapshot["web_host"]
     env.web_port = env_snapshot["web_port"]
@@ -69,6 +114,37 @@ def _reset_global_singletons():
     roles.teamlead_usernames = list(roles_snapshot["teamlead_usernames"])
 
 
+@pytest.fixture(autouse=True)
+def _reset_ai_state():
+    classification_cache.reset()
+    usage_meter.reset()
+    ai_gateway.reset()
+    circuit_breaker.reset()
+    classification_flights.reset()
+    reset_local_backend_stats()
+    edit_debouncer.reset()
+    cascade_stats.reset()
+    latency_tracker.reset()
+    sender_budget.reset()
+    load_shedder.reset()
+    reset_prefilter_model()
+    brief_fingerprints.reset()
+    yield
+    classification_cache.reset()
+    usage_meter.reset()
+    ai_gateway.reset()
+    circuit_breaker.reset()
+    classification_flights.reset()
+    reset_local_backend_stats()
+    edit_debouncer.reset()
+    cascade_stats.reset()
+    latency_tracker.reset()
+    sender_budget.reset()
+    load_shedder.reset()
+    reset_prefilter_model()
+    brief_fingerprints.reset()
+
+
 @pytest.fixture
 async def db_engine(tmp_path: Path):
     db_file = tmp_path / "test.sqlite3"
@@ -0,0 +1,58 @@
+from core.brief_diff import EDIT_SECTION, EDIT_STRUCTURAL, EDIT_TRIVIAL, diff_brief_edit
+
+BRIEF = (
+    "📦 Описание заказа\n"
+    "Дата: 18.02.2026\n"
+    "Покупатель: https://fansly.com/tyson0892/posts\n"
+    "Оплата:\n"
+    "80$\n"
+    "Длительность: 5 минут\n"
+    "🎥 Описание задания:\n"
+    "Медленный стриптиз у зеркала.\n"
+    "📅 Дедлайн: До 20.02\n"
+)
+
+
+def test_whitespace_and_punctuation_edits_are_trivial():
+    edited = BRIEF.replace("зеркала.", "зеркала!!").replace("Дата: ", "Дата:   ") + "\n\n"
+
+    assert diff_brief_edit(BRIEF, edited).kind == EDIT_TRIVIAL
+
+
+def test_punctuation_inside_numbers_is_a_change():
+    assert diff_brief_edit("Оплата: 12.5$", "Оплата: 125$").kind != EDIT_TRIVIAL
+
+
+def test_currency_symbol_edit_is_a_change():
+    brief = BRIEF.replace("80$", "$100")
+    edit = diff_brief_edit(brief, brief.replace("$100", "€100"))
+
+    assert (edit.kind, edit.field, edit.value) == (EDIT_SECTION, "payment", "€100")
+
+
+def test_emoji_only_edits_are_trivial():
+    added_emoji = BRIEF.replace("зеркала.", "зеркала 🔥")
+    swapped_marker = BRIEF.replace("📅 Дедлайн", "🔥 Дедлайн")
+
+    assert diff_brief_edit(BRIEF, added_emoji).kind == EDIT_TRIVIAL
+    assert diff_brief_edit(BRIEF, swapped_marker).kind == EDIT_TRIVIAL
+    assert diff_brief_edit("Дата: 18.02 ❤", "Дата: 18.02 ❤\ufe0f").kind == EDIT_TRIVIAL
+
+
+def test_single_field_edit_is_a_section_edit():
+    deadline = diff_brief_edit(BRIEF, BRIEF.replace("До 20.02", "До 22.02"))
+    payment = diff_brief_edit(BRIEF, BRIEF.replace("80$", "100$"))
+
+    assert (deadline.kind, deadline.field, deadline.value) == (EDIT_SECTION, "deadline", "До 22.02")
+    assert (payment.kind, payment.field, payment.value) == (EDIT_SECTION, "payment", "100$")
+
+
+def test_body_or_multi_field_edits_are_structural():
+    body = BRIEF.replace("Медленный стриптиз", "Быстрый танец")
+    two_fields = BRIEF.replace("80$", "100$").replace("5 минут", "7 минут")
+    new_field = BRIEF + "🔥 Срочность: Высокая\n"
+
+    assert diff_brief_edit(BRIEF, body).kind == EDIT_STRUCTURAL
+    assert diff_brief_edit(BRIEF, two_fields).kind == EDIT_STRUCTURAL
+    assert diff_brief_edit(BRIEF, new_field).kind == EDIT_STRUCTURAL
+    assert diff_brief_edit(None, BRIEF).kind == EDIT_STRUCTURAL
@@ -0,0 +1,82 @@
+from datetime import date
+
+from core.brief_extractor import extract_template_brief
+
+TODAY = date(2026, 2, 15)
+
+TEMPLATE = (
+    "📦 Описание заказа\n"
+    "Дата: 18.02.2026\n"
+    "Покупатель: https://fansly.com/tyson0892/posts\n"
+    "Оплата: 80$\n"
+    "Длительность: 5 минут\n"
+    "🎥 Описание задания:\n"
+    "Медленный стриптиз у зеркала. Потом танец. В конце улыбка в камеру.\n"
+    "👗 Одежда: юбка, топ\n"
+    "📝 Заметки: Имя - Ариан, без музыки\n"
+    "🔥 Срочность: Высокая\n"
+    "📅 Дедлайн: До 20.02\n"
+)
+
+
+def test_extracts_full_template_brief():
+    result = extract_template_brief(TEMPLATE, today=TODAY)
+
+    assert result["is_task"] is True
+    assert result["confidence"] >= 0.9
+    assert result["data"] == {
+        "task_date": "2026-02-18",
+        "deadline": "2026-02-20",
+        "platform": "fansly",
+        "priority": "high",
+        "fan_link": "https://fansly.com/tyson0892/posts",
+        "fan_name": "Ариан",
+        "payment_note": None,
+        "duration": "5 minutes",
+        "description": "Медленный стриптиз у зеркала. Потом танец.",
+        "outfit": "юбка, топ",
+        "notes": "Имя - Ариан, без музыки",
+        "amount_total": 80.0,
+        "amount_paid": 80.0,
+        "amount_remaining": 0.0,
+    }
+
+
+def test_optional_fields_default_like_the_classifier():
+    text = (
+        "📦 Описание заказа\n"
+        "Дата: 18.02\n"
+        "Ссылка:\n"
+        "https://onlyfans.com/fan123\n"
+        "Оплата: $120\n"
+        "Длительность: 6 кадров\n"
+        "Описание задания: Фото в душе.\n"
+    )
+
+    data = extract_template_brief(text, today=TODAY)["data"]
+
+    assert data["platform"] == "onlyfans"
+    assert data["fan_link"] == "https://onlyfans.com/fan123"
+    assert data["amount_total"] == 120.0
+    assert data["duration"] == "6 frames"
+    assert data["priority"] == "medium"
+    assert data["deadline"] is None
+    assert data["outfit"] is None
+    assert data["notes"] is None
+
+
+def test_defers_to_ai_when_anything_is_uncertain():
+    cases = [
+        TEMPLATE.replace("📦 Описание заказа\n", ""),  # no direct marker
+        TEMPLATE.replace("Оплата: 80$", "Оплата: 100$ аванс + 100$ после"),  # compound payment
+        TEMPLATE.replace("Длительность: 5 минут", "Длительность: около пяти минут"),
+        TEMPLATE.replace("Медленный стриптиз у зеркала. Потом танец. В конце улыбка в камеру.", "Slow tease by the mirror."),
+        TEMPLATE.replace("Высокая", "как можно скорее"),
+        TEMPLATE.replace("До 20.02", "на следующей неделе"),
+        TEMPLATE.replace("Дата: 18.02.2026\n", ""),
+        TEMPLATE + "Оплата: 20$\n",  # duplicated label
+        TEMPLATE + "Ещё https://fansly.com/other\n",  # ambiguous link
+    ]
+
+    for text in cases:
+        assert extract_template_brief(text, today=TODAY) is None, text
@@ -0,0 +1,43 @@
+import random
+
+from core.constants import DELIVERED_KEYWORDS, SHOT_KEYWORDS
+from core.keyword_matcher import (
+    BRIEF_EMOJI,
+    BRIEF_KEYWORD,
+    DIRECT_MARKER,
+    SHOT_KEYWORD,
+    KeywordMatcher,
+    topic_keywords,
+)
+from scripts.bench_keyword_matcher import KEYWORD_LISTS, scan_per_list
+
+
+def test_contained_keywords_are_reported_with_the_longer_match():
+    hits = topic_keywords.scan("📦 Описание заказа\nДедлайн завтра")
+
+    assert hits[DIRECT_MARKER] == {"📦 описание заказа"}
+    assert hits[BRIEF_EMOJI] == {"📦"}
+    assert hits[BRIEF_KEYWORD] == {"описание заказа", "дедлайн"}
+
+
+def test_keyword_overlapping_the_end_of_a_match_is_found():
+    matcher = KeywordMatcher({"a": ["снято"], "b": ["оплата"]})
+
+    assert matcher.scan("СНЯТОПЛАТА") == {"a": {"снято"}, "b": {"оплата"}}
+
+
+def test_prefix_keywords_of_the_same_list_are_all_reported():
+    hits = topic_keywords.scan("Готово!")
+
+    assert hits[SHOT_KEYWORD] == {"готово", "готов"}
+
+
+def test_hits_match_per_list_scans_on_random_keyword_soup():
+    rng = random.Random(19)
+    pieces = [keyword for keywords in KEYWORD_LISTS.values() for keyword in keywords]
+    pieces += [keyword[: len(keyword) // 2 + 1] for keyword in SHOT_KEYWORDS + DELIVERED_KEYWORDS]
+    pieces += [" ", "\n", "x", "О", "E", "12:30"]
+
+    for _ in range(2000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 8)))
+        assert topic_keywords.scan(text) == scan_per_list(text), text
@@ -0,0 +1,50 @@
+import pytest
+
+from core.config import env
+from core.keyword_matcher import topic_keywords
+from core.prefilter_model import (
+    FEATURE_NAMES,
+    PrefilterModel,
+    extract_features,
+    prefilter_model,
+    reset_prefilter_model,
+)
+
+
+def test_extract_features_covers_every_model_feature():
+    text = "Оплата 80$ за 5 минут, https://fansly.com/fan 🎬"
+    features = extract_features(text, topic_keywords.scan(text), sender_admin=True)
+
+    assert set(features) == set(FEATURE_NAMES)
+    assert features["has_keyword"] == features["has_payment_marker"] == features["has_platform_link"] == 1.0
+    assert features["has_emoji"] == 1.0
+    assert features["sender_admin"] == 1.0
+    assert features["sender_model"] == 0.0
+
+
+def test_model_round_trips_through_json_and_scores():
+    model = PrefilterModel(intercept=-2.0, weights={"has_keyword": 3.0}, threshold=0.5, version="v1")
+    loaded = PrefilterModel.from_json(model.to_json())
+
+    assert loaded == model
+    assert loaded.probability({"has_keyword": 0.0}) == pytest.approx(0.1192, abs=1e-4)
+    assert loaded.probability({"has_keyword": 1.0}) == pytest.approx(0.7311, abs=1e-4)
+
+
+def test_unknown_feature_is_rejected():
+    with pytest.raises(ValueError):
+        PrefilterModel.from_json('{"intercept": 0, "threshold": 0.5, "weights": {"reply_count": 1}}')
+
+
+def test_model_is_loaded_from_env_path_and_bad_files_disable_it(monkeypatch, tmp_path):
+    path = tmp_path / "prefilter.json"
+    path.write_text(PrefilterModel(intercept=0.0, weights={}, threshold=0.3).to_json(), encoding="utf-8")
+    reset_prefilter_model()
+
+    assert prefilter_model() is None
+    monkeypatch.setattr(env, "prefilter_model_path", str(path))
+    assert prefilter_model().threshold == 0.3
+
+    monkeypatch.setattr(env, "prefilter_model_path", str(tmp_path / "missing.json"))
+    assert prefilter_model() is None
+    reset_prefilter_model()
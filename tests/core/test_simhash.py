@@ -0,0 +1,44 @@
+from core.constants import DUPLICATE_MAX_HAMMING
+from core.simhash import fingerprint_tokens, from_hex, hamming, simhash, to_hex
+from scripts.bench_local_extractor import SYNTHETIC_TEMPLATE
+
+BRIEF = SYNTHETIC_TEMPLATE.format(day=3, n=5, amount=120, minutes=7)
+DESCRIPTION = "Медленный стриптиз у зеркала, потом танец. Вариант 5."
+
+
+def test_tokens_drop_template_labels_and_fold_yo():
+    tokens = fingerprint_tokens("Оплата: 120$\nДедлайн: до пятницы\nЕщё https://fansly.com/fan5")
+
+    assert "оплата" not in tokens and "дедлайн" not in tokens
+    assert tokens[:3] == ["120", "до", "пятницы"]
+    assert "еще" in tokens and "fansly" in tokens
+
+
+def test_repost_and_light_edit_are_near_duplicates():
+    edited = BRIEF.replace("120$", "150$")
+
+    assert simhash(BRIEF) == simhash(BRIEF + "\n")
+    assert hamming(simhash(BRIEF), simhash(edited)) <= DUPLICATE_MAX_HAMMING
+
+
+def test_different_briefs_on_the_same_template_are_not():
+    others = [
+        "Танец в красном белье, крупный план",
+        "Йога на коврике, вид сбоку, без звука",
+        "Разговор с фанатом по имени, поздравление с днём рождения",
+    ]
+    for other in others:
+        distance = hamming(simhash(BRIEF), simhash(BRIEF.replace(DESCRIPTION, other)))
+        assert distance > DUPLICATE_MAX_HAMMING
+
+
+def test_short_text_has_no_fingerprint():
+    assert simhash("Оплата: 50$") is None
+    assert simhash("") is None
+
+
+def test_hex_round_trip_keeps_high_bit():
+    fingerprint = (1 << 63) | 5
+
+    assert to_hex(fingerprint) == "8000000000000005"
+    assert from_hex(to_hex(fingerprint)) == fingerprint
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from db.engine import SQLITE_PROFILES, build_engine, resolve_profile
+from db.models import Base, StatusLog
+from db.repo import task_repo
+
+
+async def _pragma(engine, name: str):
+    async with engine.connect() as conn:
+        return (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+
+
+@pytest.mark.asyncio
+async def test_wal_profile_is_applied_on_every_connection(tmp_path):
+    engine = build_engine(str(tmp_path / "wal.sqlite3"), profile="wal", pool_size=2)
+    try:
+        assert (await _pragma(engine, "journal_mode")).lower() == "wal"
+        assert await _pragma(engine, "synchronous") == 1  # NORMAL
+        assert await _pragma(engine, "busy_timeout") == SQLITE_PROFILES["wal"]["busy_timeout"]
+        assert await _pragma(engine, "foreign_keys") == 1
+        assert await _pragma(engine, "temp_store") == 2  # MEMORY
+        assert await _pragma(engine, "cache_size") == SQLITE_PROFILES["wal"]["cache_size"]
+        assert engine.pool.size() == 2
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_default_profile_keeps_sqlite_defaults(tmp_path):
+    engine = build_engine(str(tmp_path / "plain.sqlite3"), profile="default", pool_size=1)
+    try:
+        assert (await _pragma(engine, "journal_mode")).lower() == "delete"
+        assert await _pragma(engine, "foreign_keys") == 0
+    finally:
+        await engine.dispose()
+
+
+def test_unknown_profile_falls_back_to_wal():
+    assert resolve_profile("turbo") == ("wal", SQLITE_PROFILES["wal"])
+
+
+@pytest.mark.asyncio
+async def test_foreign_keys_still_allow_task_deletion(tmp_path):
+    engine = build_engine(str(tmp_path / "fk.sqlite3"), profile="wal", pool_size=1)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_maker() as session:
+            task, _ = await task_repo.create_task(session, message_id=1, chat_id=-1001, raw_text="raw")
+            await session.commit()
+            await task_repo.delete_task(session, task)
+            await session.commit()
+
+            session.add(StatusLog(task_id=999, to_status="draft"))
+            with pytest.raises(IntegrityError):
+                await session.commit()
+    finally:
+        await engine.dispose()
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta, timezone
 import pytest
 from sqlalchemy import select
 
+from core.constants import RETRY_PRIORITY_LOW
 from db.models import AIRetryQueue
 from db.repo import retry_repo
 
@@ -107,3 +108,52 @@ async def test_reschedule_and_delete_retry(db_session):
         await db_session.execute(select(AIRetryQueue).where(AIRetryQueue.id == row.id))
     ).scalar_one_or_none()
     assert deleted is None
+
+
+@pytest.mark.asyncio
+async def test_low_priority_retries_come_after_normal_ones(db_session):
+    now = datetime.now(timezone.utc)
+    await retry_repo.enqueue_ai_retry(
+        db_session,
+        chat_id=1,
+        message_id=1,
+        topic_id=None,
+        raw_text="flood",
+        has_photo=False,
+        next_retry_at=(now - timedelta(minutes=5)).isoformat(),
+        priority=RETRY_PRIORITY_LOW,
+    )
+    await retry_repo.enqueue_ai_retry(
+        db_session,
+        chat_id=1,
+        message_id=2,
+        topic_id=None,
+        raw_text="brief",
+        has_photo=False,
+        next_retry_at=(now - timedelta(minutes=1)).isoformat(),
+    )
+
+    due = await retry_repo.get_due_ai_retries(db_session, now_iso=now.isoformat())
+
+    assert [row.message_id for row in due] == [2, 1]
+    assert await retry_repo.count_due_ai_retries(db_session, now_iso=now.isoformat()) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_due_retries_compares_instants_across_offsets(db_session):
+    common = dict(topic_id=777, raw_text="x", has_photo=False, sender_username="u", error_detail="E")
+    # 11:30+03:00 is 08:30 UTC: due at 10:00 UTC although it sorts later as text.
+    await retry_repo.enqueue_ai_retry(
+        db_session, chat_id=1, message_id=1, next_retry_at="2026-02-18T11:30:00+03:00", **common
+    )
+    await retry_repo.enqueue_ai_retry(
+        db_session, chat_id=1, message_id=2, next_retry_at="2026-02-18T09:00:00+00:00", **common
+    )
+    await retry_repo.enqueue_ai_retry(
+        db_session, chat_id=1, message_id=3, next_retry_at="2026-02-18T10:30:00+00:00", **common
+    )
+
+    due = await retry_repo.get_due_ai_retries(db_session, now_iso="2026-02-18T10:00:00+00:00")
+
+    assert [row.message_id for row in due] == [1, 2]
+    assert due[0].next_retry_at == "2026-02-18T08:30:00+00:00"
@@ -0,0 +1,111 @@
+import asyncio
+import sqlite3
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from core.config import env
+from db.repo import task_repo
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# (name, query, index its plan must use); None accepts any index or the primary key.
+TASK_QUERIES = [
+    ("get_task_by_id", lambda s, ids: task_repo.get_task_by_id(s, ids["task"]), None),
+    ("get_task_by_message", lambda s, ids: task_repo.get_task_by_message(s, -100, 10), "ix_tasks_chat_message"),
+    (
+        "get_task_by_bot_message",
+        lambda s, ids: task_repo.get_task_by_bot_message(s, -100, 500),
+        "ix_tasks_chat_bot_message",
+    ),
+    ("get_active_tasks", lambda s, ids: task_repo.get_active_tasks(s), "ix_tasks_active_deadline"),
+    ("get_tasks_by_status", lambda s, ids: task_repo.get_tasks_by_status(s, "processing"), "ix_tasks_status"),
+    (
+        "get_overdue_tasks",
+        lambda s, ids: task_repo.get_overdue_tasks(s, today="2026-03-01"),
+        "ix_tasks_active_deadline",
+    ),
+    (
+        "get_tasks_due_soon",
+        lambda s, ids: task_repo.get_tasks_due_soon(s, days=3, today="2026-03-01"),
+        "ix_tasks_active_deadline",
+    ),
+    ("get_all_tasks", lambda s, ids: task_repo.get_all_tasks(s), "ix_tasks_created_at"),
+    ("get_finished_tasks_older_than_hours", lambda s, ids: task_repo.get_finished_tasks_older_than_hours(s, 24), None),
+    ("get_task_with_logs", lambda s, ids: task_repo.get_task_with_logs(s, ids["task"]), "ix_status_logs_task_created"),
+    ("get_recent_tasks", lambda s, ids: task_repo.get_recent_tasks(s), "ix_tasks_updated_at"),
+    (
+        "get_recent_brief_fingerprints",
+        lambda s, ids: task_repo.get_recent_brief_fingerprints(s, "2026-02-01T00:00:00+00:00"),
+        "ix_tasks_created_at",
+    ),
+]
+
+
+@pytest.fixture
+async def migrated_db(tmp_path):
+    """Database built by the migrations (not create_all), plus a log of executed SQL."""
+    db_file = tmp_path / "plans.sqlite3"
+    cfg = Config(str(PROJECT_ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    env.db_path = str(db_file)
+    await asyncio.to_thread(command.upgrade, cfg, "head")
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_file}")
+    statements: list[tuple[str, tuple]] = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, parameters, context, executemany: statements.append(
+            (statement, parameters)
+        ),
+    )
+    try:
+        yield db_file, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False), statements
+    finally:
+        await engine.dispose()
+
+
+def _query_plan(db_file: Path, statement: str, parameters: tuple) -> list[str]:
+    conn = sqlite3.connect(db_file)
+    try:
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    finally:
+        conn.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("name", "query", "index"), TASK_QUERIES, ids=[name for name, _, _ in TASK_QUERIES])
+async def test_task_repo_queries_use_an_index(migrated_db, name, query, index):
+    db_file, session_factory, statements = migrated_db
+    async with session_factory() as session:
+        task, _ = await task_repo.create_task(
+            session, message_id=10, chat_id=-100, topic_id=777, priority="medium", deadline="2026-03-02"
+        )
+        await task_repo.update_task_status(session, task, "awaiting_confirmation", 1, "editor")
+        await session.commit()
+        ids = {"task": task.id}
+
+    statements.clear()
+    async with session_factory() as session:
+        await query(session, ids)
+
+    selects = [(sql, params) for sql, params in statements if sql.lstrip().upper().startswith("SELECT")]
+    assert selects
+    plans = [_query_plan(db_file, sql, params) for sql, params in selects]
+    for plan in plans:
+        for step in plan:
+            if step.startswith(("SCAN", "SEARCH")):
+                assert "USING" in step, f"{name}: {step}"
+    if index is not None:
+        assert any(f"INDEX {index}" in step for plan in plans for step in plan), f"{name}: {plans}"
+
+
+def test_every_task_repo_lookup_has_a_plan_check():
+    lookups = {name for name in vars(task_repo) if name.startswith("get_")}
+
+    assert lookups == {name for name, _, _ in TASK_QUERIES}
@@ -126,7 +126,19 @@ async def test_task_queries_by_status_and_deadline(db_session):
 
 
 @pytest.mark.asyncio
-async def test_get_finished_tasks_older_than_hours_handles_invalid_timestamps(db_session, freeze_time):
+async def test_deadline_predicates_compare_iso_dates_across_month_and_year(db_session):
+    for message_id, deadline in ((20, "2026-12-09"), (21, "2026-12-31"), (22, "2027-01-02"), (23, "2027-01-10")):
+        await task_repo.create_task(db_session, **_kwargs(message_id, deadline=deadline))
+
+    overdue = await task_repo.get_overdue_tasks(db_session, today="2026-12-30")
+    due_soon = await task_repo.get_tasks_due_soon(db_session, days=3, today="2026-12-30")
+
+    assert [t.deadline for t in overdue] == ["2026-12-09"]
+    assert [t.deadline for t in due_soon] == ["2026-12-31", "2027-01-02"]
+
+
+@pytest.mark.asyncio
+async def test_get_finished_tasks_older_than_hours_compares_instants(db_session, freeze_time):
     now = datetime(2026, 2, 18, 12, 0, tzinfo=timezone.utc)
     freeze_time(task_repo, now)
 
@@ -136,11 +148,12 @@ async def test_get_finished_tasks_older_than_hours_handles_invalid_timestamps(db
     fresh_task, _ = await task_repo.create_task(db_session, **_kwargs(21, status="finished"))
     fresh_task.finished_at = "2026-02-18T11:30:00+00:00"
 
-    broken_task, _ = await task_repo.create_task(db_session, **_kwargs(22, status="finished"))
-    broken_task.finished_at = "not-a-date"
+    # Sorts after the cutoff as text, but is 09:30 UTC.
+    offset_task, _ = await task_repo.create_task(db_session, **_kwargs(22, status="finished"))
+    offset_task.finished_at = "2026-02-18T12:30:00+03:00"
 
     overdue = await task_repo.get_finished_tasks_older_than_hours(db_session, 2)
-    assert {task.id for task in overdue} == {old_task.id}
+    assert [task.id for task in overdue] == [old_task.id, offset_task.id]
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,23 @@
+from datetime import datetime, timedelta, timezone
+
+from db.types import UtcTimestamp, from_epoch_us, to_epoch_us
+
+
+def test_epoch_conversion_round_trips_in_utc():
+    assert to_epoch_us("1970-01-01T00:00:01+00:00") == 1_000_000
+    assert to_epoch_us("2026-02-18T13:00:00.250000+03:00") == to_epoch_us("2026-02-18T10:00:00.250000+00:00")
+    assert to_epoch_us(datetime(2026, 2, 18, 10)) == to_epoch_us("2026-02-18T10:00:00+00:00")  # naive is UTC
+    assert from_epoch_us(to_epoch_us("2026-02-18T13:00:00.250000+03:00")) == "2026-02-18T10:00:00.250000+00:00"
+    assert datetime.fromisoformat(from_epoch_us(0)) == datetime(1970, 1, 1, tzinfo=timezone.utc)
+    assert to_epoch_us(datetime(2026, 2, 18, tzinfo=timezone(timedelta(hours=-5)))) == to_epoch_us(
+        "2026-02-18T05:00:00+00:00"
+    )
+
+
+def test_utc_timestamp_binds_integers_and_loads_iso_strings():
+    column_type = UtcTimestamp()
+
+    assert column_type.process_bind_param(None, None) is None
+    assert column_type.process_bind_param("2026-02-18T10:00:00+00:00", None) == 1771408800000000
+    assert column_type.process_result_value(1771408800000000, None) == "2026-02-18T10:00:00+00:00"
+    assert column_type.process_result_value(None, None) is None
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from dataclasses import dataclass
 from types import SimpleNamespace
 from typing import Any
@@ -187,6 +188,8 @@ class FakeTask:
     last_reminder_at: str | None = None
     task_date: str | None = None
     raw_text: str | None = None
+    text_fingerprint: str | None = None
+    created_at: str | None = None
     amount_paid: float | None = None
     amount_remaining: float | None = None
     outfit: str | None = None
@@ -194,3 +197,142 @@ class FakeTask:
     description_original: str | None = None
     outfit_original: str | None = None
     notes_original: str | None = None
+
+
+def classifier_content(answer: str) -> list[SimpleNamespace]:
+    """Content blocks for a classifier answer.
+
+    A JSON object becomes the forced `record_classification` tool call; anything
+    else is returned as a plain text block (a model that ignored the tool).
+    """
+    try:
+        payload = json.loads(answer)
+    except ValueError:
+        return [SimpleNamespace(type="text", text=answer)]
+    return [SimpleNamespace(type="tool_use", name="record_classification", input=payload)]
+
+
+def classifier_response(answer: str, **usage: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        content=classifier_content(answer),
+        usage=SimpleNamespace(**usage) if usage else None,
+    )
+
+
+class _AsyncResults:
+    def __init__(self, entries):
+        self._entries = list(entries)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for entry in self._entries:
+            yield entry
+
+
+class FakeBatchesAPI:
+    """In-memory stand-in for `client.messages.batches` (Message Batches API).
+
+    `respond(custom_id, params)` returns the model answer for a request (see
+    `classifier_content`), or one of
+    "errored" / "expired" / "canceled" prefixed with "!" to fail it.
+    """
+
+    def __init__(self, respond, *, polls_until_ended: int = 1):
+        self._respond = respond
+        self._polls_until_ended = polls_until_ended
+        self.created: list[list[dict[str, Any]]] = []
+        self.retrieve_calls: dict[str, int] = {}
+
+    async def create(self, *, requests):
+        requests = list(requests)
+        self.created.append(requests)
+        return SimpleNamespace(id=f"msgbatch_{len(self.created)}")
+
+    def _requests(self, batch_id: str) -> list[dict[str, Any]]:
+        return self.created[int(batch_id.rsplit("_", 1)[1]) - 1]
+
+    async def retrieve(self, batch_id: str):
+        calls = self.retrieve_calls.get(batch_id, 0) + 1
+        self.retrieve_calls[batch_id] = calls
+        total = len(self._requests(batch_id))
+        ended = calls > self._polls_until_ended
+        return SimpleNamespace(
+            id=batch_id,
+            processing_status="ended" if ended else "in_progress",
+            request_counts=SimpleNamespace(
+                processing=0 if ended else total,
+                succeeded=total if ended else 0,
+                errored=0,
+                expired=0,
+                canceled=0,
+            ),
+        )
+
+    async def results(self, batch_id: str):
+        entries = []
+        for request in self._requests(batch_id):
+            answer = self._respond(request["custom_id"], request["params"])
+            if answer.startswith("!"):
+                result = SimpleNamespace(type=answer[1:], error=None)
+            else:
+                result = SimpleNamespace(
+                    type="succeeded",
+                    message=SimpleNamespace(
+                        content=classifier_content(answer),
+                        usage=SimpleNamespace(input_tokens=100, output_tokens=20),
+                    ),
+                )
+            entries.append(SimpleNamespace(custom_id=request["custom_id"], result=result))
+        return _AsyncResults(entries)
+
+
+def make_batch_client(batches: FakeBatchesAPI):
+    return SimpleNamespace(messages=SimpleNamespace(batches=batches))
+
+
+class FakeMessageStream:
+    """Stand-in for `client.messages.stream(...)`: streams the classifier tool input
+    `text` as `input_json_delta` events of `chunk_size` characters."""
+
+    def __init__(self, text: str, chunk_size: int = 8):
+        self._text = text
+        self._chunk_size = chunk_size
+        self.consumed = 0
+        self.closed = False
+        self.current_message_snapshot = SimpleNamespace(
+            usage=SimpleNamespace(input_tokens=40, output_tokens=3)
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc):
+        self.closed = True
+        return False
+
+    def __aiter__(self):
+        return self._events()
+
+    async def _events(self):
+        yield SimpleNamespace(type="message_start")
+        for start in range(0, len(self._text), self._chunk_size):
+            self.consumed = start + self._chunk_size
+            yield SimpleNamespace(
+                type="content_block_delta",
+                delta=SimpleNamespace(
+                    type="input_json_delta",
+                    partial_json=self._text[start:start + self._chunk_size],
+                ),
+            )
+
+    async def get_final_message(self):
+        return SimpleNamespace(
+            content=classifier_content(self._text),
+            usage=SimpleNamespace(input_tokens=40, output_tokens=len(self._text) // 4),
+        )
+
+
+def make_stream_client(stream: FakeMessageStream):
+    return SimpleNamespace(messages=SimpleNamespace(stream=lambda **_params: stream))
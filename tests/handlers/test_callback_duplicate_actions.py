@@ -0,0 +1,63 @@
+import pytest
+
+from core.config import roles
+from handlers.callback_actions import duplicate_actions
+from handlers.callback_actions.common import is_allowed
+from tests.fakes import FakeCallbackQuery, FakeMessage, FakeTask, make_user
+
+
+class _Session:
+    async def commit(self):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_dup_ok_deletes_duplicate_notice():
+    notice = FakeMessage(text="🔁 Похоже на повтор кастома #042", message_id=900)
+    cb = FakeCallbackQuery(data="task:42:dup_ok", message=notice)
+
+    await duplicate_actions.action_dup_ok(cb, FakeTask(id=42), _Session(), cb.from_user, "u", "@u")
+
+    assert notice.deleted is True
+    assert "#042" in cb.answers[0][0]
+
+
+@pytest.mark.asyncio
+async def test_dup_new_reprocesses_original_without_duplicate_check(monkeypatch):
+    original = FakeMessage(text="📦 Описание заказа ...", message_id=202)
+    notice = FakeMessage(text="🔁 Похоже на повтор", message_id=900, reply_to_message=original)
+    cb = FakeCallbackQuery(data="task:42:dup_new", message=notice)
+    session = _Session()
+    calls = []
+
+    async def _process(message, _session, **kwargs):
+        calls.append((message, _session, kwargs))
+
+    monkeypatch.setattr(duplicate_actions, "process_brief", _process)
+
+    await duplicate_actions.action_dup_new(cb, FakeTask(id=42), session, cb.from_user, "u", "@u")
+
+    assert calls == [(original, session, {"check_duplicates": False})]
+    assert notice.deleted is True
+
+
+@pytest.mark.asyncio
+async def test_dup_new_without_original_message_points_to_add(monkeypatch):
+    cb = FakeCallbackQuery(data="task:42:dup_new", message=FakeMessage(text="🔁", message_id=900))
+
+    async def _process(*_args, **_kwargs):
+        raise AssertionError("nothing to process")
+
+    monkeypatch.setattr(duplicate_actions, "process_brief", _process)
+
+    await duplicate_actions.action_dup_new(cb, FakeTask(id=42), _Session(), cb.from_user, "u", "@u")
+
+    assert "/add" in cb.answers[0][0]
+
+
+def test_duplicate_actions_are_for_admins_and_teamleads():
+    roles.admin_ids = [1]
+    roles.model_ids = [2]
+
+    assert is_allowed("dup_new", make_user(1, "admin")) is True
+    assert is_allowed("dup_ok", make_user(2, "model")) is False
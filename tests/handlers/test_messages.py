@@ -160,3 +160,103 @@ async def test_handle_edited_message_updates_existing_task(monkeypatch):
     assert task.outfit_original == "аутфит из скрина"
     assert task.notes_original == "без музыки"
     assert bot.edited_texts and bot.edited_texts[0]["message_id"] == 888
+
+
+_STORED_BRIEF = (
+    "📦 Описание заказа\n"
+    "Дата: 18.02.2026\n"
+    "Покупатель: https://fansly.com/tyson0892/posts\n"
+    "Оплата: 80$\n"
+    "Длительность: 5 минут\n"
+    "🎥 Описание задания: Медленный стриптиз у зеркала.\n"
+    "📅 Дедлайн: До 20.02.2026\n"
+)
+
+
+def _edited_brief_setup(monkeypatch, edited_text: str):
+    from tests.fakes import FakeBot
+
+    session = _Session()
+    bot = FakeBot()
+    msg = FakeMessage(text=edited_text, bot=bot)
+    task = FakeTask(
+        id=12,
+        chat_id=msg.chat.id,
+        message_id=msg.message_id,
+        bot_message_id=888,
+        raw_text=_STORED_BRIEF,
+        deadline="2026-02-20",
+        amount_total=80.0,
+    )
+    loads = {"count": 0}
+
+    async def _get_task(*_args, **_kwargs):
+        loads["count"] += 1
+        return task
+
+    async def _classify(*_args, **_kwargs):
+        raise AssertionError("this edit must not reach the classifier")
+
+    monkeypatch.setattr(messages, "async_session", FakeSessionFactory(session))
+    monkeypatch.setattr(messages.task_repo, "get_task_by_message", _get_task)
+    monkeypatch.setattr(messages, "classify_message", _classify)
+    monkeypatch.setattr(messages, "get_card_for_status", lambda t: (f"card {t.deadline}", None))
+    return msg, session, task, loads
+
+
+@pytest.mark.asyncio
+async def test_handle_edited_message_trivial_edit_skips_ai_and_card(monkeypatch):
+    edited = _STORED_BRIEF.replace("зеркала.", "зеркала 🔥!")
+    msg, session, task, loads = _edited_brief_setup(monkeypatch, edited)
+
+    await messages.handle_edited_message(msg)
+
+    assert task.raw_text == edited
+    assert session.commits == 1
+    assert msg.bot.edited_texts == []
+    assert loads["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_handle_edited_message_patches_single_field_locally(monkeypatch):
+    edited = _STORED_BRIEF.replace("До 20.02.2026", "До 23.02.2026")
+    msg, session, task, loads = _edited_brief_setup(monkeypatch, edited)
+
+    await messages.handle_edited_message(msg)
+
+    assert task.deadline == "2026-02-23"
+    assert task.amount_total == 80.0
+    assert task.raw_text == edited
+    assert session.commits == 1
+    assert msg.bot.edited_texts[0]["text"] == "card 2026-02-23"
+    assert loads["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_handle_edited_message_holds_no_session_during_ai_call(monkeypatch):
+    edited = _STORED_BRIEF.replace("Медленный стриптиз у зеркала.", "Танец у окна в красном платье.")
+    msg, session, task, loads = _edited_brief_setup(monkeypatch, edited)
+    open_sessions = {"count": 0}
+
+    class _TrackingContext:
+        async def __aenter__(self):
+            open_sessions["count"] += 1
+            return session
+
+        async def __aexit__(self, *_exc):
+            open_sessions["count"] -= 1
+            return False
+
+    async def _classify(*_args, **_kwargs):
+        assert open_sessions["count"] == 0
+        return {"is_task": True, "confidence": 0.9, "data": {"description": "танец у окна"}}
+
+    monkeypatch.setattr(messages, "async_session", lambda: _TrackingContext())
+    monkeypatch.setattr(messages, "classify_message", _classify)
+
+    await messages.handle_edited_message(msg)
+
+    assert task.description == "танец у окна"
+    assert session.commits == 1
+    assert loads["count"] == 2  # reloaded after the AI call
+    assert msg.bot.edited_texts[0]["message_id"] == 888
@@ -3,10 +3,16 @@ from types import SimpleNamespace
 
 import pytest
 
+from ai import batch as ai_batch
+from ai.backpressure import load_shedder
+from ai.circuit_breaker import CircuitBreaker
+from ai.gateway import LANE_BACKFILL, LANE_RETRY, current_lane
 from core.config import runtime
-from core.exceptions import AITransientError
+from core.constants import AI_SHED_QUEUE_STEP, MIN_HEURISTIC_SCORE, RETRY_PRIORITY_LOW
+from core.exceptions import AICircuitOpenError, AITransientError
+from db.repo import retry_repo
 from scheduler.jobs import retry_processor
-from tests.fakes import FakeBot, FakeTask
+from tests.fakes import FakeBatchesAPI, FakeBot, FakeTask, make_batch_client
 
 
 class _Session:
@@ -21,6 +27,17 @@ class _Session:
         self.rollbacks += 1
 
 
+_count_due_ai_retries = retry_repo.count_due_ai_retries
+
+
+@pytest.fixture(autouse=True)
+def _queue_depth(monkeypatch):
+    async def _count(_session, **_kwargs):
+        return 3
+
+    monkeypatch.setattr(retry_processor.retry_repo, "count_due_ai_retries", _count)
+
+
 def _row(**kwargs):
     base = {
         "id": 1,
@@ -31,6 +48,7 @@ def _row(**kwargs):
         "has_photo": False,
         "sender_username": "u",
         "attempt_count": 0,
+        "priority": 0,
         "first_enqueued_at": datetime.now(timezone.utc).isoformat(),
         "next_retry_at": datetime.now(timezone.utc).isoformat(),
         "last_error": None,
@@ -202,3 +220,190 @@ async def test_process_ai_retry_queue_iterates_rows(monkeypatch):
     await retry_processor.process_ai_retry_queue(bot, session)
 
     assert processed == [1, 2]
+    assert retry_processor.load_shedder.queue_depth == 3
+
+
+@pytest.mark.asyncio
+async def test_low_priority_rows_are_retried_in_backfill_lane(monkeypatch):
+    rows = [_row(id=1), _row(id=2, priority=RETRY_PRIORITY_LOW)]
+    lanes = {}
+
+    async def _due(*_args, **_kwargs):
+        return rows
+
+    async def _process(_bot, queue_id, _session):
+        lanes[queue_id] = current_lane()
+
+    monkeypatch.setattr(retry_processor.retry_repo, "get_due_ai_retries", _due)
+    monkeypatch.setattr(retry_processor, "_process_single_retry", _process)
+
+    await retry_processor.process_ai_retry_queue(FakeBot(), _Session())
+
+    assert lanes == {1: LANE_RETRY, 2: LANE_BACKFILL}
+
+
+@pytest.mark.asyncio
+async def test_process_ai_retry_queue_paused_while_circuit_open(monkeypatch):
+    session = _Session()
+    bot = FakeBot()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    monkeypatch.setattr(retry_processor, "circuit_breaker", breaker)
+
+    async def _due(*_args, **_kwargs):
+        raise AssertionError("scan should not query the queue while the circuit is open")
+
+    monkeypatch.setattr(retry_processor.retry_repo, "get_due_ai_retries", _due)
+
+    await retry_processor.process_ai_retry_queue(bot, session)
+
+
+@pytest.mark.asyncio
+async def test_deferred_and_future_rows_do_not_raise_the_shedding_threshold(monkeypatch, db_session):
+    monkeypatch.setattr(retry_processor.retry_repo, "count_due_ai_retries", _count_due_ai_retries)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    monkeypatch.setattr(retry_processor, "circuit_breaker", breaker)
+    now = datetime.now(timezone.utc)
+    for message_id in range(AI_SHED_QUEUE_STEP * 2):
+        await retry_repo.enqueue_ai_retry(
+            db_session,
+            chat_id=-100,
+            message_id=message_id,
+            topic_id=777,
+            raw_text="flood",
+            has_photo=False,
+            error_detail="SENDER_BUDGET",
+            next_retry_at=(now - timedelta(minutes=1)).isoformat(),
+            priority=RETRY_PRIORITY_LOW,
+        )
+    for message_id in range(1000, 1000 + AI_SHED_QUEUE_STEP):
+        await retry_repo.enqueue_ai_retry(
+            db_session,
+            chat_id=-100,
+            message_id=message_id,
+            topic_id=777,
+            raw_text="later",
+            has_photo=False,
+            next_retry_at=(now + timedelta(minutes=10)).isoformat(),
+        )
+
+    await retry_processor.process_ai_retry_queue(FakeBot(), db_session)
+
+    assert load_shedder.queue_depth == 0
+    assert load_shedder.min_heuristic_score() == MIN_HEURISTIC_SCORE
+
+
+@pytest.mark.asyncio
+async def test_deferred_row_due_after_the_window_survives_one_transient_failure(monkeypatch, db_session):
+    bot = FakeBot()
+    now = datetime.now(timezone.utc)
+    due = now + timedelta(hours=3)
+    row = await retry_repo.enqueue_ai_retry(
+        db_session,
+        chat_id=-100,
+        message_id=101,
+        topic_id=777,
+        raw_text="flood",
+        has_photo=False,
+        error_detail="SENDER_BUDGET",
+        next_retry_at=due.isoformat(),
+        priority=RETRY_PRIORITY_LOW,
+    )
+    await db_session.commit()
+
+    await retry_processor._reschedule_or_fail(
+        db_session, bot, queue_id=row.id, now=due + timedelta(seconds=5), error_message="overloaded",
+    )
+
+    rescheduled = await retry_repo.get_ai_retry_by_id(db_session, row.id)
+    assert rescheduled is not None and rescheduled.attempt_count == 1
+    assert bot.sent_messages == []
+
+
+@pytest.mark.asyncio
+async def test_process_ai_retry_queue_stops_when_circuit_opens_midway(monkeypatch):
+    session = _Session()
+    bot = FakeBot()
+    rows = [_row(id=1), _row(id=2), _row(id=3)]
+    processed = []
+
+    async def _due(*_args, **_kwargs):
+        return rows
+
+    async def _process(_bot, queue_id, _session):
+        processed.append(queue_id)
+        if queue_id == 2:
+            raise AICircuitOpenError("open")
+
+    monkeypatch.setattr(retry_processor.retry_repo, "get_due_ai_retries", _due)
+    monkeypatch.setattr(retry_processor, "_process_single_retry", _process)
+
+    await retry_processor.process_ai_retry_queue(bot, session)
+
+    assert processed == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_process_single_retry_circuit_open_leaves_row_untouched(monkeypatch):
+    session = _Session()
+    bot = FakeBot()
+    row = _row(id=5)
+
+    async def _load(_session, _queue_id):
+        return row
+
+    async def _classify(*_args, **_kwargs):
+        raise AICircuitOpenError("open")
+
+    async def _reschedule(*_args, **_kwargs):
+        raise AssertionError("circuit-open skips must not consume a retry attempt")
+
+    monkeypatch.setattr(retry_processor, "_load_pending_retry", _load)
+    monkeypatch.setattr(retry_processor, "classify_message", _classify)
+    monkeypatch.setattr(retry_processor, "_reschedule_or_fail", _reschedule)
+
+    with pytest.raises(AICircuitOpenError):
+        await retry_processor._process_single_retry(bot, 5, session)
+
+
+@pytest.mark.asyncio
+async def test_process_ai_retry_queue_batch_applies_outcomes(monkeypatch):
+    session = _Session()
+    bot = FakeBot()
+    rows = {1: _row(id=1, message_id=201), 2: _row(id=2, message_id=202), 3: _row(id=3)}
+
+    def _respond(custom_id, _params):
+        if custom_id == "retry-2":
+            return "!errored"
+        return '{"is_task": false, "confidence": 0.9, "reason": "чат"}'
+
+    monkeypatch.setattr(ai_batch.classifier, "client", make_batch_client(FakeBatchesAPI(_respond)))
+    monkeypatch.setattr(
+        retry_processor.retry_repo, "get_due_ai_retries",
+        lambda *_a, **_k: __import__("asyncio").sleep(0, result=list(rows.values())),
+    )
+
+    async def _load(_session, queue_id):
+        return None if queue_id == 3 else rows[queue_id]
+
+    applied, rescheduled = [], []
+
+    async def _apply(_bot, _session, row, *, queue_id, now, result):
+        applied.append((queue_id, result["is_task"]))
+
+    async def _reschedule(_session, _bot, *, queue_id, now, error_message):
+        rescheduled.append((queue_id, error_message))
+
+    monkeypatch.setattr(retry_processor, "_load_pending_retry", _load)
+    monkeypatch.setattr(retry_processor, "_apply_retry_result", _apply)
+    monkeypatch.setattr(retry_processor, "_reschedule_or_fail", _reschedule)
+
+    submitted = await retry_processor.process_ai_retry_queue_batch(
+        bot, session, poll_interval=0,
+    )
+
+    assert submitted == 3
+    assert applied == [(1, False)]
+    assert rescheduled and rescheduled[0][0] == 2
+    assert "BATCH_TRANSIENT_ERROR" in rescheduled[0][1]
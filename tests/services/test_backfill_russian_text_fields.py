@@ -1,9 +1,11 @@
 import pytest
 from sqlalchemy import select
 
+from ai import batch as ai_batch
 from core.exceptions import AITransientError
 from db.models import Task
 from scripts import backfill_russian_text_fields as backfill_script
+from tests.fakes import FakeBatchesAPI, make_batch_client
 
 
 async def _insert_task(
@@ -235,3 +237,48 @@ async def test_backfill_marks_non_task_result_as_failed(db_session_factory, monk
     assert summary.failures[0].task_id == task_id
     assert summary.failures[0].reason == "classify_non_task"
     assert task.description == "old"
+
+
+@pytest.mark.asyncio
+async def test_backfill_batch_mode_applies_batch_results(db_session_factory, monkeypatch, tmp_path):
+    ok_task_id = await _insert_task(
+        db_session_factory,
+        message_id=107,
+        raw_text="good brief",
+        description="old",
+    )
+    expired_task_id = await _insert_task(
+        db_session_factory,
+        message_id=108,
+        raw_text="slow brief",
+        description="old",
+    )
+
+    def _respond(custom_id, _params):
+        if custom_id == f"task-{expired_task_id}":
+            return "!expired"
+        return (
+            '{"is_task": true, "confidence": 0.9, "data": {"description": "из батча", '
+            '"outfit": null, "notes": null}}'
+        )
+
+    async def _classify_message(*_args, **_kwargs):
+        raise AssertionError("batch mode must not call classify_message")
+
+    batches = FakeBatchesAPI(_respond)
+    monkeypatch.setattr(backfill_script, "classify_message", _classify_message)
+    monkeypatch.setattr(ai_batch.classifier, "client", make_batch_client(batches))
+    monkeypatch.setattr(ai_batch, "AI_BATCH_POLL_INTERVAL", 0)
+
+    summary = await backfill_script.run_backfill(
+        apply=True,
+        batch=True,
+        batch_state_path=tmp_path / "state.json",
+        session_maker=db_session_factory,
+    )
+
+    assert len(batches.created) == 1
+    assert summary.scanned == 2
+    assert summary.updated == 1
+    assert [f.task_id for f in summary.failures] == [expired_task_id]
+    assert (await _fetch_task(db_session_factory, ok_task_id)).description == "из батча"
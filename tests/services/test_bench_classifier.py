@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from ai import classifier
+from scripts import bench_classifier as bench_script
+from scripts.fake_messages_api import FaultProfile, Recording, ReplayBackend, content_key
+from tests.fakes import classifier_content
+
+_BRIEF = (
+    "Новый кастом для фаната, оплата 120$, длительность 7 минут, ссылка "
+    "https://onlyfans.com/fan42 — снять танец в красном платье до пятницы"
+)
+_BRIEF_ANSWER = (
+    '{"is_task": true, "confidence": 0.93, "data": {"fan_link": "https://onlyfans.com/fan42", '
+    '"platform": "onlyfans", "amount_total": 120, "amount_paid": 120, "amount_remaining": 0, '
+    '"duration": "7 minutes", "priority": "medium", "description": "Танец в красном платье"}}'
+)
+_CHAT = "Ребята, кто сегодня снимает кастом? Напишите в личку, пожалуйста, очень нужно"
+_CHAT_ANSWER = '{"is_task": false, "confidence": 0.95, "reason": "обсуждение"}'
+
+
+def _recording(text: str, answer: str) -> Recording:
+    content = [vars(block) for block in classifier_content(answer)]
+    return Recording(text=text, has_photo=False, user_content=text, latency_ms=5, content=content, usage={})
+
+
+@pytest.mark.asyncio
+async def test_run_bench_replays_pipeline_and_retry_queue(monkeypatch, db_session_factory):
+    recordings = [_recording(_BRIEF, _BRIEF_ANSWER), _recording(_CHAT, _CHAT_ANSWER)]
+    answers = {rec.text: rec.content for rec in recordings}
+    failures = {"left": 3}  # the brief times out on every inline attempt once
+
+    async def _create(**params):
+        text = params["messages"][0]["content"]
+        if text == _BRIEF and failures["left"]:
+            failures["left"] -= 1
+            raise asyncio.TimeoutError()
+        return SimpleNamespace(content=[SimpleNamespace(**block) for block in answers[text]], usage=None)
+
+    monkeypatch.setattr(classifier, "AI_RETRY_BASE_DELAY", 0)
+    monkeypatch.setattr(bench_script.env, "bot_token", bench_script.BENCH_BOT_TOKEN)
+    monkeypatch.setattr(bench_script.env, "anthropic_api_key", "replay")
+    monkeypatch.setattr(bench_script.runtime, "customs_chat_id", bench_script.BENCH_CHAT_ID)
+    monkeypatch.setattr(bench_script.runtime, "customs_topic_id", bench_script.BENCH_TOPIC_ID)
+
+    report = await bench_script.run_bench(
+        recordings,
+        client=SimpleNamespace(messages=SimpleNamespace(create=_create)),
+        session_maker=db_session_factory,
+        concurrency=2,
+    )
+
+    assert report.messages == 2 and len(report.pipeline_latencies_ms) == 2
+    assert report.retry_rounds == 1 and report.retry_remaining == 0
+    assert (report.expected_tasks, report.created_tasks, report.missed_tasks) == (1, 1, 0)
+    assert report.field_total > 0 and report.field_accuracy == 1.0
+
+
+@pytest.mark.asyncio
+async def test_replay_backend_serves_recordings_and_injects_faults():
+    recording = _recording(_CHAT, _CHAT_ANSWER)
+    body = {"model": "m", "messages": [{"role": "user", "content": _CHAT + "  "}]}
+
+    backend = ReplayBackend([recording], FaultProfile(latency_scale=0))
+    status, payload = await backend.respond(body)
+    assert status == 200 and payload["content"] == recording.content
+
+    status, payload = await backend.respond({"model": "m", "messages": [{"role": "user", "content": "?"}]})
+    assert status == 200 and payload["content"][0]["input"]["is_task"] is False
+    assert backend.stats.unmatched == 1
+
+    flaky = ReplayBackend([recording], FaultProfile(rate_429=0.5, rate_5xx=0.5), seed=1)
+    statuses = {(await flaky.respond(body))[0] for _ in range(20)}
+    assert statuses == {429, 529}
+    assert flaky.stats.injected_429 + flaky.stats.injected_5xx == 20
+    assert content_key(_CHAT) == content_key(_CHAT + "  ")
+    assert content_key(_CHAT, "record_verdict") != content_key(_CHAT)
@@ -0,0 +1,53 @@
+import pytest
+
+from scripts.bench_compact_schema import analyze, fit_line
+from scripts.fake_messages_api import Recording
+
+
+def _recording(tool_input: dict, output_tokens: int, latency_ms: int, tool: str = "record_classification"):
+    return Recording(
+        text="text",
+        has_photo=False,
+        user_content="text",
+        latency_ms=latency_ms,
+        content=[{"type": "tool_use", "id": "toolu_1", "name": tool, "input": tool_input}],
+        usage={"input_tokens": 900, "output_tokens": output_tokens},
+        tool=tool,
+    )
+
+
+def test_fit_line_recovers_slope_and_intercept():
+    assert fit_line([1, 2, 3], [12, 14, 16]) == pytest.approx((10.0, 2.0))
+    assert fit_line([5, 5], [10, 10]) == (0.0, 2.0)
+
+
+def test_analyze_reports_fewer_tokens_and_lower_latency_for_compact_schema():
+    brief = {
+        "is_task": True,
+        "confidence": 0.95,
+        "data": {
+            "task_date": "2026-02-13",
+            "fan_link": "https://fansly.com/tyson0892/posts",
+            "platform": "fansly",
+            "amount_total": 80,
+            "amount_paid": 80,
+            "amount_remaining": 0,
+            "duration": "5 минут",
+            "description": "Танец у зеркала в юбке.",
+            "priority": "medium",
+        },
+    }
+    chat = {"is_task": False, "confidence": 0.97, "reason": "обычное сообщение"}
+    recordings = [
+        _recording(brief, output_tokens=210, latency_ms=3400),
+        _recording(chat, output_tokens=45, latency_ms=1100),
+        _recording({"is_task": True, "confidence": 0.9}, output_tokens=20, latency_ms=900),  # malformed
+        _recording({"is_task": False, "confidence": 0.9}, output_tokens=20, latency_ms=500, tool="record_verdict"),
+    ]
+
+    report = analyze(recordings)
+
+    assert (report.recordings, report.skipped) == (2, 1)
+    assert report.compact_tokens < report.full_tokens
+    assert report.ms_per_output_token > 0
+    assert report.compact_latency_ms < report.full_latency_ms
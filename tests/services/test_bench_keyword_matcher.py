@@ -0,0 +1,32 @@
+import pytest
+
+from db.models import ParseFailure, Task
+from scripts import bench_keyword_matcher as bench_script
+
+
+def test_analyze_reports_no_mismatches_and_both_timings():
+    report = bench_script.analyze(bench_script.synthetic_corpus(10), repeat=1)
+
+    assert report.messages == 10
+    assert report.mismatches == []
+    assert set(report.timings_us) == {
+        "prefilter_per_list", "prefilter_compiled", "all_per_list", "all_compiled",
+    }
+    assert all(len(values) == 10 for values in report.timings_us.values())
+
+
+@pytest.mark.asyncio
+async def test_load_corpus_reads_stored_topic_texts(db_session_factory):
+    async with db_session_factory() as session:
+        session.add_all(
+            [
+                Task(message_id=1, chat_id=-100, raw_text="📦 Описание заказа", priority="medium"),
+                Task(message_id=2, chat_id=-100, raw_text=None, priority="medium"),
+                ParseFailure(message_id=3, raw_text="сняла, готово", error_type="api_error"),
+            ]
+        )
+        await session.commit()
+
+    texts = await bench_script.load_corpus(session_maker=db_session_factory)
+
+    assert set(texts) == {"📦 Описание заказа", "сняла, готово"}
@@ -0,0 +1,36 @@
+import pytest
+
+from db.models import AIClassificationCache, Task
+from scripts import bench_local_extractor as bench_script
+
+
+@pytest.mark.asyncio
+async def test_bench_reports_coverage_agreement_and_ai_latency(db_session_factory):
+    template = bench_script.SYNTHETIC_TEMPLATE.format(day=18, n=1, amount=80, minutes=5)
+    async with db_session_factory() as session:
+        session.add_all(
+            [
+                Task(
+                    message_id=1, chat_id=-100, raw_text=template, priority="medium",
+                    task_date="2026-02-18", deadline="2026-02-28", platform="fansly",
+                    fan_link="https://fansly.com/fan1/posts", amount_total=80,
+                    amount_paid=80, amount_remaining=0, duration="5 minutes",
+                ),
+                Task(message_id=2, chat_id=-100, raw_text="свободный текст брифа", priority="medium"),
+                AIClassificationCache(
+                    cache_key="k", ai_model="m", prompt_version="1", result_json="{}",
+                    latency_ms=2400, expires_at="2099-01-01T00:00:00+00:00",
+                    last_accessed_at="2026-01-01T00:00:00+00:00",
+                    created_at="2026-01-01T00:00:00+00:00",
+                ),
+            ]
+        )
+        await session.commit()
+
+    summary = await bench_script.run_bench(session_maker=db_session_factory)
+
+    assert summary.scanned == 2
+    assert summary.extracted == 1
+    assert summary.field_matches == summary.field_total == len(bench_script.COMPARED_FIELDS)
+    assert summary.ai_latencies_ms == [2400.0]
+    assert len(summary.local_latencies_ms) == 2
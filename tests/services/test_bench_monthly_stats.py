@@ -0,0 +1,26 @@
+import pytest
+
+from scripts import bench_monthly_stats as bench_script
+
+
+@pytest.mark.asyncio
+async def test_bench_size_matches_previous_implementation(tmp_path):
+    timing = await bench_script.bench_size(600, directory=tmp_path, repeat=2)
+
+    assert timing.tasks == 600
+    assert len(timing.orm_ms) == len(timing.sql_ms) == 2
+    assert timing.same_result
+
+
+def test_same_stats_detects_differences():
+    stats = {"total": 2, "total_amount": 10.0, "platforms": {"fansly": {"count": 2, "amount": 10.0}}}
+
+    assert bench_script.same_stats(stats, {**stats, "total_amount": 10.000000000001})
+    assert not bench_script.same_stats(stats, {**stats, "total": 3})
+    assert not bench_script.same_stats(stats, {**stats, "platforms": {"unknown": {"count": 2, "amount": 10.0}}})
+
+
+def test_parse_args_defaults_to_three_sizes():
+    assert bench_script.parse_args([]).tasks is None
+    assert bench_script.DEFAULT_SIZES == (10_000, 100_000, 1_000_000)
+    assert bench_script.parse_args(["--tasks", "500"]).tasks == [500]
@@ -0,0 +1,22 @@
+import pytest
+
+from db.engine import SQLITE_PROFILES
+from scripts import bench_sqlite_profile as bench_script
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("profile", sorted(SQLITE_PROFILES))
+async def test_bench_profile_commits_while_dashboard_reads(tmp_path, profile):
+    report = await bench_script.bench_profile(profile, directory=tmp_path, seed_rows=20, commits=5, readers=2)
+
+    assert report.profile == profile
+    assert report.solo_commits == report.commits == 5
+    assert report.read_ms
+    assert report.write_lock_errors == report.read_lock_errors == 0
+
+
+def test_parse_args_benchmarks_every_profile_by_default():
+    args = bench_script.parse_args([])
+
+    assert args.profile is None
+    assert bench_script.parse_args(["--profile", "wal"]).profile == ["wal"]
@@ -0,0 +1,27 @@
+import pytest
+
+from scripts import bench_timestamp_queries as bench_script
+
+
+@pytest.mark.asyncio
+async def test_bench_timestamps_times_both_schemas(tmp_path):
+    report = await bench_script.bench_timestamps(directory=tmp_path, tasks=120, repeat=2, local_share=0.0)
+
+    assert report.tasks == 120
+    assert report.migration_seconds > 0
+    assert [query.name for query in report.queries] == [
+        "monthly stats window",
+        "monthly window count",
+        "finished > 24h",
+    ]
+    for query in report.queries:
+        assert len(query.before_ms) == len(query.after_ms) == 2
+        # Without offsets both schemas select the same rows.
+        assert query.before_rows == query.after_rows
+
+
+def test_parse_args_defaults_to_100k_tasks():
+    args = bench_script.parse_args([])
+
+    assert args.tasks == 100_000
+    assert args.repeat == 5
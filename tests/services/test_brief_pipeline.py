@@ -1,10 +1,19 @@
+import asyncio
+from datetime import datetime
 from types import SimpleNamespace
 
 import pytest
 
-from core.exceptions import AITransientError
+from ai.backpressure import load_shedder
+from core.config import env, roles
+from core.constants import AI_SHED_QUEUE_STEP, MIN_HEURISTIC_SCORE, RETRY_PRIORITY_LOW
+from core.exceptions import AICircuitOpenError, AITransientError
+from core.simhash import simhash
+from scripts.bench_local_extractor import SYNTHETIC_TEMPLATE
 from services import brief_pipeline
-from tests.fakes import FakeMessage, FakeTask
+from services.duplicate_index import brief_fingerprints
+from services.sender_budget import sender_budget
+from tests.fakes import FakeMessage, FakeTask, make_user
 
 
 class _Session:
@@ -27,7 +36,7 @@ async def test_prefilter_reject_marks_processed(monkeypatch):
     marked = {"value": False}
 
     monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
-    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m: (False, "too_short", {}))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (False, "too_short", {}))
 
     async def _mark(*_args, **_kwargs):
         marked["value"] = True
@@ -48,7 +57,7 @@ async def test_transient_ai_failure_enqueues_retry(monkeypatch):
     enqueue_called = {"value": False}
 
     monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
-    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m: (True, "direct", {}))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "direct", {}))
 
     async def _classify(*_args, **_kwargs):
         raise AITransientError("x")
@@ -65,6 +74,30 @@ async def test_transient_ai_failure_enqueues_retry(monkeypatch):
     assert session.commits == 1
 
 
+@pytest.mark.asyncio
+async def test_open_circuit_enqueues_retry_with_circuit_detail(monkeypatch):
+    session = _Session()
+    message = FakeMessage(text="long text" * 20)
+    enqueued = {}
+
+    monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "direct", {}))
+
+    async def _classify(*_args, **_kwargs):
+        raise AICircuitOpenError("open")
+
+    async def _enqueue(*_args, **kwargs):
+        enqueued.update(kwargs)
+
+    monkeypatch.setattr(brief_pipeline, "classify_message", _classify)
+    monkeypatch.setattr(brief_pipeline.retry_repo, "enqueue_ai_retry", _enqueue)
+
+    await brief_pipeline.process_brief(message, session)
+
+    assert enqueued["error_detail"] == "CIRCUIT_OPEN"
+    assert session.commits == 1
+
+
 @pytest.mark.asyncio
 async def test_ai_none_logs_failure_and_notifies_admins(monkeypatch):
     session = _Session()
@@ -75,7 +108,7 @@ async def test_ai_none_logs_failure_and_notifies_admins(monkeypatch):
     notified = {"value": False}
 
     monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
-    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m: (True, "direct", {}))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "direct", {}))
 
     async def _classify(*_args, **_kwargs):
         return None
@@ -110,7 +143,7 @@ async def test_low_confidence_is_marked_not_task(monkeypatch):
     marked = []
 
     monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
-    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m: (True, "direct", {}))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "direct", {}))
     async def _classify(*_args, **_kwargs):
         return {"is_task": True, "confidence": 0.2, "data": {}}
 
@@ -133,7 +166,7 @@ async def test_existing_task_shortcuts_processing(monkeypatch):
     message = FakeMessage(text="long text" * 20)
 
     monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
-    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m: (True, "direct", {}))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "direct", {}))
     async def _classify(*_args, **_kwargs):
         return {"is_task": True, "confidence": 0.9, "data": {}}
 
@@ -161,7 +194,7 @@ async def test_create_race_and_card_send_failure_paths(monkeypatch):
     message = FakeMessage(text="long text" * 20)
 
     monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
-    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m: (True, "direct", {}))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "direct", {}))
     async def _classify(*_args, **_kwargs):
         return {"is_task": True, "confidence": 0.9, "data": {}}
 
@@ -219,7 +252,7 @@ async def test_create_task_failure_logs_parse_failure_and_notifies_admins(monkey
         lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]),
     )
     monkeypatch.setattr(
-        brief_pipeline, "evaluate_message_for_processing", lambda _m: (True, "direct", {})
+        brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "direct", {})
     )
     monkeypatch.setattr(
         brief_pipeline,
@@ -253,3 +286,366 @@ async def test_create_task_failure_logs_parse_failure_and_notifies_admins(monkey
     assert session.commits >= 1
     assert flags["parse_failure"] is True
     assert flags["notified"] is True
+
+
+@pytest.mark.asyncio
+async def test_concurrent_pipelines_for_same_message_share_classification(monkeypatch):
+    message = FakeMessage(text="long text" * 20)
+    calls = {"count": 0}
+
+    monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "direct", {}))
+
+    async def _classify(*_args, **_kwargs):
+        calls["count"] += 1
+        await asyncio.sleep(0.01)
+        return {"is_task": False, "confidence": 0.9, "reason": "chat"}
+
+    async def _mark(*_args, **_kwargs):
+        return None
+
+    monkeypatch.setattr(brief_pipeline, "classify_message", _classify)
+    monkeypatch.setattr(brief_pipeline.message_repo, "mark_message_processed", _mark)
+
+    await asyncio.gather(
+        brief_pipeline.process_brief(message, _Session()),
+        brief_pipeline.process_brief(message, _Session()),
+    )
+
+    assert calls["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_template_brief_is_parsed_locally_without_ai(monkeypatch):
+    message = FakeMessage(
+        text=(
+            "📦 Описание заказа\n"
+            "Дата: 18.02.2026\n"
+            "Покупатель: https://fansly.com/tyson0892/posts\n"
+            "Оплата: 80$\n"
+            "Длительность: 5 минут\n"
+            "🎥 Описание задания: Медленный стриптиз у зеркала.\n"
+        )
+    )
+
+    monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "direct", {}))
+
+    async def _classify(*_args, **_kwargs):
+        raise AssertionError("template briefs must not reach the AI classifier")
+
+    async def _get_existing(*_args, **_kwargs):
+        return FakeTask(id=88)
+
+    marked = []
+
+    async def _mark(*_args, **kwargs):
+        marked.append(kwargs)
+
+    monkeypatch.setattr(brief_pipeline, "classify_message", _classify)
+    monkeypatch.setattr(brief_pipeline.task_repo, "get_task_by_message", _get_existing)
+    monkeypatch.setattr(brief_pipeline.message_repo, "mark_message_processed", _mark)
+
+    await brief_pipeline.process_brief(message, _Session())
+
+    assert marked and marked[0].get("is_task") is True
+
+
+def _stream_partials_then(result):
+    async def _classify(_text, _has_photo=False, on_partial=None):
+        assert on_partial is not None
+        await on_partial({"is_task": True, "confidence": 0.95})
+        await on_partial({"is_task": True, "confidence": 0.95, "data": {"amount_total": 80}})
+        return result
+
+    return _classify
+
+
+@pytest.mark.asyncio
+async def test_streaming_skeleton_card_becomes_draft_card(monkeypatch):
+    message = FakeMessage(text="long text" * 20)
+    bound = {}
+
+    monkeypatch.setattr(brief_pipeline.env, "ai_streaming_cards", True)
+    monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "direct", {}))
+    monkeypatch.setattr(
+        brief_pipeline,
+        "classify_message",
+        _stream_partials_then({"is_task": True, "confidence": 0.95, "data": {"amount_total": 80}}),
+    )
+
+    async def _get_missing(*_args, **_kwargs):
+        return None
+
+    async def _create_ok(_session, **_kwargs):
+        return FakeTask(id=10), True
+
+    async def _mark(*_args, **_kwargs):
+        return None
+
+    async def _bind(_session, _task, bot_message_id):
+        bound["bot_message_id"] = bot_message_id
+
+    monkeypatch.setattr(brief_pipeline.task_repo, "get_task_by_message", _get_missing)
+    monkeypatch.setattr(brief_pipeline.task_repo, "create_task", _create_ok)
+    monkeypatch.setattr(brief_pipeline.task_repo, "update_task_bot_message_id", _bind)
+    monkeypatch.setattr(brief_pipeline.message_repo, "mark_message_processed", _mark)
+
+    await brief_pipeline.process_brief(message, _Session())
+
+    # One skeleton reply; the second partial is throttled; the final card edits it in place.
+    assert len(message.replies) == 1
+    assert "распознаю" in message.replies[0][0]
+    assert len(message.bot.edited_texts) == 1
+    assert message.bot.edited_texts[0]["reply_markup"] is not None
+    assert bound["bot_message_id"] == 2001
+    assert message.bot.deleted_messages == []
+
+
+@pytest.mark.asyncio
+async def test_streaming_skeleton_card_is_deleted_when_no_task_is_created(monkeypatch):
+    message = FakeMessage(text="long text" * 20)
+
+    monkeypatch.setattr(brief_pipeline.env, "ai_streaming_cards", True)
+    monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "direct", {}))
+    monkeypatch.setattr(
+        brief_pipeline,
+        "classify_message",
+        _stream_partials_then({"is_task": False, "confidence": 0.9, "reason": "chat"}),
+    )
+
+    async def _mark(*_args, **_kwargs):
+        return None
+
+    monkeypatch.setattr(brief_pipeline.message_repo, "mark_message_processed", _mark)
+
+    await brief_pipeline.process_brief(message, _Session())
+
+    assert len(message.replies) == 1
+    assert message.bot.deleted_messages == [{"chat_id": message.chat.id, "message_id": 2001}]
+
+
+@pytest.mark.asyncio
+async def test_sender_over_budget_is_deferred_at_low_priority_and_teamlead_is_exempt(monkeypatch):
+    monkeypatch.setattr(env, "ai_sender_burst", 1)
+    monkeypatch.setattr(env, "ai_sender_per_hour", 6)
+    monkeypatch.setattr(roles, "teamlead_ids", [50])
+    monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "heuristic_score", {}))
+    classified = []
+    enqueued = []
+
+    async def _classify(text, *_args, **_kwargs):
+        classified.append(text)
+        return {"is_task": False, "confidence": 0.9, "reason": "chat"}
+
+    async def _enqueue(*_args, **kwargs):
+        enqueued.append(kwargs)
+
+    async def _noop(*_args, **_kwargs):
+        return None
+
+    monkeypatch.setattr(brief_pipeline, "classify_message", _classify)
+    monkeypatch.setattr(brief_pipeline.retry_repo, "enqueue_ai_retry", _enqueue)
+    monkeypatch.setattr(brief_pipeline.message_repo, "mark_message_processed", _noop)
+
+    for message_id in (1, 2):
+        await brief_pipeline.process_brief(
+            FakeMessage(text=f"flood {message_id} " * 20, message_id=message_id, from_user=make_user(7)),
+            _Session(),
+        )
+    await brief_pipeline.process_brief(
+        FakeMessage(text="teamlead " * 20, message_id=3, from_user=make_user(50)),
+        _Session(),
+    )
+    await brief_pipeline.process_brief(
+        FakeMessage(text="teamlead again " * 20, message_id=4, from_user=make_user(50)),
+        _Session(),
+    )
+
+    assert len(classified) == 3
+    assert [item["message_id"] for item in enqueued] == [2]
+    assert enqueued[0]["priority"] == RETRY_PRIORITY_LOW
+    assert enqueued[0]["error_detail"] == "SENDER_BUDGET"
+    assert sender_budget.stats.exempt == 2
+
+
+@pytest.mark.asyncio
+async def test_sender_flood_deferrals_are_due_one_refill_interval_apart(monkeypatch):
+    monkeypatch.setattr(env, "ai_sender_burst", 1)
+    monkeypatch.setattr(env, "ai_sender_per_hour", 6)
+    monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "heuristic_score", {}))
+    enqueued = []
+
+    async def _classify(*_args, **_kwargs):
+        return {"is_task": False, "confidence": 0.9, "reason": "chat"}
+
+    async def _enqueue(*_args, **kwargs):
+        enqueued.append(kwargs)
+
+    async def _noop(*_args, **_kwargs):
+        return None
+
+    monkeypatch.setattr(brief_pipeline, "classify_message", _classify)
+    monkeypatch.setattr(brief_pipeline.retry_repo, "enqueue_ai_retry", _enqueue)
+    monkeypatch.setattr(brief_pipeline.message_repo, "mark_message_processed", _noop)
+
+    for message_id in range(1, 6):
+        await brief_pipeline.process_brief(
+            FakeMessage(text=f"flood {message_id} " * 20, message_id=message_id, from_user=make_user(7)),
+            _Session(),
+        )
+
+    due = [datetime.fromisoformat(item["next_retry_at"]) for item in enqueued]
+    gaps = [(later - earlier).total_seconds() for earlier, later in zip(due, due[1:])]
+    assert len(due) == 4
+    assert gaps == pytest.approx([600.0] * 3, abs=5)
+
+
+@pytest.mark.asyncio
+async def test_borderline_message_is_shed_while_retry_queue_is_deep(monkeypatch):
+    monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
+    load_shedder.set_queue_depth(AI_SHED_QUEUE_STEP)
+    marked = []
+
+    async def _classify(*_args, **_kwargs):
+        raise AssertionError("shed messages must not reach the classifier")
+
+    async def _mark(*args, **_kwargs):
+        marked.append(args[2])
+
+    monkeypatch.setattr(brief_pipeline, "classify_message", _classify)
+    monkeypatch.setattr(brief_pipeline.message_repo, "mark_message_processed", _mark)
+
+    text = "Это длинный текст с payment и дедлайн и 15 минут и еще слова для длины"
+    session = _Session()
+    await brief_pipeline.process_brief(FakeMessage(text=text, message_id=5), session)
+
+    assert marked == [5]
+    assert session.commits == 1
+    assert load_shedder.stats.shed == 1
+    assert load_shedder.min_heuristic_score() == MIN_HEURISTIC_SCORE + 1
+
+
+def _index_brief(task_id: int, text: str) -> None:
+    brief_fingerprints.add(task_id, -1001, 777, simhash(text))
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_is_linked_to_existing_task_without_classification(monkeypatch):
+    session = _Session()
+    original = SYNTHETIC_TEMPLATE.format(day=3, n=5, amount=120, minutes=7)
+    message = FakeMessage(text=original.replace("120$", "150$"), message_id=202)
+    _index_brief(42, original)
+    roles.admin_usernames = ["boss"]
+    marked = []
+
+    monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "direct_marker", {}))
+
+    async def _get_task(_session, task_id):
+        return FakeTask(id=task_id, message_id=101)
+
+    async def _not_processed(*_args, **_kwargs):
+        return False
+
+    async def _mark(*_args, **kwargs):
+        marked.append(kwargs)
+
+    async def _unexpected(*_args, **_kwargs):
+        raise AssertionError("a near-duplicate must not be classified")
+
+    monkeypatch.setattr(brief_pipeline.task_repo, "get_task_by_id", _get_task)
+    monkeypatch.setattr(brief_pipeline.message_repo, "is_message_processed", _not_processed)
+    monkeypatch.setattr(brief_pipeline.message_repo, "mark_message_processed", _mark)
+    monkeypatch.setattr(brief_pipeline, "classify_locally", _unexpected)
+    monkeypatch.setattr(brief_pipeline, "classify_message", _unexpected)
+
+    await brief_pipeline.process_brief(message, session)
+
+    assert marked == [{}]
+    assert session.commits == 1
+    text, kwargs = message.replies[0]
+    assert "повтор кастома #042" in text and "@boss" in text
+    buttons = kwargs["reply_markup"].inline_keyboard[0]
+    assert [button.callback_data for button in buttons] == ["task:42:dup_ok", "task:42:dup_new"]
+    assert brief_fingerprints.stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_edits_of_a_held_repost_do_not_post_more_duplicate_cards(monkeypatch):
+    original = SYNTHETIC_TEMPLATE.format(day=3, n=5, amount=120, minutes=7)
+    repost = original.replace("120$", "150$")
+    _index_brief(42, original)
+    roles.admin_usernames = ["boss"]
+    processed = set()
+
+    monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "direct_marker", {}))
+
+    async def _get_task(_session, task_id):
+        return FakeTask(id=task_id, message_id=101)
+
+    async def _is_processed(_session, chat_id, message_id):
+        return (chat_id, message_id) in processed
+
+    async def _mark(_session, chat_id, message_id, **_kwargs):
+        processed.add((chat_id, message_id))
+
+    async def _unexpected(*_args, **_kwargs):
+        raise AssertionError("a held repost must not be classified")
+
+    monkeypatch.setattr(brief_pipeline.task_repo, "get_task_by_id", _get_task)
+    monkeypatch.setattr(brief_pipeline.message_repo, "is_message_processed", _is_processed)
+    monkeypatch.setattr(brief_pipeline.message_repo, "mark_message_processed", _mark)
+    monkeypatch.setattr(brief_pipeline, "classify_locally", _unexpected)
+    monkeypatch.setattr(brief_pipeline, "classify_message", _unexpected)
+
+    message = FakeMessage(text=repost, message_id=202)
+    await brief_pipeline.process_brief(message, _Session())
+    for edited in (repost.replace("150$", "150$ (наличными)"), original):
+        message.text = edited
+        await brief_pipeline.process_brief(message, _Session())
+
+    assert len(message.replies) == 1
+    assert processed == {(message.chat.id, 202)}
+    assert brief_fingerprints.stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_duplicate_check_skips_cancelled_tasks_and_can_be_bypassed(monkeypatch):
+    text = SYNTHETIC_TEMPLATE.format(day=3, n=5, amount=120, minutes=7)
+    _index_brief(7, text)
+    _index_brief(8, text)
+    classified = []
+
+    monkeypatch.setattr(brief_pipeline, "evaluate_brief_env_readiness", lambda: SimpleNamespace(ready=True, blockers=[], warnings=[]))
+    monkeypatch.setattr(brief_pipeline, "evaluate_message_for_processing", lambda _m, **_kw: (True, "direct_marker", {}))
+
+    async def _get_task(_session, task_id):
+        return FakeTask(id=task_id, status="cancelled") if task_id == 7 else None
+
+    async def _classify_locally(*_args, **_kwargs):
+        classified.append(True)
+        return ("template", {"is_task": False, "confidence": 0.9})
+
+    async def _noop(*_args, **_kwargs):
+        return None
+
+    monkeypatch.setattr(brief_pipeline.task_repo, "get_task_by_id", _get_task)
+    monkeypatch.setattr(brief_pipeline.message_repo, "mark_message_processed", _noop)
+    monkeypatch.setattr(brief_pipeline, "classify_locally", _classify_locally)
+
+    await brief_pipeline.process_brief(FakeMessage(text=text, message_id=301), _Session())
+
+    assert classified == [True]
+    assert len(brief_fingerprints) == 0  # cancelled and deleted tasks left the index
+
+    _index_brief(9, text)
+    await brief_pipeline.process_brief(FakeMessage(text=text, message_id=302), _Session(), check_duplicates=False)
+
+    assert classified == [True, True]
+    assert brief_fingerprints.stats.lookups == 1
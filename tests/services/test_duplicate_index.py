@@ -0,0 +1,90 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.constants import DUPLICATE_MAX_HAMMING
+from core.simhash import simhash, to_hex
+from db.models import Task
+from db.repo import task_repo
+from scripts.bench_local_extractor import SYNTHETIC_TEMPLATE
+from services.duplicate_index import BriefFingerprintIndex
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+BRIEF = SYNTHETIC_TEMPLATE.format(day=3, n=5, amount=120, minutes=7)
+
+
+def _index(**kwargs) -> BriefFingerprintIndex:
+    return BriefFingerprintIndex(clock=lambda: NOW, **kwargs)
+
+
+def test_every_fingerprint_within_max_distance_is_found():
+    rng = random.Random(21)
+    index = _index()
+    for task_id in range(1, 200):
+        index.add(task_id, -1001, 777, rng.getrandbits(64), NOW)
+
+    for task_id in range(1, 200):
+        stored = index._entries[task_id].fingerprint
+        flipped = stored
+        for bit in rng.sample(range(64), rng.randint(0, DUPLICATE_MAX_HAMMING)):
+            flipped ^= 1 << bit
+        assert task_id in {match.task_id for match in index.matches(-1001, 777, flipped)}
+
+    assert index.stats.lookups == 199
+
+
+def test_matches_are_scoped_to_chat_and_topic_and_sorted():
+    index = _index()
+    index.add(1, -1001, 777, 0b111, NOW)
+    index.add(2, -1001, 777, 0b1, NOW)
+    index.add(3, -1001, 888, 0, NOW)
+    index.add(4, -1002, 777, 0, NOW)
+
+    matches = index.matches(-1001, 777, 0)
+
+    assert [(match.task_id, match.distance) for match in matches] == [(2, 1), (1, 3)]
+    assert index.matches(-1001, 777, (1 << 64) - 1) == []
+
+
+def test_old_and_discarded_entries_are_not_matched():
+    index = _index(window=timedelta(days=14))
+    index.add(1, -1001, 777, 42, NOW - timedelta(days=15))
+    index.add(2, -1001, 777, 42, NOW - timedelta(days=1))
+    index.add(3, -1001, 777, 42, NOW)
+
+    assert len(index) == 2  # the expired entry was dropped on insert
+    index.discard(3)
+
+    assert [match.task_id for match in index.matches(-1001, 777, 42)] == [2]
+
+
+@pytest.mark.asyncio
+async def test_create_task_stores_fingerprint_and_load_indexes_recent_tasks(db_session):
+    task, _ = await task_repo.create_task(
+        db_session, message_id=1, chat_id=-1001, topic_id=777, raw_text=BRIEF,
+        created_at=(NOW - timedelta(hours=2)).isoformat(),
+    )
+    legacy = Task(  # row written before fingerprints were stored
+        message_id=2, chat_id=-1001, topic_id=777, raw_text=BRIEF.replace("120$", "90$"),
+        created_at=(NOW - timedelta(days=1)).isoformat(),
+    )
+    cancelled = Task(
+        message_id=3, chat_id=-1001, topic_id=777, raw_text=BRIEF, status="cancelled",
+        created_at=NOW.isoformat(),
+    )
+    old = Task(
+        message_id=4, chat_id=-1001, topic_id=777, raw_text=BRIEF,
+        created_at=(NOW - timedelta(days=30)).isoformat(),
+    )
+    db_session.add_all([legacy, cancelled, old])
+    await db_session.commit()
+
+    assert task.text_fingerprint == to_hex(simhash(BRIEF))
+    assert legacy.text_fingerprint is None
+
+    index = _index()
+    assert await index.load(db_session) == 2
+
+    matches = index.matches(-1001, 777, simhash(BRIEF))
+    assert {match.task_id for match in matches} == {task.id, legacy.id}
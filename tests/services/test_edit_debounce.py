@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from services.edit_debounce import EditDebouncer
+from tests.fakes import FakeMessage
+
+
+def _recorder():
+    processed = []
+
+    async def _process(message):
+        processed.append(message.text)
+
+    return processed, _process
+
+
+@pytest.mark.asyncio
+async def test_burst_of_edits_is_processed_once_with_latest_text():
+    debouncer = EditDebouncer(quiet_period=0.1)
+    processed, process = _recorder()
+
+    for version in range(4):
+        await debouncer.submit(FakeMessage(text=f"v{version}", message_id=7), process)
+        await asyncio.sleep(0.005)
+    await debouncer.submit(FakeMessage(text="other", message_id=8), process)
+    assert processed == []
+    assert debouncer.pending == 2
+
+    await asyncio.sleep(0.25)
+
+    assert sorted(processed) == ["other", "v3"]
+    assert (debouncer.stats.received, debouncer.stats.coalesced, debouncer.stats.flushed) == (5, 3, 2)
+    assert debouncer.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_zero_quiet_period_processes_inline():
+    debouncer = EditDebouncer(quiet_period=0)
+    processed, process = _recorder()
+
+    await debouncer.submit(FakeMessage(text="now"), process)
+
+    assert processed == ["now"]
+    assert debouncer.stats.flushed == 1
+
+
+@pytest.mark.asyncio
+async def test_flushes_of_same_message_do_not_overlap_and_flush_all_drains():
+    debouncer = EditDebouncer(quiet_period=10)
+    active = {"now": 0, "max": 0}
+    processed = []
+
+    async def _slow(message):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.01)
+        processed.append(message.text)
+        active["now"] -= 1
+
+    await debouncer.submit(FakeMessage(text="first", message_id=7), _slow)
+    debouncer._flush((-1001, 7))
+    await debouncer.submit(FakeMessage(text="second", message_id=7), _slow)
+    await debouncer.flush_all()
+
+    assert processed == ["first", "second"]
+    assert active["max"] == 1
@@ -0,0 +1,44 @@
+from datetime import date
+
+import pytest
+
+from db.models import ParseFailure, ProcessedMessage
+from scripts import report_malformed_rate as report_script
+
+
+def _failure(message_id: int, error_type: str, created_at: str) -> ParseFailure:
+    return ParseFailure(message_id=message_id, raw_text="x", error_type=error_type, created_at=created_at)
+
+
+def _processed(message_id: int, processed_at: str) -> ProcessedMessage:
+    return ProcessedMessage(chat_id=-100, message_id=message_id, processed_at=processed_at)
+
+
+@pytest.mark.asyncio
+async def test_compare_rates_counts_api_failures_per_window(db_session_factory):
+    async with db_session_factory() as session:
+        session.add_all(
+            [
+                *[_processed(n, f"2026-03-0{1 + n % 2}T10:00:00+00:00") for n in range(4)],
+                *[_processed(10 + n, "2026-03-11T10:00:00+00:00") for n in range(5)],
+                _failure(1, "api_error", "2026-03-02T10:00:00+00:00"),
+                _failure(2, "api_error", "2026-03-02T11:00:00+00:00"),
+                _failure(3, "task_create_failed", "2026-03-02T12:00:00+00:00"),
+                _failure(11, "api_error", "2026-03-11T10:00:00+00:00"),
+            ]
+        )
+        await session.commit()
+
+    before, after = await report_script.compare_rates(
+        date(2026, 3, 10), 14, session_maker=db_session_factory
+    )
+
+    assert (before.processed, before.failures, before.rate) == (4, 2, 0.5)
+    assert (after.processed, after.failures, after.rate) == (5, 1, 0.2)
+
+
+def test_parse_args_requires_cutover_date():
+    args = report_script.parse_args(["--cutover", "2026-03-10", "--days", "7"])
+    assert args.cutover == date(2026, 3, 10) and args.days == 7
+    with pytest.raises(SystemExit):
+        report_script.parse_args(["--cutover", "10.03.2026"])
@@ -0,0 +1,45 @@
+import pytest
+
+from services.sender_budget import SenderBudget
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_defers_until_refill():
+    clock = _Clock()
+    budget = SenderBudget(burst=2, per_hour=60, clock=clock)
+
+    assert budget.try_charge(7) == 0.0
+    assert budget.try_charge(7) == 0.0
+    assert budget.try_charge(7) == pytest.approx(60.0)
+    assert budget.try_charge(8) == 0.0  # other senders have their own bucket
+
+    # The token refilled at 60s belongs to the deferred message.
+    clock.now = 60.0
+    assert budget.try_charge(7) == pytest.approx(60.0)
+    clock.now = 180.0
+    assert budget.try_charge(7) == 0.0
+    assert (budget.stats.charged, budget.stats.deferred) == (4, 2)
+
+
+def test_deferrals_reserve_tokens_so_due_times_are_spaced():
+    clock = _Clock()
+    budget = SenderBudget(burst=1, per_hour=30, clock=clock)
+
+    assert budget.try_charge(7) == 0.0
+    waits = [budget.try_charge(7) for _ in range(5)]
+
+    assert waits == pytest.approx([120.0, 240.0, 360.0, 480.0, 600.0])
+
+
+def test_zero_limits_disable_the_budget():
+    budget = SenderBudget(burst=0, per_hour=60)
+
+    assert budget.enabled is False
+    assert all(budget.try_charge(7) == 0.0 for _ in range(10))
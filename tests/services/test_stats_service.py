@@ -80,3 +80,39 @@ async def test_get_monthly_stats_aggregates(db_session, monkeypatch):
     assert stats["avg_amount"] == 87.5
     assert stats["platforms"]["fansly"]["count"] == 2
     assert stats["platforms"]["unknown"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_monthly_stats_empty_month_and_missing_values(db_session, monkeypatch):
+    monkeypatch.setattr(stats_service, "today_local", lambda: "2026-02-20")
+
+    empty = await stats_service.get_monthly_stats(db_session, 2026, 2)
+    assert empty["total"] == 0
+    assert empty["total_amount"] == 0
+    assert empty["avg_amount"] == 0
+    assert empty["platforms"] == {}
+
+    db_session.add_all(
+        [
+            Task(message_id=1, chat_id=-100, status="draft", amount_total=None, platform=None,
+                 deadline="", created_at="2026-02-05T10:00:00+00:00"),
+            Task(message_id=2, chat_id=-100, status="draft", amount_total=40, platform="",
+                 deadline="2026-02-01", created_at="2026-02-06T10:00:00+00:00"),
+            # 01:00 in Moscow on March 1st is still February in UTC.
+            Task(message_id=3, chat_id=-100, status="delivered", amount_total=60, platform="fansly",
+                 deadline="2026-02-01", created_at="2026-03-01T01:00:00+03:00"),
+        ]
+    )
+    await db_session.flush()
+
+    stats = await stats_service.get_monthly_stats(db_session, 2026, 2)
+
+    assert stats["total"] == 3
+    assert stats["completed"] == 1
+    assert stats["in_progress"] == 2
+    assert stats["overdue"] == 1  # empty deadline and delivered tasks are not overdue
+    assert stats["total_amount"] == 100
+    assert stats["platforms"] == {
+        "unknown": {"count": 2, "amount": 40.0},
+        "fansly": {"count": 1, "amount": 60.0},
+    }
@@ -0,0 +1,103 @@
+import json
+import random
+
+import pytest
+
+from db.models import RoleMembership, Task
+from scripts import train_prefilter_model as trainer
+
+CHAT_PADDING = " обычный разговор в чате"
+
+
+def _examples(count: int = 300) -> list[trainer.Example]:
+    rng = random.Random(20)
+    examples = []
+    for n in range(count):
+        is_brief = n % 3 == 0
+        if is_brief:
+            parts = rng.sample(["Оплата: 80$", "Длительность 5 минут", "https://fansly.com/fan", "🎬 видео"], 3)
+        else:
+            parts = rng.sample(["оплата прошла?", "созвон через 15 минут", "🔥", "смотри fansly.com"], 2)
+        examples.append(trainer.Example(text=" ".join(parts) + CHAT_PADDING * rng.randint(1, 6) + f" #{n}", is_brief=is_brief))
+    return examples
+
+
+def test_fit_logistic_learns_the_informative_feature():
+    rows = [[1.0, 0.0]] * 40 + [[0.0, 0.0]] * 40 + [[0.0, 1.0]] * 10 + [[1.0, 1.0]] * 10
+    labels = [True] * 36 + [False] * 4 + [False] * 36 + [True] * 4 + [False, True] * 10
+
+    intercept, informative, noise = trainer.fit_logistic(rows, labels, ridge=0.1)
+
+    assert informative > 2.0
+    assert abs(noise) < 1.0
+    assert intercept < 0
+
+
+def test_threshold_for_recall_keeps_the_target_share_of_briefs():
+    probabilities = [0.9, 0.8, 0.4, 0.3, 0.2]
+    labels = [True, False, True, False, True]
+
+    assert trainer.threshold_for_recall(probabilities, labels, 1.0) == 0.2
+    assert trainer.threshold_for_recall(probabilities, labels, 0.6) == 0.4
+
+
+def test_train_reports_calls_saved_at_equal_recall():
+    model, report = trainer.train(_examples())
+
+    assert report.holdout == 60
+    assert report.model_equal_recall.recall >= report.heuristic.recall
+    assert report.saved_calls == report.heuristic.calls - report.model_equal_recall.calls
+    assert report.saved_calls >= 0
+    assert "sender_admin" not in model.weights  # no sender known for either class
+    assert 0.0 < model.threshold < 1.0
+    assert json.loads(model.to_json())["meta"]["ai_calls_saved_at_equal_recall"] == report.saved_calls
+
+
+def test_train_needs_both_classes():
+    with pytest.raises(ValueError):
+        trainer.train([example for example in _examples() if example.is_brief])
+
+
+def test_recording_examples_use_expected_or_recorded_verdict(tmp_path):
+    path = tmp_path / "recordings.jsonl"
+    lines = [
+        {
+            "text": "бриф",
+            "content": [{"type": "tool_use", "id": "t1", "name": "record_classification", "input": {"t": False, "c": 0.9}}],
+            "expected": {"is_task": True},
+        },
+        {
+            "text": "чат",
+            "content": [{"type": "tool_use", "id": "t2", "name": "record_classification", "input": {"t": False, "c": 0.9}}],
+        },
+        {"text": "сломанный ответ", "content": [{"type": "text", "text": "?"}]},
+    ]
+    path.write_text("\n".join(json.dumps(line, ensure_ascii=False) for line in lines), encoding="utf-8")
+
+    examples = trainer.recording_examples(path)
+
+    assert [(example.text, example.is_brief) for example in examples] == [("бриф", True), ("чат", False)]
+
+
+@pytest.mark.asyncio
+async def test_task_examples_resolve_roles_and_skip_teamleads(db_session_factory):
+    async with db_session_factory() as session:
+        session.add_all(
+            [
+                RoleMembership(role="admin", username="boss"),
+                RoleMembership(role="teamlead", username="lead"),
+                Task(message_id=1, chat_id=-100, raw_text="бриф от админа", sender_username="@Boss", priority="medium"),
+                Task(message_id=2, chat_id=-100, raw_text="бриф от тимлида", sender_username="lead", priority="medium"),
+                Task(message_id=3, chat_id=-100, raw_text="бриф без отправителя", priority="medium"),
+            ]
+        )
+        await session.commit()
+
+    examples = await trainer.task_examples(session_maker=db_session_factory)
+
+    by_text = {example.text: example for example in examples}
+    assert set(by_text) == {"бриф от админа", "бриф без отправителя"}
+    assert by_text["бриф от админа"].sender_admin is True
+    assert by_text["бриф без отправителя"].sender_known is False
+    merged = trainer.merge_examples(examples, [trainer.Example(text="бриф от админа", is_brief=False)])
+    assert len(merged) == 2 and all(example.is_brief for example in merged)
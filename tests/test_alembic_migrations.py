@@ -33,10 +33,16 @@ async def test_alembic_upgrade_creates_expected_tables_and_indexes(tmp_path):
     assert "status_logs" in tables
     assert "app_settings" in tables
     assert "ai_retry_queue" in tables
+    assert "ai_classification_cache" in tables
 
     assert "ix_tasks_status" in indexes
     assert "ix_tasks_deadline" in indexes
     assert "uq_ai_retry_queue_chat_message" in indexes
+    assert "ix_ai_classification_cache_last_accessed_at" in indexes
+    assert "ix_tasks_chat_bot_message" in indexes
+    assert "ix_tasks_active_deadline" in indexes
+    assert "ix_tasks_updated_at" in indexes
+    assert "ix_status_logs_task_created" in indexes
 
     conn = sqlite3.connect(db_file)
     try:
@@ -50,6 +56,18 @@ async def test_alembic_upgrade_creates_expected_tables_and_indexes(tmp_path):
     assert "description_original" in task_columns
     assert "outfit_original" in task_columns
     assert "notes_original" in task_columns
+    assert "text_fingerprint" in task_columns
+
+    conn = sqlite3.connect(db_file)
+    try:
+        retry_columns = {
+            row[1]
+            for row in conn.execute("PRAGMA table_info(ai_retry_queue)")
+        }
+    finally:
+        conn.close()
+
+    assert "priority" in retry_columns
 
 
 def _upgrade(db_file: Path, revision: str) -> None:
@@ -137,3 +155,49 @@ def test_alembic_backfills_original_brief_sections(tmp_path):
     assert row[0] == "Оригинальное длинное описание"
     assert row[1] == "аутфит из скрина"
     assert row[2] == "без музыки"
+
+
+def test_alembic_converts_timestamps_to_epoch_microseconds(tmp_path):
+    db_file = tmp_path / "migration_timestamps.sqlite3"
+    _upgrade(db_file, "0006_add_task_text_fingerprint")
+
+    conn = sqlite3.connect(db_file)
+    try:
+        conn.executemany(
+            """
+            INSERT INTO tasks (message_id, chat_id, priority, status, finished_at, created_at, updated_at)
+            VALUES (?, -100, 'medium', 'finished', ?, ?, ?)
+            """,
+            [
+                (1, "2026-02-18T12:00:00+00:00", "2026-02-17T09:00:00+00:00", "2026-02-18T12:00:00+00:00"),
+                # Later as a string, earlier as an instant.
+                (2, "2026-02-18T13:00:00+03:00", "2026-02-17T09:00:00.500000", "not-a-date"),
+                (3, None, "2026-02-17T09:00:00+00:00", "2026-02-17T09:00:00+00:00"),
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    _upgrade(db_file, "head")
+
+    conn = sqlite3.connect(db_file)
+    try:
+        rows = conn.execute(
+            "SELECT message_id, finished_at, created_at, updated_at, typeof(created_at) FROM tasks ORDER BY message_id"
+        ).fetchall()
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        by_finished = [
+            row[0]
+            for row in conn.execute(
+                "SELECT message_id FROM tasks WHERE finished_at IS NOT NULL ORDER BY finished_at"
+            )
+        ]
+    finally:
+        conn.close()
+
+    assert rows[0] == (1, 1771416000000000, 1771318800000000, 1771416000000000, "integer")
+    assert rows[1] == (2, 1771408800000000, 1771318800500000, 0, "integer")
+    assert rows[2][1] is None
+    assert by_finished == [2, 1]
+    assert {"ix_tasks_created_at", "ix_tasks_finished_at"} <= indexes
@@ -109,6 +109,7 @@ async def test_process_brief_happy_path_still_creates_card(monkeypatch):
         amount_total=250.0,
         chat_id=message.chat.id,
         topic_id=message.message_thread_id,
+        text_fingerprint=None,
     )
     classify_called = {"value": False}
     update_card_binding_called = {"value": False}
@@ -122,7 +123,7 @@ async def test_process_brief_happy_path_still_creates_card(monkeypatch):
     monkeypatch.setattr(
         brief_pipeline,
         "evaluate_message_for_processing",
-        lambda _message: (True, "direct_marker", {"score": 3}),
+        lambda _message, **_kw: (True, "direct_marker", {"score": 3}),
     )
 
     async def _classify_message(_text, _has_photo=False):
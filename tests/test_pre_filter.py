@@ -1,5 +1,9 @@
 from datetime import datetime
 
+import pytest
+
+from core.constants import MIN_HEURISTIC_SCORE
+from core.prefilter_model import PrefilterModel
 from pre_filter import evaluate_message_for_processing
 from tests.fakes import FakeMessage, make_user
 
@@ -55,3 +59,38 @@ def test_prefilter_rejects_low_score():
     should, reason, _ = evaluate_message_for_processing(msg)
     assert should is False
     assert reason == "heuristic_score_low"
+
+
+
+def test_prefilter_sheds_borderline_score_under_raised_threshold():
+    text = "Это длинный текст с payment и дедлайн и 15 минут и еще слова для длины"
+    msg = FakeMessage(text=text)
+    _, reason, details = evaluate_message_for_processing(msg)
+    assert reason == "heuristic_score"
+
+    should, reason, details = evaluate_message_for_processing(msg, min_score=details["score"] + 1)
+
+    assert should is False
+    assert reason == "heuristic_score_shed"
+    assert details["min_score"] == details["score"] + 1
+
+    direct = FakeMessage(text="📦 описание заказа\nкраткий текст" + "x" * 40)
+    assert evaluate_message_for_processing(direct, min_score=5)[1] == "direct_marker"
+
+
+def test_prefilter_uses_learned_model_when_configured(monkeypatch):
+    model = PrefilterModel(intercept=-4.0, weights={"has_platform_link": 5.0}, threshold=0.5)
+    monkeypatch.setattr("pre_filter.prefilter_model", lambda: model)
+    keyword_only = FakeMessage(text="Это длинный текст с payment и дедлайн и 15 минут и еще слова для длины")
+    link = FakeMessage(text="Посмотри профиль https://fansly.com/test пожалуйста, это важно")
+
+    should, reason, details = evaluate_message_for_processing(keyword_only)
+    assert (should, reason) == (False, "model_score_low")
+    assert details["score"] >= 2
+
+    should, reason, details = evaluate_message_for_processing(link)
+    assert (should, reason) == (True, "model_score")
+    assert details["model_probability"] == pytest.approx(0.7311, abs=1e-4)
+
+    should, reason, _ = evaluate_message_for_processing(link, min_score=MIN_HEURISTIC_SCORE + 3)
+    assert (should, reason) == (False, "model_score_shed")
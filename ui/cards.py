@@ -1,3 +1,5 @@
+from types import SimpleNamespace
+
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from core.text_utils import esc
@@ -25,8 +27,8 @@ def _build_common_header(task: Task, status_icon: str, status_label: str) -> str
     return " | ".join(parts)
 
 
-def _build_common_lines(task: Task, status_icon: str, status_label: str) -> list[str]:
-    lines = [_build_common_header(task, status_icon, status_label)]
+def _build_detail_lines(task) -> list[str]:
+    lines: list[str] = []
     if task.description:
         lines.append(esc(task.description[:100]))
     if task.duration:
@@ -40,12 +42,31 @@ def _build_common_lines(task: Task, status_icon: str, status_label: str) -> list
         fan_platform_parts.append(f"🌐 {esc(platform_label)}")
     if fan_platform_parts:
         lines.append(" | ".join(fan_platform_parts))
+    return lines
+
+
+def _build_common_lines(task: Task, status_icon: str, status_label: str) -> list[str]:
+    lines = [_build_common_header(task, status_icon, status_label)]
+    lines.extend(_build_detail_lines(task))
 
     priority_icon = PRIORITY_EMOJI.get(task.priority, "🟡")
     lines.append(f"{priority_icon} {esc(task.priority)}")
     return lines
 
 
+def build_streaming_draft_card(data: dict) -> str:
+    """Skeleton draft card posted while the classification is still streaming."""
+    fields = SimpleNamespace(
+        **{key: data.get(key) for key in ("description", "duration", "fan_name", "platform")}
+    )
+    parts = ["📋 <b>Новый кастом</b>", format_amount(data.get("amount_total"), data.get("payment_note"))]
+    deadline_str = format_deadline_status(data.get("deadline"))
+    if deadline_str:
+        parts.append(deadline_str)
+    parts.append("⏳ распознаю…")
+    return "\n".join([" | ".join(parts), *_build_detail_lines(fields)])
+
+
 def build_draft_card(task: Task) -> tuple[str, InlineKeyboardMarkup]:
     lines = _build_common_lines(task, "📋", STATUS_LABEL["draft"])
     keyboard = InlineKeyboardMarkup(
@@ -65,6 +86,31 @@ def build_draft_card(task: Task) -> tuple[str, InlineKeyboardMarkup]:
     return "\n".join(lines), keyboard
 
 
+def build_duplicate_card(task: Task) -> tuple[str, InlineKeyboardMarkup]:
+    """Reply to a repost of `task`'s brief; the buttons carry the existing task id."""
+    lines = [
+        f"🔁 Похоже на повтор кастома #{task.id:03d}",
+        _build_common_header(task, "📋", STATUS_LABEL.get(task.status, task.status)),
+        *_build_detail_lines(task),
+        "Новый кастом не создан. Подтвердите повтор или создайте отдельный кастом.",
+    ]
+    keyboard = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    text="✅ Да, повтор",
+                    callback_data=_task_callback(task.id, "dup_ok"),
+                ),
+                InlineKeyboardButton(
+                    text="➕ Новый кастом",
+                    callback_data=_task_callback(task.id, "dup_new"),
+                ),
+            ]
+        ]
+    )
+    return "\n".join(lines), keyboard
+
+
 def build_awaiting_card(task: Task) -> tuple[str, InlineKeyboardMarkup]:
     lines = _build_common_lines(task, "📦", STATUS_LABEL["awaiting_confirmation"])
     keyboard = InlineKeyboardMarkup(